@@ -0,0 +1,444 @@
+"""
+ATS board snapshots — whole-company job lists from public JSON board APIs.
+
+Greenhouse, Lever and Ashby each publish every open job for a company in
+one JSON document. Fetching that once per company replaces a web search
+plus a page fetch per lead: leads are matched against the snapshot
+locally, and the matched job's description comes straight from it.
+
+Snapshots live in pipeline/boards/{ats}/{slug}.json, one per board, with
+a content hash per job so consecutive snapshots can be diffed (new,
+closed and edited postings); each refresh records its diff against the
+previous snapshot under "changes". Companies with no board on an ATS are
+remembered in pipeline/boards/missing.json so they aren't re-checked
+every run.
+
+Boards are found by guessing slugs from the company name, so a slug can
+belong to a different company ("mercury"). A board that names another
+company is skipped; one that names none (Lever, Ashby without a title)
+is used with lower confidence.
+
+Usage:
+    python ats_boards.py greenhouse acme       # refresh one board, show changes
+    python ats_boards.py --company "Acme Inc"  # find the company's board
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from company_resolver import company_key
+
+# Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOARDS_DIR = os.path.join(SCRIPT_DIR, "pipeline", "boards")
+
+BOARD_APIS = {
+    "greenhouse": "https://boards-api.greenhouse.io/v1/boards/{slug}/jobs?content=true",
+    "lever": "https://api.lever.co/v0/postings/{slug}?mode=json",
+    "ashby": "https://api.ashbyhq.com/posting-api/job-board/{slug}",
+}
+
+DEFAULT_MAX_AGE_SECONDS = 6 * 3600
+
+# match() confidence: exact / partial title match on a board that names the
+# lead's company, and on a board that names no company
+BOARD_CONFIDENCE = (0.9, 0.85)
+UNVERIFIED_BOARD_CONFIDENCE = (0.6, 0.55)
+
+_STOP_WORDS = {'the', 'and', 'for', 'with'}
+
+# Posting URLs -> (slug, job id), per ATS
+_JOB_URL_RES = {
+    "greenhouse": re.compile(r'greenhouse\.io/([^/?#]+)/jobs/(\d+)', re.IGNORECASE),
+    "lever": re.compile(r'jobs\.lever\.co/([^/?#]+)/([a-f0-9-]{8,})', re.IGNORECASE),
+    "ashby": re.compile(r'jobs\.ashbyhq\.com/([^/?#]+)/([a-f0-9-]{8,})', re.IGNORECASE),
+}
+
+
+# ---------------------------------------------------------------------------
+# Fetching and normalizing
+# ---------------------------------------------------------------------------
+
+def company_slugs(company):
+    """Candidate board slugs for a company name, most likely first."""
+    name = company.lower()
+    name = re.sub(r',?\s+(inc|llc|ltd|corp|corporation|co)\.?$', '', name.strip())
+    slugs = [re.sub(r'[^a-z0-9]', '', name), re.sub(r'[^a-z0-9]+', '-', name).strip('-')]
+    return [s for i, s in enumerate(slugs) if s and s not in slugs[:i]]
+
+
+def parse_job_url(url):
+    """(ats, slug, job_id) for a Greenhouse/Lever/Ashby posting URL, or None."""
+    for ats, pattern in _JOB_URL_RES.items():
+        match = pattern.search(url or "")
+        if match:
+            return ats, match.group(1), match.group(2)
+    return None
+
+
+def content_hash(job):
+    """Stable hash of the parts of a posting a candidate would notice changing."""
+    key = json.dumps([job["title"], job["location"], job["description_html"]], sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _normalize_greenhouse(data, slug):
+    jobs = []
+    for job in data.get("jobs", []):
+        jobs.append({
+            "id": str(job.get("id", "")),
+            "title": job.get("title") or "",
+            "url": job.get("absolute_url") or f"https://boards.greenhouse.io/{slug}/jobs/{job.get('id')}",
+            "location": (job.get("location") or {}).get("name", ""),
+            "company": job.get("company_name") or "",
+            "description_html": html.unescape(job.get("content") or ""),
+        })
+    company = next((j["company"] for j in jobs if j["company"]), slug)
+    return company, jobs
+
+
+def _normalize_lever(data, slug):
+    jobs = []
+    for job in data if isinstance(data, list) else []:
+        parts = [job.get("description") or ""]
+        for section in job.get("lists") or []:
+            parts.append(f"<h3>{section.get('text', '')}</h3><ul>{section.get('content', '')}</ul>")
+        parts.append(job.get("additional") or "")
+        jobs.append({
+            "id": str(job.get("id", "")),
+            "title": job.get("text") or "",
+            "url": job.get("hostedUrl") or f"https://jobs.lever.co/{slug}/{job.get('id')}",
+            "location": (job.get("categories") or {}).get("location") or "",
+            "company": "",
+            "description_html": "\n".join(p for p in parts if p),
+        })
+    return slug, jobs
+
+
+def _normalize_ashby(data, slug):
+    jobs = []
+    for job in data.get("jobs", []):
+        jobs.append({
+            "id": str(job.get("id", "")),
+            "title": job.get("title") or "",
+            "url": job.get("jobUrl") or f"https://jobs.ashbyhq.com/{slug}/{job.get('id')}",
+            "location": job.get("location") or "",
+            "company": "",
+            "description_html": job.get("descriptionHtml") or "",
+        })
+    return data.get("jobBoard", {}).get("title", slug), jobs
+
+
+_NORMALIZERS = {
+    "greenhouse": _normalize_greenhouse,
+    "lever": _normalize_lever,
+    "ashby": _normalize_ashby,
+}
+
+
+def fetch_board(http, ats, slug):
+    """Fetch one company board. Returns a snapshot dict, or None if the
+    company has no board on this ATS.
+
+    Raises requests.RequestException / ValueError on transport or JSON errors.
+    """
+    resp = http.get(BOARD_APIS[ats].format(slug=slug),
+                    headers={"Accept": "application/json"}, timeout=15)
+    if resp.status_code in (404, 410):
+        return None
+    resp.raise_for_status()
+    company, jobs = _NORMALIZERS[ats](resp.json(), slug)
+    for job in jobs:
+        job["content_hash"] = content_hash(job)
+    return {
+        "ats": ats,
+        "slug": slug,
+        "company": company,
+        "fetched_at": datetime.now().isoformat(),
+        "jobs": jobs,
+    }
+
+
+def diff_snapshots(old, new):
+    """Compare two snapshots of the same board by job id and content hash.
+
+    Returns {added, removed, changed} lists of job ids.
+    """
+    old_jobs = {j["id"]: j["content_hash"] for j in (old or {}).get("jobs", [])}
+    new_jobs = {j["id"]: j["content_hash"] for j in (new or {}).get("jobs", [])}
+    return {
+        "added": sorted(set(new_jobs) - set(old_jobs)),
+        "removed": sorted(set(old_jobs) - set(new_jobs)),
+        "changed": sorted(i for i in set(old_jobs) & set(new_jobs) if old_jobs[i] != new_jobs[i]),
+    }
+
+
+def format_diff(snapshot, diff):
+    return (f"{snapshot['company']} ({snapshot['ats']}): {len(snapshot['jobs'])} open, "
+            f"+{len(diff['added'])} new, -{len(diff['removed'])} closed, "
+            f"{len(diff['changed'])} changed")
+
+
+# ---------------------------------------------------------------------------
+# Local matching
+# ---------------------------------------------------------------------------
+
+def board_names_company(snapshot, company):
+    """True if the board's company is company, False if it is another one,
+    None if the board does not name its company (only its slug)."""
+    board_company = snapshot.get("company") or ""
+    if not board_company or board_company == snapshot.get("slug"):
+        return None
+    ours, theirs = company_key(company or ""), company_key(board_company)
+    return bool(ours) and (ours == theirs or ours.replace(" ", "") == theirs.replace(" ", ""))
+
+
+def _title_words(text):
+    return set(re.findall(r'\b[a-z]{3,}\b', text.lower())) - _STOP_WORDS
+
+
+def match_role(snapshot, role):
+    """Best job on a board for a role title. Returns (job, score) or (None, 0).
+
+    Same word-overlap test the scrapers use: at least two shared title
+    words (or all of them for one-word roles), covering half the role.
+    """
+    role_words = _title_words(role or "")
+    if not role_words:
+        return None, 0.0
+    needed = min(2, len(role_words))
+
+    best_job, best_key = None, None
+    for job in snapshot.get("jobs", []):
+        job_words = _title_words(job["title"])
+        overlap = len(role_words & job_words)
+        if overlap < needed or overlap / len(role_words) < 0.5:
+            continue
+        # Most role words covered, then fewest extra words in the job title
+        key = (overlap / len(role_words), -len(job_words - role_words))
+        if best_key is None or key > best_key:
+            best_job, best_key = job, key
+    if best_job is None:
+        return None, 0.0
+    return best_job, round(best_key[0], 2)
+
+
+# ---------------------------------------------------------------------------
+# Snapshot store
+# ---------------------------------------------------------------------------
+
+class BoardStore:
+    """Board snapshots on disk, refreshed through an HttpClient.
+
+    Each board is fetched at most once per process; a snapshot younger than
+    max_age_seconds is reused from disk without a request. If a refresh
+    fails (offline, cache-only, API down) a stale snapshot is still used.
+    Thread-safe: concurrent leads for the same company share one fetch.
+    """
+
+    def __init__(self, http, boards_dir=BOARDS_DIR, max_age_seconds=DEFAULT_MAX_AGE_SECONDS,
+                 log=print):
+        self.http = http
+        self.boards_dir = boards_dir
+        self.max_age_seconds = max_age_seconds
+        self.log = log
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._boards = {}       # (ats, slug) -> snapshot or None
+        self._by_url = {}       # job url -> (snapshot, job)
+        self._missing = None    # "ats/slug" -> epoch seconds last checked
+
+    # -- disk --------------------------------------------------------------
+
+    def _path(self, ats, slug):
+        return os.path.join(self.boards_dir, ats, f"{slug}.json")
+
+    def _missing_path(self):
+        return os.path.join(self.boards_dir, "missing.json")
+
+    def _load_json(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _is_missing(self, key, now):
+        with self._lock:
+            if self._missing is None:
+                self._missing = self._load_json(self._missing_path()) or {}
+            checked = self._missing.get(key)
+        return checked is not None and now - checked < self.max_age_seconds
+
+    def _set_missing(self, key, checked):
+        with self._lock:
+            if self._missing is None:
+                self._missing = self._load_json(self._missing_path()) or {}
+            self._missing[key] = checked
+            self._write_json(self._missing_path(), self._missing)
+
+    # -- boards ------------------------------------------------------------
+
+    def board(self, ats, slug, refresh=False):
+        """Snapshot for one board, or None if the company has none there."""
+        key = (ats, slug)
+        with self._lock:
+            if key in self._boards and not refresh:
+                return self._boards[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._boards and not refresh:
+                    return self._boards[key]
+            snapshot = self._load_or_fetch(ats, slug, refresh)
+            with self._lock:
+                self._boards[key] = snapshot
+                if snapshot:
+                    for job in snapshot["jobs"]:
+                        self._by_url[job["url"]] = (snapshot, job)
+            return snapshot
+
+    def _load_or_fetch(self, ats, slug, refresh):
+        now = time.time()
+        path = self._path(ats, slug)
+        previous = self._load_json(path)
+        if previous and not refresh:
+            age = now - datetime.fromisoformat(previous["fetched_at"]).timestamp()
+            if age < self.max_age_seconds:
+                return previous
+        if not previous and not refresh and self._is_missing(f"{ats}/{slug}", now):
+            return None
+
+        try:
+            snapshot = fetch_board(self.http, ats, slug)
+        except (requests.RequestException, ValueError):
+            return previous  # stale beats nothing
+
+        if snapshot is None:
+            self._set_missing(f"{ats}/{slug}", now)
+            return None
+        if previous:
+            diff = diff_snapshots(previous, snapshot)
+            snapshot["changes"] = diff
+            if any(diff.values()):
+                self.log(f"      Board update — {format_diff(snapshot, diff)}")
+        self._write_json(path, snapshot)
+        return snapshot
+
+    def find_board(self, company):
+        """First board found for a company across the supported ATSs.
+
+        Boards that name a different company are skipped.
+        """
+        candidates = [(ats, slug) for slug in company_slugs(company) for ats in BOARD_APIS]
+        if not candidates:
+            return None
+        # Check every candidate (so misses are remembered), prefer by order
+        with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+            snapshots = list(pool.map(lambda c: self.board(*c), candidates))
+        return next((s for s in snapshots
+                     if s and s["jobs"] and board_names_company(s, company) is not False), None)
+
+    def match(self, company, role):
+        """Match a lead against the company's board locally.
+
+        Returns {url, ats_type, confidence, company_verified, job} or None.
+        """
+        snapshot = self.find_board(company)
+        if not snapshot:
+            return None
+        job, score = match_role(snapshot, role)
+        if not job:
+            return None
+        verified = bool(board_names_company(snapshot, company))
+        exact, partial = BOARD_CONFIDENCE if verified else UNVERIFIED_BOARD_CONFIDENCE
+        return {
+            "url": job["url"],
+            "ats_type": snapshot["ats"],
+            "confidence": exact if score == 1.0 else partial,
+            "company_verified": verified,
+            "job": job,
+        }
+
+    def lookup_job(self, url):
+        """(snapshot, job) for a posting URL, or None.
+
+        Checks boards already loaded, then the board the URL belongs to.
+        """
+        with self._lock:
+            hit = self._by_url.get(url)
+        if hit:
+            return hit
+        parsed = parse_job_url(url)
+        if not parsed:
+            return None
+        ats, slug, job_id = parsed
+        snapshot = self.board(ats, slug)
+        for job in (snapshot or {}).get("jobs", []):
+            if job["id"] == job_id:
+                return snapshot, job
+        return None
+
+
+def build_store(config, http, boards_dir=BOARDS_DIR, log=print):
+    """Build a BoardStore from the `ats_boards` config section (None if disabled)."""
+    boards_cfg = config.get("ats_boards", {})
+    if not boards_cfg.get("enabled", True):
+        return None
+    max_age = boards_cfg.get("max_age_hours", DEFAULT_MAX_AGE_SECONDS / 3600) * 3600
+    return BoardStore(http, boards_dir=boards_dir, max_age_seconds=max_age, log=log)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    import argparse
+
+    from http_client import HttpClient
+
+    parser = argparse.ArgumentParser(description="Fetch and diff ATS job board snapshots")
+    parser.add_argument("ats", nargs="?", choices=sorted(BOARD_APIS), help="ATS name")
+    parser.add_argument("slug", nargs="?", help="Board slug (e.g. 'acme')")
+    parser.add_argument("--company", help="Find the board for a company name instead")
+    args = parser.parse_args()
+
+    if not args.company and not (args.ats and args.slug):
+        parser.error("give ATS and SLUG, or --company")
+
+    store = BoardStore(HttpClient(), max_age_seconds=0)
+    if args.company:
+        snapshot = store.find_board(args.company)
+    else:
+        snapshot = store.board(args.ats, args.slug, refresh=True)
+
+    if not snapshot:
+        print("  No board found.")
+        sys.exit(1)
+
+    print(f"  {format_diff(snapshot, snapshot.get('changes', diff_snapshots(None, snapshot)))}")
+    for job in snapshot["jobs"]:
+        print(f"    {job['title'][:60]:<60} {job['location'][:25]:<25} {job['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Content-addressed, compressed blob store for raw email bodies and
+scraped career-page HTML.
+
+Layout under pipeline/blobs/:
+
+    <first 2 hex>/<sha256 of content>.zst   (or .gz without zstandard)
+
+A blob is addressed by the SHA-256 of its uncompressed bytes, so the same
+LinkedIn alert template or career page saved twice is stored once. Staging
+JSON keeps only the hash: a field such as `body_html` is written as
+`body_html_blob: <sha256>`, at any depth of the record (see
+dehydrate/hydrate). Records written before
+the store existed still carry the field inline and read back unchanged.
+
+zstd is used when the optional `zstandard` package is installed, gzip
+otherwise; blobs written with either codec can be read as long as the
+codec is available.
+
+Usage:
+    python blob_store.py             # blob count and bytes on disk
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
+BLOBS_DIR = os.path.join(PIPELINE_DIR, "blobs")
+
+# Suffix of a staging-JSON key that holds a blob hash instead of content
+REF_SUFFIX = "_blob"
+
+# Bodies shorter than this stay inline; a hash plus a file costs more
+MIN_BLOB_BYTES = 256
+
+
+def _gzip_compress(data):
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+if zstandard is not None:
+    CODECS = {
+        ".zst": (zstandard.ZstdCompressor(level=10).compress,
+                 lambda data: zstandard.ZstdDecompressor().decompress(data)),
+        ".gz": (_gzip_compress, gzip.decompress),
+    }
+else:
+    CODECS = {".gz": (_gzip_compress, gzip.decompress)}
+
+DEFAULT_CODEC = ".zst" if zstandard is not None else ".gz"
+
+
+class BlobStore:
+    """SHA-256 addressed, compressed, write-once files under one directory."""
+
+    def __init__(self, root=BLOBS_DIR, codec=DEFAULT_CODEC):
+        if codec not in CODECS:
+            raise ValueError(f"blob codec {codec} not available")
+        self.root = root
+        self.codec = codec
+
+    def _path(self, digest, ext):
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    def _find(self, digest):
+        for ext in CODECS:
+            path = self._path(digest, ext)
+            if os.path.exists(path):
+                return path, ext
+        return None, None
+
+    def put(self, data):
+        """Store bytes or text (UTF-8); returns the SHA-256 hex digest."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find(digest)[0]:
+            return digest
+        path = self._path(digest, self.codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so a crash never leaves a truncated blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(CODECS[self.codec][0](data))
+        os.replace(tmp, path)
+        return digest
+
+    def get(self, digest):
+        """Return the bytes for digest; KeyError if it is not stored."""
+        path, ext = self._find(digest)
+        if path is None:
+            if os.path.exists(self._path(digest, ".zst")):
+                raise RuntimeError(f"blob {digest} is zstd-compressed; pip install zstandard")
+            raise KeyError(digest)
+        with open(path, "rb") as f:
+            return CODECS[ext][1](f.read())
+
+    def get_text(self, digest):
+        return self.get(digest).decode("utf-8")
+
+    def __contains__(self, digest):
+        return self._find(digest)[0] is not None
+
+    def stats(self):
+        """{"blobs": n, "bytes": compressed bytes on disk}."""
+        count = size = 0
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if name.endswith((".zst", ".gz")):
+                        count += 1
+                        size += os.path.getsize(os.path.join(dirpath, name))
+        return {"blobs": count, "bytes": size}
+
+
+# ---------------------------------------------------------------------------
+# Staging-record helpers
+# ---------------------------------------------------------------------------
+
+def dehydrate(record, fields, store):
+    """Copy of record with each large text field in fields moved to the store.
+
+    `record[field]` becomes `record[field + "_blob"] = <sha256>`. A dotted
+    field ("forward_info.original_body_text") names a field of a nested
+    dict, which is copied too. Empty and short values stay inline.
+    """
+    out = dict(record)
+    for field in fields:
+        *parents, name = field.split(".")
+        target = out
+        for parent in parents:
+            if not isinstance(target.get(parent), dict):
+                break
+            target[parent] = dict(target[parent])
+            target = target[parent]
+        else:
+            value = target.get(name)
+            if isinstance(value, str) and len(value.encode("utf-8")) >= MIN_BLOB_BYTES:
+                target[name + REF_SUFFIX] = store.put(value)
+                del target[name]
+    return out
+
+
+def hydrate(record, store):
+    """Replace every `<field>_blob` reference in record with its text, in place.
+
+    Nested dicts are hydrated too. Records without references (older
+    staging files) are returned as-is.
+    """
+    for key in list(record):
+        if key.endswith(REF_SUFFIX):
+            record[key[:-len(REF_SUFFIX)]] = store.get_text(record.pop(key))
+        elif isinstance(record[key], dict):
+            hydrate(record[key], store)
+    return record
+
+
+def main():
+    stats = BlobStore().stats()
+    print(f"  Blob store: {BLOBS_DIR}")
+    print(f"    Blobs:  {stats['blobs']}")
+    print(f"    Size:   {stats['bytes'] / 1e6:.1f} MB ({DEFAULT_CODEC[1:]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Long-lived headless browser pool for JS-rendered career pages.
+
+One Chromium process is started on first use and kept for the whole run.
+Pages are opened in a small set of reusable browser contexts, at most
+max_pages at a time, with image/font/media requests aborted. Instead of a
+fixed sleep, each page waits until a description-like element has real
+text (or the readiness timeout passes), so fast pages return fast.
+
+Playwright objects are bound to the thread that created them, so the pool
+runs Playwright's async API on its own event-loop thread; scrape() is a
+blocking call safe to use from any number of worker threads.
+
+If the browser cannot be started (e.g. `playwright install chromium` was
+never run), whatever had started is stopped again and every scrape()
+raises BrowserUnavailable without another attempt.
+
+Requires: pip install playwright && playwright install chromium
+"""
+
+import asyncio
+import importlib
+import threading
+
+# Element selectors that hold the job description, per ATS, most specific
+# first. The page is "ready" once any of them has >200 chars of text.
+READY_SELECTORS = {
+    "workday": ['[data-automation-id="jobPostingDescription"]'],
+    "icims": [".iCIMS_JobContent", ".iCIMS_InfoMsg_Job", "#iCIMS_Content"],
+    "successfactors": [".jobdescription", '[class*="jobDescription"]', '[itemprop="description"]'],
+}
+
+DEFAULT_SELECTORS = [
+    '[data-automation-id="jobPostingDescription"]',
+    '[class*="job-description"]',
+    '[class*="jobDescription"]',
+    'article', 'main', '[role="main"]',
+]
+
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+
+# Same extraction as the old one-browser-per-URL scraper
+_EXTRACT_JS = """
+(selectors) => {
+    const h1 = document.querySelector('h1');
+    const title = h1 ? h1.textContent.trim() : '';
+
+    let description = '';
+    for (const sel of selectors) {
+        const el = document.querySelector(sel);
+        if (el && el.textContent.trim().length > 200) {
+            description = el.textContent.trim();
+            break;
+        }
+    }
+    if (!description && document.body) {
+        description = document.body.textContent.trim().substring(0, 10000);
+    }
+
+    const loc = document.querySelector('[class*="location"], [data-automation*="location"]');
+    return {title, description, location: loc ? loc.textContent.trim() : ''};
+}
+"""
+
+_READY_JS = """
+(selectors) => selectors.some(sel => {
+    const el = document.querySelector(sel);
+    return el && el.textContent.trim().length > 200;
+})
+"""
+
+
+class BrowserUnavailable(RuntimeError):
+    """The browser could not be started; the pool will not try again."""
+
+
+class BrowserPool:
+    """Reusable Chromium contexts with a page concurrency limit.
+
+    Raises ImportError on construction if Playwright is not installed.
+    """
+
+    def __init__(self, contexts=2, max_pages=4, user_agent=None,
+                 blocked_resource_types=BLOCKED_RESOURCE_TYPES,
+                 nav_timeout_ms=30000, ready_timeout_ms=8000):
+        importlib.import_module("playwright.async_api")  # fail fast if not installed
+
+        self.num_contexts = max(contexts, 1)
+        self.max_pages = max(max_pages, 1)
+        self.user_agent = user_agent
+        self.blocked = set(blocked_resource_types)
+        self.nav_timeout_ms = nav_timeout_ms
+        self.ready_timeout_ms = ready_timeout_ms
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="browser-pool", daemon=True)
+        self._thread.start()
+        self._started = False
+        self._start_error = None
+        self._start_lock = threading.Lock()
+        self._next_context = 0
+        self.pages_loaded = 0
+
+    # -- event-loop side ---------------------------------------------------
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = self._browser = None
+        self._contexts = []
+        try:
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            await self._open_contexts()
+        except BaseException:
+            await self._stop()
+            raise
+        self._page_slots = asyncio.Semaphore(self.max_pages)
+
+    async def _open_contexts(self):
+        for _ in range(self.num_contexts):
+            kwargs = {"user_agent": self.user_agent} if self.user_agent else {}
+            context = await self._browser.new_context(**kwargs)
+            if self.blocked:
+                await context.route("**/*", self._route)
+            self._contexts.append(context)
+
+    async def _route(self, route):
+        if route.request.resource_type in self.blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _scrape(self, url, selectors):
+        async with self._page_slots:
+            context = self._contexts[self._next_context % len(self._contexts)]
+            self._next_context += 1
+            page = await context.new_page()
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.nav_timeout_ms)
+                try:
+                    await page.wait_for_function(_READY_JS, arg=selectors,
+                                                 timeout=self.ready_timeout_ms)
+                except Exception:
+                    pass  # not ready in time — extract whatever rendered
+                result = await page.evaluate(_EXTRACT_JS, selectors)
+                result["html"] = await page.content()
+                self.pages_loaded += 1
+                return result
+            finally:
+                await page.close()
+
+    async def _stop(self):
+        for context in self._contexts:
+            await context.close()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    # -- caller side -------------------------------------------------------
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def scrape(self, url, ats_type=None):
+        """Render url and extract {title, description, location, html}.
+
+        Blocks the calling thread; raises on navigation/browser errors, and
+        BrowserUnavailable if the browser could not be started.
+        """
+        with self._start_lock:
+            if self._start_error is not None:
+                raise BrowserUnavailable(str(self._start_error)) from self._start_error
+            if not self._started:
+                try:
+                    self._run(self._start())
+                except Exception as e:
+                    self._start_error = e
+                    raise BrowserUnavailable(str(e)) from e
+                self._started = True
+        selectors = READY_SELECTORS.get(ats_type, []) + DEFAULT_SELECTORS
+        return self._run(self._scrape(url, selectors))
+
+    def close(self):
+        with self._start_lock:
+            if self._started:
+                self._run(self._stop())
+                self._started = False
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+def build_pool(config, user_agent=None):
+    """Build a BrowserPool from the `browser` config section.
+
+    Raises ImportError if Playwright is not installed.
+    """
+    browser_cfg = config.get("browser", {})
+    return BrowserPool(
+        contexts=browser_cfg.get("contexts", 2),
+        max_pages=browser_cfg.get("max_pages", 4),
+        user_agent=user_agent,
+        blocked_resource_types=browser_cfg.get("block_resource_types", BLOCKED_RESOURCE_TYPES),
+        ready_timeout_ms=browser_cfg.get("ready_timeout_ms", 8000),
+    )
@@ -9,15 +9,29 @@ Uses Google search to discover career pages, then ATS-specific scrapers
 (Workday, Greenhouse, Lever, iCIMS) or a generic scraper for the job
 description content.
 
+Leads are worked off a durable SQLite queue (work_queue.py) with lease/ack,
+so an interrupted run or one that hits its --deadline resumes without
+redoing finished leads. Transient failures are retried with backoff, and
+permanent ones are kept as dead letters.
+
+Scraped HTML is kept in the content-addressed blob store (pipeline/blobs),
+so `--re-extract` can re-run the extractors over it offline after a
+scraper change.
+
 Usage:
-    python career_search.py [--limit N] [--retry-unresolved]
+    python career_search.py [--limit N] [--retry-unresolved] [--concurrency N] [--cache-only]
+                            [--deadline 45m]
+    python career_search.py --re-extract
 """
 
 import json
 import os
 import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from urllib.parse import urlparse, quote_plus
 
@@ -28,11 +42,28 @@ except ImportError:
     print("ERROR: Missing dependencies. Run: pip install requests beautifulsoup4")
     sys.exit(1)
 
+from ats_boards import build_store, fetch_board
+from blob_store import BlobStore
+from browser_pool import BrowserUnavailable, build_pool
+from html_extract import (
+    extract_generic, extract_greenhouse, extract_lever, html_to_text, set_default_backend,
+)
+from http_cache import build_cache
+from http_client import HttpClient, build_client
+from pipeline_ledger import RETRY_STATUSES, open_ledger, record_hash
+from record_log import open_stage
+from work_queue import BACKOFF_SECONDS, LEASE_SECONDS, MAX_ATTEMPTS, WorkQueue
+
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
 STAGING_PARSED = os.path.join(PIPELINE_DIR, "staging", "parsed")
 STAGING_SOURCED = os.path.join(PIPELINE_DIR, "staging", "sourced")
+HTTP_CACHE_DIR = os.path.join(PIPELINE_DIR, "cache", "http")
+BOARDS_DIR = os.path.join(PIPELINE_DIR, "boards")
+BLOBS_DIR = os.path.join(PIPELINE_DIR, "blobs")
+LEDGER_DB_PATH = os.path.join(PIPELINE_DIR, "ledger.sqlite3")
+SEARCH_QUEUE_PATH = os.path.join(PIPELINE_DIR, "search_queue.sqlite3")
 CONFIG_PATH = os.path.join(SCRIPT_DIR, "pipeline_config.json")
 
 # HTTP headers for requests
@@ -44,6 +75,10 @@ HEADERS = {
 }
 
 
+# Search engine host — gets the (slower) google_search_seconds spacing
+SEARCH_HOST = "html.duckduckgo.com"
+
+
 def load_config():
     """Load pipeline configuration."""
     if not os.path.exists(CONFIG_PATH):
@@ -52,6 +87,86 @@ def load_config():
         return json.load(f)
 
 
+# ---------------------------------------------------------------------------
+# Shared HTTP client
+# ---------------------------------------------------------------------------
+
+# Pooled per-host sessions, retries, per-host throttle and stats for every
+# scraper request. Rebuilt from config by configure_http().
+_http = HttpClient(headers=HEADERS)
+
+
+def configure_http(config, cache_only=False):
+    """Build the shared HTTP client from the `http` and `throttle` config.
+
+    google_search_seconds spaces DuckDuckGo queries, career_page_seconds
+    spaces requests to any other single host, and per_host_concurrency caps
+    parallel requests per host. Responses are cached under HTTP_CACHE_DIR
+    (see http_cache); cache_only serves everything from that cache.
+    """
+    global _http
+    _http.close()
+    cache = build_cache(config, HTTP_CACHE_DIR, cache_only=cache_only)
+    _http = build_client(config, headers=HEADERS, search_hosts=("duckduckgo.com",),
+                         cache=cache)
+    return _http
+
+
+# Greenhouse/Lever/Ashby board snapshots (see ats_boards). Built from config
+# by configure_boards(); None means every lead goes through web search.
+_boards = None
+
+
+def configure_boards(config):
+    """Build the board snapshot store on top of the shared HTTP client."""
+    global _boards
+    _boards = build_store(config, _http, boards_dir=BOARDS_DIR)
+    return _boards
+
+
+# Content-addressed store for scraped HTML (see blob_store). Set by
+# configure_blobs(); None means the HTML is dropped after extraction.
+_blobs = None
+
+
+def configure_blobs():
+    """Keep raw HTML of every scrape in BLOBS_DIR for --re-extract."""
+    global _blobs
+    _blobs = BlobStore(BLOBS_DIR)
+    return _blobs
+
+
+# Headless browser pool (see browser_pool), started on the first page that
+# needs JavaScript and shut down by close_browser() at the end of a run.
+_browser = None
+_browser_config = {}
+_browser_lock = threading.Lock()
+
+
+def configure_browser(config):
+    """Use the `browser` config section for the next browser pool."""
+    global _browser_config
+    close_browser()
+    _browser_config = config
+
+
+def _get_browser():
+    """The shared browser pool, started on first use (ImportError if no Playwright)."""
+    global _browser
+    with _browser_lock:
+        if _browser is None:
+            _browser = build_pool(_browser_config, user_agent=HEADERS["User-Agent"])
+        return _browser
+
+
+def close_browser():
+    global _browser
+    with _browser_lock:
+        if _browser is not None:
+            _browser.close()
+            _browser = None
+
+
 # ---------------------------------------------------------------------------
 # Career page discovery
 # ---------------------------------------------------------------------------
@@ -72,25 +187,32 @@ def find_career_page(company, role, config, linkedin_url=None):
 
     Strategy:
       0. If linkedin_url provided, extract job ID and search with it
-      1. Search for '{company} careers {role}' — prefer specific job URLs
-      2. If we land on a general careers page, scan for links to the specific role
-      3. Detect ATS type from URL
+      1. Match against the company's Greenhouse/Lever/Ashby board snapshot
+         (lower confidence when the board does not name the company)
+      2. Search for '{company} careers {role}' — prefer specific job URLs
+      3. If we land on a general careers page, scan for links to the specific role
+      4. Detect ATS type from URL
     Returns {url, ats_type, confidence} or None.
     """
-    throttle = config.get("throttle", {})
-    delay = throttle.get("google_search_seconds", 2.0)
     ats_handlers = config.get("ats_handlers", {})
 
     # Strategy 0: Use LinkedIn job ID to find the direct posting
     job_id = extract_linkedin_job_id(linkedin_url)
     if job_id:
-        id_urls = _search_by_job_id(company, role, job_id, delay)
+        id_urls = _search_by_job_id(company, role, job_id)
         for url in id_urls:
             ats_type = detect_ats(url, ats_handlers)
             if _is_job_listing_url(url):
                 return {"url": url, "ats_type": ats_type, "confidence": 0.9}
 
-    urls = google_search_careers(company, role, delay)
+    # Strategy 1: One bulk board fetch per company, matched locally
+    if _boards is not None:
+        board_match = _boards.match(company, role)
+        if board_match:
+            return {"url": board_match["url"], "ats_type": board_match["ats_type"],
+                    "confidence": board_match["confidence"]}
+
+    urls = google_search_careers(company, role)
     if not urls:
         return None
 
@@ -138,8 +260,7 @@ def _is_job_listing_url(url):
 def _find_job_link_on_page(career_page_url, role, company):
     """Scan a careers page for a link matching the specific role."""
     try:
-        resp = requests.get(career_page_url, headers=HEADERS, timeout=15,
-                            allow_redirects=True)
+        resp = _http.get(career_page_url, timeout=15, allow_redirects=True)
         resp.raise_for_status()
     except requests.RequestException:
         return None
@@ -179,10 +300,11 @@ def _find_job_link_on_page(career_page_url, role, company):
     return best_link
 
 
-def google_search_careers(company, role, throttle_seconds=2.0):
+def google_search_careers(company, role):
     """Search for career page URLs using DuckDuckGo (primary) and direct URL probing.
 
-    Excludes LinkedIn, Indeed, Glassdoor, ZipRecruiter results.
+    Excludes LinkedIn, Indeed, Glassdoor, ZipRecruiter results. Search
+    spacing comes from the shared HTTP client (see configure_http).
     Returns list of candidate URLs.
     """
     excluded_sites = [
@@ -195,7 +317,7 @@ def google_search_careers(company, role, throttle_seconds=2.0):
     direct_urls = _probe_direct_career_urls(company, excluded_sites)
 
     # Strategy 2: DuckDuckGo search
-    search_urls = _duckduckgo_search(company, role, excluded_sites, throttle_seconds)
+    search_urls = _duckduckgo_search(company, role, excluded_sites)
 
     # Combine results (direct probes first, then search)
     all_urls = direct_urls + search_urls
@@ -211,7 +333,7 @@ def google_search_careers(company, role, throttle_seconds=2.0):
     return unique[:5]
 
 
-def _search_by_job_id(company, role, job_id, throttle_seconds=2.0):
+def _search_by_job_id(company, role, job_id):
     """Search for a specific job posting using the LinkedIn job ID.
 
     Uses DuckDuckGo to search for the job by company + role + job ID,
@@ -223,12 +345,10 @@ def _search_by_job_id(company, role, job_id, throttle_seconds=2.0):
     ]
 
     query = f'"{company}" "{role}" job {job_id}'
-    search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
-
-    time.sleep(throttle_seconds)
+    search_url = f"https://{SEARCH_HOST}/html/?q={quote_plus(query)}"
 
     try:
-        resp = requests.get(search_url, headers=HEADERS, timeout=15)
+        resp = _http.get(search_url, timeout=15)
         resp.raise_for_status()
     except requests.RequestException:
         return []
@@ -255,8 +375,11 @@ def _search_by_job_id(company, role, job_id, throttle_seconds=2.0):
 
 
 def _probe_direct_career_urls(company, excluded_domains):
-    """Try common career page URL patterns directly."""
-    urls = []
+    """Try common career page URL patterns directly.
+
+    All patterns are HEAD-probed in parallel (they are on different hosts);
+    the first pattern in priority order that resolves wins.
+    """
 
     # Normalize company name to domain slug
     slug = re.sub(r'[^a-z0-9]', '', company.lower())
@@ -275,30 +398,30 @@ def _probe_direct_career_urls(company, excluded_domains):
         f"https://jobs.smartrecruiters.com/{slug_hyphen}",
     ]
 
-    for url in patterns:
+    def probe(url):
         try:
-            resp = requests.head(url, headers=HEADERS, timeout=8,
-                                 allow_redirects=True)
-            if resp.status_code == 200:
-                final_url = resp.url
-                if _is_career_url(final_url, excluded_domains):
-                    urls.append(final_url)
-                    break  # Found a valid career page, stop probing
+            resp = _http.head(url, timeout=8, allow_redirects=True)
         except requests.RequestException:
-            continue
+            return None
+        if resp.status_code == 200 and _is_career_url(resp.url, excluded_domains):
+            return resp.url
+        return None
+
+    with ThreadPoolExecutor(max_workers=len(patterns)) as pool:
+        for final_url in pool.map(probe, patterns):
+            if final_url:
+                return [final_url]  # Found a valid career page
 
-    return urls
+    return []
 
 
-def _duckduckgo_search(company, role, excluded_domains, throttle_seconds=2.0):
+def _duckduckgo_search(company, role, excluded_domains):
     """Search DuckDuckGo HTML for career page URLs."""
     query = f'{company} careers {role}'
-    search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
-
-    time.sleep(throttle_seconds)
+    search_url = f"https://{SEARCH_HOST}/html/?q={quote_plus(query)}"
 
     try:
-        resp = requests.get(search_url, headers=HEADERS, timeout=15)
+        resp = _http.get(search_url, timeout=15)
         resp.raise_for_status()
     except requests.RequestException as e:
         print(f"      WARNING: Search failed for '{company}': {e}")
@@ -417,13 +540,18 @@ def scrape_job_description(url, ats_type, config, role=None):
     ats_handlers = config.get("ats_handlers", {})
     handler = ats_handlers.get(ats_type, {})
 
+    # Postings on a known board come straight from its snapshot
+    result = _scrape_from_board(url)
+    if result:
+        return result
+
     # If ATS requires Playwright, try it; fall back to requests
     if handler.get("requires_playwright") and ats_type in ("workday", "icims", "successfactors"):
         result = _scrape_with_playwright(url, ats_type)
         if result:
             return result
 
-    # Use requests + BeautifulSoup (or API for supported ATS)
+    # Use requests + html_extract (or API for supported ATS)
     if ats_type == "greenhouse":
         return scrape_greenhouse(url)
     elif ats_type == "lever":
@@ -442,41 +570,33 @@ def scrape_job_description(url, ats_type, config, role=None):
         return result
 
 
+def _scrape_from_board(url):
+    """Build a scrape result from a board snapshot, without fetching the page."""
+    hit = _boards.lookup_job(url) if _boards is not None else None
+    if not hit:
+        return None
+    snapshot, job = hit
+    desc_html = job["description_html"]
+    return _build_scrape_result(url, snapshot["ats"], job["title"],
+                                job["company"] or snapshot["company"], job["location"],
+                                html_to_text(desc_html), desc_html, extractor="description")
+
+
 def scrape_greenhouse(url):
     """ATS-specific scraper for Greenhouse.
 
-    boards.greenhouse.io pages are mostly static HTML with predictable structure.
+    boards.greenhouse.io pages are mostly static HTML with predictable structure:
+    .app-title for role, .company-name, #content for description.
     """
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = _http.get(url, timeout=15)
         resp.raise_for_status()
     except requests.RequestException as e:
         return {"error": str(e), "url": url}
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # Greenhouse structure: .app-title for role, .company-name, #content for description
-    title = ""
-    title_el = soup.select_one(".app-title, h1.heading")
-    if title_el:
-        title = title_el.get_text(strip=True)
-
-    company = ""
-    company_el = soup.select_one(".company-name, .company")
-    if company_el:
-        company = company_el.get_text(strip=True)
-
-    location = ""
-    location_el = soup.select_one(".location, .body--metadata")
-    if location_el:
-        location = location_el.get_text(strip=True)
-
-    description = ""
-    content_el = soup.select_one("#content, .content, .job-post-content")
-    if content_el:
-        description = content_el.get_text(separator="\n", strip=True)
-
-    return _build_scrape_result(url, "greenhouse", title, company, location, description, resp.text)
+    title, company, location, description = extract_greenhouse(resp.text)
+    return _build_scrape_result(url, "greenhouse", title, company, location, description, resp.text,
+                                extractor="greenhouse")
 
 
 def scrape_lever(url):
@@ -485,39 +605,14 @@ def scrape_lever(url):
     jobs.lever.co pages are semi-static with a known structure.
     """
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = _http.get(url, timeout=15)
         resp.raise_for_status()
     except requests.RequestException as e:
         return {"error": str(e), "url": url}
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    title = ""
-    title_el = soup.select_one(".posting-headline h2, h1")
-    if title_el:
-        title = title_el.get_text(strip=True)
-
-    company = ""
-    # Lever usually has company in the page title or header
-    header_el = soup.select_one(".main-header-logo, .posting-headline .company")
-    if header_el:
-        company = header_el.get_text(strip=True)
-
-    location = ""
-    location_el = soup.select_one(".posting-categories .location, .workplaceTypes")
-    if location_el:
-        location = location_el.get_text(strip=True)
-
-    description = ""
-    content_sections = soup.select(".posting-page .section-wrapper, .posting-page .content")
-    if content_sections:
-        description = "\n\n".join(s.get_text(separator="\n", strip=True) for s in content_sections)
-    else:
-        content_el = soup.select_one(".content, .posting-page")
-        if content_el:
-            description = content_el.get_text(separator="\n", strip=True)
-
-    return _build_scrape_result(url, "lever", title, company, location, description, resp.text)
+    title, company, location, description = extract_lever(resp.text)
+    return _build_scrape_result(url, "lever", title, company, location, description, resp.text,
+                                extractor="lever")
 
 
 def scrape_ashby(url, role=None):
@@ -536,18 +631,21 @@ def scrape_ashby(url, role=None):
     company_slug = path_parts[0]
     job_id = path_parts[1] if len(path_parts) > 1 else None
 
-    # Try the Ashby posting API to get all jobs for this company
-    api_url = f"https://api.ashbyhq.com/posting-api/job-board/{company_slug}"
+    # Get all jobs for this company from the Ashby posting API (via the
+    # board snapshot store when configured, so the board is kept)
     try:
-        resp = requests.get(api_url, headers={"Accept": "application/json"}, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
+        if _boards is not None:
+            board = _boards.board("ashby", company_slug)
+        else:
+            board = fetch_board(_http, "ashby", company_slug)
+        if board is None:
+            raise ValueError(f"no Ashby board for '{company_slug}'")
     except (requests.RequestException, ValueError) as e:
         print(f"      Ashby API failed, falling back to Playwright: {e}")
         pw_result = _scrape_with_playwright(url, "ashby")
         return pw_result if pw_result else {"error": str(e), "url": url}
 
-    jobs = data.get("jobs", [])
+    jobs = board["jobs"]
     if not jobs:
         return _build_scrape_result(url, "ashby", "", company_slug, "", "", "")
 
@@ -583,21 +681,14 @@ def scrape_ashby(url, role=None):
 
     title = target_job.get("title", "")
     location = target_job.get("location", "")
-    company_name = data.get("jobBoard", {}).get("title", company_slug)
-
-    # Ashby API returns description as HTML in the descriptionHtml field
-    desc_html = target_job.get("descriptionHtml", "")
-    description = html_to_text_bs4(desc_html) if desc_html else ""
+    company_name = board["company"]
 
-    return _build_scrape_result(url, "ashby", title, company_name, location, description, desc_html)
+    # Ashby API returns description as HTML (descriptionHtml)
+    desc_html = target_job.get("description_html", "")
+    description = html_to_text(desc_html) if desc_html else ""
 
-
-def html_to_text_bs4(html):
-    """Convert HTML to plain text using BeautifulSoup."""
-    if not html:
-        return ""
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text(separator="\n", strip=True)
+    return _build_scrape_result(url, "ashby", title, company_name, location, description, desc_html,
+                                extractor="description")
 
 
 def _is_js_blocked(result):
@@ -621,167 +712,61 @@ def scrape_generic(url):
 
     Extracts the largest meaningful text block, looks for common
     section headers (Requirements, Qualifications, Responsibilities).
+    See html_extract.extract_generic.
     """
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15, allow_redirects=True)
+        resp = _http.get(url, timeout=15, allow_redirects=True)
         resp.raise_for_status()
     except requests.RequestException as e:
         return {"error": str(e), "url": url}
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # Remove script, style, nav, footer elements
-    for tag in soup.select("script, style, nav, footer, header, .cookie-banner"):
-        tag.decompose()
-
-    # Try to find the job title from h1 or og:title
-    title = ""
-    h1 = soup.find("h1")
-    if h1:
-        title = h1.get_text(strip=True)
-    if not title:
-        og_title = soup.find("meta", property="og:title")
-        if og_title:
-            title = og_title.get("content", "")
-
-    # Try og:site_name for company
-    company = ""
-    og_site = soup.find("meta", property="og:site_name")
-    if og_site:
-        company = og_site.get("content", "")
-
-    # Try to find location
-    location = ""
-    for el in soup.select("[class*='location'], [data-automation*='location']"):
-        location = el.get_text(strip=True)
-        break
-
-    # Find the main content area
-    description = ""
-
-    # Strategy 1: Look for elements with job-related classes
-    job_selectors = [
-        "[class*='job-description']", "[class*='job-detail']",
-        "[class*='posting-detail']", "[class*='jd-']",
-        "[id*='job-description']", "[id*='job-detail']",
-        "article", "main", "[role='main']",
-    ]
-    for selector in job_selectors:
-        el = soup.select_one(selector)
-        if el:
-            text = el.get_text(separator="\n", strip=True)
-            if len(text) > 200:  # Minimum meaningful content
-                description = text
-                break
-
-    # Strategy 2: Find sections by headers
-    if not description:
-        sections = []
-        job_headers = [
-            "description", "responsibilities", "requirements",
-            "qualifications", "about the role", "what you'll do",
-            "who you are", "about you", "skills", "experience",
-        ]
-        for header in soup.find_all(["h1", "h2", "h3", "h4", "strong", "b"]):
-            header_text = header.get_text(strip=True).lower()
-            if any(jh in header_text for jh in job_headers):
-                # Get text until next header
-                content_parts = []
-                sibling = header.find_next_sibling()
-                while sibling and sibling.name not in ("h1", "h2", "h3", "h4"):
-                    content_parts.append(sibling.get_text(separator="\n", strip=True))
-                    sibling = sibling.find_next_sibling()
-                sections.append(f"{header.get_text(strip=True)}\n" + "\n".join(content_parts))
-
-        if sections:
-            description = "\n\n".join(sections)
-
-    # Strategy 3: Largest text block
-    if not description:
-        body = soup.find("body")
-        if body:
-            description = body.get_text(separator="\n", strip=True)
-            # Trim to reasonable length
-            if len(description) > 10000:
-                description = description[:10000]
-
+    title, company, location, description = extract_generic(resp.text)
     return _build_scrape_result(url, None, title, company, location, description, resp.text)
 
 
 def _scrape_with_playwright(url, ats_type):
-    """Scrape a JS-heavy page using Playwright.
+    """Scrape a JS-heavy page in the shared headless browser pool.
 
-    Falls back to None if Playwright is not available.
+    Falls back to the generic scraper if Playwright is not available.
     """
+    if _http.cache is not None and _http.cache.cache_only:
+        # Offline replay: the browser can't be served from the cache
+        return scrape_generic(url)
+
     try:
-        from playwright.sync_api import sync_playwright
+        pool = _get_browser()
     except ImportError:
         print(f"    WARNING: Playwright not available for {ats_type}. Using generic scraper.")
         return scrape_generic(url)
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_extra_http_headers({"User-Agent": HEADERS["User-Agent"]})
-
-            page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            # Wait for content to render
-            page.wait_for_timeout(3000)
-
-            # Extract content
-            title = page.evaluate("""
-                () => {
-                    const h1 = document.querySelector('h1');
-                    return h1 ? h1.textContent.trim() : '';
-                }
-            """)
-
-            description = page.evaluate("""
-                () => {
-                    // Try common job description selectors
-                    const selectors = [
-                        '[data-automation-id="jobPostingDescription"]',
-                        '[class*="job-description"]',
-                        '[class*="jobDescription"]',
-                        'article', 'main', '[role="main"]'
-                    ];
-                    for (const sel of selectors) {
-                        const el = document.querySelector(sel);
-                        if (el && el.textContent.trim().length > 200) {
-                            return el.textContent.trim();
-                        }
-                    }
-                    return document.body ? document.body.textContent.trim().substring(0, 10000) : '';
-                }
-            """)
-
-            location = page.evaluate("""
-                () => {
-                    const el = document.querySelector('[class*="location"], [data-automation*="location"]');
-                    return el ? el.textContent.trim() : '';
-                }
-            """)
-
-            html = page.content()
-            browser.close()
-
-            return _build_scrape_result(url, ats_type, title, "", location, description, html)
-
+        page = pool.scrape(url, ats_type)
+    except BrowserUnavailable as e:
+        print(f"    WARNING: Browser unavailable for {ats_type} ({e}). Using generic scraper.")
+        return scrape_generic(url)
     except Exception as e:
         print(f"    WARNING: Playwright scrape failed for {url}: {e}")
         return scrape_generic(url)
 
+    return _build_scrape_result(url, ats_type, page["title"], "", page["location"],
+                                page["description"], page["html"])
 
-def _build_scrape_result(url, ats_type, title, company, location, description, raw_html):
-    """Build a standardized scrape result dict."""
+
+def _build_scrape_result(url, ats_type, title, company, location, description, raw_html,
+                         extractor="generic"):
+    """Build a standardized scrape result dict.
+
+    When the blob store is configured, raw_html is kept there and the result
+    records its hash (raw_html_blob) and which REEXTRACTORS entry produced
+    the fields, so the page can be re-extracted without a fetch.
+    """
     # Extract compensation if mentioned
     compensation = _extract_compensation(description)
 
     # Check description completeness
     description_incomplete = len(description) < 200 if description else True
 
-    return {
+    result = {
         "url": url,
         "ats_type": ats_type,
         "title": title,
@@ -792,6 +777,10 @@ def _build_scrape_result(url, ats_type, title, company, location, description, r
         "description_incomplete": description_incomplete,
         "scraped_at": datetime.now().isoformat(),
     }
+    if raw_html and _blobs is not None:
+        result["raw_html_blob"] = _blobs.put(raw_html)
+        result["extractor"] = extractor
+    return result
 
 
 def _extract_compensation(text):
@@ -892,7 +881,7 @@ def find_similar_roles(company, career_page_url):
     """
     # This is a best-effort scrape of the company's career page listing
     try:
-        resp = requests.get(career_page_url, headers=HEADERS, timeout=15)
+        resp = _http.get(career_page_url, timeout=15)
         resp.raise_for_status()
     except requests.RequestException:
         return []
@@ -918,129 +907,264 @@ def find_similar_roles(company, career_page_url):
 # Main pipeline
 # ---------------------------------------------------------------------------
 
-def process_parsed_leads(config, limit=None, retry_unresolved=False):
-    """Process all parsed lead files and search for career pages."""
-    os.makedirs(STAGING_SOURCED, exist_ok=True)
-
-    # Gather all leads from parsed files
-    if not os.path.exists(STAGING_PARSED):
-        print("  No parsed leads found.")
-        return {"total": 0, "sourced": 0, "unresolved": 0}
-
-    parsed_files = [f for f in os.listdir(STAGING_PARSED) if f.endswith(".json")]
-    if not parsed_files:
-        print("  No parsed lead files found.")
-        return {"total": 0, "sourced": 0, "unresolved": 0}
-
-    # Load all leads
-    all_leads = []
-    for filename in sorted(parsed_files):
-        filepath = os.path.join(STAGING_PARSED, filename)
-        with open(filepath, encoding="utf-8") as f:
-            results = json.load(f)
-
-        for result in results:
-            if result.get("type") == "job_lead":
-                result["_source_file"] = filename
-                all_leads.append(result)
+def process_parsed_leads(config, limit=None, retry_unresolved=False, concurrency=1,
+                         cache_only=False, deadline=None):
+    """Process all parsed lead files and search for career pages.
+
+    Leads go through the durable search queue (work_queue, SEARCH_QUEUE_PATH):
+    each is leased, sourced and acked as soon as its record is written, so
+    an interrupted run never redoes finished leads. Transient failures
+    (timeouts, dropped connections, 429/5xx) are retried with exponential
+    backoff; permanent ones and leads out of attempts go to the dead letters.
+
+    With concurrency > 1, that many worker threads lease leads at once.
+    Output records are the same as a serial run.
+    With cache_only, no network requests are made (see http_cache).
+    With retry_unresolved, leads the pipeline ledger lists as unresolved
+    or failed (and dead letters) are sourced again.
+    With deadline (seconds), no new lead is started once it has passed;
+    leads in flight finish and the rest stay queued for the next run.
+    """
+    started = time.monotonic()
+
+    # Gather all leads from the parsed records
+    with open_stage(STAGING_PARSED) as parsed:
+        parsed_keys = sorted(parsed.keys())
+        if not parsed_keys:
+            print("  No parsed leads found.")
+            return {"total": 0, "sourced": 0, "unresolved": 0}
+
+        # Load all leads
+        all_leads = []
+        for key in parsed_keys:
+            for result in parsed.get(key):
+                if result.get("type") == "job_lead":
+                    result["_source_file"] = f"{key}.json"
+                    all_leads.append(result)
 
     if not all_leads:
         print("  No job leads to search for.")
         return {"total": 0, "sourced": 0, "unresolved": 0}
 
-    # Check which are already sourced
-    sourced_keys = set()
-    if not retry_unresolved:
-        for f in os.listdir(STAGING_SOURCED) if os.path.exists(STAGING_SOURCED) else []:
-            if f.endswith(".json"):
-                sourced_keys.add(f)
-
-    # Filter to unprocessed leads
-    leads_to_process = []
-    for lead in all_leads:
-        key = f"{lead['email_uid']}_{lead.get('lead_index', 0)}.json"
-        if key not in sourced_keys:
-            leads_to_process.append(lead)
-
-    if limit:
-        leads_to_process = leads_to_process[:limit]
-
-    if not leads_to_process:
+    # Queue every lead not sourced yet; leads already queued keep their state
+    with open_stage(STAGING_SOURCED) as sourced:
+        sourced_keys = set(sourced.keys())
+    retry_keys = set()
+    if retry_unresolved:
+        with _open_ledger() as ledger:
+            retry_keys = ledger.keys("search", RETRY_STATUSES)
+    with _open_search_queue(config) as work:
+        work.drop_unstarted(sourced_keys - retry_keys)   # e.g. sourced by pipeline.py
+        work.enqueue((sourced_key(lead), lead) for lead in all_leads
+                     if sourced_key(lead) not in sourced_keys - retry_keys)
+        work.requeue(retry_keys)
+        orphans = work.reclaim_orphans()
+        queued = work.counts()["ready"]
+
+    if orphans:
+        print(f"  Resuming {orphans} leads left in flight by an interrupted run")
+    if not queued:
         print("  All leads already sourced.")
         return {"total": len(all_leads), "sourced": 0, "unresolved": 0, "already_sourced": len(sourced_keys)}
 
-    print(f"  Searching career pages for {len(leads_to_process)} leads...")
+    total = min(queued, limit) if limit else queued
+    print(f"  Searching career pages for {total} leads...")
+
+    stats = {"total": 0, "sourced": 0, "unresolved": 0, "retrying": 0, "dead": 0}
+    run = {"leased": 0, "stop": False}
+    lock = threading.Lock()
+    deadline_at = started + deadline if deadline is not None else None
+
+    def next_lead(work):
+        """Lease the next lead, waiting for a scheduled retry when worthwhile."""
+        while True:
+            with lock:
+                if run["stop"] or (limit and run["leased"] >= limit):
+                    return None
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    run["stop"] = True
+                    return None
+                item = work.lease()
+                if item is not None:
+                    run["leased"] += 1
+                    return item, run["leased"]
+                due = work.next_due()
+            # Nothing due now: wait for a scheduled retry if it falls inside the
+            # deadline (or soon, without one); otherwise leave it for a later run
+            wait_until = deadline_at if deadline_at is not None else time.monotonic() + RETRY_WAIT_SECONDS
+            if due is None or time.monotonic() + due > wait_until:
+                return None
+            time.sleep(min(due, 1.0))
+
+    def worker(work):
+        while True:
+            leased = next_lead(work)
+            if leased is None:
+                return
+            (key, lead, attempt), i = leased
+            try:
+                outcome = _work_lead(work, key, lead, attempt, config, i - 1, total)
+            except KeyboardInterrupt:
+                work.release(key)
+                raise
+            with lock:
+                stats["total"] += 1
+                stats[outcome] += 1
+
+    with sourcing_session(config, cache_only=cache_only), _open_search_queue(config) as work:
+        if concurrency > 1:
+            print(f"  Running up to {concurrency} leads concurrently")
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = [pool.submit(worker, work) for _ in range(concurrency)]
+                try:
+                    for future in futures:
+                        future.result()
+                except KeyboardInterrupt:
+                    with lock:
+                        run["stop"] = True     # workers finish their current lead
+                    raise
+        else:
+            worker(work)
+        counts = work.counts()
+        next_retry = work.next_due()
+
+    stats["remaining"] = counts["ready"] + counts["leased"]
+    stats["dead_letters"] = counts["dead"]
+    if run["stop"] and deadline_at is not None:
+        print(f"\n  Deadline reached after {time.monotonic() - started:.0f}s: "
+              f"{stats['remaining']} leads left queued; run again to continue")
+    elif next_retry is not None:
+        print(f"\n  {counts['ready']} leads scheduled for retry (next in {next_retry:.0f}s)")
+    return stats
 
-    throttle = config.get("throttle", {})
-    career_delay = throttle.get("career_page_seconds", 1.0)
 
-    stats = {"total": len(leads_to_process), "sourced": 0, "unresolved": 0, "skipped": 0}
+# Without --deadline, a run waits this long for a scheduled retry to come
+# due before leaving it to the next run
+RETRY_WAIT_SECONDS = 120
 
-    for i, lead in enumerate(leads_to_process):
-        company = lead.get("company", "Unknown")
-        role = lead.get("role", "Unknown")
-        print(f"\n    [{i+1}/{len(leads_to_process)}] {company.encode('ascii', 'replace').decode()} — {role.encode('ascii', 'replace').decode()}")
+# Scrape errors worth retrying later: timeouts, dropped connections, 429/5xx
+TRANSIENT_ERROR_RE = re.compile(
+    r"timed? ?out|Max retries exceeded|Connection ?(?:Error|aborted|reset|refused)"
+    r"|NameResolution|Temporary failure|\b(?:429|5\d\d) (?:Client|Server) Error", re.I)
 
-        # Find career page (use LinkedIn URL if available for better results)
-        linkedin_url = lead.get("linkedin_url")
-        career_result = find_career_page(company, role, config, linkedin_url=linkedin_url)
 
-        if not career_result:
-            print("      No career page found")
-            stats["unresolved"] += 1
-            _save_sourced_result(lead, None, "No career page found for company")
-            continue
+def is_transient(error):
+    """True for failures another attempt may not hit: network errors, 429 and 5xx.
 
-        url = career_result["url"]
-        ats_type = career_result["ats_type"]
-        print(f"      Found: {url[:80]}... (ATS: {ats_type or 'generic'})")
+    error is an exception or an unresolved reason string.
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return bool(error) and bool(TRANSIENT_ERROR_RE.search(str(error)))
 
-        # Scrape the job description
-        time.sleep(career_delay)
-        scraped = scrape_job_description(url, ats_type, config, role=role)
 
-        if scraped.get("error"):
-            print(f"      Scrape failed: {scraped['error']}")
-            stats["unresolved"] += 1
-            _save_sourced_result(lead, scraped, f"Scrape failed: {scraped['error']}")
-            continue
+def _open_search_queue(config):
+    settings = config.get("search_queue", {})
+    return WorkQueue(SEARCH_QUEUE_PATH,
+                     lease_seconds=settings.get("lease_seconds", LEASE_SECONDS),
+                     max_attempts=settings.get("max_attempts", MAX_ATTEMPTS),
+                     backoff_seconds=settings.get("backoff_seconds", BACKOFF_SECONDS))
 
-        if not scraped.get("description_text"):
-            print("      No description content found")
-            stats["unresolved"] += 1
-            _save_sourced_result(lead, scraped, "No description content on page")
-            continue
 
-        # Validate match
-        match_result = validate_job_match(lead, scraped)
-        if not match_result["is_match"]:
-            print(f"      WARNING: Low match confidence ({match_result['confidence']:.2f})")
-
-        # Save sourced result
-        sourced_data = {
-            "lead": lead,
-            "scraped": scraped,
-            "match_validation": match_result,
-            "career_page": career_result,
-            "status": "sourced",
-            "sourced_at": datetime.now().isoformat(),
-        }
-
-        key = f"{lead['email_uid']}_{lead.get('lead_index', 0)}.json"
-        filepath = os.path.join(STAGING_SOURCED, key)
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(sourced_data, f, indent=2, ensure_ascii=False)
-
-        stats["sourced"] += 1
-        desc_len = len(scraped.get("description_text", ""))
-        print(f"      Sourced: {desc_len} chars, match confidence: {match_result['confidence']:.2f}")
+def _work_lead(work, key, lead, attempt, config, i, total):
+    """Source one leased lead and settle it in the queue.
 
-    return stats
+    Returns 'sourced', 'unresolved', 'retrying' or 'dead'. The lead's log
+    is printed as one block so concurrent output stays readable.
+    """
+    lines = []
+    try:
+        try:
+            outcome = source_lead(lead, config, i, total, log=lines.append)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if is_transient(e):
+                state = work.retry(key, error)
+            else:
+                work.bury(key, error)
+                state = "dead"
+            mark_search_failed(lead, error)
+            lines.append(f"      FAILED (attempt {attempt}): {error}")
+            lines.append("      Retry scheduled" if state == "ready" else "      Moved to dead letters")
+            return "retrying" if state == "ready" else "dead"
+
+        if outcome == "unresolved":
+            reason = load_sourced(lead).get("unresolved_reason")
+            if is_transient(reason):
+                if work.retry(key, reason) == "ready":
+                    lines.append(f"      Retry scheduled (attempt {attempt})")
+                    return "retrying"
+                lines.append(f"      Out of attempts after {attempt}; moved to dead letters")
+                return "dead"
+        work.ack(key)
+        return outcome
+    finally:
+        print("\n".join(lines), flush=True)
+
+
+def source_lead(lead, config, i=None, total=None, log=print):
+    """Find the career page for one parsed lead, scrape it, and write
+    the staging/sourced record {email_uid}_{lead_index}.
+
+    Returns 'sourced' or 'unresolved'.
+    """
+    company = lead.get("company", "Unknown")
+    role = lead.get("role", "Unknown")
+    position = f"[{i+1}/{total}] " if i is not None and total else ""
+    log(f"\n    {position}{company.encode('ascii', 'replace').decode()} — {role.encode('ascii', 'replace').decode()}")
+
+    # Find career page (use LinkedIn URL if available for better results)
+    linkedin_url = lead.get("linkedin_url")
+    career_result = find_career_page(company, role, config, linkedin_url=linkedin_url)
+
+    if not career_result:
+        log("      No career page found")
+        _save_sourced_result(lead, None, "No career page found for company")
+        return "unresolved"
+
+    url = career_result["url"]
+    ats_type = career_result["ats_type"]
+    log(f"      Found: {url[:80]}... (ATS: {ats_type or 'generic'})")
+
+    # Scrape the job description (spacing handled by the shared HTTP client)
+    scraped = scrape_job_description(url, ats_type, config, role=role)
+
+    if scraped.get("error"):
+        log(f"      Scrape failed: {scraped['error']}")
+        _save_sourced_result(lead, scraped, f"Scrape failed: {scraped['error']}")
+        return "unresolved"
+
+    if not scraped.get("description_text"):
+        log("      No description content found")
+        _save_sourced_result(lead, scraped, "No description content on page")
+        return "unresolved"
+
+    # Validate match
+    match_result = validate_job_match(lead, scraped)
+    if not match_result["is_match"]:
+        log(f"      WARNING: Low match confidence ({match_result['confidence']:.2f})")
+
+    # Save sourced result
+    sourced_data = {
+        "lead": lead,
+        "scraped": scraped,
+        "match_validation": match_result,
+        "career_page": career_result,
+        "status": "sourced",
+        "sourced_at": datetime.now().isoformat(),
+    }
+
+    _write_sourced(lead, sourced_data)
+
+    desc_len = len(scraped.get("description_text", ""))
+    log(f"      Sourced: {desc_len} chars, match confidence: {match_result['confidence']:.2f}")
+    return "sourced"
 
 
 def _save_sourced_result(lead, scraped, error_reason):
     """Save an unresolved sourced result."""
-    os.makedirs(STAGING_SOURCED, exist_ok=True)
     sourced_data = {
         "lead": lead,
         "scraped": scraped,
@@ -1050,11 +1174,166 @@ def _save_sourced_result(lead, scraped, error_reason):
         "unresolved_reason": error_reason,
         "sourced_at": datetime.now().isoformat(),
     }
+    _write_sourced(lead, sourced_data)
+
+
+# staging/sourced record log and pipeline ledger, held open for the length
+# of process_parsed_leads
+_sourced = None
+_ledger = None
+
 
-    key = f"{lead['email_uid']}_{lead.get('lead_index', 0)}.json"
-    filepath = os.path.join(STAGING_SOURCED, key)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(sourced_data, f, indent=2, ensure_ascii=False)
+def sourced_key(lead):
+    """Record key of a lead in staging/sourced: "<email_uid>_<lead_index>"."""
+    return f"{lead['email_uid']}_{lead.get('lead_index', 0)}"
+
+
+def _open_ledger():
+    return open_ledger(LEDGER_DB_PATH, os.path.dirname(STAGING_SOURCED))
+
+
+@contextmanager
+def sourcing_session(config, cache_only=False):
+    """Configure the scrapers and hold the sourced log and ledger open.
+
+    source_lead can be called from any number of threads inside the block.
+    """
+    global _sourced, _ledger
+    configure_http(config, cache_only=cache_only)
+    configure_boards(config)
+    configure_blobs()
+    configure_browser(config)
+    set_default_backend(config.get("html_extract", {}).get("backend", "auto"))
+    _sourced = open_stage(STAGING_SOURCED)
+    _ledger = _open_ledger()
+    try:
+        yield
+    finally:
+        close_browser()
+        _sourced.close()
+        _ledger.close()
+        _sourced = _ledger = None
+
+
+@contextmanager
+def open_sourced():
+    """The staging/sourced log: the session's inside sourcing_session, else a fresh one."""
+    if _sourced is not None:
+        yield _sourced
+        return
+    with open_stage(STAGING_SOURCED) as stage:
+        yield stage
+
+
+def load_sourced(lead):
+    """The staging/sourced record for lead, or None (inside sourcing_session)."""
+    return _sourced.get(sourced_key(lead))
+
+
+def mark_search_failed(lead, error):
+    """Record a lead whose sourcing raised (inside sourcing_session)."""
+    _ledger.mark(sourced_key(lead), "search", "failed", error=error)
+
+
+def _mark_sourced(ledger, key, sourced_data):
+    """Record a sourced record's outcome in the pipeline ledger."""
+    status = "done" if sourced_data.get("status") == "sourced" else "unresolved"
+    ledger.mark(key, "search", status, record_hash(sourced_data),
+                sourced_data.get("unresolved_reason"))
+
+
+def _write_sourced(lead, sourced_data):
+    key = sourced_key(lead)
+    if _sourced is not None:
+        _sourced.put(key, sourced_data)
+        _mark_sourced(_ledger, key, sourced_data)
+        return
+    with open_stage(STAGING_SOURCED) as stage, _open_ledger() as ledger:
+        stage.put(key, sourced_data)
+        _mark_sourced(ledger, key, sourced_data)
+
+
+# ---------------------------------------------------------------------------
+# Offline re-extraction
+# ---------------------------------------------------------------------------
+
+# Extractor name recorded in a scrape result -> html -> (title, company,
+# location, description). "description" is an HTML fragment (board and
+# Ashby API postings) whose title/company/location came from the API.
+REEXTRACTORS = {
+    "greenhouse": extract_greenhouse,
+    "lever": extract_lever,
+    "generic": extract_generic,
+    "description": lambda html: ("", "", "", html_to_text(html)),
+}
+
+
+def re_extract_sourced(config=None):
+    """Re-run the extractors over stored HTML for every sourced record.
+
+    No network: the HTML comes from the blob store. Fields the extractor
+    returns empty keep their previous value, match validation is redone,
+    and a lead left unresolved for lack of description content becomes
+    sourced when the new extraction finds some.
+    """
+    stats = {"records": 0, "re_extracted": 0, "changed": 0, "recovered": 0,
+             "no_html": 0, "missing_blob": 0}
+    blobs = configure_blobs()
+    set_default_backend((config or {}).get("html_extract", {}).get("backend", "auto"))
+
+    with open_stage(STAGING_SOURCED) as sourced, _open_ledger() as ledger, ledger.batch():
+        for key in sorted(sourced.keys()):
+            stats["records"] += 1
+            data = sourced.get(key)
+
+            old = data.get("scraped") or {}
+            extract = REEXTRACTORS.get(old.get("extractor"))
+            if not old.get("raw_html_blob") or extract is None:
+                stats["no_html"] += 1
+                continue
+            try:
+                html = blobs.get_text(old["raw_html_blob"])
+            except KeyError:
+                stats["missing_blob"] += 1
+                continue
+
+            title, company, location, description = extract(html)
+            new = _build_scrape_result(old["url"], old.get("ats_type"),
+                                       title or old.get("title", ""),
+                                       company or old.get("company", ""),
+                                       location or old.get("location", ""),
+                                       description, html, extractor=old["extractor"])
+            new["scraped_at"] = old.get("scraped_at")
+            new["re_extracted_at"] = datetime.now().isoformat()
+            stats["re_extracted"] += 1
+
+            fields = ("title", "company", "location", "description_text", "compensation")
+            if any(new.get(k) != old.get(k) for k in fields):
+                stats["changed"] += 1
+            data["scraped"] = new
+
+            if (data.get("status") == "unresolved" and description
+                    and data.get("unresolved_reason") == "No description content on page"):
+                data["status"] = "sourced"
+                data.pop("unresolved_reason", None)
+                stats["recovered"] += 1
+            if data.get("status") == "sourced" and data.get("lead"):
+                data["match_validation"] = validate_job_match(data["lead"], new)
+
+            sourced.put(key, data)
+            _mark_sourced(ledger, key, data)
+
+    return stats
+
+
+def parse_duration(text):
+    """Seconds in "90", "90s", "45m" or "2h"."""
+    import argparse
+
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", text.lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r} (e.g. 900, 45m, 2h)")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
 
 
 def main():
@@ -1063,6 +1342,15 @@ def main():
     parser = argparse.ArgumentParser(description="Search company career pages for job postings")
     parser.add_argument("--limit", type=int, default=None, help="Max leads to process")
     parser.add_argument("--retry-unresolved", action="store_true", help="Retry previously unresolved leads")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Leads to source at once (default: 1). Per-host limits still apply")
+    parser.add_argument("--cache-only", action="store_true",
+                        help="Serve every request from the HTTP cache; never touch the network")
+    parser.add_argument("--deadline", type=parse_duration, default=None, metavar="TIME",
+                        help="Time budget, e.g. 900, 45m or 2h. No new lead starts once it "
+                             "has passed; the rest stay queued for the next run")
+    parser.add_argument("--re-extract", action="store_true",
+                        help="Re-run the extractors over stored HTML offline (no searching or fetching)")
     args = parser.parse_args()
 
     print("=" * 60)
@@ -1070,15 +1358,38 @@ def main():
     print("=" * 60)
 
     config = load_config()
-    stats = process_parsed_leads(config, limit=args.limit, retry_unresolved=args.retry_unresolved)
+
+    if args.re_extract:
+        stats = re_extract_sourced(config)
+        print("\n  Re-extraction (offline):")
+        print(f"    Sourced records: {stats['records']}")
+        print(f"    Re-extracted:    {stats['re_extracted']}")
+        print(f"    Changed:         {stats['changed']}")
+        print(f"    Now sourced:     {stats['recovered']}")
+        print(f"    No stored HTML:  {stats['no_html'] + stats['missing_blob']}")
+        return
+
+    stats = process_parsed_leads(config, limit=args.limit, retry_unresolved=args.retry_unresolved,
+                                 concurrency=args.concurrency, cache_only=args.cache_only,
+                                 deadline=args.deadline)
 
     print("\n  Results:")
     print(f"    Leads processed: {stats['total']}")
     print(f"    Sourced:         {stats['sourced']}")
     print(f"    Unresolved:      {stats['unresolved']}")
+    if stats.get("retrying"):
+        print(f"    Retry scheduled: {stats['retrying']}")
+    if stats.get("dead"):
+        print(f"    Dead letters:    {stats['dead']} new, {stats['dead_letters']} total "
+              f"(python work_queue.py dead)")
+    if stats.get("remaining"):
+        print(f"    Still queued:    {stats['remaining']}")
     if stats.get("already_sourced"):
         print(f"    Already sourced: {stats['already_sourced']}")
 
+    print("\n  HTTP requests by host:")
+    print(_http.format_stats())
+
     print(f"\n{'=' * 60}")
     print(f"  CAREER SEARCH COMPLETE — {stats['sourced']} descriptions ready for scoring")
     print(f"{'=' * 60}")
@@ -0,0 +1,171 @@
+"""
+Company name resolution: alias lookups, suffix-insensitive keys and fuzzy matching.
+
+A CompanyResolver is built once from the company_aliases map in
+pipeline_config.json ({canonical: [aliases]}) and, optionally, the names
+of known companies (applications, Supabase rows). Aliases become a
+reverse dict, and every name is indexed under a normalized key: lower
+case, legal suffix (Inc/LLC/Ltd/Corp/Co/Group) stripped, punctuation
+collapsed to single spaces. Exact and alias lookups are dict hits, O(1)
+however large the alias map grows.
+
+Names that do not match exactly fall back to a character n-gram index.
+Candidates are scored by the Dice coefficient of their n-gram sets
+(1.0 = same key), and only names sharing an n-gram with the query are
+scored.
+
+Usage:
+    resolver = CompanyResolver(config["company_aliases"])
+    resolver.resolve("Google Inc.")              # "Alphabet"
+
+    apps = CompanyResolver()
+    for app in applications:
+        apps.add(app["company"], app)
+    apps.lookup("Acme, Inc.")                    # apps for "Acme", "ACME Corp", ...
+    apps.match("Acme Helth")                     # (app, 0.82) or None
+"""
+
+import re
+from collections import Counter, defaultdict
+
+SUFFIX_RE = re.compile(r'\s*(?:Inc\.?|LLC|Ltd\.?|Corp\.?|Corporation|Co\.?|Group)\s*$',
+                       re.IGNORECASE)
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+NGRAM = 3
+MIN_SCORE = 0.8     # match(): below this a fuzzy candidate is not the same company
+
+
+def strip_suffix(name):
+    """'Acme Corp.' -> 'Acme'."""
+    return SUFFIX_RE.sub('', name.strip()).strip()
+
+
+def company_key(name):
+    """Normalized lookup key: 'Florida Power & Light, Inc.' -> 'florida power light'."""
+    return _NON_ALNUM_RE.sub(' ', strip_suffix(name).lower()).strip()
+
+
+def _ngrams(key):
+    padded = f" {key} "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+
+class CompanyResolver:
+    """Aliases plus an index of known company names, built once per run."""
+
+    def __init__(self, alias_map=None, names=()):
+        self._canonical = set()             # alias_map keys, as given
+        self._aliases = {}                  # alias.lower() -> canonical.title()
+        self._groups = {}                   # key of a canonical or alias -> canonical's key
+        self._titles = {}                   # canonical's key -> canonical.title()
+        self._values = defaultdict(list)    # key -> values added under it
+        self._members = defaultdict(list)   # group key -> keys with values
+        self._grams = defaultdict(set)      # n-gram -> keys with values
+        self._gram_counts = {}              # key -> size of its n-gram set
+
+        # Earlier entries win when an alias is listed under two canonicals
+        for canonical, aliases in (alias_map or {}).items():
+            self._canonical.add(canonical)
+            group = company_key(canonical)
+            self._groups.setdefault(group, group)
+            self._titles.setdefault(group, canonical.title())
+            for alias in aliases:
+                self._aliases.setdefault(alias.lower(), canonical.title())
+                self._groups.setdefault(company_key(alias), group)
+        for name in names:
+            self.add(name)
+
+    @classmethod
+    def for_aliases(cls, alias_map):
+        """The resolver for alias_map, built on first use.
+
+        Config maps are loaded once and never mutated, so one resolver per
+        map object serves every lookup of the run.
+        """
+        cached = _resolvers.get(id(alias_map))
+        if cached is None or cached[0] is not alias_map:
+            cached = _resolvers[id(alias_map)] = (alias_map, cls(alias_map))
+        return cached[1]
+
+    def add(self, name, value=None):
+        """Index name; lookups and matches on it return value (default: name)."""
+        key = company_key(name or "")
+        if not key:
+            return
+        if key not in self._values:
+            grams = _ngrams(key)
+            for gram in grams:
+                self._grams[gram].add(key)
+            self._gram_counts[key] = len(grams)
+            self._members[self._groups.get(key, key)].append(key)
+        self._values[key].append(name if value is None else value)
+
+    # -- canonical names ---------------------------------------------------
+
+    def resolve(self, raw_name):
+        """Canonical form of a company name.
+
+        A canonical name from the alias map comes back as written (minus
+        its suffix), an alias as its canonical name in title case, and any
+        other name with just its legal suffix stripped.
+        """
+        if not raw_name:
+            return raw_name
+        cleaned = strip_suffix(raw_name)
+        lower = cleaned.lower()
+        if lower in self._canonical:
+            return cleaned
+        canonical = self._aliases.get(lower)
+        if canonical is not None:
+            return canonical
+        # Punctuation and suffix variants of a listed alias ("Meta Platforms, Inc")
+        group = self._groups.get(company_key(cleaned))
+        return self._titles.get(group, cleaned)
+
+    # -- known names -------------------------------------------------------
+
+    def values(self, key):
+        return list(self._values.get(key, ()))
+
+    def lookup(self, name):
+        """Values of names with the same key as name, or an alias of the same company."""
+        key = company_key(name or "")
+        group = self._groups.get(key, key)
+        keys = self._members.get(group, [])
+        # The name's own key first, then other spellings of the company
+        ordered = ([key] if key in self._values else []) + [k for k in keys if k != key]
+        return [value for k in ordered for value in self._values[k]]
+
+    def candidates(self, name, min_score=0.0):
+        """[(key, score)] for indexed names sharing an n-gram with name, best first."""
+        key = company_key(name or "")
+        if not key:
+            return []
+        grams = _ngrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        scored = []
+        for other, n in shared.items():
+            score = 1.0 if other == key else 2 * n / (len(grams) + self._gram_counts[other])
+            if score >= min_score:
+                scored.append((other, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def match(self, name, min_score=MIN_SCORE):
+        """(value, confidence) for the best indexed name, or None.
+
+        Exact and alias lookups have confidence 1.0; otherwise the best
+        n-gram candidate scoring at least min_score.
+        """
+        found = self.lookup(name)
+        if found:
+            return found[0], 1.0
+        for key, score in self.candidates(name, min_score):
+            return self._values[key][0], score
+        return None
+
+
+_resolvers = {}     # id(alias_map) -> (alias_map, resolver)
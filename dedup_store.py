@@ -0,0 +1,176 @@
+"""
+Embedded SQLite dedup index for fetched emails.
+
+Replaces pipeline/fingerprints.json. Every fetched (or duplicate) email
+appends one row holding its Message-ID, content fingerprint and IMAP UID;
+each column is indexed, so "have we seen this?" is a single lookup no
+matter how large the mailbox grows, and a run only writes the rows it adds
+instead of rewriting the whole index. SQLite's locking (WAL mode) keeps
+concurrent runs — fetch and audit at the same time — from corrupting it.
+
+Rows are never updated or deleted. The first open of a new database
+imports fingerprints.json and the Message-IDs of emails already in
+staging/raw (log or legacy files); the JSON file is left in place. The
+legacy fetch keyed both by IMAP sequence number (SEARCH ALL), which is
+not a UID and shifts as mail is expunged, so imported rows keep the
+fingerprint and Message-ID with a NULL uid.
+
+Usage:
+    python dedup_store.py            # migrate if needed, print stats
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from record_log import LOG_SUFFIX, open_stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
+DEDUP_DB_PATH = os.path.join(PIPELINE_DIR, "dedup.sqlite3")
+FINGERPRINTS_PATH = os.path.join(PIPELINE_DIR, "fingerprints.json")
+STAGING_RAW = os.path.join(PIPELINE_DIR, "staging", "raw")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    id          INTEGER PRIMARY KEY,
+    message_id  TEXT,
+    fingerprint TEXT,
+    uid         TEXT,
+    uidvalidity INTEGER,
+    source      TEXT NOT NULL,
+    seen_at     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_message_id ON seen (message_id);
+CREATE INDEX IF NOT EXISTS seen_fingerprint ON seen (fingerprint);
+CREATE INDEX IF NOT EXISTS seen_uid ON seen (uid);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class DedupStore:
+    """Append-only Message-ID / fingerprint / UID index in SQLite."""
+
+    def __init__(self, path=DEDUP_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- lookups -----------------------------------------------------------
+
+    def _exists(self, column, value):
+        if not value:
+            return False
+        row = self._conn.execute(
+            f"SELECT 1 FROM seen WHERE {column} = ? LIMIT 1", (value,)).fetchone()
+        return row is not None
+
+    def has_message_id(self, message_id):
+        return self._exists("message_id", message_id)
+
+    def has_fingerprint(self, fingerprint):
+        return self._exists("fingerprint", fingerprint)
+
+    def uids(self):
+        """Set of every UID recorded."""
+        return {row[0] for row in self._conn.execute(
+            "SELECT DISTINCT uid FROM seen WHERE uid IS NOT NULL")}
+
+    def count(self, column=None):
+        """Number of rows, or of distinct non-null values in `column`."""
+        if column is None:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        return self._conn.execute(
+            f"SELECT COUNT(DISTINCT {column}) FROM seen").fetchone()[0]
+
+    # -- writes ------------------------------------------------------------
+
+    def add(self, message_id=None, fingerprint=None, uid=None, uidvalidity=None,
+            source="fetch"):
+        """Append one seen email."""
+        self.add_many([(message_id, fingerprint, uid, uidvalidity)], source)
+
+    def add_many(self, rows, source="fetch"):
+        """Append (message_id, fingerprint, uid, uidvalidity) rows in one transaction."""
+        now = datetime.now().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO seen (message_id, fingerprint, uid, uidvalidity, source, seen_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(mid or None, fp or None, None if uid is None else str(uid), uv, source, now)
+                 for mid, fp, uid, uv in rows])
+
+    # -- migration ---------------------------------------------------------
+
+    def migrate(self, fingerprints_path=FINGERPRINTS_PATH, staging_dir=STAGING_RAW):
+        """Import fingerprints.json and staged Message-IDs, once.
+
+        Returns the number of rows imported (0 if already migrated).
+        """
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_at'").fetchone():
+            return 0
+
+        fingerprints = {}
+        if os.path.exists(fingerprints_path):
+            with open(fingerprints_path, encoding="utf-8") as f:
+                fingerprints = json.load(f)
+
+        message_ids = {}   # sequence number -> Message-ID
+        if os.path.isdir(staging_dir) or os.path.isdir(staging_dir + LOG_SUFFIX):
+            with open_stage(staging_dir) as stage:
+                for key in stage.keys():
+                    try:
+                        raw = stage.get(key)
+                    except (OSError, json.JSONDecodeError):
+                        continue
+                    if raw.get("message_id"):
+                        message_ids[str(raw.get("uid", key))] = raw["message_id"]
+
+        rows = [(message_ids.pop(str(seq), None), fp, None, None)
+                for fp, seq in fingerprints.items()]
+        rows += [(mid, None, None, None) for mid in message_ids.values()]
+        self.add_many(rows, source="migration")
+        with self._conn:
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_at', ?)",
+                               (datetime.now().isoformat(),))
+        return len(rows)
+
+
+def open_store(path=DEDUP_DB_PATH, fingerprints_path=FINGERPRINTS_PATH,
+               staging_dir=STAGING_RAW):
+    """Open the dedup store, importing the legacy JSON index on first use."""
+    store = DedupStore(path)
+    imported = store.migrate(fingerprints_path, staging_dir)
+    if imported:
+        print(f"  Migrated {imported} entries from fingerprints.json/staging into {path}")
+    return store
+
+
+def main():
+    with open_store() as store:
+        print(f"  {store.path}")
+        print(f"    Rows:         {store.count()}")
+        print(f"    Message-IDs:  {store.count('message_id')}")
+        print(f"    Fingerprints: {store.count('fingerprint')}")
+        print(f"    UIDs:         {store.count('uid')}")
+
+
+if __name__ == "__main__":
+    main()
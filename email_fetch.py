@@ -7,23 +7,41 @@ pipeline staging directory.
 
 Usage:
     python email_fetch.py [--limit N] [--dry-run]
+    python email_fetch.py --watch [--no-parse]
+    python email_fetch.py --from-mbox PATH | --from-maildir PATH | --from-eml-dir PATH
+                          [--workers N] [--limit N] [--dry-run]
 """
 
 import email
+import email.parser
 import email.policy
 import hashlib
 import imaplib
 import json
 import os
 import re
+import select
+import ssl
 import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
+from blob_store import BlobStore, dehydrate
+from dedup_store import open_store
+from pipeline_ledger import open_ledger, record_hash
+from record_log import open_stage
+
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
 STAGING_RAW = os.path.join(PIPELINE_DIR, "staging", "raw")
 FINGERPRINTS_PATH = os.path.join(PIPELINE_DIR, "fingerprints.json")
+DEDUP_DB_PATH = os.path.join(PIPELINE_DIR, "dedup.sqlite3")
+LEDGER_DB_PATH = os.path.join(PIPELINE_DIR, "ledger.sqlite3")
+SYNC_STATE_PATH = os.path.join(PIPELINE_DIR, "sync_state.json")
+BLOBS_DIR = os.path.join(PIPELINE_DIR, "blobs")
 CONFIG_PATH = os.path.join(SCRIPT_DIR, "pipeline_config.json")
 
 
@@ -67,7 +85,10 @@ def connect_imap(config):
     password = get_app_password(config)
 
     try:
-        conn = imaplib.IMAP4_SSL(host, port)
+        if email_cfg.get("imap_ssl", True):
+            conn = imaplib.IMAP4_SSL(host, port)
+        else:
+            conn = imaplib.IMAP4(host, port)   # local stand-in servers only
         conn.login(address, password)
         print(f"  Connected to {host} as {address}")
         return conn
@@ -77,61 +98,262 @@ def connect_imap(config):
         sys.exit(1)
 
 
-def get_unprocessed_emails(conn, config, limit=50):
-    """Fetch emails from INBOX not yet processed.
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+#
+# Instead of SEARCH ALL + one FETCH per message, each run asks only for
+# UIDs above the last one seen (UID SEARCH n:*), reads headers for those in
+# batched UID ranges with BODY.PEEK[HEADER], drops Message-IDs already in
+# the dedup store, and downloads full bodies (BODY.PEEK[], also batched)
+# only for what is left. The sync point is only valid for one UIDVALIDITY;
+# if the server changes it the UIDs are rescanned from 1 and the dedup
+# store keeps already-fetched mail from being saved twice.
+
+FETCH_BATCH_SIZE = 50
+
+# Longest sequence set sent in one STORE/COPY/MOVE; longer sets are split
+MAX_SET_CHARS = 1000
+
+_FETCH_UID_RE = re.compile(rb"UID (\d+)")
+
+
+def load_sync_state():
+    """Load the IMAP sync point (UIDVALIDITY and last UID handled)."""
+    if os.path.exists(SYNC_STATE_PATH):
+        with open(SYNC_STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    return {"uidvalidity": None, "last_uid": 0}
+
+
+def save_sync_state(state):
+    """Save the IMAP sync point."""
+    os.makedirs(os.path.dirname(SYNC_STATE_PATH), exist_ok=True)
+    state["synced_at"] = datetime.now().isoformat()
+    with open(SYNC_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def uid_set(uids):
+    """Compress UIDs into an IMAP sequence set: [1, 2, 3, 7] -> "1:3,7"."""
+    ranges = []
+    for uid in sorted(set(int(u) for u in uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(lo) if lo == hi else f"{lo}:{hi}" for lo, hi in ranges)
+
+
+def uid_set_chunks(uids, max_chars=MAX_SET_CHARS):
+    """Yield compressed sequence sets covering uids, each under max_chars."""
+    chunk = ""
+    for part in uid_set(uids).split(","):
+        if chunk and len(chunk) + 1 + len(part) > max_chars:
+            yield chunk
+            chunk = ""
+        chunk = f"{chunk},{part}" if chunk else part
+    if chunk:
+        yield chunk
+
+
+def _batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _mailbox_uidvalidity(conn, mailbox):
+    """UIDVALIDITY of the selected mailbox (from the SELECT response)."""
+    _, data = conn.response("UIDVALIDITY")
+    if data and data[0]:
+        return int(data[0])
+    status, data = conn.status(mailbox, "(UIDVALIDITY)")
+    match = re.search(rb"UIDVALIDITY (\d+)", data[0] or b"") if status == "OK" else None
+    return int(match.group(1)) if match else None
+
+
+def uid_fetch(conn, uids, item, batch_size=FETCH_BATCH_SIZE):
+    """UID FETCH `item` for uids in batched ranges.
 
-    Uses IMAP SEARCH to find emails not labeled as processed or failed.
-    Returns list of parsed email dicts.
+    Yields (uid, literal bytes, Gmail labels); labels is None unless
+    X-GM-LABELS was part of `item`.
     """
+    for batch in _batches(list(uids), batch_size):
+        status, data = conn.uid("FETCH", uid_set(batch), f"(UID {item})")
+        if status != "OK":
+            print(f"  WARNING: Could not fetch UIDs {uid_set(batch)}")
+            continue
+        for part in data:
+            if not isinstance(part, tuple):
+                continue   # closing b")" of each response
+            match = _FETCH_UID_RE.search(part[0])
+            if match:
+                yield int(match.group(1)), part[1], parse_gmail_labels(part[0])
+
+
+# ---------------------------------------------------------------------------
+# Gmail IMAP extensions
+# ---------------------------------------------------------------------------
+#
+# On Gmail (X-GM-EXT-1) the search itself excludes labelled mail with
+# X-GM-RAW, headers come back with their labels (X-GM-LABELS) in the same
+# FETCH, and labels are applied with one UID STORE per batch instead of a
+# create/select/copy per message.
+
+DEFAULT_GMAIL_QUERY = "-label:{processed} -label:{failed}"
+
+_GM_LABELS_RE = re.compile(rb"X-GM-LABELS \(((?:[^()\"]|\"(?:[^\"\\]|\\.)*\")*)\)")
+_GM_LABEL_TOKEN_RE = re.compile(rb'"((?:[^"\\]|\\.)*)"|([^\s"]+)')
+
+
+def use_gmail_extensions(conn, config):
+    """True if the server speaks X-GM-EXT-1 and config does not turn it off.
+
+    email.gmail_extensions: true, false or "auto" (default).
+    """
+    setting = config["email"].get("gmail_extensions", "auto")
+    if setting != "auto":
+        return bool(setting)
+    return "X-GM-EXT-1" in getattr(conn, "capabilities", ())
+
+
+def gmail_query(config):
+    """The X-GM-RAW search for unprocessed mail, labels filled in from config."""
     labels = config["email"].get("labels", {})
-    _processed_label = labels.get("processed", "pipeline/processed")
-    _failed_label = labels.get("failed", "pipeline/failed")
+    query = config["email"].get("gmail_query", DEFAULT_GMAIL_QUERY)
+    return query.format(processed=labels.get("processed", "pipeline/processed"),
+                        failed=labels.get("failed", "pipeline/failed"))
 
-    # Select INBOX
-    conn.select("INBOX")
 
-    # Search for all emails (we'll filter by checking labels/flags)
-    # Gmail IMAP: unlabeled emails in INBOX that haven't been moved
-    status, data = conn.search(None, "ALL")
-    if status != "OK":
-        print("  ERROR: Could not search INBOX")
-        return []
+def imap_quote(value):
+    """Quote a string argument for an IMAP command."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
 
-    uids = data[0].split()
-    if not uids:
-        print("  No emails found in INBOX.")
-        return []
 
-    # Check which UIDs are already processed via our fingerprint file
-    fingerprints = load_fingerprints()
-    processed_uids = set(fingerprints.values())  # uid strings we've already seen
+def parse_gmail_labels(response):
+    """Labels from a FETCH response line, or None if it has no X-GM-LABELS."""
+    match = _GM_LABELS_RE.search(response)
+    if not match:
+        return None
+    labels = []
+    for quoted, atom in _GM_LABEL_TOKEN_RE.findall(match.group(1)):
+        if quoted:
+            labels.append(re.sub(rb"\\(.)", rb"\1", quoted).decode("utf-8", "replace"))
+        else:
+            labels.append(atom.decode("utf-8", "replace"))
+    return labels
+
 
-    # Filter to unprocessed, apply limit
-    unprocessed_uids = [uid for uid in uids if uid.decode() not in processed_uids]
-    if limit:
-        unprocessed_uids = unprocessed_uids[-limit:]  # Most recent first
+def store_gmail_labels(conn, uids, add=(), remove=()):
+    """Add/remove Gmail labels on uids with one UID STORE per operation.
+
+    The UIDs go out as one compressed sequence set (split only past
+    MAX_SET_CHARS). Returns (commands sent, commands failed).
+    """
+    commands = failures = 0
+    for op, labels in (("+X-GM-LABELS", add), ("-X-GM-LABELS", remove)):
+        if not labels or not uids:
+            continue
+        label_list = "(" + " ".join(imap_quote(label) for label in labels) + ")"
+        for seq in uid_set_chunks(uids):
+            commands += 1
+            try:
+                status, _ = conn.uid("STORE", seq, op, label_list)
+            except imaplib.IMAP4.error as e:
+                status = str(e)
+            if status != "OK":
+                failures += 1
+                print(f"  WARNING: Could not {op} {label_list} on UIDs {seq}: {status}")
+    return commands, failures
+
+
+def get_unprocessed_emails(conn, config, limit=50, state=None, store=None):
+    """Fetch emails from INBOX that arrived since the last sync.
+
+    Searches only UIDs above the saved sync point (on Gmail, also only
+    mail without the processed/failed labels, via X-GM-RAW), skips
+    Message-IDs already fetched after reading headers alone, and downloads
+    the rest in batched UID FETCHes. Oldest first, so with a limit the next
+    run picks up where this one stopped.
+
+    Advances `state` (see load_sync_state) in place; the caller saves it
+    once the returned emails are stored. `store` is the DedupStore to check
+    Message-IDs against. Returns list of parsed email dicts.
+    """
+    if state is None:
+        state = load_sync_state()
+    if store is None:
+        store = open_dedup_store()
+    mailbox = config["email"].get("mailbox", "INBOX")
+    batch_size = config["email"].get("fetch_batch_size", FETCH_BATCH_SIZE)
+
+    status, _ = conn.select(mailbox)
+    if status != "OK":
+        print(f"  ERROR: Could not select {mailbox}")
+        return []
 
-    if not unprocessed_uids:
-        print("  No unprocessed emails found.")
+    uidvalidity = _mailbox_uidvalidity(conn, mailbox)
+    if state.get("uidvalidity") != uidvalidity:
+        if state.get("uidvalidity") is not None:
+            print(f"  UIDVALIDITY changed ({state['uidvalidity']} -> {uidvalidity}); "
+                  f"rescanning {mailbox}")
+        state["uidvalidity"] = uidvalidity
+        state["last_uid"] = 0
+    last_uid = state.get("last_uid", 0)
+
+    # n:* always matches the highest UID, even when it is below n
+    criteria = ["UID", f"{last_uid + 1}:*"]
+    gmail = use_gmail_extensions(conn, config)
+    if gmail:
+        criteria += ["X-GM-RAW", imap_quote(gmail_query(config))]
+    status, data = conn.uid("SEARCH", *criteria)
+    if status != "OK":
+        print(f"  ERROR: Could not search {mailbox}")
+        return []
+    uids = sorted(int(u) for u in data[0].split() if int(u) > last_uid)
+    if not uids:
+        print("  No new emails since last sync.")
         return []
 
-    print(f"  Found {len(unprocessed_uids)} unprocessed emails (of {len(uids)} total)")
+    # Headers (and Gmail labels) first; stop once `limit` new messages are
+    # found (a failed fetch stops the scan there, so the next run retries it)
+    header_item = "X-GM-LABELS BODY.PEEK[HEADER]" if gmail else "BODY.PEEK[HEADER]"
+    labels_cfg = config["email"].get("labels", {})
+    done_labels = {labels_cfg.get("processed", "pipeline/processed"),
+                   labels_cfg.get("failed", "pipeline/failed")}
+    wanted = []
+    scanned_to = last_uid
+    done = False
+    for batch in _batches(uids, batch_size):
+        headers = {uid: (header, labels) for uid, header, labels
+                   in uid_fetch(conn, batch, header_item, batch_size)}
+        for uid in batch:
+            if uid not in headers or (limit and len(wanted) >= limit):
+                done = True
+                break
+            scanned_to = uid
+            header, labels = headers[uid]
+            if labels and done_labels.intersection(labels):
+                continue   # labelled since the search ran
+            msg = email.message_from_bytes(header, policy=email.policy.default)
+            if not store.has_message_id(str(msg.get("Message-ID", ""))):
+                wanted.append(uid)
+        if done:
+            break
+
+    skipped = sum(1 for uid in uids if uid <= scanned_to) - len(wanted)
+    print(f"  Found {len(uids)} new UIDs since {last_uid}: "
+          f"{len(wanted)} to fetch, {skipped} already seen")
 
     emails = []
-    for uid in unprocessed_uids:
-        uid_str = uid.decode()
-        status, msg_data = conn.fetch(uid, "(RFC822)")
-        if status != "OK":
-            print(f"  WARNING: Could not fetch UID {uid_str}")
-            continue
-
-        raw_email = msg_data[0][1]
+    for uid, raw_email, _ in uid_fetch(conn, wanted, "BODY.PEEK[]", batch_size):
         msg = email.message_from_bytes(raw_email, policy=email.policy.default)
-
-        email_dict = parse_email_message(msg, uid_str)
+        email_dict = parse_email_message(msg, str(uid))
         if email_dict:
             emails.append(email_dict)
 
+    missing = set(wanted) - {int(e["uid"]) for e in emails}
+    state["last_uid"] = min(missing) - 1 if missing else scanned_to
     return emails
 
 
@@ -272,140 +494,577 @@ def compute_email_fingerprint(email_dict):
     return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
 
 
-def load_fingerprints():
-    """Load the email fingerprint dedup index."""
-    if os.path.exists(FINGERPRINTS_PATH):
-        with open(FINGERPRINTS_PATH, encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+def open_dedup_store():
+    """Open the Message-ID / fingerprint / UID dedup index (see dedup_store).
+
+    Imports the legacy fingerprints.json on first use.
+    """
+    return open_store(DEDUP_DB_PATH, FINGERPRINTS_PATH, STAGING_RAW)
 
 
-def save_fingerprints(fingerprints):
-    """Save the email fingerprint dedup index."""
-    os.makedirs(os.path.dirname(FINGERPRINTS_PATH), exist_ok=True)
-    with open(FINGERPRINTS_PATH, "w", encoding="utf-8") as f:
-        json.dump(fingerprints, f, indent=2)
+# Bodies kept in pipeline/blobs and referenced by hash from staging/raw.
+# forward_info holds the forwarded part of the body (the whole body when
+# the email is not a forward, which the store then keeps once).
+BODY_FIELDS = ("body_text", "body_html",
+               "forward_info.original_body_text", "forward_info.original_body_html")
+
+
+def save_raw_email(email_dict, stage, blobs=None, ledger=None):
+    """Append a raw email to the staging/raw record log under its uid.
+
+    Large bodies, including the forwarded bodies in forward_info, go to the
+    blob store (pipeline/blobs) and the record keeps their hash as
+    body_text_blob / body_html_blob; email_dict itself is not changed.
+    With a ledger, the uid is marked fetched. Idempotent: returns False
+    if the uid is already staged.
+    """
+    uid = str(email_dict["uid"])
+    if uid in stage:
+        return False
+    record = dehydrate(email_dict, BODY_FIELDS, blobs or BlobStore(BLOBS_DIR))
+    stage.put(uid, record)
+    if ledger is not None:
+        ledger.mark(uid, "fetch", "done", record_hash(record))
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Batched labelling
+# ---------------------------------------------------------------------------
+
+class LabelBatcher:
+    """Collects UIDs per label during a run and applies each label in bulk.
+
+    flush() sends one command per label with a compressed sequence set
+    (101:140,152,160:170): UID STORE +X-GM-LABELS on Gmail, otherwise
+    UID COPY into the label folder — or UID MOVE when `move` is set and
+    the server supports it. Label folders are created at most once per
+    session.
+    """
 
+    def __init__(self, conn, mailbox="INBOX", gmail=False, move=False):
+        self.conn = conn
+        self.mailbox = mailbox
+        self.gmail = gmail
+        self.move = move and "MOVE" in getattr(conn, "capabilities", ())
+        self.pending = {}    # label -> set of uids
+        self.created = set()
+        self.stats = {}      # label -> {"uids", "commands", "failed", "seconds"}
 
-def save_raw_email(email_dict, staging_dir=STAGING_RAW):
-    """Save raw email as JSON to staging/raw/{uid}.json.
+    def add(self, uid, label):
+        self.pending.setdefault(label, set()).add(int(uid))
 
-    Returns the file path. Idempotent: skips if file already exists.
+    def _ensure_label(self, label):
+        if label in self.created:
+            return
+        try:
+            self.conn.create(label)
+        except imaplib.IMAP4.error:
+            pass  # Label already exists
+        self.created.add(label)
+
+    def _apply(self, label, uids):
+        if self.gmail:
+            return store_gmail_labels(self.conn, uids, add=[label])
+        self._ensure_label(label)
+        command = "MOVE" if self.move else "COPY"
+        commands = failures = 0
+        for seq in uid_set_chunks(uids):
+            commands += 1
+            try:
+                status, _ = self.conn.uid(command, seq, imap_quote(label))
+            except imaplib.IMAP4.error as e:
+                status = str(e)
+            if status != "OK":
+                failures += 1
+                print(f"  WARNING: Could not {command} UIDs {seq} to {label}: {status}")
+        return commands, failures
+
+    def flush(self):
+        """Apply every pending label; returns the per-label stats."""
+        if not self.pending:
+            return self.stats
+        self.conn.select(self.mailbox)
+        for label, uids in sorted(self.pending.items()):
+            start = time.perf_counter()
+            commands, failures = self._apply(label, uids)
+            entry = self.stats.setdefault(label, {"uids": 0, "commands": 0,
+                                                  "failed": 0, "seconds": 0.0})
+            entry["uids"] += len(uids)
+            entry["commands"] += commands
+            entry["failed"] += failures
+            entry["seconds"] += time.perf_counter() - start
+        self.pending.clear()
+        return self.stats
+
+    def format_stats(self):
+        lines = []
+        for label, entry in sorted(self.stats.items()):
+            failed = f", {entry['failed']} failed" if entry["failed"] else ""
+            lines.append(f"    {label}: {entry['uids']} emails, {entry['commands']} "
+                         f"command(s), {entry['seconds']:.2f}s{failed}")
+        return "\n".join(lines)
+
+
+def save_fetched(conn, config, emails, store, state, dry_run=False):
+    """Dedup, save and label a batch from get_unprocessed_emails.
+
+    Returns (saved emails, duplicate count, LabelBatcher with stats).
     """
-    os.makedirs(staging_dir, exist_ok=True)
-    uid = email_dict["uid"]
-    filepath = os.path.join(staging_dir, f"{uid}.json")
+    blobs = BlobStore(BLOBS_DIR)
+    # Labels are collected here and applied in bulk after the loop
+    processed_label = config["email"]["labels"]["processed"]
+    labeler = LabelBatcher(conn, config["email"].get("mailbox", "INBOX"),
+                           gmail=use_gmail_extensions(conn, config),
+                           move=config["email"].get("move_processed", False))
+
+    saved = []
+    dupes = 0
+    with open_stage(STAGING_RAW) as raw, \
+            open_ledger(LEDGER_DB_PATH, os.path.dirname(STAGING_RAW)) as ledger, ledger.batch():
+        for email_dict in emails:
+            fp = compute_email_fingerprint(email_dict)
 
-    if os.path.exists(filepath):
-        return filepath, False
+            # Check for duplicate (same email forwarded twice)
+            if store.has_fingerprint(fp):
+                dupes += 1
+                if not dry_run:
+                    store.add(email_dict["message_id"], fp, email_dict["uid"],
+                              state["uidvalidity"], source="duplicate")
+                    labeler.add(email_dict["uid"], processed_label)
+                continue
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(email_dict, f, indent=2, ensure_ascii=False)
+            if dry_run:
+                print(f"    [DRY RUN] Would save: {email_dict['subject'][:60]}")
+                saved.append(email_dict)
+                continue
+
+            # Detect and annotate forwarded content
+            fwd_info = detect_forwarded_content(email_dict)
+            email_dict["forward_info"] = fwd_info
+
+            # Save raw email and record it in the dedup index
+            was_saved = save_raw_email(email_dict, raw, blobs, ledger)
+            store.add(email_dict["message_id"], fp, email_dict["uid"], state["uidvalidity"])
+            if was_saved:
+                saved.append(email_dict)
+
+                # Label as processed in Gmail
+                labeler.add(email_dict["uid"], processed_label)
 
-    return filepath, True
+    labeler.flush()
+    return saved, dupes, labeler
 
 
-def label_email(conn, uid, label):
-    """Apply a Gmail label (IMAP folder copy) to mark email as processed.
+# ---------------------------------------------------------------------------
+# Offline ingestion (mbox / Maildir / .eml exports)
+# ---------------------------------------------------------------------------
+#
+# Backfills from a Google Takeout mbox or a local mail store without IMAP.
+# Messages are streamed one at a time from disk; MIME decoding, forward
+# detection and fingerprinting run in a process pool with a bounded number
+# of messages in flight, so memory stays flat however large the archive.
+# Message-IDs already in the dedup store are skipped from the headers
+# alone, before any decoding. Offline emails get stable ids of the form
+# "<source>-<hash>" in place of an IMAP UID.
 
-    Gmail uses labels as virtual folders. We copy the message to the label
-    folder and optionally remove from INBOX.
+_MBOX_FROM_ESCAPE_RE = re.compile(rb"^>(>*From )")
+
+
+def iter_mbox(path):
+    """Yield raw message bytes from an mbox file, one message at a time.
+
+    Splits on "From " lines that follow a blank line and undoes mboxrd
+    ">From " quoting (Google Takeout exports are mboxrd).
     """
-    try:
-        # Gmail labels can be created as IMAP folders
-        # First try to create the label folder (idempotent - fails silently if exists)
-        conn.create(label)
-    except imaplib.IMAP4.error:
-        pass  # Label already exists
+    with open(path, "rb") as f:
+        lines = []
+        prev_blank = True
+        for line in f:
+            if prev_blank and line.startswith(b"From "):
+                if lines:
+                    yield _mbox_message(lines)
+                lines = []
+            else:
+                lines.append(_MBOX_FROM_ESCAPE_RE.sub(rb"\1", line))
+            prev_blank = line.strip() == b""
+        if lines:
+            yield _mbox_message(lines)
+
+
+def _mbox_message(lines):
+    # The blank line before the next "From " belongs to the mbox, not the message
+    return b"".join(lines[:-1] if lines[-1].strip() == b"" else lines)
+
+
+def iter_maildir(path):
+    """Yield raw message bytes from a Maildir (cur/ and new/), oldest name first."""
+    for sub in ("cur", "new"):
+        folder = os.path.join(path, sub)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.startswith("."):
+                continue
+            with open(os.path.join(folder, name), "rb") as f:
+                yield f.read()
+
+
+def iter_eml_dir(path):
+    """Yield raw message bytes from every *.eml under path, sorted by path."""
+    found = []
+    for root, _, names in os.walk(path):
+        found.extend(os.path.join(root, n) for n in names if n.lower().endswith(".eml"))
+    for filepath in sorted(found):
+        with open(filepath, "rb") as f:
+            yield f.read()
+
+
+OFFLINE_SOURCES = {"mbox": iter_mbox, "maildir": iter_maildir, "eml": iter_eml_dir}
+
+_header_parser = email.parser.BytesHeaderParser(policy=email.policy.default)
+
+
+def offline_message_id(raw):
+    """Message-ID from the header block alone ("" if none)."""
+    end = raw.find(b"\n\n")
+    if end < 0:
+        end = raw.find(b"\r\n\r\n")
+    headers = _header_parser.parsebytes(raw if end < 0 else raw[:end + 2])
+    return str(headers.get("Message-ID", "") or "").strip()
+
 
+def offline_uid(source, message_id, raw):
+    """Stable id for an offline message: Message-ID hash, else content hash."""
+    key = message_id.encode("utf-8") if message_id else raw
+    return f"{source}-{hashlib.sha256(key).hexdigest()[:16]}"
+
+
+def decode_offline_message(item):
+    """Pool worker: raw bytes -> (email dict with forward_info, fingerprint)."""
+    uid, raw = item
+    msg = email.message_from_bytes(raw, policy=email.policy.default)
+    email_dict = parse_email_message(msg, uid)
+    email_dict["forward_info"] = detect_forwarded_content(email_dict)
+    return email_dict, compute_email_fingerprint(email_dict)
+
+
+def _decoded(items, workers):
+    """Decode (uid, raw) items in order, with at most workers * 8 in flight."""
+    if workers <= 1:
+        for item in items:
+            yield decode_offline_message(item)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            in_flight.append(pool.submit(decode_offline_message, item))
+            if len(in_flight) >= workers * 8:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def ingest_offline(source, path, store, workers=1, limit=None, dry_run=False,
+                   staging_dir=None, blobs=None):
+    """Stream an mbox/maildir/eml export into the staging/raw record log.
+
+    Same dedup as the IMAP path (Message-ID, then content fingerprint).
+    Returns a stats dict.
+    """
+    stats = {}
+    start = time.perf_counter()
+    for _ in iter_ingested(source, path, store, stats, workers, limit, dry_run,
+                           staging_dir, blobs):
+        pass
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def iter_ingested(source, path, store, stats, workers=1, limit=None, dry_run=False,
+                  staging_dir=None, blobs=None):
+    """ingest_offline as a generator: yields each email dict as it is saved.
+
+    Counters accumulate in stats (read, known, saved, duplicates).
+    """
+    staging_dir = staging_dir or STAGING_RAW
+    blobs = blobs or BlobStore(BLOBS_DIR)
+    stats.update({"read": 0, "known": 0, "saved": 0, "duplicates": 0})
+    seen_ids = set()   # Message-IDs queued this run (not yet in the store)
+
+    def new_messages():
+        for raw in OFFLINE_SOURCES[source](path):
+            stats["read"] += 1
+            message_id = offline_message_id(raw)
+            if message_id and (message_id in seen_ids or store.has_message_id(message_id)):
+                stats["known"] += 1
+                continue
+            seen_ids.add(message_id)
+            yield offline_uid(source, message_id, raw), raw
+
+    # No ledger.batch() here: a consumer may hold this generator between
+    # emails, and an open batch would keep the ledger write-locked meanwhile
+    with open_stage(staging_dir) as raw, \
+            open_ledger(LEDGER_DB_PATH, os.path.dirname(staging_dir)) as ledger:
+        for email_dict, fp in _decoded(new_messages(), workers):
+            if store.has_fingerprint(fp):
+                stats["duplicates"] += 1
+                if not dry_run:
+                    store.add(email_dict["message_id"], fp, email_dict["uid"], source="duplicate")
+                continue
+            if dry_run:
+                print(f"    [DRY RUN] Would save: {email_dict['subject'][:60]}")
+            else:
+                was_saved = save_raw_email(email_dict, raw, blobs, ledger)
+                store.add(email_dict["message_id"], fp, email_dict["uid"], source=source)
+                if not was_saved:
+                    continue
+            stats["saved"] += 1
+            yield email_dict
+            if limit and stats["saved"] >= limit:
+                break
+
+
+# ---------------------------------------------------------------------------
+# Watch mode (IMAP IDLE)
+# ---------------------------------------------------------------------------
+#
+# One authenticated connection stays open. After each sync it sits in IDLE
+# until the server pushes an EXISTS update (new mail) or idle_seconds pass,
+# then syncs again and hands the saved emails to the parse stage in the
+# same process. A dropped connection is re-opened with exponential backoff.
+
+IDLE_SECONDS = 300        # re-issue IDLE well inside Gmail's ~29 min cutoff
+MAX_BACKOFF_SECONDS = 300
+
+_IDLE_WAKE_RE = re.compile(rb"^\* \d+ (?:EXISTS|RECENT)\b", re.IGNORECASE)
+
+
+def _has_buffered_input(conn):
+    """True if a response line is already readable without touching select().
+
+    imaplib reads through a buffered file, so an untagged "* N EXISTS" that
+    arrived in the same segment as an earlier line sits in conn.file where
+    select() cannot see it (and TLS may hold decrypted bytes too). The peek
+    runs with the socket non-blocking so an empty buffer never blocks.
+    """
+    sock = conn.socket()
+    if hasattr(sock, "pending") and sock.pending():
+        return True
+    timeout = sock.gettimeout()
+    sock.settimeout(0)
     try:
-        conn.select("INBOX")
-        # Copy message to the label folder
-        conn.copy(uid.encode() if isinstance(uid, str) else uid, label)
-    except imaplib.IMAP4.error as e:
-        print(f"  WARNING: Could not label email {uid}: {e}")
+        return bool(conn.file.peek(1))
+    except (BlockingIOError, ssl.SSLWantReadError):
+        return False
+    finally:
+        sock.settimeout(timeout)
+
+
+def imap_idle(conn, timeout, stop=None):
+    """Wait in IDLE until new mail is announced, timeout passes or stop is set.
+
+    imaplib (before Python 3.14) has no IDLE command, so this speaks it on
+    the connection directly. Returns True if the server reported new mail.
+    Raises imaplib.IMAP4.abort if the connection drops.
+    """
+    tag = conn._new_tag()
+    conn.send(tag + b" IDLE\r\n")
+    line = conn.readline()
+    if not line.startswith(b"+"):
+        raise imaplib.IMAP4.abort(f"IDLE refused: {line!r}")
+
+    sock = conn.socket()
+    deadline = time.monotonic() + timeout
+    woke = False
+    while not woke and time.monotonic() < deadline and not (stop and stop.is_set()):
+        wait = min(deadline - time.monotonic(), 1.0)
+        if not _has_buffered_input(conn) and not select.select([sock], [], [], max(wait, 0))[0]:
+            continue
+        line = conn.readline()
+        if not line or line.startswith(b"* BYE"):
+            raise imaplib.IMAP4.abort("connection closed during IDLE")
+        woke = bool(_IDLE_WAKE_RE.match(line))
+
+    conn.send(b"DONE\r\n")
+    while True:
+        line = conn.readline()
+        if not line:
+            raise imaplib.IMAP4.abort("connection closed ending IDLE")
+        if line.startswith(tag + b" "):
+            return woke
+
+
+def sync_new_mail(conn, config, store, state, limit=0):
+    """Fetch, save and label everything new; returns the saved emails."""
+    saved = []
+    while True:
+        emails = get_unprocessed_emails(conn, config, limit=limit, state=state, store=store)
+        batch, _, _ = save_fetched(conn, config, emails, store, state)
+        save_sync_state(state)
+        saved.extend(batch)
+        if not limit or len(emails) < limit:
+            return saved
+
+
+def watch(config, on_new=None, idle_seconds=IDLE_SECONDS, limit=0, stop=None,
+          connect=connect_imap, max_backoff=MAX_BACKOFF_SECONDS):
+    """Run until stop is set (or Ctrl-C): sync, IDLE, repeat.
+
+    on_new(emails) is called with each non-empty batch of saved emails.
+    """
+    stop = stop or threading.Event()
+    backoff = 1
+    with open_dedup_store() as store:
+        while not stop.is_set():
+            conn = None
+            try:
+                conn = connect(config)
+                state = load_sync_state()
+                backoff = 1
+                while not stop.is_set():
+                    saved = sync_new_mail(conn, config, store, state, limit)
+                    if saved:
+                        print(f"  [{datetime.now():%H:%M:%S}] Saved {len(saved)} new emails")
+                        if on_new:
+                            on_new(saved)
+                    imap_idle(conn, idle_seconds, stop)
+            except (imaplib.IMAP4.abort, imaplib.IMAP4.error, OSError) as e:
+                if stop.is_set():
+                    break
+                print(f"  Connection lost ({e}); reconnecting in {backoff}s")
+                stop.wait(backoff)
+                backoff = min(backoff * 2, max_backoff)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.logout()
+                    except Exception:
+                        pass
+
+
+def parse_new_emails(emails):
+    """Parse just the freshly saved emails, in-process."""
+    import email_parse
+
+    stats = email_parse.process_raw_emails(keys=[str(e["uid"]) for e in emails])
+    print(f"  Parsed: {stats.get('leads_found', 0)} leads from {stats.get('parsed', 0)} emails")
+
+
+def run_offline(source, path, args):
+    """main() for --from-mbox / --from-maildir / --from-eml-dir."""
+    if not os.path.exists(path):
+        print(f"  ERROR: {path} not found")
+        sys.exit(1)
+
+    print(f"\n  Ingesting {source} export {path}"
+          + (f" with {args.workers} worker processes" if args.workers > 1 else ""))
+    with open_dedup_store() as store:
+        stats = ingest_offline(source, path, store, workers=args.workers,
+                               limit=args.limit, dry_run=args.dry_run)
+
+    rate = stats["read"] / stats["seconds"] if stats["seconds"] else 0
+    print("\n  Results:")
+    print(f"    Read:       {stats['read']} ({rate:.0f} msg/s)")
+    print(f"    Known:      {stats['known']}")
+    print(f"    Saved:      {stats['saved']}")
+    print(f"    Duplicates: {stats['duplicates']}")
+    print(f"    Staging:    {STAGING_RAW}.log")
+
+    print(f"\n{'=' * 60}")
+    print(f"  FETCH COMPLETE — {stats['saved']} emails ready for parsing")
+    print(f"{'=' * 60}")
 
 
 def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Fetch job emails from Gmail")
-    parser.add_argument("--limit", type=int, default=50, help="Max emails to fetch")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Max emails to fetch (default: 50 over IMAP, no limit offline)")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be fetched without saving")
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument("--from-mbox", metavar="PATH", help="Ingest an mbox file (e.g. Google Takeout)")
+    offline.add_argument("--from-maildir", metavar="PATH", help="Ingest a local Maildir")
+    offline.add_argument("--from-eml-dir", metavar="PATH", help="Ingest every .eml under a directory")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for MIME decoding in offline mode (default: 1)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay connected and fetch new mail as it arrives (IMAP IDLE)")
+    parser.add_argument("--no-parse", action="store_true",
+                        help="With --watch, only fetch; do not run the parse stage")
     args = parser.parse_args()
+    if args.watch and (args.dry_run or args.from_mbox or args.from_maildir or args.from_eml_dir):
+        parser.error("--watch cannot be combined with --dry-run or offline ingestion")
 
     print("=" * 60)
     print("  EMAIL PIPELINE — STEP 1: FETCH")
     print("=" * 60)
 
+    for source, path in (("mbox", args.from_mbox), ("maildir", args.from_maildir),
+                         ("eml", args.from_eml_dir)):
+        if path:
+            run_offline(source, path, args)
+            return
+
     # Load config
     config = load_config()
 
+    if args.watch:
+        idle_seconds = config["email"].get("idle_seconds", IDLE_SECONDS)
+        print(f"\n  Watching {config['email'].get('mailbox', 'INBOX')} "
+              f"(IDLE, re-issued every {idle_seconds}s). Ctrl-C to stop.")
+        try:
+            watch(config, on_new=None if args.no_parse else parse_new_emails,
+                  idle_seconds=idle_seconds, limit=args.limit or 0)
+        except KeyboardInterrupt:
+            print("\n  Stopped.")
+        return
+
     # Connect
     print("\n  Connecting to Gmail...")
     conn = connect_imap(config)
 
+    store = open_dedup_store()
     try:
-        # Fetch unprocessed emails
+        # Fetch emails since the last sync
         print("\n  Fetching unprocessed emails...")
-        emails = get_unprocessed_emails(conn, config, limit=args.limit)
+        state = load_sync_state()
+        limit = args.limit if args.limit is not None else 50
+        emails = get_unprocessed_emails(conn, config, limit=limit, state=state, store=store)
 
         if not emails:
+            if not args.dry_run:
+                save_sync_state(state)
             print("\n  No new emails to process.")
             return
 
-        # Load fingerprint index for dedup
-        fingerprints = load_fingerprints()
-
-        # Process each email
-        saved = 0
-        dupes = 0
-        for email_dict in emails:
-            fp = compute_email_fingerprint(email_dict)
-
-            # Check for duplicate (same email forwarded twice)
-            if fp in fingerprints:
-                dupes += 1
-                if not args.dry_run:
-                    label_email(conn, email_dict["uid"],
-                                config["email"]["labels"]["processed"])
-                continue
-
-            if args.dry_run:
-                print(f"    [DRY RUN] Would save: {email_dict['subject'][:60]}")
-                saved += 1
-                continue
-
-            # Detect and annotate forwarded content
-            fwd_info = detect_forwarded_content(email_dict)
-            email_dict["forward_info"] = fwd_info
-
-            # Save raw email
-            filepath, was_saved = save_raw_email(email_dict)
-            if was_saved:
-                saved += 1
-                fingerprints[fp] = email_dict["uid"]
-
-                # Label as processed in Gmail
-                label_email(conn, email_dict["uid"],
-                            config["email"]["labels"]["processed"])
+        saved, dupes, labeler = save_fetched(conn, config, emails, store, state,
+                                             dry_run=args.dry_run)
 
-        # Save updated fingerprints
+        # Save the sync point
         if not args.dry_run:
-            save_fingerprints(fingerprints)
+            save_sync_state(state)
 
         # Summary
         print("\n  Results:")
         print(f"    Fetched:    {len(emails)}")
-        print(f"    Saved:      {saved}")
+        print(f"    Saved:      {len(saved)}")
         print(f"    Duplicates: {dupes}")
-        print(f"    Staging:    {STAGING_RAW}")
+        print(f"    Staging:    {STAGING_RAW}.log")
+        if labeler.stats:
+            print("    Labels:")
+            print(labeler.format_stats())
 
     finally:
+        store.close()
         conn.logout()
 
     print(f"\n{'=' * 60}")
-    print(f"  FETCH COMPLETE — {saved} emails ready for parsing")
+    print(f"  FETCH COMPLETE — {len(saved)} emails ready for parsing")
     print(f"{'=' * 60}")
 
 
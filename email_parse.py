@@ -7,26 +7,39 @@ a source of job descriptions — real JDs come exclusively from the
 Chrome extension's DOM capture on the live job posting. Never
 synthesize or reconstruct a JD from email body text.
 
-Reads raw email JSON files from staging/raw/ and extracts structured
-job leads: company name, role title, source platform, confidence.
+Reads raw email records from the staging/raw record log (see record_log)
+and extracts structured job leads: company name, role title, source
+platform, confidence.
 
 Handles multi-job emails (LinkedIn "Jobs you might like"), single-job
 notifications, recruiter outreach, and accidental non-job forwards.
 
 Usage:
-    python email_parse.py [--reparse]
+    python email_parse.py [--reparse[=stale]] [--workers N]
 """
 
+import inspect
 import json
 import os
 import re
+import sys
+from collections import Counter
+from functools import cached_property
 from html.parser import HTMLParser
 
+from blob_store import BlobStore, hydrate
+from company_resolver import CompanyResolver, company_key, strip_suffix
+from pipeline_ledger import lead_keys, open_ledger, record_hash
+from record_log import open_stage
+from rule_engine import RuleSet, compiled
+
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
 STAGING_RAW = os.path.join(PIPELINE_DIR, "staging", "raw")
 STAGING_PARSED = os.path.join(PIPELINE_DIR, "staging", "parsed")
+BLOBS_DIR = os.path.join(PIPELINE_DIR, "blobs")
+LEDGER_DB_PATH = os.path.join(PIPELINE_DIR, "ledger.sqlite3")
 CONFIG_PATH = os.path.join(SCRIPT_DIR, "pipeline_config.json")
 
 
@@ -60,23 +73,23 @@ def canonical_source_from_domain(domain):
     return CANONICAL_SOURCES.get(key)
 
 
-def detect_source_from_body(text):
-    """Scan email body for known job-board URLs."""
+def detect_source_from_body(text, lowered=None):
+    """Scan email body for known job-board URLs (lowered: text.lower(), if known)."""
     if not text:
         return None
-    lowered = text.lower()
+    lowered = lowered if lowered is not None else text.lower()
     for key, canonical in CANONICAL_SOURCES.items():
         if key in lowered:
             return canonical
     return None
 
 
-def detect_source_platform(domain, body_text):
+def detect_source_platform(domain, body_text, lowered=None):
     """Resolve the true source platform. Sender domain wins only if it's a
     known job board; otherwise scan body for job-board URLs; else Unknown."""
     return (
         canonical_source_from_domain(domain)
-        or detect_source_from_body(body_text)
+        or detect_source_from_body(body_text, lowered)
         or "Unknown"
     )
 
@@ -152,6 +165,85 @@ def load_config():
         return json.load(f)
 
 
+# ---------------------------------------------------------------------------
+# Email view
+# ---------------------------------------------------------------------------
+
+# Invisible spacers LinkedIn pads its alerts with, and <url> link targets
+_SPACERS_RE = re.compile(r'[\u034f\u200b-\u200f\u2028\u2029\u00ad]+')
+_ANGLE_URL_RE = re.compile(r'<https?://[^>]+>')
+
+
+class EmailView:
+    """A raw email dict plus the fields derived from it, each computed once.
+
+    Every classifier and parser needs the plain-text body, its lowercase
+    form or the sender domain. For an HTML-only alert, the plain text means
+    running HTMLTextExtractor over up to a few hundred KB, so it is worked
+    out on first use and then shared. The classification and parsing
+    functions accept either an email dict or an EmailView.
+    """
+
+    def __init__(self, email_dict):
+        self.email = email_dict
+
+    @classmethod
+    def of(cls, email):
+        """email as an EmailView (unchanged if it already is one)."""
+        return email if isinstance(email, cls) else cls(email)
+
+    @property
+    def subject(self):
+        return self.email.get("subject", "")
+
+    @property
+    def from_addr(self):
+        return self.email.get("from", "")
+
+    @cached_property
+    def body_text(self):
+        """The text/plain part as received ("" for HTML-only mail)."""
+        return self.email.get("body_text", "") or ""
+
+    @cached_property
+    def text(self):
+        """Plain-text body: the text/plain part, else the HTML part converted."""
+        return self.body_text or html_to_text(self.email.get("body_html", ""))
+
+    @cached_property
+    def lower_subject(self):
+        return self.subject.lower()
+
+    @cached_property
+    def lower_text(self):
+        return self.text.lower()
+
+    @cached_property
+    def clean_body(self):
+        """text without invisible spacers and <url> links."""
+        return _ANGLE_URL_RE.sub('', _SPACERS_RE.sub('', self.text))
+
+    @cached_property
+    def sender_domain(self):
+        """Domain of the From: header."""
+        return get_sender_domain(self.from_addr)
+
+    @cached_property
+    def forward_info(self):
+        """{"is_forwarded", and "original_from"/"original_subject" when found}."""
+        return _detect_forward(self.subject, self.text)
+
+    @cached_property
+    def effective_from(self):
+        """The original sender of a forwarded email, else From:."""
+        return (self.email.get("_original_from") or self.forward_info.get("original_from")
+                or self.from_addr)
+
+    @cached_property
+    def effective_domain(self):
+        return get_sender_domain(self.effective_from)
+
+
 # ---------------------------------------------------------------------------
 # Forward detection
 # ---------------------------------------------------------------------------
@@ -162,15 +254,23 @@ def _enrich_forwarded_email(email_dict):
     Adds _original_from, _original_subject, _is_forwarded keys.
     Handles Outlook "Fw:" and Gmail "Fwd:" forward formats.
     """
-    subject = email_dict.get("subject", "")
-    body_text = email_dict.get("body_text", "") or html_to_text(email_dict.get("body_html", ""))
-
+    view = EmailView.of(email_dict)
+    info = view.forward_info
+    view.email["_is_forwarded"] = info["is_forwarded"]
+    if "original_from" in info:
+        view.email["_original_from"] = info["original_from"]
+    if "original_subject" in info:
+        view.email["_original_subject"] = info["original_subject"]
+    return view.email
+
+
+def _detect_forward(subject, body_text):
+    """Forward details from the subject and body; see EmailView.forward_info."""
     is_forwarded = bool(re.match(r'^(?:Fw|Fwd|FW):\s*', subject, re.IGNORECASE))
     if not is_forwarded:
-        email_dict["_is_forwarded"] = False
-        return email_dict
+        return {"is_forwarded": False}
 
-    email_dict["_is_forwarded"] = True
+    info = {"is_forwarded": True}
 
     # Try Outlook/Hotmail format: ____\nFrom: ...\nSent: ...\nTo: ...\nSubject: ...
     outlook_fwd = re.search(
@@ -182,9 +282,9 @@ def _enrich_forwarded_email(email_dict):
         body_text, re.IGNORECASE
     )
     if outlook_fwd:
-        email_dict["_original_from"] = outlook_fwd.group(1).strip()
-        email_dict["_original_subject"] = outlook_fwd.group(4).strip()
-        return email_dict
+        info["original_from"] = outlook_fwd.group(1).strip()
+        info["original_subject"] = outlook_fwd.group(4).strip()
+        return info
 
     # Try Gmail format: ---------- Forwarded message ----------\nFrom: ...
     gmail_fwd = re.search(
@@ -193,13 +293,92 @@ def _enrich_forwarded_email(email_dict):
         body_text, re.IGNORECASE
     )
     if gmail_fwd:
-        email_dict["_original_from"] = gmail_fwd.group(1).strip()
+        info["original_from"] = gmail_fwd.group(1).strip()
         subj_match = re.search(r'Subject:\s*(.+?)\n', body_text[gmail_fwd.start():])
         if subj_match:
-            email_dict["_original_subject"] = subj_match.group(1).strip()
-        return email_dict
+            info["original_subject"] = subj_match.group(1).strip()
+
+    return info
 
-    return email_dict
+
+# ---------------------------------------------------------------------------
+# Classification rules
+# ---------------------------------------------------------------------------
+#
+# Compiled once at import into RuleSets (rule_engine), which also report
+# which rule matched. Sender-template patterns from pipeline_config.json
+# are compiled on first use.
+
+# Strong rejection signals — need at least one (matched against lowercased text)
+REJECTION_RULES = RuleSet([
+    ("decided_on_other_candidates", r"(?:we|i).{0,30}(?:decided|chosen|elected)\s+(?:to\s+)?(?:not\s+to\s+)?(?:move|proceed|go)\s+(?:forward|ahead)\s+with\s+other"),
+    ("not_moving_forward_with_you", r"(?:we|i).{0,30}(?:will not|won'?t|cannot|can'?t)\s+be\s+(?:moving|proceeding|going)\s+forward\s+with\s+(?:your|you)"),
+    ("decided_not_to_proceed", r"(?:we|i).{0,30}(?:decided|chosen)\s+not\s+to\s+(?:move|proceed)\s+forward"),
+    ("unfortunately_not_moving", r"(?:unfortunately|regret).{0,60}(?:not\s+(?:be\s+)?(?:moving|proceeding|advancing)|(?:will\s+not|won'?t)\s+be\s+(?:moving|able))"),
+    ("position_filled", r"position\s+has\s+been\s+filled"),
+    ("role_filled", r"role\s+has\s+been\s+filled"),
+    ("regret_to_inform", r"(?:we|i).{0,20}(?:regret(?:fully)?|sorry)\s+to\s+(?:inform|let|advise)\s+you"),
+    ("not_proceeding_with_application", r"not\s+(?:be\s+)?(?:moving|proceeding|advancing)\s+(?:forward\s+)?with\s+your\s+(?:application|candidacy|candidature)"),
+    ("application_unsuccessful", r"(?:your\s+)?application.{0,40}(?:has\s+been|was)\s+(?:unsuccessful|declined|rejected|not\s+selected)"),
+    ("pursuing_other_candidates", r"(?:we|i).{0,20}(?:pursued|pursuing)\s+(?:other|different)\s+candidates"),
+    ("not_pursuing_candidacy", r"(?:will not|won'?t)\s+be\s+pursuing\s+your\s+(?:candidacy|application)"),
+    ("after_careful_consideration", r"after\s+careful\s+(?:consideration|review).{0,60}(?:not|other\s+candidates)"),
+    ("role_no_longer_open", r"(?:this\s+)?(?:role|position)\s+(?:is\s+)?no\s+longer\s+(?:available|open)"),
+    ("we_filled_position", r"we.{0,20}(?:have\s+)?(?:filled|closed)\s+(?:the|this)\s+(?:position|role|opening)"),
+])
+
+# Subject-only rejection hints, which also need negative sentiment in the body
+REJECTION_SUBJECT_RULES = RuleSet([
+    ("application_status", r"(?:your\s+)?application\s+(?:status|update)"),
+    ("regarding_application", r"regarding\s+your\s+(?:application|candidacy)"),
+    ("update_on_application", r"update\s+(?:on|from)\s+(?:your\s+)?(?:application|interview)"),
+])
+NEGATIVE_BODY_RULES = RuleSet([
+    ("unfortunately", r"unfortunately"),
+    ("regret", r"regret"),
+    ("not_selected", r"not\s+(?:selected|chosen|moving)"),
+    ("other_candidates", r"other\s+candidates"),
+    ("at_this_time", r"at\s+this\s+time"),
+    ("will_not", r"will\s+not"),
+])
+
+# Newsletter/promotional patterns
+NON_JOB_RULES = RuleSet([
+    ("unsubscribe", r"unsubscribe"),
+    ("weekly_digest", r"weekly digest"),
+    ("newsletter", r"newsletter"),
+    ("periodic_summary", r"your (?:weekly|daily|monthly) (?:summary|recap|update)"),
+    ("connection_request", r"connection request"),
+    ("accepted_invitation", r"accepted your invitation"),
+    ("endorsement", r"endorsed you"),
+    ("birthday", r"happy birthday"),
+    ("work_anniversary", r"congratulations on your work anniversary"),
+    ("profile_view", r"profile view"),
+    ("viewed_profile", r"who.s viewed your profile"),
+    ("invitation_to_connect", r"invitation to connect"),
+], re.IGNORECASE)
+
+RECRUITER_RULES = RuleSet([
+    ("opportunity", r"opportunity"),
+    ("exciting_role", r"exciting role"),
+    ("position_open", r"position.+(?:available|open)"),
+    ("perfect_fit", r"perfect (?:fit|match|candidate)"),
+    ("client_hiring", r"client.+(?:is hiring|looking for)"),
+    ("came_across_profile", r"i came across your profile"),
+    ("your_background", r"your background"),
+    ("reaching_out", r"reaching out"),
+], re.IGNORECASE)
+
+# A specific job posting (company + role): "Role at Company", "Company is hiring ..."
+SPECIFIC_JOB_RULES = RuleSet([
+    ("role_at_company", r'(?:director|vp|vice president|manager|engineer|architect|lead|head|chief)\s+(?:of\s+)?\w+.+?at\s+\w+'),
+    ("company_is_hiring", r'\w+\s+is\s+(?:hiring|looking)\s+(?:for\s+)?(?:a\s+)?\w+'),
+    ("labelled_position", r'(?:position|role|opportunity):\s*\w+'),
+    ("apply_link", r'(?:apply|apply now|view job|see job)'),
+], re.IGNORECASE)
+
+# LinkedIn "... and more" subjects are multi-job alerts
+_AND_MORE_RE = re.compile(r'\band more\b', re.IGNORECASE)
 
 
 # ---------------------------------------------------------------------------
@@ -211,85 +390,86 @@ def classify_email(email_dict, sender_templates):
 
     Returns: 'single_job', 'multi_job', 'recruiter_generic', 'rejection', 'not_job', 'unknown'
     """
-    from_addr = email_dict.get("from", "")
-    subject = email_dict.get("subject", "")
-    body_text = email_dict.get("body_text", "") or html_to_text(email_dict.get("body_html", ""))
+    return classify_email_rule(email_dict, sender_templates)[0]
+
+
+def classify_email_rule(email_dict, sender_templates):
+    """classify_email plus the rule that decided it: (email type, rule name).
+
+    Rule names look like "rejection:position_filled", "not_job:unsubscribe",
+    "multi_job:linkedin.com:multi_job_indicator" or
+    "recruiter_generic:recruiter:reaching_out".
+    """
+    view = EmailView.of(email_dict)
+    from_addr = view.from_addr
+    subject = view.subject
+    body_text = view.text
 
     # Check for rejection emails before non-job filter (rejections can contain "unsubscribe" etc.)
-    if detect_rejection_email(email_dict):
-        return "rejection"
+    rule = rejection_rule(view)
+    if rule:
+        return "rejection", f"rejection:{rule}"
 
     # Detect non-job emails
-    if detect_non_job_email(email_dict):
-        return "not_job"
+    rule = non_job_rule(view)
+    if rule:
+        return "not_job", f"not_job:{rule}"
 
     # Use original sender if this is a forwarded email
-    effective_from = email_dict.get("_original_from", from_addr)
-    domain = get_sender_domain(effective_from)
-    sender_config = sender_templates.get(domain, sender_templates.get("_default", {}))
+    domain = view.effective_domain
+    template = domain if domain in sender_templates else "_default"
+    sender_config = sender_templates.get(template, {})
 
     # Check for multi-job indicator
     multi_indicator = sender_config.get("multi_job_indicator", "")
     if multi_indicator:
-        # Strip invisible Unicode spacers and URLs for a cleaner check window
-        clean_body = re.sub(r'[\u034f\u200b-\u200f\u2028\u2029\u00ad]+', '', body_text)
-        clean_body = re.sub(r'<https?://[^>]+>', '', clean_body)
-        combined = f"{subject} {clean_body[:2000]}".lower()
-        if re.search(multi_indicator, combined, re.IGNORECASE):
-            return "multi_job"
+        # Invisible Unicode spacers and URLs are stripped for a cleaner check window
+        combined = f"{subject} {view.clean_body[:2000]}".lower()
+        if compiled(multi_indicator, re.IGNORECASE).search(combined):
+            return "multi_job", f"multi_job:{template}:multi_job_indicator"
 
     # LinkedIn "and more" in subject indicates multi-job alert
-    if domain == "linkedin.com" and re.search(r'\band more\b', subject, re.IGNORECASE):
-        return "multi_job"
+    if domain == "linkedin.com" and _AND_MORE_RE.search(subject):
+        return "multi_job", "multi_job:linkedin_and_more"
 
     # Check if it matches a job board sender
     if sender_config.get("type") == "job_board":
-        return "single_job"
+        return "single_job", f"single_job:{template}:job_board"
 
     # Check for recruiter patterns
-    if sender_config.get("type") == "recruiter" or _looks_like_recruiter(from_addr, subject, body_text):
+    recruiter = ("sender_template" if sender_config.get("type") == "recruiter"
+                 else _recruiter_rule(from_addr, subject, body_text))
+    if recruiter:
         # Check if specific job is mentioned
-        if _has_specific_job(subject, body_text):
-            return "single_job"
-        return "recruiter_generic"
+        rule = _specific_job_rule(subject, body_text)
+        if rule:
+            return "single_job", f"single_job:recruiter:{rule}"
+        return "recruiter_generic", f"recruiter_generic:recruiter:{recruiter}"
 
     # Fallback: check body for job-like content
-    if _has_specific_job(subject, body_text):
-        return "single_job"
+    rule = _specific_job_rule(subject, body_text)
+    if rule:
+        return "single_job", f"single_job:specific_job:{rule}"
 
-    return "unknown"
+    return "unknown", "unknown"
 
 
 def detect_non_job_email(email_dict):
     """Heuristics for non-job emails accidentally forwarded."""
-    subject = email_dict.get("subject", "").lower()
-    body = (email_dict.get("body_text", "") or "")[:1000].lower()
-
-    # Newsletter/promotional patterns
-    non_job_patterns = [
-        r"unsubscribe",
-        r"weekly digest",
-        r"newsletter",
-        r"your (?:weekly|daily|monthly) (?:summary|recap|update)",
-        r"connection request",
-        r"accepted your invitation",
-        r"endorsed you",
-        r"happy birthday",
-        r"congratulations on your work anniversary",
-        r"profile view",
-        r"who.s viewed your profile",
-        r"invitation to connect",
-    ]
+    return non_job_rule(email_dict) is not None
 
-    combined = f"{subject} {body}"
-    for pattern in non_job_patterns:
-        if re.search(pattern, combined, re.IGNORECASE):
-            # Some newsletters mention jobs — check for job-specific content
-            if _has_specific_job(subject, body):
-                return False
-            return True
 
-    return False
+def non_job_rule(email_dict):
+    """Name of the non-job rule the email matches, or None."""
+    view = EmailView.of(email_dict)
+    subject = view.lower_subject
+    body = view.body_text[:1000].lower()
+
+    rule = NON_JOB_RULES.first(f"{subject} {body}")
+    # Some newsletters mention jobs — check for job-specific content
+    if rule is None or _has_specific_job(subject, body):
+        return None
+    return rule
 
 
 def detect_rejection_email(email_dict):
@@ -298,48 +478,27 @@ def detect_rejection_email(email_dict):
     These are emails saying "we decided not to move forward", "position has been filled",
     "we will not be pursuing your candidacy", etc.
     """
-    subject = email_dict.get("subject", "").lower()
-    body = (email_dict.get("body_text", "") or html_to_text(email_dict.get("body_html", "")))[:3000].lower()
-    combined = f"{subject} {body}"
-
-    # Strong rejection signals — need at least one
-    rejection_patterns = [
-        r"(?:we|i).{0,30}(?:decided|chosen|elected)\s+(?:to\s+)?(?:not\s+to\s+)?(?:move|proceed|go)\s+(?:forward|ahead)\s+with\s+other",
-        r"(?:we|i).{0,30}(?:will not|won'?t|cannot|can'?t)\s+be\s+(?:moving|proceeding|going)\s+forward\s+with\s+(?:your|you)",
-        r"(?:we|i).{0,30}(?:decided|chosen)\s+not\s+to\s+(?:move|proceed)\s+forward",
-        r"(?:unfortunately|regret).{0,60}(?:not\s+(?:be\s+)?(?:moving|proceeding|advancing)|(?:will\s+not|won'?t)\s+be\s+(?:moving|able))",
-        r"position\s+has\s+been\s+filled",
-        r"role\s+has\s+been\s+filled",
-        r"(?:we|i).{0,20}(?:regret(?:fully)?|sorry)\s+to\s+(?:inform|let|advise)\s+you",
-        r"not\s+(?:be\s+)?(?:moving|proceeding|advancing)\s+(?:forward\s+)?with\s+your\s+(?:application|candidacy|candidature)",
-        r"(?:your\s+)?application.{0,40}(?:has\s+been|was)\s+(?:unsuccessful|declined|rejected|not\s+selected)",
-        r"(?:we|i).{0,20}(?:pursued|pursuing)\s+(?:other|different)\s+candidates",
-        r"(?:will not|won'?t)\s+be\s+pursuing\s+your\s+(?:candidacy|application)",
-        r"after\s+careful\s+(?:consideration|review).{0,60}(?:not|other\s+candidates)",
-        r"(?:this\s+)?(?:role|position)\s+(?:is\s+)?no\s+longer\s+(?:available|open)",
-        r"we.{0,20}(?:have\s+)?(?:filled|closed)\s+(?:the|this)\s+(?:position|role|opening)",
-    ]
+    return rejection_rule(email_dict) is not None
 
-    match_count = sum(1 for p in rejection_patterns if re.search(p, combined))
-    if match_count >= 1:
-        return True
 
-    # Subject-only strong signals
-    subject_rejection = [
-        r"(?:your\s+)?application\s+(?:status|update)",
-        r"regarding\s+your\s+(?:application|candidacy)",
-        r"update\s+(?:on|from)\s+(?:your\s+)?(?:application|interview)",
-    ]
-    if any(re.search(p, subject) for p in subject_rejection):
-        # Only if body also has negative sentiment
-        negative_body = [
-            r"unfortunately", r"regret", r"not\s+(?:selected|chosen|moving)",
-            r"other\s+candidates", r"at\s+this\s+time", r"will\s+not",
-        ]
-        if any(re.search(p, body) for p in negative_body):
-            return True
+def rejection_rule(email_dict):
+    """Name of the rejection rule the email matches, or None."""
+    view = EmailView.of(email_dict)
+    subject = view.lower_subject
+    body = view.lower_text[:3000]
+
+    rule = REJECTION_RULES.first(f"{subject} {body}")
+    if rule:
+        return rule
+
+    # Subject-only strong signals, only if the body also has negative sentiment
+    subject_rule = REJECTION_SUBJECT_RULES.first(subject)
+    if subject_rule:
+        body_rule = NEGATIVE_BODY_RULES.first(body)
+        if body_rule:
+            return f"{subject_rule}+{body_rule}"
 
-    return False
+    return None
 
 
 def parse_rejection_email(email_dict, alias_map):
@@ -347,13 +506,13 @@ def parse_rejection_email(email_dict, alias_map):
 
     Returns dict with company, role (if found), rejection_date, and raw text snippet.
     """
-    from_addr = email_dict.get("from", "")
-    subject = email_dict.get("subject", "")
-    body_text = email_dict.get("body_text", "") or html_to_text(email_dict.get("body_html", ""))
+    view = EmailView.of(email_dict)
+    subject = view.subject
+    body_text = view.text
 
     # Use original sender if forwarded
-    effective_from = email_dict.get("_original_from", from_addr)
-    domain = get_sender_domain(effective_from)
+    effective_from = view.effective_from
+    domain = view.effective_domain
 
     company = None
     role = None
@@ -440,31 +599,20 @@ def parse_rejection_email(email_dict, alias_map):
 
 def _looks_like_recruiter(from_addr, subject, body):
     """Detect recruiter outreach patterns."""
-    recruiter_signals = [
-        r"opportunity",
-        r"exciting role",
-        r"position.+(?:available|open)",
-        r"perfect (?:fit|match|candidate)",
-        r"client.+(?:is hiring|looking for)",
-        r"i came across your profile",
-        r"your background",
-        r"reaching out",
-    ]
-    combined = f"{subject} {body[:500]}".lower()
-    return any(re.search(p, combined, re.IGNORECASE) for p in recruiter_signals)
+    return _recruiter_rule(from_addr, subject, body) is not None
+
+
+def _recruiter_rule(from_addr, subject, body):
+    return RECRUITER_RULES.first(f"{subject} {body[:500]}".lower())
 
 
 def _has_specific_job(subject, body):
     """Check if email contains a specific job posting (company + role)."""
-    combined = f"{subject} {body[:1000]}"
-    # Look for patterns like "Role at Company" or "Company is hiring for Role"
-    job_patterns = [
-        r'(?:director|vp|vice president|manager|engineer|architect|lead|head|chief)\s+(?:of\s+)?\w+.+?at\s+\w+',
-        r'\w+\s+is\s+(?:hiring|looking)\s+(?:for\s+)?(?:a\s+)?\w+',
-        r'(?:position|role|opportunity):\s*\w+',
-        r'(?:apply|apply now|view job|see job)',
-    ]
-    return any(re.search(p, combined, re.IGNORECASE) for p in job_patterns)
+    return _specific_job_rule(subject, body) is not None
+
+
+def _specific_job_rule(subject, body):
+    return SPECIFIC_JOB_RULES.first(f"{subject} {body[:1000]}")
 
 
 # ---------------------------------------------------------------------------
@@ -476,10 +624,10 @@ def parse_single_job_email(email_dict, sender_config, alias_map):
 
     Returns dict with company, role, source_platform, confidence.
     """
-    subject = email_dict.get("subject", "")
-    body_text = email_dict.get("body_text", "") or html_to_text(email_dict.get("body_html", ""))
-    from_addr = email_dict.get("from", "")
-    domain = get_sender_domain(from_addr)
+    view = EmailView.of(email_dict)
+    subject = view.subject
+    body_text = view.text
+    domain = view.sender_domain
 
     # Try subject patterns first
     company = None
@@ -488,7 +636,7 @@ def parse_single_job_email(email_dict, sender_config, alias_map):
 
     subject_patterns = sender_config.get("subject_patterns", [])
     for pattern in subject_patterns:
-        match = re.search(pattern, subject, re.IGNORECASE)
+        match = compiled(pattern, re.IGNORECASE).search(subject)
         if match:
             groups = match.groupdict()
             if "company" in groups:
@@ -521,7 +669,7 @@ def parse_single_job_email(email_dict, sender_config, alias_map):
     return {
         "company": company or "Unknown",
         "role": role or "Unknown Role",
-        "source_platform": detect_source_platform(domain, body_text),
+        "source_platform": detect_source_platform(domain, body_text, view.lower_text),
         "confidence": round(confidence, 2),
     }
 
@@ -531,29 +679,17 @@ def parse_multi_job_email(email_dict, sender_config, alias_map):
 
     Returns list of {company, role, source_platform, confidence}.
     """
-    body_html = email_dict.get("body_html", "")
-    body_text = email_dict.get("body_text", "") or html_to_text(body_html)
-    effective_from = email_dict.get("_original_from", email_dict.get("from", ""))
-    domain = get_sender_domain(effective_from)
+    view = EmailView.of(email_dict)
+    body_html = view.email.get("body_html", "")
+    body_text = view.text
+    domain = view.effective_domain
     strategy = sender_config.get("body_parse_strategy", "generic")
 
-    leads = []
-
-    if strategy == "linkedin_cards":
-        leads = _parse_linkedin_cards(body_html, body_text)
-    elif strategy == "indeed_list":
-        leads = _parse_indeed_list(body_html, body_text)
-    elif strategy == "glassdoor_cards":
-        leads = _parse_generic_job_list(body_html, body_text)
-    elif strategy == "ziprecruiter_list":
-        leads = _parse_generic_job_list(body_html, body_text)
-    elif strategy == "dice_list":
-        leads = _parse_generic_job_list(body_html, body_text)
-    else:
-        leads = _parse_generic_job_list(body_html, body_text)
+    parse_body = BODY_PARSE_STRATEGIES.get(strategy, BODY_PARSE_STRATEGIES["generic"])
+    leads = parse_body(body_html, body_text)
 
     # Normalize all results
-    platform = detect_source_platform(domain, body_text)
+    platform = detect_source_platform(domain, body_text, view.lower_text)
     for lead in leads:
         lead["source_platform"] = platform
         if lead.get("company"):
@@ -708,6 +844,17 @@ def _parse_generic_job_list(body_html, body_text):
     return _parse_text_job_blocks(text)
 
 
+# body_parse_strategy -> parser; unknown strategies use "generic"
+BODY_PARSE_STRATEGIES = {
+    "linkedin_cards": _parse_linkedin_cards,
+    "indeed_list": _parse_indeed_list,
+    "glassdoor_cards": _parse_generic_job_list,
+    "ziprecruiter_list": _parse_generic_job_list,
+    "dice_list": _parse_generic_job_list,
+    "generic": _parse_generic_job_list,
+}
+
+
 def _parse_text_job_blocks(text):
     """Extract job leads from plain text using common patterns."""
     leads = []
@@ -813,9 +960,10 @@ def parse_recruiter_email(email_dict, alias_map):
 
     Returns dict with recruiter info and any job details found.
     """
-    from_addr = email_dict.get("from", "")
-    subject = email_dict.get("subject", "")
-    body_text = email_dict.get("body_text", "") or html_to_text(email_dict.get("body_html", ""))
+    view = EmailView.of(email_dict)
+    from_addr = view.from_addr
+    subject = view.subject
+    body_text = view.text
 
     # Extract recruiter name from From header
     recruiter_name = ""
@@ -823,7 +971,7 @@ def parse_recruiter_email(email_dict, alias_map):
     if name_match:
         recruiter_name = name_match.group(1).strip()
 
-    recruiter_company = get_sender_domain(from_addr)
+    recruiter_company = view.sender_domain
 
     # Try to find the actual hiring company
     target_company = None
@@ -890,27 +1038,7 @@ def resolve_company_name(raw_name, alias_map):
 
     Looks up the raw name against known aliases and returns the canonical name.
     """
-    if not raw_name:
-        return raw_name
-
-    cleaned = raw_name.strip()
-    # Remove common suffixes
-    cleaned = re.sub(r'\s*(?:Inc\.?|LLC|Ltd\.?|Corp\.?|Corporation|Co\.?|Group)\s*$',
-                     '', cleaned, flags=re.IGNORECASE).strip()
-
-    lower = cleaned.lower()
-
-    # Check if it's a canonical name
-    if lower in alias_map:
-        return cleaned
-
-    # Check if it's an alias
-    for canonical, aliases in alias_map.items():
-        if lower in [a.lower() for a in aliases]:
-            # Return in title case based on canonical
-            return canonical.title()
-
-    return cleaned
+    return CompanyResolver.for_aliases(alias_map).resolve(raw_name)
 
 
 def normalize_role_title(raw_title):
@@ -947,188 +1075,493 @@ def normalize_role_title(raw_title):
 # Main pipeline
 # ---------------------------------------------------------------------------
 
-def process_raw_emails(reparse=False):
-    """Process all raw email files not yet parsed."""
-    config = load_config()
-    sender_templates = config.get("sender_templates", {})
-    alias_map = config.get("company_aliases", {})
-
-    os.makedirs(STAGING_PARSED, exist_ok=True)
-
-    # Find raw files to process
-    if not os.path.exists(STAGING_RAW):
-        print("  No raw emails found.")
-        return {"total": 0, "parsed": 0, "not_job": 0, "unresolved": 0}
-
-    raw_files = [f for f in os.listdir(STAGING_RAW) if f.endswith(".json")]
-    if not raw_files:
-        print("  No raw email files found.")
-        return {"total": 0, "parsed": 0, "not_job": 0, "unresolved": 0}
-
-    # Check which are already parsed
-    if not reparse:
-        parsed_files = set(os.listdir(STAGING_PARSED)) if os.path.exists(STAGING_PARSED) else set()
-        raw_files = [f for f in raw_files if f not in parsed_files]
-
-    if not raw_files:
-        print("  All raw emails already parsed.")
-        return {"total": 0, "parsed": 0, "not_job": 0, "unresolved": 0}
-
-    print(f"  Processing {len(raw_files)} raw email files...")
-
-    stats = {"total": len(raw_files), "parsed": 0, "not_job": 0, "unresolved": 0,
-             "leads_found": 0, "multi_job": 0, "single_job": 0, "recruiter": 0,
-             "rejection": 0}
-
-    for filename in sorted(raw_files):
-        filepath = os.path.join(STAGING_RAW, filename)
-        with open(filepath, encoding="utf-8") as f:
-            email_dict = json.load(f)
+def parse_email(email_dict, uid, sender_templates, alias_map, stats):
+    """Classify one raw email and extract its results (leads, rejection, ...).
 
-        uid = email_dict.get("uid", filename.replace(".json", ""))
-
-        # Detect forwarded email and extract original sender
-        _enrich_forwarded_email(email_dict)
-
-        # Classify (uses original sender if forwarded)
-        email_type = classify_email(email_dict, sender_templates)
-
-        results = []
-
-        if email_type == "rejection":
-            stats["rejection"] += 1
-            rejection_info = parse_rejection_email(email_dict, alias_map)
+    Counts the outcome into stats. Returns the list stored for it in
+    staging/parsed.
+    """
+    # Derived text is computed once and shared by every step below
+    view = EmailView(email_dict)
+
+    # Detect forwarded email and extract original sender
+    _enrich_forwarded_email(view)
+
+    # Classify (uses original sender if forwarded)
+    email_type, rule = classify_email_rule(view, sender_templates)
+
+    results = []
+
+    if email_type == "rejection":
+        stats["rejection"] += 1
+        rejection_info = parse_rejection_email(view, alias_map)
+        results = [{
+            "type": "rejection",
+            "company": rejection_info.get("company"),
+            "role": rejection_info.get("role"),
+            "sender_domain": rejection_info.get("sender_domain"),
+            "sender": rejection_info.get("sender"),
+            "confidence": rejection_info.get("confidence", 0.5),
+            "email_uid": uid,
+            "email_date": email_dict.get("date", ""),
+            "raw_subject": email_dict.get("subject", ""),
+        }]
+
+    elif email_type == "not_job":
+        stats["not_job"] += 1
+        results = [{
+            "type": "not_job",
+            "reason": "Email classified as non-job content",
+            "email_uid": uid,
+            "email_date": email_dict.get("date", ""),
+            "raw_subject": email_dict.get("subject", ""),
+        }]
+
+    elif email_type == "multi_job":
+        stats["multi_job"] += 1
+        domain = view.effective_domain
+        sender_config = sender_templates.get(domain, sender_templates.get("_default", {}))
+        leads = parse_multi_job_email(view, sender_config, alias_map)
+        if leads:
+            stats["leads_found"] += len(leads)
+            for i, lead in enumerate(leads):
+                lead["email_uid"] = uid
+                lead["email_date"] = email_dict.get("date", "")
+                lead["raw_subject"] = email_dict.get("subject", "")
+                lead["lead_index"] = i
+                lead["type"] = "job_lead"
+            results = leads
+        else:
+            stats["unresolved"] += 1
             results = [{
-                "type": "rejection",
-                "company": rejection_info.get("company"),
-                "role": rejection_info.get("role"),
-                "sender_domain": rejection_info.get("sender_domain"),
-                "sender": rejection_info.get("sender"),
-                "confidence": rejection_info.get("confidence", 0.5),
+                "type": "unresolved",
+                "reason": "Multi-job email but no leads extracted",
                 "email_uid": uid,
                 "email_date": email_dict.get("date", ""),
                 "raw_subject": email_dict.get("subject", ""),
             }]
 
-        elif email_type == "not_job":
-            stats["not_job"] += 1
+    elif email_type == "single_job":
+        stats["single_job"] += 1
+        domain = view.effective_domain
+        sender_config = sender_templates.get(domain, sender_templates.get("_default", {}))
+        lead = parse_single_job_email(view, sender_config, alias_map)
+        if lead:
+            stats["leads_found"] += 1
+            lead["email_uid"] = uid
+            lead["email_date"] = email_dict.get("date", "")
+            lead["raw_subject"] = email_dict.get("subject", "")
+            lead["lead_index"] = 0
+            lead["type"] = "job_lead"
+            results = [lead]
+        else:
+            stats["unresolved"] += 1
             results = [{
-                "type": "not_job",
-                "reason": "Email classified as non-job content",
+                "type": "unresolved",
+                "reason": "Single-job email but could not extract company/role",
                 "email_uid": uid,
                 "email_date": email_dict.get("date", ""),
                 "raw_subject": email_dict.get("subject", ""),
             }]
 
-        elif email_type == "multi_job":
-            stats["multi_job"] += 1
-            effective_from = email_dict.get("_original_from", email_dict.get("from", ""))
-            domain = get_sender_domain(effective_from)
-            sender_config = sender_templates.get(domain, sender_templates.get("_default", {}))
-            leads = parse_multi_job_email(email_dict, sender_config, alias_map)
-            if leads:
-                stats["leads_found"] += len(leads)
-                for i, lead in enumerate(leads):
-                    lead["email_uid"] = uid
-                    lead["email_date"] = email_dict.get("date", "")
-                    lead["raw_subject"] = email_dict.get("subject", "")
-                    lead["lead_index"] = i
-                    lead["type"] = "job_lead"
-                results = leads
-            else:
-                stats["unresolved"] += 1
-                results = [{
-                    "type": "unresolved",
-                    "reason": "Multi-job email but no leads extracted",
-                    "email_uid": uid,
-                    "email_date": email_dict.get("date", ""),
-                    "raw_subject": email_dict.get("subject", ""),
-                }]
-
-        elif email_type == "single_job":
-            stats["single_job"] += 1
-            effective_from = email_dict.get("_original_from", email_dict.get("from", ""))
-            domain = get_sender_domain(effective_from)
-            sender_config = sender_templates.get(domain, sender_templates.get("_default", {}))
-            lead = parse_single_job_email(email_dict, sender_config, alias_map)
-            if lead:
-                stats["leads_found"] += 1
-                lead["email_uid"] = uid
-                lead["email_date"] = email_dict.get("date", "")
-                lead["raw_subject"] = email_dict.get("subject", "")
-                lead["lead_index"] = 0
-                lead["type"] = "job_lead"
-                results = [lead]
-            else:
-                stats["unresolved"] += 1
-                results = [{
-                    "type": "unresolved",
-                    "reason": "Single-job email but could not extract company/role",
-                    "email_uid": uid,
-                    "email_date": email_dict.get("date", ""),
-                    "raw_subject": email_dict.get("subject", ""),
-                }]
-
-        elif email_type == "recruiter_generic":
-            stats["recruiter"] += 1
-            recruiter_info = parse_recruiter_email(email_dict, alias_map)
-            if recruiter_info.get("target_company") and recruiter_info.get("role_hint"):
-                stats["leads_found"] += 1
-                results = [{
-                    "type": "job_lead",
-                    "company": recruiter_info["target_company"],
-                    "role": recruiter_info["role_hint"],
-                    "source_platform": "Recruiter",
-                    "confidence": recruiter_info["confidence"],
-                    "recruiter_name": recruiter_info["recruiter_name"],
-                    "recruiter_company": recruiter_info["recruiter_company"],
-                    "is_staffing_agency": recruiter_info["is_staffing_agency"],
-                    "email_uid": uid,
-                    "email_date": email_dict.get("date", ""),
-                    "raw_subject": email_dict.get("subject", ""),
-                    "lead_index": 0,
-                }]
-            else:
-                stats["unresolved"] += 1
-                results = [{
-                    "type": "unresolved",
-                    "reason": "Recruiter email without specific company/role",
-                    "recruiter_name": recruiter_info.get("recruiter_name", ""),
-                    "recruiter_company": recruiter_info.get("recruiter_company", ""),
-                    "email_uid": uid,
-                    "email_date": email_dict.get("date", ""),
-                    "raw_subject": email_dict.get("subject", ""),
-                }]
-
-        else:  # unknown
+    elif email_type == "recruiter_generic":
+        stats["recruiter"] += 1
+        recruiter_info = parse_recruiter_email(view, alias_map)
+        if recruiter_info.get("target_company") and recruiter_info.get("role_hint"):
+            stats["leads_found"] += 1
+            results = [{
+                "type": "job_lead",
+                "company": recruiter_info["target_company"],
+                "role": recruiter_info["role_hint"],
+                "source_platform": "Recruiter",
+                "confidence": recruiter_info["confidence"],
+                "recruiter_name": recruiter_info["recruiter_name"],
+                "recruiter_company": recruiter_info["recruiter_company"],
+                "is_staffing_agency": recruiter_info["is_staffing_agency"],
+                "email_uid": uid,
+                "email_date": email_dict.get("date", ""),
+                "raw_subject": email_dict.get("subject", ""),
+                "lead_index": 0,
+            }]
+        else:
             stats["unresolved"] += 1
             results = [{
                 "type": "unresolved",
-                "reason": "Could not classify email type",
+                "reason": "Recruiter email without specific company/role",
+                "recruiter_name": recruiter_info.get("recruiter_name", ""),
+                "recruiter_company": recruiter_info.get("recruiter_company", ""),
                 "email_uid": uid,
                 "email_date": email_dict.get("date", ""),
                 "raw_subject": email_dict.get("subject", ""),
             }]
 
-        # Save parsed results
-        parsed_path = os.path.join(STAGING_PARSED, filename)
-        with open(parsed_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        stats["parsed"] += 1
+    else:  # unknown
+        stats["unresolved"] += 1
+        results = [{
+            "type": "unresolved",
+            "reason": "Could not classify email type",
+            "email_uid": uid,
+            "email_date": email_dict.get("date", ""),
+            "raw_subject": email_dict.get("subject", ""),
+        }]
+
+    # Which classification rule fired, for auditing misclassified emails,
+    # and which code and config produced the results (for --reparse=stale)
+    fingerprint = parser_fingerprint(email_type, view.effective_domain, sender_templates,
+                                     alias_map)
+    for result in results:
+        result["classified_by"] = rule
+        result["parser_fingerprint"] = fingerprint
+        result["effective_domain"] = view.effective_domain
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Parser fingerprints
+# ---------------------------------------------------------------------------
+#
+# A parsed record is stale when the code or config its email's parse path
+# depends on has changed since it was written. The code part hashes the
+# source of every repo function and class, and every module-level table,
+# reachable by name from the classifier and from the parser for the
+# email's type (for multi-job emails, only its body_parse_strategy). The
+# config part hashes the sender template the email's domain selects and,
+# for types that resolve company names, company_aliases.
+
+# Email type -> the parse function its path runs
+PARSE_PATHS = {
+    "rejection": "parse_rejection_email",
+    "multi_job": "parse_multi_job_email",
+    "single_job": "parse_single_job_email",
+    "recruiter_generic": "parse_recruiter_email",
+    "not_job": None,
+    "unknown": None,
+}
+# Followed only for the path that runs them (and never: the fingerprinting itself)
+_PATH_ONLY = set(filter(None, PARSE_PATHS.values())) | {"BODY_PARSE_STRATEGIES"}
+_NOT_PARSER = {"parser_fingerprint"}
+_ALIAS_TYPES = ("rejection", "multi_job", "single_job", "recruiter_generic")
+
+_code_fingerprints = {}     # (email type, strategy) -> hash
+_section_hashes = {}        # id(config section) -> (section, hash)
+
+
+def parser_fingerprint(email_type, domain, sender_templates, alias_map):
+    """Fingerprint of the code and config an email of this type and domain is parsed with."""
+    template = sender_templates.get(domain, sender_templates.get("_default"))
+    strategy = (template or {}).get("body_parse_strategy", "generic")
+    parts = [_path_fingerprint(email_type, strategy if email_type == "multi_job" else None),
+             _section_hash(template)]
+    if email_type in _ALIAS_TYPES:
+        parts.append(_section_hash(alias_map))
+    return record_hash(parts)[:16]
+
+
+def _section_hash(section):
+    # Config sections are loaded once and never mutated, so hash each object once
+    cached = _section_hashes.get(id(section))
+    if cached is None or cached[0] is not section:
+        cached = _section_hashes[id(section)] = (section, record_hash(section))
+    return cached[1]
+
+
+def _path_fingerprint(email_type, strategy=None):
+    key = (email_type, strategy)
+    if key not in _code_fingerprints:
+        roots = [EmailView, _enrich_forwarded_email, classify_email_rule, parse_email]
+        skip = _PATH_ONLY | _NOT_PARSER
+        entry = PARSE_PATHS.get(email_type)
+        if entry:
+            roots.append(globals()[entry])
+            skip.discard(entry)
+        if email_type == "multi_job":
+            roots.append(BODY_PARSE_STRATEGIES.get(strategy, BODY_PARSE_STRATEGIES["generic"]))
+        _code_fingerprints[key] = record_hash(_code_sources(roots, skip))
+    return _code_fingerprints[key]
+
+
+def _is_repo_object(value):
+    if not (inspect.isfunction(value) or inspect.isclass(value)):
+        return False
+    path = getattr(sys.modules.get(value.__module__), "__file__", None) or ""
+    return os.path.dirname(os.path.abspath(path)) == SCRIPT_DIR
+
+
+def _referenced_names(obj):
+    """Global names used by a function, or by a class's methods."""
+    if inspect.isclass(obj):
+        functions = [getattr(v, "func", getattr(v, "__func__", v)) for v in vars(obj).values()]
+    else:
+        functions = [obj]
+    names = set()
+    codes = [f.__code__ for f in functions if hasattr(f, "__code__")]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(c for c in code.co_consts if inspect.iscode(c))
+    return names
+
+
+def _code_sources(roots, skip=()):
+    """{qualified name: source or table} for roots and everything they reach."""
+    sources = {}
+    stack = list(roots)
+
+    def describe(value):
+        # Stable across runs: no object addresses, sets sorted
+        if _is_repo_object(value):
+            stack.append(value)
+            return f"{value.__module__}.{value.__qualname__}"
+        if isinstance(value, dict):
+            return {str(k): describe(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [describe(v) for v in value]
+        if isinstance(value, (set, frozenset)):
+            return sorted(repr(v) for v in value)
+        if isinstance(value, re.Pattern):
+            return [value.pattern, value.flags]
+        if isinstance(value, RuleSet):
+            return [describe(value.rules), value.flags]
+        if isinstance(value, (str, int, float, bool, type(None))):
+            return value
+        return type(value).__qualname__
+
+    while stack:
+        obj = stack.pop()
+        label = f"{obj.__module__}.{obj.__qualname__}"
+        if label in sources:
+            continue
+        sources[label] = inspect.getsource(obj)
+        module_globals = vars(sys.modules[obj.__module__])
+        for name in sorted(_referenced_names(obj)):
+            if name in skip or name not in module_globals:
+                continue
+            value = module_globals[name]
+            if _is_repo_object(value):
+                stack.append(value)
+            elif inspect.ismodule(value) or callable(value):
+                continue
+            elif name.startswith("_") and isinstance(value, (dict, list, set)):
+                continue    # a process-level cache (e.g. rule_engine._compiled), not parser input
+            else:
+                sources[f"{obj.__module__}.{name}"] = describe(value)
+    return sources
+
+
+def stale_parsed_keys(parsed, sender_templates, alias_map):
+    """Keys of parsed records whose parser fingerprint no longer matches."""
+    stale = []
+    for key, record in parsed.items():
+        results = record if isinstance(record, list) else [record]
+        first = results[0] if results else {}
+        email_type = (first.get("classified_by") or "").split(":", 1)[0]
+        fingerprint = first.get("parser_fingerprint")
+        if not fingerprint or email_type not in PARSE_PATHS or fingerprint != parser_fingerprint(
+                email_type, first.get("effective_domain", ""), sender_templates, alias_map):
+            stale.append(key)
+    return stale
+
+
+# Result fields that describe how a lead was parsed, not the lead itself
+_PARSE_METADATA = ("classified_by", "parser_fingerprint", "effective_domain")
+
+
+def invalidated_downstream(ledger, old_results, new_results):
+    """Lead keys whose sourced/scored records a reparse has made invalid.
+
+    A lead is invalid downstream when it changed or disappeared and the
+    search (or score) stage already processed it. Returns
+    {"search": [...], "score": [...]}.
+    """
+    def leads(results):
+        found = {}
+        for result in results if isinstance(results, list) else [results]:
+            for key in lead_keys([result]):
+                found[key] = {k: v for k, v in result.items() if k not in _PARSE_METADATA}
+        return found
+
+    old, new = leads(old_results or []), leads(new_results or [])
+    invalid = {"search": [], "score": []}
+    for key in sorted(old):
+        if old[key] == new.get(key):
+            continue
+        for stage in invalid:
+            row = ledger.get(key, stage)
+            if row and row["status"] != "pending":
+                invalid[stage].append(key)
+    return invalid
+
+
+def process_raw_emails(reparse=False, workers=1, keys=None):
+    """Process all raw email records not yet parsed.
+
+    keys limits the run to those raw records (e.g. the emails a watcher
+    just saved) instead of scanning the whole raw stage.
 
+    Each email is marked parsed (or failed, with the exception) in the
+    pipeline ledger, and its job leads are registered as pending search.
+    An email that fails to parse is left unparsed and retried next run.
+
+    reparse=True re-parses every email; reparse="stale" only those whose
+    parser fingerprint no longer matches the current code and config.
+    Leads a reparse changes or drops, and that were already searched or
+    scored, are counted and listed as invalidated downstream.
+
+    With workers > 1, emails are loaded and parsed in a process pool; this
+    process still writes every result, in the same order as a serial run,
+    so the records, ledger and stats are identical.
+    """
+    config = load_config()
+    sender_templates = config.get("sender_templates", {})
+    alias_map = config.get("company_aliases", {})
+
+    with open_stage(STAGING_RAW) as raw, open_stage(STAGING_PARSED) as parsed:
+        raw_keys = raw.keys() if keys is None else [str(k) for k in keys if str(k) in raw]
+        if not raw_keys:
+            print("  No raw emails found.")
+            return {"total": 0, "parsed": 0, "not_job": 0, "unresolved": 0}
+
+        # Check which are already parsed
+        if reparse == "stale":
+            stale = set(stale_parsed_keys(parsed, sender_templates, alias_map))
+            print(f"  {len(stale)} parsed emails are stale")
+            raw_keys = [k for k in raw_keys if k not in parsed or k in stale]
+        elif not reparse:
+            raw_keys = [k for k in raw_keys if k not in parsed]
+
+        if not raw_keys:
+            print("  All raw emails already parsed.")
+            return {"total": 0, "parsed": 0, "not_job": 0, "unresolved": 0}
+
+        print(f"  Processing {len(raw_keys)} raw emails...")
+
+        stats = {"total": len(raw_keys), "parsed": 0, "not_job": 0, "unresolved": 0,
+                 "leads_found": 0, "multi_job": 0, "single_job": 0, "recruiter": 0,
+                 "rejection": 0, "failed": 0, "invalidated_search": 0, "invalidated_score": 0}
+
+        if workers > 1:
+            print(f"  Using {workers} worker processes")
+        parsed_emails = _parse_raw(sorted(raw_keys), raw, sender_templates, alias_map, workers)
+        invalidated = {"search": [], "score": []}
+        with open_ledger(LEDGER_DB_PATH, os.path.dirname(STAGING_RAW)) as ledger, ledger.batch():
+            for key, (results, email_stats, error) in parsed_emails:
+                for name, count in email_stats.items():
+                    stats[name] += count
+
+                if reparse and not error and key in parsed:
+                    for stage, stage_keys in invalidated_downstream(
+                            ledger, parsed.get(key), results).items():
+                        invalidated[stage].extend(stage_keys)
+
+                # Save parsed results
+                record_parse(parsed, ledger, key, results, error)
+                stats["failed" if error else "parsed"] += 1
+
+    for stage, stage_keys in invalidated.items():
+        stats[f"invalidated_{stage}"] = len(stage_keys)
+        if stage_keys:
+            print(f"  Reparse changed {len(stage_keys)} leads already past {stage}: "
+                  f"{', '.join(stage_keys)}")
     return stats
 
 
-def process_rejections():
+def _parse_raw(keys, raw, sender_templates, alias_map, workers=1):
+    """Yield (key, (results, stats counted, error)) for each raw email, in key order.
+
+    With workers > 1 the pool workers read the raw records themselves and
+    are handed keys in chunks, so only keys and results cross processes.
+    """
+    if workers <= 1 or len(keys) < 2:
+        blobs = BlobStore(BLOBS_DIR)
+        for key in keys:
+            yield key, _load_and_parse(raw, blobs, key, sender_templates, alias_map)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(keys) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker,
+                             initargs=(sender_templates, alias_map, STAGING_RAW,
+                                       BLOBS_DIR)) as pool:
+        yield from zip(keys, pool.map(_parse_key_in_worker, keys, chunksize=chunksize))
+
+
+def _load_and_parse(raw, blobs, key, sender_templates, alias_map):
+    """Parse one raw record: (results, stats counted for it, error or None)."""
+    stats = Counter()
+    try:
+        email_dict = hydrate(raw.get(key), blobs)
+        uid = email_dict.get("uid", key)
+        results = parse_email(email_dict, uid, sender_templates, alias_map, stats)
+    except Exception as e:
+        return None, dict(stats), f"{type(e).__name__}: {e}"
+    return results, dict(stats), None
+
+
+def record_parse(parsed, ledger, key, results, error=None):
+    """Store one email's parse results and mark it in the pipeline ledger.
+
+    Job leads found are registered as pending search. With an error, the
+    email is marked failed instead and nothing is stored, so the next run
+    retries it.
+    """
+    if error:
+        print(f"    FAILED {key}: {error}")
+        ledger.mark(key, "parse", "failed", error=error)
+        return
+    parsed.put(key, results)
+    ledger.mark(key, "parse", "done", record_hash(results))
+    ledger.add_pending("search", lead_keys(results))
+
+
+# Per-process state for pool workers (set once by _init_parse_worker)
+_worker_config = {}
+
+
+def _init_parse_worker(sender_templates, alias_map, raw_path=None, blobs_dir=None):
+    _worker_config["sender_templates"] = sender_templates
+    _worker_config["alias_map"] = alias_map
+    if raw_path:
+        # Read-only: never closed, so the parent's index is left alone
+        _worker_config["raw"] = open_stage(raw_path)
+        _worker_config["blobs"] = BlobStore(blobs_dir)
+
+
+def _parse_in_worker(email_dict):
+    """Pool worker: parse one hydrated email.
+
+    Returns (results, stats counted for it, error or None).
+    """
+    stats = Counter()
+    try:
+        results = parse_email(email_dict, email_dict.get("uid"), _worker_config["sender_templates"],
+                              _worker_config["alias_map"], stats)
+    except Exception as e:
+        return None, dict(stats), f"{type(e).__name__}: {e}"
+    return results, dict(stats), None
+
+
+def _parse_key_in_worker(key):
+    """Pool worker: load and parse one raw record by key."""
+    return _load_and_parse(_worker_config["raw"], _worker_config["blobs"], key,
+                           _worker_config["sender_templates"], _worker_config["alias_map"])
+
+
+# Rejection matching: n-gram similarity treated as the same company
+FUZZY_COMPANY_SCORE = 0.8
+
+
+def process_rejections(alias_map=None):
     """Scan parsed results for rejections and update matching application metadata.
 
-    Matches rejection emails to existing applications by company name (fuzzy),
-    then sets status='rejected', rejection_date, and clears follow_up_date.
+    Matches rejection emails to existing applications by company name (fuzzy,
+    and through alias_map), then sets status='rejected', rejection_date, and
+    clears follow_up_date.
 
     Returns list of dicts describing what was updated.
     """
     applications_dir = os.path.join(SCRIPT_DIR, "applications")
-    if not os.path.exists(applications_dir) or not os.path.exists(STAGING_PARSED):
+    if not os.path.exists(applications_dir):
         return []
 
     # Build index of applications by normalized company name
@@ -1145,19 +1578,19 @@ def process_rejections():
         company = (meta.get("company") or "").lower().strip()
         if company:
             app_index.setdefault(company, []).append((folder, meta_path, meta))
+    resolver = _app_resolver(app_index, alias_map)
 
-    # Scan parsed files for rejections
+    # Scan parsed records for rejections
     updates = []
-    parsed_files = [f for f in os.listdir(STAGING_PARSED) if f.endswith(".json")]
-
-    for filename in parsed_files:
-        parsed_path = os.path.join(STAGING_PARSED, filename)
-        with open(parsed_path, encoding="utf-8") as f:
+    with open_stage(STAGING_PARSED) as parsed:
+        parsed_records = []
+        for key in parsed.keys():
             try:
-                records = json.load(f)
+                parsed_records.append(parsed.get(key))
             except (json.JSONDecodeError, ValueError):
                 continue
 
+    for records in parsed_records:
         if not isinstance(records, list):
             records = [records]
 
@@ -1175,7 +1608,7 @@ def process_rejections():
                 continue
 
             # Find matching application(s)
-            matched = _match_rejection_to_app(rejection_company, record, app_index)
+            matched = _match_rejection_to_app(rejection_company, record, app_index, resolver)
             if matched:
                 for folder, meta_path, meta in matched:
                     # Only update if not already rejected
@@ -1213,42 +1646,49 @@ def process_rejections():
     return updates
 
 
-def _match_rejection_to_app(rejection_company, record, app_index):
+def _app_resolver(app_index, alias_map=None):
+    """CompanyResolver over the applications, by company and by folder company slug."""
+    resolver = CompanyResolver(alias_map)
+    for company, entries in app_index.items():
+        for entry in entries:
+            resolver.add(company, entry)
+            parts = entry[0].split("_")     # <date>_<company-slug>_<role-slug>
+            if len(parts) == 3:
+                resolver.add(parts[1], entry)
+    return resolver
+
+
+def _match_rejection_to_app(rejection_company, record, app_index, resolver=None):
     """Match a rejection to application(s) by company name.
 
-    Uses exact match first, then fuzzy substring matching.
+    Uses exact match first, then the same company after suffix, punctuation
+    and alias normalization, then substring and close-spelling matches
+    among the names sharing n-grams with it. Pass the resolver from
+    _app_resolver when matching many rejections.
     Returns list of (folder, meta_path, meta) tuples.
     """
-    rc_lower = rejection_company.lower().strip()
-    # Remove common suffixes for matching
-    rc_clean = re.sub(r'\s*(?:inc\.?|llc|ltd\.?|corp\.?|corporation|co\.?|group)\s*$',
-                      '', rc_lower, flags=re.IGNORECASE).strip()
+    rc_clean = strip_suffix(rejection_company.lower())
 
     # Exact match
-    matches = app_index.get(rc_clean, [])
+    matches = list(app_index.get(rc_clean, []))
 
-    # Try fuzzy matching if no exact match
     if not matches:
-        for company_key, entries in app_index.items():
-            # Clean the stored company name the same way
-            ck_clean = re.sub(r'\s*(?:inc\.?|llc|ltd\.?|corp\.?|corporation|co\.?|group)\s*$',
-                              '', company_key, flags=re.IGNORECASE).strip()
-
-            # Exact after cleaning
-            if rc_clean == ck_clean:
-                matches.extend(entries)
-                continue
+        if resolver is None:
+            resolver = _app_resolver(app_index)
+        matches = resolver.lookup(rc_clean)
 
-            # Substring: "acme" matches "acme corp" or vice versa
-            if rc_clean in ck_clean or ck_clean in rc_clean:
-                matches.extend(entries)
-                continue
+    # Substring: "acme" matches "acme corp" or vice versa; close spellings
+    if not matches:
+        rc_key = company_key(rc_clean)
+        for key, score in resolver.candidates(rc_clean):
+            if rc_key in key or key in rc_key or score >= FUZZY_COMPANY_SCORE:
+                matches.extend(resolver.values(key))
 
-            # Slug match: check if company appears in folder name
-            rc_slug = re.sub(r'[^a-z0-9]+', '-', rc_clean).strip('-')
-            for folder, meta_path, meta in entries:
-                if rc_slug and rc_slug in folder.lower():
-                    matches.append((folder, meta_path, meta))
+    # The same application can match on both its company and its folder name
+    unique = {}
+    for entry in matches:
+        unique.setdefault(entry[0], entry)
+    matches = list(unique.values())
 
     # If rejection includes a role, prefer matches with the same role
     rejection_role = record.get("role")
@@ -1287,14 +1727,19 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Parse raw emails into job leads")
-    parser.add_argument("--reparse", action="store_true", help="Re-parse already processed emails")
+    parser.add_argument("--reparse", nargs="?", const="all", choices=("all", "stale"),
+                        help="Re-parse already processed emails: all (the default) or only "
+                             "those parsed by older code or config")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse emails across N processes (default: 1)")
     args = parser.parse_args()
 
     print("=" * 60)
     print("  EMAIL PIPELINE — STEP 2: PARSE")
     print("=" * 60)
 
-    stats = process_raw_emails(reparse=args.reparse)
+    reparse = "stale" if args.reparse == "stale" else bool(args.reparse)
+    stats = process_raw_emails(reparse=reparse, workers=args.workers)
 
     print("\n  Results:")
     print(f"    Emails processed: {stats['parsed']} / {stats['total']}")
@@ -1305,11 +1750,16 @@ def main():
     print(f"    Not-job emails:    {stats['not_job']}")
     print(f"    Unresolved:        {stats['unresolved']}")
     print(f"    Total leads found: {stats.get('leads_found', 0)}")
+    if stats.get("failed"):
+        print(f"    Failed:            {stats['failed']} (see: python pipeline_ledger.py retry parse)")
+    if stats.get("invalidated_search") or stats.get("invalidated_score"):
+        print(f"    Invalidated:       {stats['invalidated_search']} sourced, "
+              f"{stats['invalidated_score']} scored leads changed by this reparse")
 
     # Process rejections — match to applications and update metadata
     if stats.get("rejection", 0) > 0:
         print("\n  Processing rejections...")
-        rejection_updates = process_rejections()
+        rejection_updates = process_rejections(load_config().get("company_aliases", {}))
         updated = [u for u in rejection_updates if u["status"] == "updated"]
         unmatched = [u for u in rejection_updates if u["status"] == "unmatched"]
         already = [u for u in rejection_updates if u["status"] == "already_rejected"]
@@ -0,0 +1,683 @@
+"""
+Fast HTML-to-text extraction for the career page scrapers.
+
+The scrapers used to build a full BeautifulSoup tree with the pure-Python
+html.parser, decompose unwanted tags, then run several select/find_all
+passes and get_text() over large subtrees. Here a page is parsed once,
+streaming: parser events feed a single extractor that prunes
+script/style/nav subtrees, matches the scrapers' CSS selectors against the
+open-element stack and collects the text of every element of interest in
+the same pass. With html.parser the output is the same as BeautifulSoup's
+get_text(separator, strip=True) over the same elements.
+
+lxml is faster but repairs invalid nesting differently, which changes
+what is extracted on real career pages: libxml2 closes a <p> at a nested
+<div>, so '<p class="content">Intro<div>Lead the team</div>More</p>'
+yields only 'Intro' as the description, and it drops stray end tags
+silently. It is therefore opt-in.
+
+Backends (config "html_extract": {"backend": ...}):
+    html.parser  stdlib tokenizer (default; matches bs4)
+    lxml         libxml2 SAX-style target parser, opt-in when installed
+    bs4          the original BeautifulSoup tree code, kept as reference
+
+Usage:
+    title, company, location, description = extract_generic(html)
+    text = html_to_text(html)
+"""
+
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree as _lxml_etree
+except ImportError:
+    _lxml_etree = None
+
+BACKENDS = ("lxml", "html.parser", "bs4")
+
+# Elements whose text BeautifulSoup's get_text() never includes
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+DEFAULT_BACKEND = "html.parser"
+
+_default_backend = DEFAULT_BACKEND
+
+
+def set_default_backend(name):
+    """Choose the backend used when callers don't pass one ('auto' resets)."""
+    global _default_backend
+    if name in (None, "auto"):
+        name = DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend '{name}' (choose from {', '.join(BACKENDS)})")
+    if name == "lxml" and _lxml_etree is None:
+        raise ValueError("lxml backend requested but lxml is not installed")
+    _default_backend = name
+
+
+def get_default_backend():
+    return _default_backend
+
+
+# ---------------------------------------------------------------------------
+# Minimal CSS selectors
+# ---------------------------------------------------------------------------
+
+# Enough CSS for the scrapers: tag, #id, .class, [attr], [attr=v], [attr*=v],
+# compounds of those (h1.heading) and the descendant combinator.
+_SIMPLE_RE = re.compile(
+    r"""([a-z][a-z0-9]*|\*)
+      | \#([\w-]+)
+      | \.([\w-]+)
+      | \[\s*([\w-]+)\s*(?:([*^$]?=)\s*(?:'([^']*)'|"([^"]*)"|([^\]\s]+))\s*)?\]
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+class _Compound:
+    """One compound selector like div.content[role='main']."""
+
+    __slots__ = ("tag", "ids", "classes", "attrs")
+
+    def __init__(self, text):
+        self.tag = None
+        self.ids = []
+        self.classes = []
+        self.attrs = []  # (name, op, value)
+        pos = 0
+        while pos < len(text):
+            m = _SIMPLE_RE.match(text, pos)
+            if not m or m.end() == pos:
+                raise ValueError(f"Unsupported selector: {text!r}")
+            tag, id_, cls, attr, op, v1, v2, v3 = m.groups()
+            if tag:
+                self.tag = None if tag == "*" else tag.lower()
+            elif id_:
+                self.ids.append(id_)
+            elif cls:
+                self.classes.append(cls)
+            else:
+                value = v1 if v1 is not None else v2 if v2 is not None else v3
+                self.attrs.append((attr.lower(), op, value))
+            pos = m.end()
+
+    def matches(self, tag, attrs, classes):
+        if self.tag and self.tag != tag:
+            return False
+        for id_ in self.ids:
+            if attrs.get("id") != id_:
+                return False
+        for cls in self.classes:
+            if cls not in classes:
+                return False
+        for name, op, value in self.attrs:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if name == "class":
+                actual = " ".join(classes)
+            if op is None:
+                continue
+            if op == "=" and actual != value:
+                return False
+            if op == "*=" and (not value or value not in actual):
+                return False
+            if op == "^=" and (not value or not actual.startswith(value)):
+                return False
+            if op == "$=" and (not value or not actual.endswith(value)):
+                return False
+        return True
+
+
+class Selector:
+    """A selector group ('a b, c.d') matched against an open-element stack."""
+
+    def __init__(self, text):
+        self.text = text
+        self.chains = [[_Compound(part) for part in group.split()]
+                       for group in text.split(",") if group.strip()]
+
+    def matches(self, tag, attrs, classes, ancestors):
+        """ancestors: list of (tag, attrs, classes), outermost first."""
+        for chain in self.chains:
+            if not chain[-1].matches(tag, attrs, classes):
+                continue
+            # Descendant combinator: match remaining compounds right to left
+            i = len(chain) - 2
+            for a_tag, a_attrs, a_classes in reversed(ancestors):
+                if i < 0:
+                    break
+                if chain[i].matches(a_tag, a_attrs, a_classes):
+                    i -= 1
+            if i < 0:
+                return True
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Streaming extractor
+# ---------------------------------------------------------------------------
+
+class Query:
+    """What to collect from a page in one pass.
+
+    first     name -> selector; text strings of the first matching element
+    every     name -> selector; text strings of every matching element
+    meta      meta property names (og:title...) whose content to keep
+    prune     selector of subtrees to drop entirely (like decompose())
+    sections  (header tags, keywords, stop tags): headers whose text contains
+              a keyword, with the text of each following sibling element up
+              to the next sibling in stop tags
+    """
+
+    def __init__(self, first=None, every=None, meta=(), prune=None, sections=None):
+        self.first = {name: Selector(sel) for name, sel in (first or {}).items()}
+        self.every = {name: Selector(sel) for name, sel in (every or {}).items()}
+        self.meta = tuple(meta)
+        self.prune = Selector(prune) if prune else None
+        self.sections = sections
+
+
+class Extract:
+    """Result of one extraction pass. Text is kept as stripped strings;
+    join them with the separator the caller's get_text() used."""
+
+    def __init__(self):
+        self.strings = []     # whole document
+        self.body = None      # strings inside <body>, None if no body element
+        self.first = {}       # name -> strings (absent if no match)
+        self.every = {}       # name -> [strings, ...]
+        self.meta = {}        # property -> content
+        self.sections = []    # [(header strings, [sibling strings, ...])]
+
+    def first_text(self, name, separator=""):
+        strings = self.first.get(name)
+        return None if strings is None else separator.join(strings)
+
+
+class _Frame:
+    __slots__ = ("tag", "attrs", "classes", "captures", "pruned", "section", "collect")
+
+    def __init__(self, tag, attrs, classes):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = classes
+        self.captures = []
+        self.pruned = False
+        self.section = None   # section slot if this element is a candidate header
+        self.collect = None   # [(collector, strings)] if a section sibling
+
+
+class _Collector:
+    __slots__ = ("depth", "parts", "done")
+
+    def __init__(self, depth):
+        self.depth = depth
+        self.parts = []
+        self.done = False
+
+
+class _Extractor:
+    """Parser target: start/end/data/comment/close events in document order."""
+
+    def __init__(self, query):
+        self.q = query
+        self.out = Extract()
+        self.stack = []
+        self.ancestors = []      # (tag, attrs, classes) per open element
+        self.active = [self.out.strings]
+        self.pending = []
+        self.skip_text = 0
+        self.pruned = 0
+        self.slots = []          # section candidates, in header start order
+        self.collectors = []
+        if query.sections:
+            self.header_tags, self.keywords, self.stop_tags = query.sections
+        else:
+            self.header_tags = ()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        text = "".join(self.pending).strip()
+        self.pending = []
+        if text and not self.skip_text and not self.pruned:
+            for strings in self.active:
+                strings.append(text)
+
+    def _capture(self, frame):
+        strings = []
+        frame.captures.append(strings)
+        self.active.append(strings)
+        return strings
+
+    def start(self, tag, attrs):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else str(tag)
+        attrs = dict(attrs)
+        frame = _Frame(tag, attrs, (attrs.get("class") or "").split())
+        depth = len(self.stack)
+        ancestors = self.ancestors
+
+        if self.pruned or (self.q.prune and self.q.prune.matches(
+                tag, attrs, frame.classes, ancestors)):
+            frame.pruned = True
+            self.pruned += 1
+            self._push(frame)
+            return
+
+        if tag in _NON_TEXT_TAGS:
+            self.skip_text += 1
+        if tag == "body" and self.out.body is None:
+            self.out.body = self._capture(frame)
+        if tag == "meta":
+            prop = attrs.get("property")
+            if prop in self.q.meta and prop not in self.out.meta:
+                self.out.meta[prop] = attrs.get("content", "")
+
+        for name, selector in self.q.first.items():
+            if name not in self.out.first and selector.matches(tag, attrs, frame.classes, ancestors):
+                self.out.first[name] = self._capture(frame)
+        for name, selector in self.q.every.items():
+            if selector.matches(tag, attrs, frame.classes, ancestors):
+                self.out.every.setdefault(name, []).append(self._capture(frame))
+
+        for collector in self.collectors:
+            if not collector.done and collector.depth == depth:
+                if tag in self.stop_tags:
+                    collector.done = True
+                else:
+                    if frame.collect is None:
+                        frame.collect = []
+                    frame.collect.append((collector, self._capture(frame)))
+        if tag in self.header_tags:
+            frame.section = [self._capture(frame), None]
+            self.slots.append(frame.section)
+
+        self._push(frame)
+
+    def _push(self, frame):
+        self.stack.append(frame)
+        self.ancestors.append((frame.tag, frame.attrs, frame.classes))
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else str(tag)
+        # Close unclosed children (stray end tags are ignored)
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                while len(self.stack) > i:
+                    self._pop()
+                return
+
+    def _pop(self):
+        frame = self.stack.pop()
+        self.ancestors.pop()
+        if frame.pruned:
+            self.pruned -= 1
+            return
+        if frame.tag in _NON_TEXT_TAGS:
+            self.skip_text -= 1
+        for strings in frame.captures:
+            # By identity — different captures can hold equal text
+            for i in range(len(self.active) - 1, -1, -1):
+                if self.active[i] is strings:
+                    del self.active[i]
+                    break
+        if frame.collect:
+            for collector, strings in frame.collect:
+                collector.parts.append(strings)
+        if frame.section:
+            header_strings = frame.section[0]
+            text = "".join(header_strings).lower()
+            if any(kw in text for kw in self.keywords):
+                collector = _Collector(len(self.stack))
+                self.collectors.append(collector)
+                frame.section[1] = collector
+        # Leaving a parent ends its children's sibling scans
+        depth = len(self.stack)
+        for collector in self.collectors:
+            if collector.depth > depth:
+                collector.done = True
+
+    def data(self, text):
+        self.pending.append(text)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        while self.stack:
+            self._pop()
+        for header_strings, collector in self.slots:
+            if collector is not None:
+                self.out.sections.append((header_strings, collector.parts))
+        return self.out
+
+
+class _StdlibDriver(HTMLParser):
+    """Feeds stdlib HTMLParser events into an _Extractor."""
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {k: (v if v is not None else "") for k, v in attrs})
+        if tag in _VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, {k: (v if v is not None else "") for k, v in attrs})
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in _VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def handle_comment(self, data):
+        self.target.comment(data)
+
+    def handle_decl(self, decl):
+        self.target.comment(decl)
+
+    def handle_pi(self, data):
+        self.target.comment(data)
+
+
+def extract(html, query, backend=None):
+    """Run one streaming pass over html. Returns an Extract."""
+    backend = backend or _default_backend
+    target = _Extractor(query)
+    if not html or not html.strip():
+        return target.close()
+    if backend == "lxml":
+        parser = _lxml_etree.HTMLParser(target=target, remove_comments=False)
+        try:
+            return _lxml_etree.fromstring(html, parser)
+        except (_lxml_etree.XMLSyntaxError, ValueError):
+            target = _Extractor(query)  # fall through to the stdlib tokenizer
+    driver = _StdlibDriver(target)
+    driver.feed(html)
+    driver.close()
+    return target.close()
+
+
+# ---------------------------------------------------------------------------
+# Scraper extractions
+# ---------------------------------------------------------------------------
+
+GENERIC_PRUNE = "script, style, nav, footer, header, .cookie-banner"
+
+GENERIC_LOCATION = "[class*='location'], [data-automation*='location']"
+
+GENERIC_JOB_SELECTORS = [
+    "[class*='job-description']", "[class*='job-detail']",
+    "[class*='posting-detail']", "[class*='jd-']",
+    "[id*='job-description']", "[id*='job-detail']",
+    "article", "main", "[role='main']",
+]
+
+SECTION_HEADERS = ("h1", "h2", "h3", "h4", "strong", "b")
+SECTION_STOP = ("h1", "h2", "h3", "h4")
+SECTION_KEYWORDS = (
+    "description", "responsibilities", "requirements",
+    "qualifications", "about the role", "what you'll do",
+    "who you are", "about you", "skills", "experience",
+)
+
+_GENERIC_QUERY = Query(
+    first=dict([("h1", "h1"), ("location", GENERIC_LOCATION)]
+               + [(sel, sel) for sel in GENERIC_JOB_SELECTORS]),
+    meta=("og:title", "og:site_name"),
+    prune=GENERIC_PRUNE,
+    sections=(SECTION_HEADERS, SECTION_KEYWORDS, SECTION_STOP),
+)
+
+_GREENHOUSE_QUERY = Query(first={
+    "title": ".app-title, h1.heading",
+    "company": ".company-name, .company",
+    "location": ".location, .body--metadata",
+    "content": "#content, .content, .job-post-content",
+})
+
+_LEVER_QUERY = Query(
+    first={
+        "title": ".posting-headline h2, h1",
+        "company": ".main-header-logo, .posting-headline .company",
+        "location": ".posting-categories .location, .workplaceTypes",
+        "content": ".content, .posting-page",
+    },
+    every={"sections": ".posting-page .section-wrapper, .posting-page .content"},
+)
+
+_TEXT_QUERY = Query()
+
+
+def html_to_text(html, backend=None):
+    """All text in html, one stripped string per line."""
+    if not html:
+        return ""
+    backend = backend or _default_backend
+    if backend == "bs4":
+        return _bs4_html_to_text(html)
+    return "\n".join(extract(html, _TEXT_QUERY, backend).strings)
+
+
+def extract_greenhouse(html, backend=None):
+    """(title, company, location, description) from a Greenhouse job page."""
+    backend = backend or _default_backend
+    if backend == "bs4":
+        return _bs4_greenhouse(html)
+    ex = extract(html, _GREENHOUSE_QUERY, backend)
+    return (ex.first_text("title") or "", ex.first_text("company") or "",
+            ex.first_text("location") or "", ex.first_text("content", "\n") or "")
+
+
+def extract_lever(html, backend=None):
+    """(title, company, location, description) from a Lever job page."""
+    backend = backend or _default_backend
+    if backend == "bs4":
+        return _bs4_lever(html)
+    ex = extract(html, _LEVER_QUERY, backend)
+    sections = ex.every.get("sections")
+    if sections:
+        description = "\n\n".join("\n".join(s) for s in sections)
+    else:
+        description = ex.first_text("content", "\n") or ""
+    return (ex.first_text("title") or "", ex.first_text("company") or "",
+            ex.first_text("location") or "", description)
+
+
+def extract_generic(html, backend=None):
+    """(title, company, location, description) from an unknown career page.
+
+    Title from h1 or og:title, company from og:site_name, then the first
+    job-looking container with real text, else sections under
+    Requirements/Responsibilities-style headers, else the whole body.
+    """
+    backend = backend or _default_backend
+    if backend == "bs4":
+        return _bs4_generic(html)
+    ex = extract(html, _GENERIC_QUERY, backend)
+
+    title = ex.first_text("h1") or ""
+    if not title:
+        title = ex.meta.get("og:title", "")
+    company = ex.meta.get("og:site_name", "")
+    location = ex.first_text("location") or ""
+
+    # Strategy 1: Look for elements with job-related classes
+    description = ""
+    for selector in GENERIC_JOB_SELECTORS:
+        text = ex.first_text(selector, "\n")
+        if text is not None and len(text) > 200:  # Minimum meaningful content
+            description = text
+            break
+
+    # Strategy 2: Find sections by headers
+    if not description and ex.sections:
+        description = "\n\n".join(
+            f"{''.join(header)}\n" + "\n".join("\n".join(part) for part in parts)
+            for header, parts in ex.sections
+        )
+
+    # Strategy 3: Largest text block
+    if not description and ex.body is not None:
+        description = "\n".join(ex.body)
+        if len(description) > 10000:
+            description = description[:10000]
+
+    return title, company, location, description
+
+
+# ---------------------------------------------------------------------------
+# BeautifulSoup reference backend (the original scraper code)
+# ---------------------------------------------------------------------------
+
+def _soup(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser")
+
+
+def _bs4_html_to_text(html):
+    return _soup(html).get_text(separator="\n", strip=True)
+
+
+def _bs4_greenhouse(html):
+    soup = _soup(html)
+
+    # Greenhouse structure: .app-title for role, .company-name, #content for description
+    title = ""
+    title_el = soup.select_one(".app-title, h1.heading")
+    if title_el:
+        title = title_el.get_text(strip=True)
+
+    company = ""
+    company_el = soup.select_one(".company-name, .company")
+    if company_el:
+        company = company_el.get_text(strip=True)
+
+    location = ""
+    location_el = soup.select_one(".location, .body--metadata")
+    if location_el:
+        location = location_el.get_text(strip=True)
+
+    description = ""
+    content_el = soup.select_one("#content, .content, .job-post-content")
+    if content_el:
+        description = content_el.get_text(separator="\n", strip=True)
+
+    return title, company, location, description
+
+
+def _bs4_lever(html):
+    soup = _soup(html)
+
+    title = ""
+    title_el = soup.select_one(".posting-headline h2, h1")
+    if title_el:
+        title = title_el.get_text(strip=True)
+
+    company = ""
+    # Lever usually has company in the page title or header
+    header_el = soup.select_one(".main-header-logo, .posting-headline .company")
+    if header_el:
+        company = header_el.get_text(strip=True)
+
+    location = ""
+    location_el = soup.select_one(".posting-categories .location, .workplaceTypes")
+    if location_el:
+        location = location_el.get_text(strip=True)
+
+    description = ""
+    content_sections = soup.select(".posting-page .section-wrapper, .posting-page .content")
+    if content_sections:
+        description = "\n\n".join(s.get_text(separator="\n", strip=True) for s in content_sections)
+    else:
+        content_el = soup.select_one(".content, .posting-page")
+        if content_el:
+            description = content_el.get_text(separator="\n", strip=True)
+
+    return title, company, location, description
+
+
+def _bs4_generic(html):
+    soup = _soup(html)
+
+    # Remove script, style, nav, footer elements
+    for tag in soup.select(GENERIC_PRUNE):
+        tag.decompose()
+
+    # Try to find the job title from h1 or og:title
+    title = ""
+    h1 = soup.find("h1")
+    if h1:
+        title = h1.get_text(strip=True)
+    if not title:
+        og_title = soup.find("meta", property="og:title")
+        if og_title:
+            title = og_title.get("content", "")
+
+    # Try og:site_name for company
+    company = ""
+    og_site = soup.find("meta", property="og:site_name")
+    if og_site:
+        company = og_site.get("content", "")
+
+    # Try to find location
+    location = ""
+    for el in soup.select(GENERIC_LOCATION):
+        location = el.get_text(strip=True)
+        break
+
+    # Find the main content area
+    description = ""
+
+    # Strategy 1: Look for elements with job-related classes
+    for selector in GENERIC_JOB_SELECTORS:
+        el = soup.select_one(selector)
+        if el:
+            text = el.get_text(separator="\n", strip=True)
+            if len(text) > 200:  # Minimum meaningful content
+                description = text
+                break
+
+    # Strategy 2: Find sections by headers
+    if not description:
+        sections = []
+        for header in soup.find_all(list(SECTION_HEADERS)):
+            header_text = header.get_text(strip=True).lower()
+            if any(jh in header_text for jh in SECTION_KEYWORDS):
+                # Get text until next header
+                content_parts = []
+                sibling = header.find_next_sibling()
+                while sibling and sibling.name not in SECTION_STOP:
+                    content_parts.append(sibling.get_text(separator="\n", strip=True))
+                    sibling = sibling.find_next_sibling()
+                sections.append(f"{header.get_text(strip=True)}\n" + "\n".join(content_parts))
+
+        if sections:
+            description = "\n\n".join(sections)
+
+    # Strategy 3: Largest text block
+    if not description:
+        body = soup.find("body")
+        if body:
+            description = body.get_text(separator="\n", strip=True)
+            # Trim to reasonable length
+            if len(description) > 10000:
+                description = description[:10000]
+
+    return title, company, location, description
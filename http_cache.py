@@ -0,0 +1,275 @@
+"""
+On-disk HTTP response cache for the pipeline scrapers.
+
+Layout under the cache directory (pipeline/cache/http by default):
+
+    bodies/<sha256 of body>.gz   content-addressed, gzip-compressed bodies
+    meta/<sha256 of key>.json    one small record per (method, url)
+
+Identical bodies (the same career page behind several URLs) are stored
+once. Each URL class has its own TTL; stale entries carrying an ETag or
+Last-Modified are revalidated with a conditional request instead of being
+re-downloaded. A meta file's mtime is its last-access time, which drives
+LRU eviction once bodies exceed the size cap. In cache-only mode nothing
+goes to the network — misses fail like a connection error, so a run can
+be replayed offline.
+
+Configured from the optional `http_cache` section of pipeline_config.json:
+
+    "http_cache": {"enabled": true, "max_mb": 200,
+                   "ttl_seconds": {"search": 86400, "ats_api": 21600}}
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Freshness per URL class (see classify_url)
+DEFAULT_TTLS = {
+    "search": DAY,              # DuckDuckGo result pages
+    "ats_api": 6 * HOUR,        # Ashby/Greenhouse/Lever JSON board APIs
+    "job_posting": 3 * DAY,     # a specific job listing page
+    "career_page": DAY,         # any other page
+    "probe": 7 * DAY,           # HEAD probes of guessed career URLs
+}
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Only cache definitive answers — never 429/5xx
+CACHEABLE_STATUSES = (200, 203, 404, 410)
+
+# Response headers worth keeping (bodies are stored decoded)
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+_ATS_API_HOSTS = ("api.ashbyhq.com", "boards-api.greenhouse.io", "api.lever.co")
+_JOB_POSTING_RE = re.compile(
+    r'/jobs?/\d+|/jobs?/[a-z0-9-]+/\d+|/positions?/\d+|/postings?/\d+'
+    r'|greenhouse\.io/[^/]+/jobs/\d+|lever\.co/[^/]+/[a-f0-9-]{8,}'
+    r'|ashbyhq\.com/[^/]+/[a-f0-9-]{8,}',
+    re.IGNORECASE,
+)
+
+
+def classify_url(method, url):
+    """Bucket a request into a URL class for TTL purposes."""
+    if method == "HEAD":
+        return "probe"
+    host = urlparse(url).netloc.lower()
+    if "duckduckgo." in host:
+        return "search"
+    if host in _ATS_API_HOSTS:
+        return "ats_api"
+    if _JOB_POSTING_RE.search(url):
+        return "job_posting"
+    return "career_page"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    """Content-addressed response cache with TTLs, revalidation and LRU."""
+
+    def __init__(self, cache_dir, ttl_seconds=None, max_bytes=DEFAULT_MAX_BYTES,
+                 cache_only=False):
+        self.cache_dir = cache_dir
+        self.meta_dir = os.path.join(cache_dir, "meta")
+        self.body_dir = os.path.join(cache_dir, "bodies")
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttl_seconds or {})
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self._lock = threading.Lock()
+        self._total_bytes = None  # computed lazily from disk
+
+    # -- lookup ------------------------------------------------------------
+
+    def _meta_path(self, method, url):
+        return os.path.join(self.meta_dir, _sha256(f"{method} {url}".encode("utf-8")) + ".json")
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.body_dir, body_hash + ".gz")
+
+    def lookup(self, method, url):
+        """Return the stored entry for (method, url), or None."""
+        path = self._meta_path(method, url)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._body_path(entry["body_hash"])):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return entry
+
+    def is_fresh(self, entry, now=None):
+        now = time.time() if now is None else now
+        ttl = self.ttls.get(entry.get("url_class"), DAY)
+        return now - entry.get("stored_at", 0) < ttl
+
+    def validators(self, entry):
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        stored = entry.get("headers", {})
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last-modified"):
+            headers["If-Modified-Since"] = stored["last-modified"]
+        return headers
+
+    def to_response(self, entry):
+        """Rebuild a requests.Response from a cache entry."""
+        with open(self._body_path(entry["body_hash"]), "rb") as f:
+            body = gzip.decompress(f.read())
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = "Cached"
+        resp._content = body
+        resp.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        resp.url = entry.get("final_url") or entry["url"]
+        resp.encoding = entry.get("encoding")
+        resp.from_cache = True
+        return resp
+
+    # -- storage -----------------------------------------------------------
+
+    def store(self, method, url, resp):
+        """Store a live response. Returns True if it was cacheable."""
+        if resp.status_code not in CACHEABLE_STATUSES:
+            return False
+        body = resp.content or b""
+        body_hash = _sha256(body)
+        entry = {
+            "method": method,
+            "url": url,
+            "final_url": resp.url,
+            "url_class": classify_url(method, url),
+            "status": resp.status_code,
+            "headers": {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers},
+            "encoding": resp.encoding,
+            "body_hash": body_hash,
+            "size": len(body),
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            os.makedirs(self.meta_dir, exist_ok=True)
+            os.makedirs(self.body_dir, exist_ok=True)
+            body_path = self._body_path(body_hash)
+            added = 0
+            if not os.path.exists(body_path):
+                compressed = gzip.compress(body)
+                _write_atomic(body_path, compressed)
+                added = len(compressed)
+            _write_atomic(self._meta_path(method, url), json.dumps(entry).encode("utf-8"))
+            if self._total_bytes is not None:
+                self._total_bytes += added
+            if self._current_bytes() > self.max_bytes:
+                self._evict()
+        return True
+
+    def refresh(self, entry):
+        """Mark a revalidated (304) entry as fresh again."""
+        entry["stored_at"] = time.time()
+        with self._lock:
+            _write_atomic(self._meta_path(entry["method"], entry["url"]),
+                          json.dumps(entry).encode("utf-8"))
+
+    # -- eviction ----------------------------------------------------------
+
+    def _current_bytes(self):
+        if self._total_bytes is None:
+            total = 0
+            if os.path.isdir(self.body_dir):
+                for name in os.listdir(self.body_dir):
+                    try:
+                        total += os.path.getsize(os.path.join(self.body_dir, name))
+                    except OSError:
+                        pass
+            self._total_bytes = total
+        return self._total_bytes
+
+    def _evict(self):
+        """Drop least-recently-used entries until bodies fit in 90% of the cap.
+
+        Reads every meta file once: victims are picked from the LRU order by
+        the size of the bodies they leave unreferenced, then the
+        unreferenced bodies are deleted in one pass.
+        """
+        metas, refs = [], {}
+        for name in os.listdir(self.meta_dir):
+            path = os.path.join(self.meta_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+                with open(path, encoding="utf-8") as f:
+                    body_hash = json.load(f)["body_hash"]
+            except (OSError, ValueError, KeyError):
+                continue
+            metas.append((mtime, path, body_hash))
+            refs[body_hash] = refs.get(body_hash, 0) + 1
+        metas.sort()
+
+        total = self._current_bytes()
+        target = int(self.max_bytes * 0.9)
+        for _, path, body_hash in metas:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            refs[body_hash] -= 1
+            if not refs[body_hash]:
+                try:
+                    total -= os.path.getsize(self._body_path(body_hash))
+                except OSError:
+                    pass
+        self._delete_bodies({h for h, n in refs.items() if n})
+
+    def _delete_bodies(self, keep):
+        """Delete every body whose hash is not in keep."""
+        for name in os.listdir(self.body_dir):
+            if name.endswith(".gz") and name[:-3] not in keep:
+                try:
+                    os.remove(os.path.join(self.body_dir, name))
+                except OSError:
+                    pass
+        self._total_bytes = None
+
+
+def build_cache(config, cache_dir, cache_only=False):
+    """Build an HttpCache from the `http_cache` config section.
+
+    Returns None when caching is disabled (unless cache_only is requested).
+    """
+    cache_cfg = config.get("http_cache", {})
+    if not cache_cfg.get("enabled", True) and not cache_only:
+        return None
+    return HttpCache(
+        cache_dir,
+        ttl_seconds=cache_cfg.get("ttl_seconds"),
+        max_bytes=int(cache_cfg.get("max_mb", DEFAULT_MAX_BYTES // (1024 * 1024)) * 1024 * 1024),
+        cache_only=cache_only,
+    )
@@ -0,0 +1,271 @@
+"""
+Shared HTTP client for the pipeline scrapers.
+
+One pooled keep-alive requests.Session per host, retries with exponential
+backoff on 429/5xx (honouring Retry-After), gzip/brotli negotiation,
+separate connect/read timeouts, per-host politeness (HostThrottle), an
+optional on-disk response cache (http_cache.HttpCache) and per-host
+request/latency stats for an end-of-run report.
+
+Configured from the optional `http` and `throttle` sections of
+pipeline_config.json:
+
+    "http": {"connect_timeout": 5, "read_timeout": 15,
+             "retries": 3, "backoff_seconds": 0.5}
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Brotli is only negotiated when a decoder is installed (urllib3 uses it)
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip, deflate"
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+# ---------------------------------------------------------------------------
+# Per-host politeness
+# ---------------------------------------------------------------------------
+
+class HostThrottle:
+    """Per-host rate limiting shared by every request in the process.
+
+    Spaces consecutive requests to the same host by a minimum interval and
+    caps how many requests may be in flight to one host at a time. Requests
+    to different hosts never wait on each other. Thread-safe, so many leads
+    can be sourced concurrently without hammering any single site.
+    """
+
+    def __init__(self, default_interval=0.0, host_intervals=None, max_per_host=2):
+        self.default_interval = default_interval
+        self.host_intervals = dict(host_intervals or {})
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._next_start = {}  # host -> monotonic time the next request may start
+        self._semaphores = {}
+
+    def interval_for(self, host):
+        for suffix, seconds in self.host_intervals.items():
+            if host == suffix or host.endswith("." + suffix):
+                return seconds
+        return self.default_interval
+
+    @contextmanager
+    def slot(self, url):
+        """Block until a request to url's host is allowed, then hold a slot."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = sem
+        sem.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.interval_for(host)
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            sem.release()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class HttpClient:
+    """Pooled, retrying, throttled HTTP client with per-host stats."""
+
+    def __init__(self, headers=None, throttle=None, connect_timeout=5.0,
+                 read_timeout=15.0, retries=3, backoff_seconds=0.5, cache=None):
+        self.headers = dict(headers or {})
+        self.headers.setdefault("Accept-Encoding", _ACCEPT_ENCODING)
+        self.throttle = throttle or HostThrottle()
+        self.cache = cache  # optional http_cache.HttpCache for GET/HEAD
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_seconds,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self._lock = threading.Lock()
+        self._sessions = {}  # host -> requests.Session
+        self._stats = {}     # host -> {requests, errors, total_seconds, max_seconds, statuses}
+
+    def _session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=max(self.throttle.max_per_host, 1),
+                    max_retries=self.retry,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def _timeout(self, timeout):
+        if timeout is None:
+            return (self.connect_timeout, self.read_timeout)
+        if isinstance(timeout, (int, float)):
+            return (min(self.connect_timeout, timeout), timeout)
+        return timeout
+
+    def _record(self, host, elapsed, status=None, error=False, cached=False):
+        with self._lock:
+            entry = self._stats.setdefault(host, {
+                "requests": 0, "errors": 0, "cache_hits": 0, "total_seconds": 0.0,
+                "max_seconds": 0.0, "statuses": {},
+            })
+            entry["requests"] += 1
+            entry["total_seconds"] += elapsed
+            entry["max_seconds"] = max(entry["max_seconds"], elapsed)
+            if error:
+                entry["errors"] += 1
+            if cached:
+                entry["cache_hits"] += 1
+            if status is not None:
+                entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """Send a request through the host's pooled session.
+
+        GET/HEAD go through the response cache when one is attached: fresh
+        entries are served without touching the network, stale ones are
+        revalidated with If-None-Match/If-Modified-Since. In cache-only
+        mode a miss raises requests.ConnectionError.
+
+        Raises requests.RequestException like requests.request does.
+        """
+        host = urlparse(url).netloc.lower()
+        cache = self.cache if method in ("GET", "HEAD") else None
+        entry = cache.lookup(method, url) if cache else None
+
+        if cache and (cache.cache_only or (entry and cache.is_fresh(entry))):
+            if entry is None:
+                self._record(host, 0.0, error=True)
+                raise requests.ConnectionError(f"Not in HTTP cache (cache-only mode): {url}")
+            self._record(host, 0.0, status=entry["status"],
+                         error=entry["status"] >= 400, cached=True)
+            return cache.to_response(entry)
+
+        if entry:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.update(cache.validators(entry))
+            kwargs["headers"] = headers
+
+        session = self._session_for(host)
+        with self.throttle.slot(url):
+            start = time.monotonic()
+            try:
+                resp = session.request(method, url, timeout=self._timeout(timeout), **kwargs)
+            except requests.RequestException:
+                self._record(host, time.monotonic() - start, error=True)
+                raise
+        elapsed = time.monotonic() - start
+
+        if cache:
+            if resp.status_code == 304 and entry:
+                cache.refresh(entry)
+                self._record(host, elapsed, status=entry["status"],
+                             error=entry["status"] >= 400, cached=True)
+                return cache.to_response(entry)
+            cache.store(method, url, resp)
+
+        self._record(host, elapsed, status=resp.status_code,
+                     error=resp.status_code >= 400)
+        return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def stats(self):
+        """Per-host request counts and latency, as a plain dict."""
+        with self._lock:
+            out = {}
+            for host, entry in self._stats.items():
+                count = entry["requests"]
+                out[host] = {
+                    "requests": count,
+                    "errors": entry["errors"],
+                    "cache_hits": entry["cache_hits"],
+                    "avg_ms": round(1000 * entry["total_seconds"] / count, 1) if count else 0.0,
+                    "max_ms": round(1000 * entry["max_seconds"], 1),
+                    "total_seconds": round(entry["total_seconds"], 2),
+                    "statuses": dict(entry["statuses"]),
+                }
+            return out
+
+    def format_stats(self):
+        """Human-readable per-host stats table, busiest host first."""
+        stats = self.stats()
+        if not stats:
+            return "    (no HTTP requests made)"
+        lines = [f"    {'Host':<40} {'Reqs':>5} {'Errs':>5} {'Cached':>6} {'Avg ms':>8} {'Max ms':>8}"]
+        for host, s in sorted(stats.items(), key=lambda kv: (-kv[1]["requests"], kv[0])):
+            lines.append(f"    {host[:40]:<40} {s['requests']:>5} {s['errors']:>5} "
+                         f"{s['cache_hits']:>6} {s['avg_ms']:>8.1f} {s['max_ms']:>8.1f}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def build_client(config, headers=None, search_hosts=(), cache=None):
+    """Build an HttpClient from the `http` and `throttle` config sections.
+
+    google_search_seconds spaces requests to search_hosts,
+    career_page_seconds spaces requests to any other single host, and
+    per_host_concurrency caps parallel requests to one host.
+    """
+    throttle_cfg = config.get("throttle", {})
+    http_cfg = config.get("http", {})
+    search_interval = throttle_cfg.get("google_search_seconds", 2.0)
+    throttle = HostThrottle(
+        default_interval=throttle_cfg.get("career_page_seconds", 1.0),
+        host_intervals={host: search_interval for host in search_hosts},
+        max_per_host=throttle_cfg.get("per_host_concurrency", 2),
+    )
+    return HttpClient(
+        headers=headers,
+        throttle=throttle,
+        connect_timeout=http_cfg.get("connect_timeout", 5.0),
+        read_timeout=http_cfg.get("read_timeout", 15.0),
+        retries=http_cfg.get("retries", 3),
+        backoff_seconds=http_cfg.get("backoff_seconds", 0.5),
+        cache=cache,
+    )
@@ -16,7 +16,7 @@ Creates application folder stubs (status=pending_review) and updates
 index.json and tracker.xlsx.
 
 Usage:
-    python job_score.py [--rescore]
+    python job_score.py [--rescore] [--workers N]
 """
 
 import json
@@ -24,10 +24,14 @@ import os
 import re
 from datetime import datetime
 
+from pipeline_ledger import open_ledger, record_hash
+from record_log import open_stage
+
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
 STAGING_SOURCED = os.path.join(PIPELINE_DIR, "staging", "sourced")
+LEDGER_DB_PATH = os.path.join(PIPELINE_DIR, "ledger.sqlite3")
 APPLICATIONS_DIR = os.path.join(SCRIPT_DIR, "applications")
 INDEX_PATH = os.path.join(APPLICATIONS_DIR, "index.json")
 TRACKER_PATH = os.path.join(SCRIPT_DIR, "tracker.xlsx")
@@ -224,7 +228,7 @@ def extract_requirements(job_description):
         "hard_requirements": hard_requirements,
         "preferred": preferred,
         "responsibilities": responsibilities,
-        "keywords": list(keywords),
+        "keywords": sorted(keywords),
         "red_flags": red_flags,
     }
 
@@ -343,53 +347,130 @@ def _simple_stem(word):
     return word
 
 
+_TERM_RE = re.compile(r'\b[a-z]{3,}\b')
+_YEARS_RE = re.compile(r'(\d+)\+?\s*years?')
+_DIRECT_KEYWORD_RE = re.compile(
+    r'\b(?:Python|Java|AWS|Azure|GCP|Kubernetes|Docker|Terraform|'
+    r'React|Node|HIPAA|SOC2|FHIR|HL7|DICOM|AI|ML|NLP|'
+    r'microservices|agile|scrum|DevOps|CI/CD)\b',
+    re.IGNORECASE
+)
+
+
+def _stemmed_terms(text_lower):
+    """Tokenize lowercased text into a set of stemmed terms."""
+    return set(_simple_stem(w) for w in _TERM_RE.findall(text_lower))
+
+
+class AchievementIndex:
+    """Pre-tokenized achievements inventory for fast requirement scoring.
+
+    Built once from load_achievements(). Holds each achievement's stemmed
+    term set and years-of-experience, plus an inverted index from term to
+    achievement so score_requirement() only visits achievements that can
+    actually score above zero.
+    """
+
+    def __init__(self, achievements):
+        self.entries = []   # [{category, item, lower, terms, years}] in file order
+        self.postings = {}  # stemmed term -> [entry ids]
+        self.years_ids = []  # entry ids that mention "N years"
+        self._substring_ids = {}  # direct keyword -> entry ids containing it
+
+        for category, items in achievements.items():
+            for item in items:
+                item_lower = item.lower()
+                years_match = _YEARS_RE.search(item_lower)
+                entry_id = len(self.entries)
+                terms = _stemmed_terms(item_lower)
+                self.entries.append({
+                    "category": category,
+                    "item": item,
+                    "lower": item_lower,
+                    "terms": terms,
+                    "years": int(years_match.group(1)) if years_match else None,
+                })
+                for term in terms:
+                    self.postings.setdefault(term, []).append(entry_id)
+                if years_match:
+                    self.years_ids.append(entry_id)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _ids_containing(self, keyword_lower):
+        """Entry ids whose text contains the keyword (substring, memoized)."""
+        ids = self._substring_ids.get(keyword_lower)
+        if ids is None:
+            ids = [i for i, e in enumerate(self.entries) if keyword_lower in e["lower"]]
+            self._substring_ids[keyword_lower] = ids
+        return ids
+
+    def candidates(self, req_terms, direct_keywords=(), years_required=None):
+        """Return ids of achievements that could score above zero, in file order.
+
+        An achievement is a candidate if it shares a stemmed term with the
+        requirement, contains one of its direct keywords, or states enough
+        years of experience.
+        """
+        ids = set()
+        for term in req_terms:
+            ids.update(self.postings.get(term, ()))
+        for kw in direct_keywords:
+            ids.update(self._ids_containing(kw))
+        if years_required is not None:
+            ids.update(i for i in self.years_ids
+                       if self.entries[i]["years"] >= years_required)
+        return sorted(ids)
+
+
 def score_requirement(requirement, achievements):
     """Score a single requirement against the achievements inventory.
 
+    achievements may be the {category: [items]} dict from load_achievements()
+    or a prebuilt AchievementIndex (much faster when scoring many requirements).
+
     Returns {requirement, match_type: 'strong'|'partial'|'gap', evidence, category}.
     """
+    if not isinstance(achievements, AchievementIndex):
+        achievements = AchievementIndex(achievements)
+
     req_lower = requirement.lower()
 
     # Extract key terms and stem them for better matching
-    req_words = re.findall(r'\b[a-z]{3,}\b', req_lower)
-    req_terms = set(_simple_stem(w) for w in req_words)
+    req_terms = _stemmed_terms(req_lower)
+
+    # Direct keyword matches (technologies, frameworks)
+    direct_keywords = [kw.lower() for kw in _DIRECT_KEYWORD_RE.findall(requirement)]
+
+    # Experience level
+    years_req = _YEARS_RE.search(req_lower)
+    years_required = int(years_req.group(1)) if years_req else None
 
     best_match = None
     best_score = 0
 
-    for category, items in achievements.items():
-        for item in items:
-            item_lower = item.lower()
-            item_words = re.findall(r'\b[a-z]{3,}\b', item_lower)
-            item_terms = set(_simple_stem(w) for w in item_words)
+    for entry_id in achievements.candidates(req_terms, set(direct_keywords), years_required):
+        entry = achievements.entries[entry_id]
+        item_terms = entry["terms"]
 
-            # Calculate overlap
-            if req_terms and item_terms:
-                overlap = len(req_terms & item_terms) / max(len(req_terms), 1)
-            else:
-                overlap = 0
-
-            # Check for direct keyword matches (technologies, frameworks)
-            direct_keywords = re.findall(
-                r'\b(?:Python|Java|AWS|Azure|GCP|Kubernetes|Docker|Terraform|'
-                r'React|Node|HIPAA|SOC2|FHIR|HL7|DICOM|AI|ML|NLP|'
-                r'microservices|agile|scrum|DevOps|CI/CD)\b',
-                requirement, re.IGNORECASE
-            )
-            for kw in direct_keywords:
-                if kw.lower() in item_lower:
-                    overlap += 0.3
-
-            # Check for experience level matches
-            years_req = re.search(r'(\d+)\+?\s*years?', req_lower)
-            years_ach = re.search(r'(\d+)\+?\s*years?', item_lower)
-            if years_req and years_ach:
-                if int(years_ach.group(1)) >= int(years_req.group(1)):
-                    overlap += 0.2
-
-            if overlap > best_score:
-                best_score = overlap
-                best_match = {"evidence": item, "category": category}
+        # Calculate overlap
+        if req_terms and item_terms:
+            overlap = len(req_terms & item_terms) / max(len(req_terms), 1)
+        else:
+            overlap = 0
+
+        for kw in direct_keywords:
+            if kw in entry["lower"]:
+                overlap += 0.3
+
+        if years_required is not None and entry["years"] is not None:
+            if entry["years"] >= years_required:
+                overlap += 0.2
+
+        if overlap > best_score:
+            best_score = overlap
+            best_match = {"evidence": entry["item"], "category": entry["category"]}
 
     if best_score >= 0.35:
         return {
@@ -968,137 +1049,163 @@ def _write_review_md(queue):
 
 
 # ---------------------------------------------------------------------------
-# Main pipeline
+# Lead scoring (serial or multi-process)
 # ---------------------------------------------------------------------------
 
-def main():
-    import argparse
+def score_sourced_record(sourced, achievement_index, user_preferences):
+    """Score one staging/sourced record.
 
-    parser = argparse.ArgumentParser(description="Score and rank sourced job descriptions")
-    parser.add_argument("--rescore", action="store_true", help="Re-score already scored leads")
-    parser.parse_args()
+    Pure CPU work — never touches index.json, tracker.xlsx or the
+    applications folder, so it is safe to run in a worker process.
 
-    print("=" * 60)
-    print("  EMAIL PIPELINE — STEP 4: SCORE & RANK")
-    print("=" * 60)
+    Returns ("unresolved", {company, role, reason, email_uid}) or
+    ("scored", scored_lead).
+    """
+    lead = sourced.get("lead", {})
+
+    # Skip unresolved leads
+    if sourced.get("status") == "unresolved":
+        return "unresolved", {
+            "company": lead.get("company", "Unknown"),
+            "role": lead.get("role", "Unknown"),
+            "reason": sourced.get("unresolved_reason", "Unknown"),
+            "email_uid": lead.get("email_uid", ""),
+        }
 
-    config = load_config()
-    auto_skip_rules = config.get("auto_skip_rules", {})
-    user_preferences = config.get("user_preferences", {})
+    scraped = sourced.get("scraped", {})
+    description = scraped.get("description_text", "")
 
-    # Load achievements
-    print("\n  Loading achievements...")
-    achievements = load_achievements()
-    if not achievements:
-        print("  WARNING: No achievements loaded — scoring will be limited")
-    else:
-        total_ach = sum(len(v) for v in achievements.values())
-        print(f"  Loaded {total_ach} achievements across {len(achievements)} categories")
+    if not description:
+        return "unresolved", {
+            "company": lead.get("company", "Unknown"),
+            "role": lead.get("role", "Unknown"),
+            "reason": "No description text available",
+            "email_uid": lead.get("email_uid", ""),
+        }
 
-    # Load sourced results
-    if not os.path.exists(STAGING_SOURCED):
-        print("  No sourced leads found.")
-        return
+    # Extract requirements (form content is stripped internally)
+    requirements = extract_requirements(description)
 
-    sourced_files = [f for f in os.listdir(STAGING_SOURCED) if f.endswith(".json")]
-    if not sourced_files:
-        print("  No sourced lead files found.")
-        return
+    # Score each requirement against achievements
+    all_reqs = requirements["hard_requirements"] + requirements["preferred"]
+    if not all_reqs:
+        # If no structured requirements found, treat cleaned description as context
+        cleaned_desc = _strip_application_form(description)
+        all_reqs = [line.strip() for line in cleaned_desc.split("\n")
+                    if len(line.strip()) > 20 and _is_requirement(line)][:15]
 
-    print(f"\n  Scoring {len(sourced_files)} sourced leads...")
+    matches = [score_requirement(req, achievement_index) for req in all_reqs]
+    score_result = calculate_overall_score(matches)
 
-    # Load index for dedup
-    index = load_index()
+    # Detect employment type
+    employment_type = detect_employment_type(description)
 
-    scored_leads = []
-    auto_skipped = []
-    unresolved = []
+    # Check location
+    location_info = detect_location_match(description, user_preferences)
 
-    batch_id = f"{datetime.now().strftime('%Y-%m-%d')}_{os.urandom(3).hex()}"
+    return "scored", {
+        "company": lead.get("company", ""),
+        "role": lead.get("role", ""),
+        "source_platform": lead.get("source_platform", ""),
+        "email_uid": lead.get("email_uid", ""),
+        "email_date": lead.get("email_date", ""),
+        "raw_subject": lead.get("raw_subject", ""),
+        "confidence": lead.get("confidence", 0),
+        "career_page_url": scraped.get("url", ""),
+        "description_text": description,
+        "compensation": scraped.get("compensation"),
+        "score_result": score_result,
+        "matches": matches,
+        "requirements": requirements,
+        "employment_type": employment_type,
+        "location_info": location_info,
+        "red_flags": requirements.get("red_flags", []),
+    }
 
-    for filename in sorted(sourced_files):
-        filepath = os.path.join(STAGING_SOURCED, filename)
-        with open(filepath, encoding="utf-8") as f:
-            sourced = json.load(f)
-
-        # Skip unresolved leads
-        if sourced.get("status") == "unresolved":
-            unresolved.append({
-                "company": sourced.get("lead", {}).get("company", "Unknown"),
-                "role": sourced.get("lead", {}).get("role", "Unknown"),
-                "reason": sourced.get("unresolved_reason", "Unknown"),
-                "email_uid": sourced.get("lead", {}).get("email_uid", ""),
-            })
-            continue
 
-        lead = sourced.get("lead", {})
-        scraped = sourced.get("scraped", {})
-        description = scraped.get("description_text", "")
+# Per-process state for pool workers (set once by _init_score_worker)
+_worker_state = {}
 
-        if not description:
-            unresolved.append({
-                "company": lead.get("company", "Unknown"),
-                "role": lead.get("role", "Unknown"),
-                "reason": "No description text available",
-                "email_uid": lead.get("email_uid", ""),
-            })
-            continue
 
-        # Extract requirements (form content is stripped internally)
-        requirements = extract_requirements(description)
+def _init_score_worker(achievements, user_preferences):
+    """Build the achievement index once per worker process."""
+    _worker_state["index"] = AchievementIndex(achievements)
+    _worker_state["user_preferences"] = user_preferences
 
-        # Score each requirement against achievements
-        all_reqs = requirements["hard_requirements"] + requirements["preferred"]
-        if not all_reqs:
-            # If no structured requirements found, treat cleaned description as context
-            cleaned_desc = _strip_application_form(description)
-            all_reqs = [line.strip() for line in cleaned_desc.split("\n")
-                        if len(line.strip()) > 20 and _is_requirement(line)][:15]
 
-        matches = [score_requirement(req, achievements) for req in all_reqs]
-        score_result = calculate_overall_score(matches)
+def _score_record_in_worker(sourced):
+    return score_sourced_record(sourced, _worker_state["index"],
+                                _worker_state["user_preferences"])
 
-        # Detect employment type
-        employment_type = detect_employment_type(description)
 
-        # Check location
-        location_info = detect_location_match(description, user_preferences)
+def score_sourced_records(records, achievements, user_preferences, workers=1):
+    """Score sourced records, optionally fanned out over a process pool.
 
-        # Build the scored lead
-        scored_lead = {
-            "company": lead.get("company", ""),
-            "role": lead.get("role", ""),
-            "source_platform": lead.get("source_platform", ""),
-            "email_uid": lead.get("email_uid", ""),
-            "email_date": lead.get("email_date", ""),
-            "raw_subject": lead.get("raw_subject", ""),
-            "confidence": lead.get("confidence", 0),
-            "career_page_url": scraped.get("url", ""),
-            "description_text": description,
-            "compensation": scraped.get("compensation"),
-            "score_result": score_result,
-            "matches": matches,
-            "requirements": requirements,
-            "employment_type": employment_type,
-            "location_info": location_info,
-            "red_flags": requirements.get("red_flags", []),
-            "pipeline_batch": batch_id,
-        }
+    Results come back in the same order as records regardless of worker
+    count, so ranking, review queue and folder stubs match a serial run.
+    """
+    if workers <= 1 or len(records) < 2:
+        index = AchievementIndex(achievements)
+        return [score_sourced_record(r, index, user_preferences) for r in records]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(records) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_score_worker,
+                             initargs=(achievements, user_preferences)) as pool:
+        return list(pool.map(_score_record_in_worker, records, chunksize=chunksize))
+
+
+# ---------------------------------------------------------------------------
+# Main pipeline
+# ---------------------------------------------------------------------------
+
+def publish_scores(keys, results, config):
+    """Auto-skip, rank and publish scored records.
+
+    keys are the staging/sourced keys and results the matching
+    score_sourced_record outcomes. Creates application stubs, updates
+    index.json and tracker.xlsx, writes the review queue and marks the
+    score stage in the pipeline ledger. Returns the review queue.
+    """
+    auto_skip_rules = config.get("auto_skip_rules", {})
+    user_preferences = config.get("user_preferences", {})
+
+    # Load index for dedup
+    index = load_index()
+
+    scored_leads = []
+    auto_skipped = []
+    unresolved = []
+    ledger_rows = []   # (key, status, content_hash, error) for the score stage
+
+    batch_id = f"{datetime.now().strftime('%Y-%m-%d')}_{os.urandom(3).hex()}"
+
+    for key, (status, result) in zip(keys, results):
+        if status == "unresolved":
+            unresolved.append(result)
+            continue
+
+        scored_lead = result
+        scored_lead["pipeline_batch"] = batch_id
+        score_result = scored_lead["score_result"]
 
         # Check auto-skip rules
         skip_reason = check_auto_skip(scored_lead, score_result, auto_skip_rules,
-                                       user_preferences, employment_type)
+                                       user_preferences, scored_lead["employment_type"])
         if skip_reason:
             auto_skipped.append({
-                "company": lead.get("company", ""),
-                "role": lead.get("role", ""),
+                "company": scored_lead["company"],
+                "role": scored_lead["role"],
                 "reason": skip_reason,
                 "score": score_result.get("overall", ""),
-                "email_uid": lead.get("email_uid", ""),
+                "email_uid": scored_lead["email_uid"],
             })
+            ledger_rows.append((key, "skipped", None, skip_reason))
             continue
 
         scored_leads.append(scored_lead)
+        ledger_rows.append((key, "done", record_hash(score_result), None))
 
     # Apply bullseye filter (quick pattern-match against ideal profile)
     try:
@@ -1136,6 +1243,9 @@ def main():
     print("\n  Generating review queue...")
     queue = generate_review_queue(ranked, auto_skipped, unresolved)
 
+    with open_ledger(LEDGER_DB_PATH, os.path.dirname(STAGING_SOURCED)) as ledger:
+        ledger.mark_many("score", ledger_rows)
+
     # Summary
     print("\n  Results:")
     print(f"    Scored:       {len(scored_leads)}")
@@ -1154,6 +1264,51 @@ def main():
     print(f"  SCORING COMPLETE — {len(queue['leads'])} leads ready for review")
     print(f"{'=' * 60}")
 
+    return queue
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score and rank sourced job descriptions")
+    parser.add_argument("--rescore", action="store_true", help="Re-score already scored leads")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Score leads across N processes (default: 1, serial)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  EMAIL PIPELINE — STEP 4: SCORE & RANK")
+    print("=" * 60)
+
+    config = load_config()
+    user_preferences = config.get("user_preferences", {})
+
+    # Load achievements
+    print("\n  Loading achievements...")
+    achievements = load_achievements()
+    if not achievements:
+        print("  WARNING: No achievements loaded — scoring will be limited")
+    else:
+        total_ach = sum(len(v) for v in achievements.values())
+        print(f"  Loaded {total_ach} achievements across {len(achievements)} categories")
+
+    # Load sourced results
+    with open_stage(STAGING_SOURCED) as stage:
+        sourced_keys = sorted(stage.keys())
+        sourced_records = [stage.get(key) for key in sourced_keys]
+    if not sourced_records:
+        print("  No sourced leads found.")
+        return
+
+    print(f"\n  Scoring {len(sourced_records)} sourced leads...")
+
+    if args.workers > 1:
+        print(f"  Using {args.workers} worker processes")
+
+    results = score_sourced_records(sourced_records, achievements, user_preferences,
+                                    workers=args.workers)
+    publish_scores(sourced_keys, results, config)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,481 @@
+"""
+Email Pipeline — streaming orchestrator (fetch → parse → search → score)
+
+Runs the four stages in one process instead of four scripts handing off
+through the staging directories. The existing stage functions are joined
+by bounded queues, each stage on its own thread(s):
+
+    fetch ──> parse ──> career search (N threads) ──> score ──> review queue
+
+An email's leads are searched while later emails are still being parsed,
+and scored as soon as they are sourced, so a run takes roughly as long as
+its slowest stage (career search) rather than the sum of all four. Config
+is read once. A full queue blocks its producer, so memory stays flat
+whatever the backlog.
+
+- fetch:  IMAP (one batch, or --watch for IDLE) or an offline export.
+          Emails fetched earlier but never parsed go first.
+- parse:  email_parse.parse_email; --parse-workers N runs it in a process pool.
+          Leads the pipeline ledger lists as pending search go first.
+- search: career_search.source_lead on --search-workers threads (network-bound).
+- score:  job_score.score_sourced_record; --score-workers N uses a process pool.
+
+Records and ledger rows are written exactly as the stage scripts write
+them. The review queue is published with job_score.publish_scores over
+every sourced record when the run ends (as `python job_score.py` does), and
+in --watch mode again each time the pipeline drains: once every email
+and lead in flight has been parsed, searched and scored, not per lead.
+
+Usage:
+    python pipeline.py run [--limit N] [--search-workers N] [--parse-workers N]
+                           [--score-workers N] [--queue-size N] [--cache-only]
+    python pipeline.py run --from-mbox PATH | --from-maildir PATH | --from-eml-dir PATH
+    python pipeline.py run --watch
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+import career_search
+import email_fetch
+import email_parse
+import job_score
+from blob_store import BlobStore, hydrate
+from pipeline_ledger import open_ledger
+from record_log import open_stage
+
+QUEUE_SIZE = 64
+SEARCH_WORKERS = 4
+
+# Closes a queue. A consumer that takes it puts it back for its siblings.
+_END = object()
+
+
+def _drain(inbox):
+    """Yield items from inbox until _END."""
+    while True:
+        item = inbox.get()
+        if item is _END:
+            inbox.put(_END)
+            return
+        yield item
+
+
+def _pooled(inbox, fn, workers, initializer, initargs):
+    """Yield (item, fn(item)) for items from inbox, in order.
+
+    With workers > 1, fn runs in a process pool with at most workers * 4
+    items in flight. Finished results are handed on as soon as the inbox
+    runs dry instead of waiting for the next item to arrive.
+    """
+    if workers <= 1:
+        initializer(*initargs)
+        for item in _drain(inbox):
+            yield item, fn(item)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as pool:
+        while True:
+            if in_flight and (len(in_flight) >= workers * 4 or inbox.empty()):
+                item, future = in_flight.popleft()
+                yield item, future.result()
+                continue
+            item = inbox.get()
+            if item is _END:
+                inbox.put(_END)
+                break
+            in_flight.append((item, pool.submit(fn, item)))
+        while in_flight:
+            item, future = in_flight.popleft()
+            yield item, future.result()
+
+
+def _score_item(item):
+    """Pool worker: score one (sourced key, record) pair."""
+    return job_score._score_record_in_worker(item[1])
+
+
+class PipelineRun:
+    """One streaming run: a thread per stage (N for search), bounded queues between."""
+
+    def __init__(self, config, search_workers=SEARCH_WORKERS, parse_workers=1,
+                 score_workers=1, queue_size=QUEUE_SIZE, cache_only=False, watch=False):
+        self.config = config
+        self.search_workers = search_workers
+        self.parse_workers = parse_workers
+        self.score_workers = score_workers
+        self.cache_only = cache_only
+        self.watch = watch
+        self.to_parse = queue.Queue(queue_size)
+        self.to_search = queue.Queue(queue_size)
+        self.to_score = queue.Queue(queue_size)
+        self.stats = Counter()
+        self.parse_stats = Counter()    # email_parse's per-type counters
+        self.busy = Counter()       # seconds each stage spent working
+        self.scores = {}            # sourced key -> score_sourced_record outcome
+        self.errors = []
+        self.queue = None           # last published review queue
+        self._in_flight = 0         # emails being parsed + leads not yet scored
+        self._unpublished = False   # scored since the last publish
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._achievements = job_score.load_achievements()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _timed(self, stage, start):
+        with self._lock:
+            self.busy[stage] += time.perf_counter() - start
+
+    def _enter(self, n=1):
+        """n emails or leads entered the pipeline."""
+        with self._lock:
+            self._in_flight += n
+
+    def _leave(self, n=1, scored=False):
+        """n emails or leads are finished; in --watch mode, publish once drained."""
+        with self._lock:
+            self._in_flight -= n
+            self._unpublished |= scored
+            drained = self.watch and not self._in_flight and self._unpublished
+        if drained:
+            self.publish()
+
+    # -- stages ------------------------------------------------------------
+
+    def _fetch(self, new_mail, stop=None):
+        """Queue the unparsed backlog, then new_mail, until stop is set."""
+        stopped = stop.is_set if stop is not None else lambda: False
+        for email_dict in self._parse_backlog():
+            if stopped():
+                return
+            self._count("backlog_emails")
+            self._enter()
+            self.to_parse.put(email_dict)
+        items = iter(new_mail)
+        while not stopped():
+            start = time.perf_counter()
+            email_dict = next(items, None)
+            self._timed("fetch", start)
+            if email_dict is None:
+                return
+            self._count("fetched")
+            self._enter()
+            self.to_parse.put(email_dict)
+        # Stopped: let the source release its connection or pool in this thread
+        if hasattr(items, "close"):
+            items.close()
+
+    def _parse_backlog(self):
+        """Fetched emails with no parse results (e.g. a run stopped after fetch)."""
+        with open_stage(email_parse.STAGING_PARSED) as parsed:
+            done = set(parsed.keys())
+        blobs = BlobStore(email_parse.BLOBS_DIR)
+        with open_stage(email_parse.STAGING_RAW) as raw:
+            for key in sorted(k for k in raw.keys() if k not in done):
+                email_dict = hydrate(raw.get(key), blobs)
+                email_dict.setdefault("uid", key)
+                yield email_dict
+
+    def _search_backlog(self, parsed, ledger):
+        """Leads registered as pending search by an earlier parse."""
+        by_uid = {}
+        for key in ledger.pending("search"):
+            uid, index = key.rsplit("_", 1)
+            by_uid.setdefault(uid, set()).add(index)
+        for uid in sorted(by_uid):
+            for result in parsed.get(uid) or []:
+                if (result.get("type") == "job_lead"
+                        and str(result.get("lead_index", 0)) in by_uid[uid]):
+                    result["_source_file"] = f"{uid}.json"
+                    yield result
+
+    def _parse(self):
+        templates = self.config.get("sender_templates", {})
+        aliases = self.config.get("company_aliases", {})
+        with open_stage(email_parse.STAGING_PARSED) as parsed, \
+                open_ledger(email_parse.LEDGER_DB_PATH,
+                            os.path.dirname(email_parse.STAGING_RAW)) as ledger:
+            for lead in self._search_backlog(parsed, ledger):
+                self._count("backlog_leads")
+                self._enter()
+                self.to_search.put(lead)
+
+            for email_dict, (results, stats, error) in _pooled(
+                    self.to_parse, email_parse._parse_in_worker, self.parse_workers,
+                    email_parse._init_parse_worker, (templates, aliases)):
+                start = time.perf_counter()
+                key = str(email_dict["uid"])
+                email_parse.record_parse(parsed, ledger, key, results, error)
+                self._timed("parse", start)
+                self.parse_stats.update(stats)
+                self._count("parse_failed" if error else "parsed")
+                leads = [r for r in results or [] if r.get("type") == "job_lead"]
+                self._enter(len(leads))
+                for result in leads:
+                    result["_source_file"] = f"{key}.json"
+                    self.to_search.put(result)
+                self._leave()
+
+    def _search(self):
+        for lead in _drain(self.to_search):
+            record = career_search.load_sourced(lead)
+            if record is None:
+                lines = []
+                start = time.perf_counter()
+                try:
+                    outcome = career_search.source_lead(lead, self.config, log=lines.append)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    lines.append(f"      FAILED: {error}")
+                    career_search.mark_search_failed(lead, error)
+                    self._count("search_failed")
+                    self._leave()
+                    continue
+                finally:
+                    self._timed("search", start)
+                    print("\n".join(lines), flush=True)
+                self._count(outcome)
+                record = career_search.load_sourced(lead)
+            self.to_score.put((career_search.sourced_key(lead), record))
+
+    def _score(self):
+        prefs = self.config.get("user_preferences", {})
+        for (key, _), outcome in _pooled(self.to_score, _score_item, self.score_workers,
+                                         job_score._init_score_worker,
+                                         (self._achievements, prefs)):
+            with self._lock:
+                self.scores[key] = outcome
+                self.stats["scored_this_run"] += 1
+            self._leave(scored=True)
+
+    # -- running -----------------------------------------------------------
+
+    def publish(self):
+        """Rank every sourced record and write the review queue (job_score).
+
+        During a run the records are read through the sourcing session's
+        staging/sourced log, never a second copy of it.
+        """
+        with self._publish_lock:
+            with self._lock:
+                self._unpublished = False
+            return self._publish()
+
+    def _publish(self):
+        start = time.perf_counter()
+        with career_search.open_sourced() as stage:
+            keys = sorted(stage.keys())
+            missing = [key for key in keys if key not in self.scores]
+            records = [stage.get(key) for key in missing]
+        if not keys:
+            return None
+        outcomes = job_score.score_sourced_records(
+            records, self._achievements, self.config.get("user_preferences", {}),
+            workers=self.score_workers)
+        self.scores.update(zip(missing, outcomes))
+        self.queue = job_score.publish_scores(keys, [self.scores[key] for key in keys],
+                                              self.config)
+        self._timed("publish", start)
+        return self.queue
+
+    def _thread(self, name, body, inbox, outbox, count=1):
+        """Start count threads running body; the last one to exit closes outbox.
+
+        A stage that dies keeps draining its inbox, so upstream never blocks,
+        and lets each drained item leave so --watch still sees the pipeline drain.
+        """
+        remaining = [count]
+
+        def target():
+            try:
+                body()
+            except Exception as e:
+                self.errors.append(f"{name}: {type(e).__name__}: {e}")
+                print(f"  ERROR in {name} stage: {type(e).__name__}: {e}", flush=True)
+                if inbox is not None:
+                    for _ in _drain(inbox):
+                        self._leave()
+            finally:
+                with self._lock:
+                    remaining[0] -= 1
+                    last = not remaining[0]
+                if last:
+                    outbox.put(_END)
+
+        threads = [threading.Thread(target=target, name=f"{name}-{i}", daemon=True)
+                   for i in range(count)]
+        for t in threads:
+            t.start()
+        return threads
+
+    def run(self, new_mail, stop=None):
+        """Stream new_mail (an iterable of email dicts) through every stage.
+
+        Returns stats. With stop (a threading.Event), Ctrl-C sets it: no
+        more mail is fetched and the run drains what is already in flight
+        before returning. A second Ctrl-C aborts.
+        """
+        start = time.perf_counter()
+        with career_search.sourcing_session(self.config, cache_only=self.cache_only):
+            threads = (self._thread("fetch", lambda: self._fetch(new_mail, stop), None, self.to_parse)
+                       + self._thread("parse", self._parse, self.to_parse, self.to_search)
+                       + self._thread("search", self._search, self.to_search, self.to_score,
+                                      count=self.search_workers)
+                       + self._thread("score", self._score, self.to_score, queue.Queue()))
+            for t in threads:
+                while t.is_alive():
+                    try:
+                        t.join(0.5)
+                    except KeyboardInterrupt:
+                        if stop is None or stop.is_set():
+                            raise
+                        print("\n  Stopping: finishing emails already in the pipeline...")
+                        stop.set()
+        self.publish()
+        self.stats["seconds"] = time.perf_counter() - start
+        return self.stats
+
+
+# ---------------------------------------------------------------------------
+# Sources of new mail
+# ---------------------------------------------------------------------------
+
+def imap_batch(config, limit):
+    """Fetch, save and label up to limit new emails; yields the saved ones."""
+    conn = email_fetch.connect_imap(config)
+    try:
+        with email_fetch.open_dedup_store() as store:
+            state = email_fetch.load_sync_state()
+            emails = email_fetch.get_unprocessed_emails(conn, config, limit=limit,
+                                                        state=state, store=store)
+            saved, _, _ = email_fetch.save_fetched(conn, config, emails, store, state)
+            email_fetch.save_sync_state(state)
+    finally:
+        conn.logout()
+    yield from saved
+
+
+def imap_watch(config, stop, limit=0):
+    """Yield saved emails as IMAP IDLE reports them, until stop is set."""
+    inbox = queue.Queue()
+
+    def on_new(saved):
+        for email_dict in saved:
+            inbox.put(email_dict)
+
+    def run():
+        try:
+            email_fetch.watch(config, on_new=on_new, limit=limit, stop=stop,
+                              idle_seconds=config["email"].get("idle_seconds",
+                                                               email_fetch.IDLE_SECONDS))
+        finally:
+            inbox.put(_END)
+
+    threading.Thread(target=run, name="imap-watch", daemon=True).start()
+    yield from _drain(inbox)
+
+
+def offline_export(source, path, workers=1, limit=None):
+    """Yield emails saved from an mbox/Maildir/.eml export."""
+    stats = {}
+    with email_fetch.open_dedup_store() as store:
+        yield from email_fetch.iter_ingested(source, path, store, stats, workers, limit)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the email pipeline as one streaming process")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="fetch → parse → search → score")
+    run.add_argument("--limit", type=int, default=None,
+                     help="Max emails to fetch (default: 50 over IMAP, no limit offline)")
+    offline = run.add_mutually_exclusive_group()
+    offline.add_argument("--from-mbox", metavar="PATH", help="Ingest an mbox file instead of IMAP")
+    offline.add_argument("--from-maildir", metavar="PATH", help="Ingest a local Maildir")
+    offline.add_argument("--from-eml-dir", metavar="PATH", help="Ingest every .eml under a directory")
+    run.add_argument("--watch", action="store_true",
+                     help="Stay connected and process new mail as it arrives (IMAP IDLE)")
+    run.add_argument("--search-workers", type=int, default=SEARCH_WORKERS,
+                     help=f"Leads to career-search at once (default: {SEARCH_WORKERS})")
+    run.add_argument("--parse-workers", type=int, default=1,
+                     help="Processes for parsing (default: 1, in-thread)")
+    run.add_argument("--score-workers", type=int, default=1,
+                     help="Processes for scoring (default: 1, in-thread)")
+    run.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                     help=f"Items buffered between two stages (default: {QUEUE_SIZE})")
+    run.add_argument("--cache-only", action="store_true",
+                     help="Serve every career-search request from the HTTP cache")
+    args = parser.parse_args()
+
+    offline_source = next(((source, path) for source, path in (
+        ("mbox", args.from_mbox), ("maildir", args.from_maildir), ("eml", args.from_eml_dir))
+        if path), None)
+    if args.watch and offline_source:
+        parser.error("--watch cannot be combined with offline ingestion")
+
+    print("=" * 60)
+    print("  EMAIL PIPELINE — STREAMING RUN")
+    print("=" * 60)
+
+    stop = threading.Event()
+    if offline_source:
+        source, path = offline_source
+        if not os.path.exists(path):
+            print(f"  ERROR: {path} not found")
+            sys.exit(1)
+        config = career_search.load_config()
+        new_mail = offline_export(source, path, limit=args.limit)
+        print(f"\n  Source: {source} export {path}")
+    else:
+        config = email_fetch.load_config()
+        if args.watch:
+            new_mail = imap_watch(config, stop, limit=args.limit or 0)
+            print(f"\n  Source: {config['email'].get('mailbox', 'INBOX')} (IDLE). Ctrl-C to stop.")
+        else:
+            new_mail = imap_batch(config, args.limit if args.limit is not None else 50)
+            print(f"\n  Source: {config['email'].get('mailbox', 'INBOX')}")
+    print(f"  Workers: parse {args.parse_workers}, search {args.search_workers}, "
+          f"score {args.score_workers}; queues hold {args.queue_size}")
+
+    pipeline = PipelineRun(config, search_workers=args.search_workers,
+                           parse_workers=args.parse_workers, score_workers=args.score_workers,
+                           queue_size=args.queue_size, cache_only=args.cache_only,
+                           watch=args.watch)
+    stats = pipeline.run(new_mail, stop=stop)
+
+    print(f"\n  Results ({datetime.now():%H:%M:%S}):")
+    print(f"    Emails fetched:   {stats['fetched']} (+{stats['backlog_emails']} unparsed from before)")
+    print(f"    Emails parsed:    {stats['parsed']}" +
+          (f" ({stats['parse_failed']} failed)" if stats["parse_failed"] else ""))
+    print(f"    Leads found:      {pipeline.parse_stats['leads_found']} (+{stats['backlog_leads']} pending from before)")
+    print(f"    Sourced:          {stats['sourced']}")
+    print(f"    Unresolved:       {stats['unresolved']}" +
+          (f" ({stats['search_failed']} failed)" if stats["search_failed"] else ""))
+    print(f"    Scored this run:  {stats['scored_this_run']}")
+    if pipeline.queue is not None:
+        print(f"    Review queue:     {len(pipeline.queue['leads'])} leads")
+    print(f"\n  Wall time: {stats['seconds']:.1f}s. Busy time per stage (runs overlap):")
+    for stage in ("fetch", "parse", "search", "score", "publish"):
+        if pipeline.busy[stage]:
+            print(f"    {stage:<8} {pipeline.busy[stage]:>7.1f}s")
+    for error in pipeline.errors:
+        print(f"  ERROR: {error}")
+    if pipeline.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
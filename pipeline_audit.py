@@ -17,6 +17,8 @@ RAW_DIR = PIPELINE / "staging" / "raw"
 PARSED_DIR = PIPELINE / "staging" / "parsed"
 SOURCED_DIR = PIPELINE / "staging" / "sourced"
 FINGERPRINTS = PIPELINE / "fingerprints.json"
+DEDUP_DB = PIPELINE / "dedup.sqlite3"
+LEDGER_DB = PIPELINE / "ledger.sqlite3"
 REVIEW_QUEUE = PIPELINE / "review_queue.json"
 APPLICATIONS = BASE / "applications"
 CONFIG = BASE / "pipeline_config.json"
@@ -25,6 +27,10 @@ def load_json(path):
     with open(path, encoding="utf-8") as f:
         return json.load(f)
 
+def uid_key(uid):
+    """Sort IMAP UIDs numerically, offline ids (mbox-..., eml-...) after them."""
+    return (0, int(uid), "") if uid.isdigit() else (1, 0, uid)
+
 def section(title):
     print(f"\n{'='*70}")
     print(f"  {title}")
@@ -52,7 +58,10 @@ if not app_password:
 else:
     try:
         print(f"Connecting to {imap_host}:{imap_port} as {gmail_addr}...")
-        mail = imaplib.IMAP4_SSL(imap_host, imap_port)
+        if config["email"].get("imap_ssl", True):
+            mail = imaplib.IMAP4_SSL(imap_host, imap_port)
+        else:
+            mail = imaplib.IMAP4(imap_host, imap_port)
         mail.login(gmail_addr, app_password)
 
         # Check INBOX
@@ -125,30 +134,63 @@ else:
 # ─────────────────────────────────────────────────────
 section("2. LOCAL PIPELINE ANALYSIS")
 
-# Load fingerprints
-fingerprints = load_json(FINGERPRINTS)
-print(f"Fingerprints: {len(fingerprints)} message_id -> UID mappings")
-fp_uids = set(fingerprints.values())
-print(f"  Unique UIDs in fingerprints: {sorted(fp_uids, key=int)}")
+# Load the dedup index (SQLite store, or the legacy fingerprints.json)
+if DEDUP_DB.exists():
+    from dedup_store import DedupStore
+    with DedupStore(str(DEDUP_DB)) as store:
+        fingerprint_count = store.count("fingerprint")
+        fp_uids = store.uids()
+else:
+    # Legacy values are IMAP sequence numbers, not UIDs
+    fingerprint_count = len(load_json(FINGERPRINTS))
+    fp_uids = set()
+print(f"Fingerprints: {fingerprint_count}")
+print(f"  IMAP UIDs recorded: {sorted(fp_uids, key=uid_key)}")
+
+# Staged records (record logs, plus any legacy one-file-per-record JSON)
+from record_log import open_stage
+raw_stage = open_stage(str(RAW_DIR))
+parsed_stage = open_stage(str(PARSED_DIR))
+sourced_stage = open_stage(str(SOURCED_DIR))
 
 # Raw emails
-raw_files = sorted([f.stem for f in RAW_DIR.glob("*.json")], key=int)
-print(f"\nRaw fetched emails: {len(raw_files)} files")
+raw_files = sorted(raw_stage.keys(), key=uid_key)
+print(f"\nRaw fetched emails: {len(raw_files)} records")
 print(f"  UIDs: {raw_files}")
 
 # Parsed emails
-parsed_files = sorted([f.stem for f in PARSED_DIR.glob("*.json")], key=int)
-print(f"\nParsed emails: {len(parsed_files)} files")
+parsed_files = sorted(parsed_stage.keys(), key=uid_key)
+print(f"\nParsed emails: {len(parsed_files)} records")
 print(f"  UIDs: {parsed_files}")
 
-# Sourced leads
-sourced_files = sorted(SOURCED_DIR.glob("*.json"))
+# Sourced leads (keyed "<uid>_<lead index>")
+sourced_files = sorted(sourced_stage.keys())
 sourced_by_uid = defaultdict(list)
 for f in sourced_files:
-    parts = f.stem.split("_")
-    uid = parts[0]
-    sourced_by_uid[uid].append(f.name)
-print(f"\nSourced leads: {len(sourced_files)} files from {len(sourced_by_uid)} emails")
+    uid = f.rsplit("_", 1)[0]
+    sourced_by_uid[uid].append(f)
+print(f"\nSourced leads: {len(sourced_files)} records from {len(sourced_by_uid)} emails")
+
+# Per-stage status from the pipeline ledger (indexed queries, no record loads)
+if LEDGER_DB.exists():
+    from pipeline_ledger import STAGES, PipelineLedger
+    subsection("Pipeline Ledger")
+    with PipelineLedger(str(LEDGER_DB)) as ledger:
+        counts = ledger.counts()
+        for stage in STAGES:
+            by_status = counts.get(stage, {})
+            detail = ", ".join(f"{status} {n}" for status, n in sorted(by_status.items()))
+            print(f"  {stage:<7} {sum(by_status.values()):>5}  {detail}")
+        for stage in ("parse", "search"):
+            pending = ledger.pending(stage)
+            if pending:
+                print(f"\n  Waiting for {stage}: {len(pending)}  {sorted(pending)[:20]}")
+        for stage in STAGES:
+            retry = ledger.retry(stage)
+            if retry:
+                print(f"\n  {stage} failed/unresolved: {len(retry)}")
+                for key, status, error, attempts in retry[:20]:
+                    print(f"    {key}: {status} after {attempts} attempt(s) — {(error or '?')[:70]}")
 
 # ─────────────────────────────────────────────────────
 # 3. Gap Analysis: Fetching
@@ -165,7 +207,7 @@ if gmail_emails:
     inbox_not_fetched = gmail_uid_set - raw_uid_set
     if inbox_not_fetched:
         print(f"\n*** INBOX emails NOT fetched to pipeline: {len(inbox_not_fetched)} ***")
-        for uid in sorted(inbox_not_fetched, key=lambda x: int(x) if x.isdigit() else 0):
+        for uid in sorted(inbox_not_fetched, key=uid_key):
             info = gmail_emails[uid]
             print(f"  UID {uid}: {info['subject'][:80]}")
             print(f"           Date: {info['date']}")
@@ -177,8 +219,8 @@ if gmail_emails:
     fetched_not_in_inbox = raw_uid_set - gmail_uid_set
     if fetched_not_in_inbox:
         print(f"\nFetched emails no longer in INBOX: {len(fetched_not_in_inbox)}")
-        for uid in sorted(fetched_not_in_inbox, key=int):
-            raw = load_json(RAW_DIR / f"{uid}.json")
+        for uid in sorted(fetched_not_in_inbox, key=uid_key):
+            raw = raw_stage.get(uid, {})
             print(f"  UID {uid}: {raw.get('subject', '?')[:80]}")
 
     # Check if moved to processed
@@ -191,12 +233,13 @@ else:
     print("(Gmail connection unavailable — checking local consistency only)")
 
     # Check if UIDs are sequential
-    if raw_files:
-        max_uid = max(int(u) for u in raw_files)
+    imap_uids = [u for u in raw_files if u.isdigit()]
+    if imap_uids:
+        max_uid = max(int(u) for u in imap_uids)
         expected = set(str(i) for i in range(1, max_uid + 1))
         missing_uids = expected - raw_uid_set
         if missing_uids:
-            print(f"\nGap in UID sequence (1-{max_uid}): missing UIDs {sorted(missing_uids, key=int)}")
+            print(f"\nGap in UID sequence (1-{max_uid}): missing UIDs {sorted(missing_uids, key=uid_key)}")
         else:
             print(f"\nUIDs are sequential from 1 to {max_uid}. No local gaps.")
 
@@ -210,8 +253,8 @@ parsed_not_fetched = parsed_uid_set - raw_uid_set
 
 if fetched_not_parsed:
     print(f"\n*** Fetched but NOT parsed: {len(fetched_not_parsed)} emails ***")
-    for uid in sorted(fetched_not_parsed, key=int):
-        raw = load_json(RAW_DIR / f"{uid}.json")
+    for uid in sorted(fetched_not_parsed, key=uid_key):
+        raw = raw_stage.get(uid, {})
         print(f"  UID {uid}: {raw.get('subject', '?')[:80]}")
 else:
     print("\nAll fetched emails have been parsed. No gaps.")
@@ -232,7 +275,7 @@ uids_unresolved = set()
 uids_no_leads = set()
 
 for uid in parsed_files:
-    parsed = load_json(PARSED_DIR / f"{uid}.json")
+    parsed = parsed_stage.get(uid)
     leads = []
     if isinstance(parsed, list):
         leads = parsed
@@ -268,8 +311,8 @@ sourced_uid_set = set(sourced_by_uid.keys())
 leads_not_sourced = uids_with_leads - sourced_uid_set
 if leads_not_sourced:
     print(f"\n*** Emails with leads but NO sourced files: {len(leads_not_sourced)} ***")
-    for uid in sorted(leads_not_sourced, key=int):
-        raw = load_json(RAW_DIR / f"{uid}.json")
+    for uid in sorted(leads_not_sourced, key=uid_key):
+        raw = raw_stage.get(uid, {})
         print(f"  UID {uid}: {raw.get('subject', '?')[:80]}")
 else:
     print("\nAll emails with leads have sourced files.")
@@ -300,11 +343,11 @@ for item in all_rq_items:
 
 sourced_not_in_rq = sourced_uid_set - rq_uid_set
 if sourced_not_in_rq:
-    print(f"\n*** Sourced leads from emails NOT in review queue: UIDs {sorted(sourced_not_in_rq, key=int)} ***")
-    for uid in sorted(sourced_not_in_rq, key=int):
+    print(f"\n*** Sourced leads from emails NOT in review queue: UIDs {sorted(sourced_not_in_rq, key=uid_key)} ***")
+    for uid in sorted(sourced_not_in_rq, key=uid_key):
         files = sourced_by_uid[uid]
         for f in files:
-            lead = load_json(SOURCED_DIR / f)
+            lead = sourced_stage.get(f)
             lead_data = lead.get("lead", lead)
             print(f"  {f}: {lead_data.get('company','?')} — {lead_data.get('role','?')}")
 
@@ -367,9 +410,9 @@ else:
 
 subsection("Sourced Leads with Bad Data")
 bad_sourced = []
-for uid, files in sorted(sourced_by_uid.items(), key=lambda x: int(x[0])):
+for uid, files in sorted(sourced_by_uid.items(), key=lambda x: uid_key(x[0])):
     for f in files:
-        lead_data = load_json(SOURCED_DIR / f)
+        lead_data = sourced_stage.get(f)
         lead = lead_data.get("lead", lead_data)
         company = lead.get("company", "")
         role = lead.get("role", "")
@@ -395,7 +438,7 @@ section("8. PARSED EMAIL TYPE BREAKDOWN")
 
 type_counts = defaultdict(int)
 for uid in parsed_files:
-    parsed = load_json(PARSED_DIR / f"{uid}.json")
+    parsed = parsed_stage.get(uid)
     leads = []
     if isinstance(parsed, list):
         leads = parsed
@@ -468,7 +511,7 @@ section("11. END-TO-END COVERAGE SUMMARY")
 
 print(f"""
 Gmail INBOX emails:        {len(gmail_emails) if gmail_emails else 'N/A (no connection)'}
-Fingerprinted (fetched):   {len(fingerprints)}
+Fingerprinted (fetched):   {fingerprint_count}
 Raw email files:           {len(raw_files)}
 Parsed email files:        {len(parsed_files)}
 Sourced lead files:        {len(sourced_files)} (from {len(sourced_by_uid)} emails)
@@ -493,4 +536,7 @@ if gmail_emails:
     if gap_count:
         print(f"\n  *** {gap_count} GMAIL EMAILS NOT IN PIPELINE — SEE SECTION 3 ***")
 
+for stage in (raw_stage, parsed_stage, sourced_stage):
+    stage.close()
+
 print("\nAudit complete.")
@@ -0,0 +1,317 @@
+"""
+SQLite ledger of where every email and lead is in the pipeline.
+
+One row per (key, stage). Keys are the email UID for the fetch and parse
+stages, and "<email_uid>_<lead_index>" (the staging/sourced key) for the
+search and score stages. Each row holds the stage status, a SHA-256 of
+the record the stage wrote, the error or unresolved reason, an attempt
+count and first/last timestamps. (stage, status) and email_uid are
+indexed, so "what's pending", retry lists and audits are queries instead
+of scans over the staging logs and their JSON records.
+
+Each stage updates its rows as it writes records: email_fetch marks
+fetch, email_parse marks parse and registers the leads it found as
+pending search, career_search marks search and job_score marks score.
+The first open of a new ledger backfills fetch/parse/search from the
+staging records already on disk.
+
+Statuses:
+    pending      known, not processed yet (leads between parse and search)
+    done         the stage wrote its record
+    unresolved   processed without a usable result (career search)
+    skipped      deliberately not processed further (auto-skip in scoring)
+    failed       the stage raised; `error` holds the reason
+
+Usage:
+    python pipeline_ledger.py                 # counts per stage and status
+    python pipeline_ledger.py pending STAGE   # keys waiting for STAGE
+    python pipeline_ledger.py retry STAGE     # failed/unresolved keys with reasons
+    python pipeline_ledger.py show UID        # every row for one email and its leads
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from record_log import LOG_SUFFIX, open_stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
+LEDGER_DB_PATH = os.path.join(PIPELINE_DIR, "ledger.sqlite3")
+STAGING_DIR = os.path.join(PIPELINE_DIR, "staging")
+
+STAGES = ("fetch", "parse", "search", "score")
+LEAD_STAGES = ("search", "score")
+RETRY_STATUSES = ("failed", "unresolved")
+
+# A key is pending for a stage once its row for the upstream stage is done
+UPSTREAM = {"parse": "fetch", "score": "search"}
+
+# Inside batch(), commit after this many rows so a long run never holds
+# the write lock for long
+BATCH_COMMIT_ROWS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    key          TEXT NOT NULL,
+    stage        TEXT NOT NULL,
+    email_uid    TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    content_hash TEXT,
+    error        TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    created_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (key, stage)
+);
+CREATE INDEX IF NOT EXISTS ledger_stage_status ON ledger (stage, status);
+CREATE INDEX IF NOT EXISTS ledger_email_uid ON ledger (email_uid);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT = """
+INSERT INTO ledger (key, stage, email_uid, status, content_hash, error, attempts,
+                    created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+ON CONFLICT (key, stage) DO UPDATE SET
+    status = excluded.status, content_hash = excluded.content_hash,
+    error = excluded.error, attempts = attempts + 1, updated_at = excluded.updated_at
+"""
+
+_COLUMNS = ("key", "stage", "email_uid", "status", "content_hash", "error", "attempts",
+            "created_at", "updated_at")
+
+
+def record_hash(record):
+    """SHA-256 of a staging record's canonical JSON."""
+    data = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def email_uid_of(key, stage):
+    """The email UID a ledger key belongs to."""
+    return key.rsplit("_", 1)[0] if stage in LEAD_STAGES else key
+
+
+class PipelineLedger:
+    """Per-stage status of every email UID and lead key, in SQLite."""
+
+    def __init__(self, path=LEDGER_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared by career_search's worker threads; every call takes the lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._uncommitted = 0
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def batch(self):
+        """Group the marks made inside the block into few transactions.
+
+        Rows are committed every BATCH_COMMIT_ROWS and at the end of the
+        block. The records the marks describe are already written by then,
+        so the rows are committed even if the block raises.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def _execute(self, sql, rows):
+        with self._lock:
+            cursor = self._conn.executemany(sql, rows)
+            self._uncommitted += max(cursor.rowcount, 1)
+            if not self._batch_depth or self._uncommitted >= BATCH_COMMIT_ROWS:
+                self._commit()
+
+    # -- writes ------------------------------------------------------------
+
+    def mark(self, key, stage, status, content_hash=None, error=None):
+        """Record the outcome of one stage for one key."""
+        self.mark_many(stage, [(key, status, content_hash, error)])
+
+    def mark_many(self, stage, rows):
+        """Record (key, status, content_hash, error) outcomes for one stage."""
+        now = datetime.now().isoformat()
+        self._execute(_UPSERT, [(str(key), stage, email_uid_of(str(key), stage), status,
+                                 content_hash, error, now, now)
+                                for key, status, content_hash, error in rows])
+
+    def add_pending(self, stage, keys):
+        """Register keys as pending for stage; existing rows are left alone."""
+        now = datetime.now().isoformat()
+        self._execute(
+            "INSERT OR IGNORE INTO ledger (key, stage, email_uid, status, attempts,"
+            " created_at, updated_at) VALUES (?, ?, ?, 'pending', 0, ?, ?)",
+            [(str(key), stage, email_uid_of(str(key), stage), now, now) for key in keys])
+
+    # -- queries -----------------------------------------------------------
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, key, stage):
+        """The row for key at stage as a dict, or None."""
+        rows = self._query(f"SELECT {', '.join(_COLUMNS)} FROM ledger"
+                           " WHERE key = ? AND stage = ?", (str(key), stage))
+        return dict(zip(_COLUMNS, rows[0])) if rows else None
+
+    def keys(self, stage, status=None):
+        """Set of keys with a row for stage, optionally only in status (str or tuple)."""
+        if status is None:
+            rows = self._query("SELECT key FROM ledger WHERE stage = ?", (stage,))
+        else:
+            statuses = (status,) if isinstance(status, str) else tuple(status)
+            marks = ", ".join("?" * len(statuses))
+            rows = self._query(f"SELECT key FROM ledger WHERE stage = ? AND status IN ({marks})",
+                               (stage, *statuses))
+        return {row[0] for row in rows}
+
+    def pending(self, stage):
+        """Keys waiting for stage: registered as pending, or done upstream with no row here."""
+        sql = "SELECT key FROM ledger WHERE stage = ? AND status = 'pending'"
+        params = [stage]
+        if stage in UPSTREAM:
+            sql += (" UNION SELECT u.key FROM ledger u WHERE u.stage = ? AND u.status = 'done'"
+                    " AND NOT EXISTS (SELECT 1 FROM ledger d WHERE d.key = u.key AND d.stage = ?)")
+            params += [UPSTREAM[stage], stage]
+        return {row[0] for row in self._query(sql, params)}
+
+    def retry(self, stage):
+        """[(key, status, error, attempts)] for failed and unresolved rows of stage."""
+        return self._query(
+            "SELECT key, status, error, attempts FROM ledger WHERE stage = ?"
+            " AND status IN (?, ?) ORDER BY updated_at", (stage, *RETRY_STATUSES))
+
+    def for_email(self, email_uid):
+        """Every row for one email and its leads, as dicts."""
+        rows = self._query(f"SELECT {', '.join(_COLUMNS)} FROM ledger WHERE email_uid = ?"
+                           " ORDER BY key, created_at", (str(email_uid),))
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def counts(self):
+        """{stage: {status: rows}}."""
+        counts = {}
+        for stage, status, n in self._query(
+                "SELECT stage, status, COUNT(*) FROM ledger GROUP BY stage, status"):
+            counts.setdefault(stage, {})[status] = n
+        return counts
+
+    # -- backfill ----------------------------------------------------------
+
+    def backfill(self, staging_dir=STAGING_DIR):
+        """Import the state of records already staged, once.
+
+        Returns the number of rows written (0 if already done).
+        """
+        if self._query("SELECT 1 FROM meta WHERE key = 'backfilled_at'"):
+            return 0
+        written = 0
+        with self.batch():
+            for name, stage in (("raw", "fetch"), ("parsed", "parse"), ("sourced", "search")):
+                path = os.path.join(staging_dir, name)
+                if not (os.path.isdir(path) or os.path.isdir(path + LOG_SUFFIX)):
+                    continue
+                with open_stage(path) as records:
+                    for key, record in records.items():
+                        if stage == "search":
+                            status = "done" if record.get("status") == "sourced" else "unresolved"
+                            self.mark(key, stage, status, record_hash(record),
+                                      record.get("unresolved_reason"))
+                        else:
+                            self.mark(key, stage, "done", record_hash(record))
+                        if stage == "parse":
+                            self.add_pending("search", lead_keys(record))
+                        written += 1
+            self._execute("INSERT INTO meta (key, value) VALUES ('backfilled_at', ?)",
+                          [(datetime.now().isoformat(),)])
+        return written
+
+
+def lead_keys(results):
+    """Ledger keys of the job leads in one email's parse results."""
+    if not isinstance(results, list):
+        results = [results]
+    return [f"{r['email_uid']}_{r.get('lead_index', 0)}" for r in results
+            if r.get("type") == "job_lead" and r.get("email_uid") is not None]
+
+
+def open_ledger(path=LEDGER_DB_PATH, staging_dir=STAGING_DIR):
+    """Open the ledger, backfilling it from the staging records on first use."""
+    ledger = PipelineLedger(path)
+    written = ledger.backfill(staging_dir)
+    if written:
+        print(f"  Backfilled {written} staged records into {path}")
+    return ledger
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the pipeline ledger")
+    parser.add_argument("command", nargs="?", default="counts",
+                        choices=("counts", "pending", "retry", "show"))
+    parser.add_argument("arg", nargs="?", help="STAGE for pending/retry, email UID for show")
+    args = parser.parse_args()
+    if args.command in ("pending", "retry") and args.arg not in STAGES:
+        parser.error(f"{args.command} needs a stage: {', '.join(STAGES)}")
+    if args.command == "show" and not args.arg:
+        parser.error("show needs an email UID")
+
+    with open_ledger() as ledger:
+        if args.command == "counts":
+            counts = ledger.counts()
+            print(f"  {ledger.path}")
+            for stage in STAGES:
+                by_status = counts.get(stage, {})
+                detail = ", ".join(f"{status} {n}" for status, n in sorted(by_status.items()))
+                print(f"    {stage:<7} {sum(by_status.values()):>6}  {detail}")
+                if stage in UPSTREAM:
+                    print(f"            {len(ledger.pending(stage))} waiting for {stage}")
+        elif args.command == "pending":
+            for key in sorted(ledger.pending(args.arg)):
+                print(f"  {key}")
+        elif args.command == "retry":
+            for key, status, error, attempts in ledger.retry(args.arg):
+                print(f"  {key:<16} {status:<10} attempts={attempts}  {error or ''}")
+        else:
+            for row in ledger.for_email(args.arg):
+                print(f"  {row['key']:<16} {row['stage']:<7} {row['status']:<10} "
+                      f"{row['updated_at'][:19]}  {row['error'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""
+Segmented, append-only JSONL record log for the pipeline staging stages.
+
+Replaces the one-pretty-printed-JSON-file-per-record layout of
+staging/raw, staging/parsed and staging/sourced. Each stage directory
+gets a sibling log directory:
+
+    staging/raw.log/
+        00000001.jsonl    {"k": "<key>", "v": <record>}  one line per write
+        00000002.jsonl    a new segment starts past max_segment_bytes
+        index.json        key -> [segment, byte offset, length]
+
+A write appends one line and updates the in-memory offset index, so a
+record is rewritten by appending a newer version. get() is one seek and
+one read; items() streams the segments in write order and skips
+superseded lines without decoding them. The index is saved on close; a
+log opened after a crash re-reads only the segment bytes the saved index
+does not cover and stops at a torn final line. Only the writer removes
+that line, when it first appends to the segment: a reader may be looking
+at a line another process is still writing. compact() copies the live
+lines into fresh segments and deletes the old ones; close() does it
+automatically once more than half the log is superseded.
+
+Keys are strings: the email UID for raw and parsed, "<email_uid>_<lead_index>"
+for sourced.
+
+Stage (open_stage) is the compatibility reader: it serves records from
+the log first and falls back to any legacy <key>.json files still in the
+stage directory, so unmigrated data and tools that drop plain JSON files
+there keep working. Writes always go to the log. `migrate` imports the
+legacy files and moves the old directory aside to <dir>.migrated.
+
+One process writes a given stage at a time (threads may share a Stage).
+
+Usage:
+    python record_log.py stats               # records/segments/bytes per stage
+    python record_log.py migrate [STAGE...]  # import legacy JSON files
+    python record_log.py compact [STAGE...]
+"""
+
+import json
+import os
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
+STAGING_DIR = os.path.join(PIPELINE_DIR, "staging")
+STAGES = ("raw", "parsed", "sourced")
+
+MAX_SEGMENT_BYTES = 16 * 1024 * 1024
+INDEX_NAME = "index.json"
+LOG_SUFFIX = ".log"
+
+# A writer's close() compacts once superseded bytes pass both of these
+COMPACT_MIN_GARBAGE = 1024 * 1024
+COMPACT_GARBAGE_RATIO = 0.5
+
+
+def _segment_name(number):
+    return f"{number:08d}.jsonl"
+
+
+def _encode(key, value):
+    line = json.dumps({"k": key, "v": value}, ensure_ascii=False, separators=(",", ":"))
+    return line.encode("utf-8") + b"\n"
+
+
+class RecordLog:
+    """Append-only key -> JSON value log in numbered segment files."""
+
+    def __init__(self, directory, max_segment_bytes=MAX_SEGMENT_BYTES):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.RLock()
+        self._index = {}      # key -> (segment, offset, length)
+        self._sizes = {}      # segment -> bytes covered by _index
+        self._garbage = 0     # bytes of superseded lines
+        self._writer = None
+        self._readers = {}
+        self._dirty = False
+        self._wrote = False   # only a writer compacts on close
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # -- open / recovery ---------------------------------------------------
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, _segment_name(number))
+
+    def _on_disk(self):
+        numbers = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext == ".jsonl" and stem.isdigit():
+                numbers.append(int(stem))
+        return sorted(numbers)
+
+    def _load(self):
+        saved = {}
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, encoding="utf-8") as f:
+                    saved = json.load(f)
+            except ValueError:
+                saved = {}   # torn index: rebuild from the segments
+        segments = self._on_disk()
+        sizes = {int(n): size for n, size in saved.get("segments", {}).items()}
+        # The saved index is only a cache; trust it if every segment it
+        # covers is still on disk and at least as long as it was.
+        if all(n in segments and os.path.getsize(self._segment_path(n)) >= size
+               for n, size in sizes.items()):
+            self._index = {k: tuple(v) for k, v in saved.get("keys", {}).items()}
+            self._sizes = sizes
+            self._garbage = saved.get("garbage", 0)
+        for number in segments:
+            self._scan_tail(number)
+
+    def _scan_tail(self, number, repair=False):
+        """Index lines past what the index covers, up to any torn last line.
+
+        repair truncates the torn line; only the writer passes it.
+        """
+        path = self._segment_path(number)
+        start = self._sizes.get(number, 0)
+        size = os.path.getsize(path)
+        if size <= start:
+            self._sizes[number] = size
+            return
+        offset = start
+        with open(path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(entry["k"], entry.get("d"), number, offset, len(line))
+                offset += len(line)
+        if repair and offset < size:
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        self._sizes[number] = offset
+        self._dirty = True
+
+    def _apply(self, key, deleted, number, offset, length):
+        old = self._index.pop(key, None)
+        if old:
+            self._garbage += old[2]
+        if deleted:
+            self._garbage += length
+        else:
+            self._index[key] = (number, offset, length)
+
+    # -- writes ------------------------------------------------------------
+
+    def _append(self, key, line, deleted=False):
+        with self._lock:
+            number = max(self._sizes, default=1)
+            if self._writer is None or self._writer[0] != number:
+                self._open_writer(number)
+            size = self._sizes.get(number, 0)
+            if size and size + len(line) > self.max_segment_bytes:
+                number, size = number + 1, 0
+                self._open_writer(number)
+            f = self._writer[1]
+            f.write(line)
+            f.flush()
+            self._sizes[number] = size + len(line)
+            self._apply(key, deleted, number, size, len(line))
+            self._dirty = self._wrote = True
+
+    def _open_writer(self, number):
+        """Append to segment number, first indexing its tail and cutting a torn line."""
+        self._close_writer()
+        if os.path.exists(self._segment_path(number)):
+            self._scan_tail(number, repair=True)
+        self._writer = (number, open(self._segment_path(number), "ab"))
+
+    def put(self, key, value):
+        """Append a new version of key."""
+        self._append(key, _encode(key, value))
+
+    def delete(self, key):
+        """Append a tombstone; a no-op for unknown keys."""
+        if key in self._index:
+            line = json.dumps({"k": key, "d": 1}, ensure_ascii=False).encode("utf-8") + b"\n"
+            self._append(key, line, deleted=True)
+
+    # -- reads -------------------------------------------------------------
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        with self._lock:
+            return list(self._index)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return default
+            number, offset, length = entry
+            f = self._readers.get(number)
+            if f is None:
+                f = self._readers[number] = open(self._segment_path(number), "rb")
+            f.seek(offset)
+            return json.loads(f.read(length))["v"]
+
+    def items(self):
+        """(key, value) for every live record, in write order."""
+        with self._lock:
+            live = {(number, offset) for number, offset, _ in self._index.values()}
+            segments = sorted(self._sizes.items())
+        for number, size in segments:
+            offset = 0
+            with open(self._segment_path(number), "rb") as f:
+                for line in f:
+                    if offset >= size:
+                        break
+                    if (number, offset) in live:
+                        entry = json.loads(line)
+                        yield entry["k"], entry["v"]
+                    offset += len(line)
+
+    def stats(self):
+        total = sum(self._sizes.values())
+        return {"records": len(self._index), "segments": len(self._sizes),
+                "bytes": total, "garbage_bytes": self._garbage}
+
+    # -- maintenance -------------------------------------------------------
+
+    def compact(self):
+        """Rewrite the live lines into new segments and delete the old ones.
+
+        Returns (bytes before, bytes after).
+        """
+        with self._lock:
+            before = sum(self._sizes.values())
+            old = sorted(self._sizes)
+            self._close_files()
+            by_position = sorted((entry, key) for key, entry in self._index.items())
+            number = max(old, default=0) + 1
+            index, sizes = {}, {}
+            out = None
+            for (segment, offset, length), key in by_position:
+                f = self._readers.get(segment)
+                if f is None:
+                    f = self._readers[segment] = open(self._segment_path(segment), "rb")
+                f.seek(offset)
+                line = f.read(length)
+                full = out is not None and sizes[number] and \
+                    sizes[number] + length > self.max_segment_bytes
+                if full:
+                    out.close()
+                    number += 1
+                if out is None or full:
+                    out = open(self._segment_path(number), "wb")
+                    sizes[number] = 0
+                out.write(line)
+                index[key] = (number, sizes[number], length)
+                sizes[number] += length
+            if out is not None:
+                out.flush()
+                os.fsync(out.fileno())
+                out.close()
+            self._close_files()
+            self._index, self._sizes, self._garbage = index, sizes, 0
+            self._dirty = True
+            self.save_index()   # new index first, then the old segments go
+            for segment in old:
+                os.remove(self._segment_path(segment))
+            return before, sum(sizes.values())
+
+    def needs_compaction(self):
+        total = sum(self._sizes.values())
+        return (self._garbage >= COMPACT_MIN_GARBAGE
+                and self._garbage > COMPACT_GARBAGE_RATIO * total)
+
+    def save_index(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"segments": {str(n): s for n, s in self._sizes.items()},
+                    "keys": self._index, "garbage": self._garbage}
+            path = os.path.join(self.directory, INDEX_NAME)
+            tmp = f"{path}.{os.getpid()}.tmp"   # readers in other processes save too
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+            self._dirty = False
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer[1].close()
+            self._writer = None
+
+    def _close_files(self):
+        self._close_writer()
+        for f in self._readers.values():
+            f.close()
+        self._readers = {}
+
+    def close(self):
+        with self._lock:
+            if self._wrote and self.needs_compaction():
+                self.compact()
+            self._close_files()
+            self.save_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Stage: log plus legacy one-file-per-record fallback
+# ---------------------------------------------------------------------------
+
+class Stage:
+    """A staging stage: its RecordLog plus any legacy <key>.json files."""
+
+    def __init__(self, path, max_segment_bytes=MAX_SEGMENT_BYTES):
+        self.path = path
+        self.log = RecordLog(path + LOG_SUFFIX, max_segment_bytes)
+        self._legacy = self._legacy_keys()
+
+    def _legacy_keys(self):
+        if not os.path.isdir(self.path):
+            return set()
+        return {name[:-5] for name in os.listdir(self.path) if name.endswith(".json")}
+
+    def _load_legacy(self, key):
+        with open(os.path.join(self.path, f"{key}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def __contains__(self, key):
+        return key in self.log or key in self._legacy
+
+    def __len__(self):
+        return len(self.log) + len(self._legacy.difference(self.log.keys()))
+
+    def keys(self):
+        keys = self.log.keys()
+        return keys + sorted(self._legacy.difference(keys))
+
+    def get(self, key, default=None):
+        if key in self.log:
+            return self.log.get(key)
+        if key in self._legacy:
+            return self._load_legacy(key)
+        return default
+
+    def items(self):
+        """Log records in write order, then legacy files by name."""
+        yield from self.log.items()
+        for key in sorted(self._legacy.difference(self.log.keys())):
+            yield key, self._load_legacy(key)
+
+    def put(self, key, value):
+        self.log.put(key, value)
+
+    def delete(self, key):
+        self.log.delete(key)
+        if key in self._legacy:
+            os.remove(os.path.join(self.path, f"{key}.json"))
+            self._legacy.discard(key)
+
+    def migrate(self):
+        """Import legacy files the log does not have; move the directory aside.
+
+        Returns the number of records imported.
+        """
+        imported = 0
+        for key in sorted(self._legacy):
+            if key not in self.log:
+                self.log.put(key, self._load_legacy(key))
+                imported += 1
+        if os.path.isdir(self.path):
+            self.log.save_index()
+            os.replace(self.path, self.path + ".migrated")
+        self._legacy = set()
+        return imported
+
+    def compact(self):
+        return self.log.compact()
+
+    def stats(self):
+        stats = self.log.stats()
+        stats["legacy_files"] = len(self._legacy)
+        return stats
+
+    def close(self):
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_stage(path, **kwargs):
+    """Open the stage whose legacy directory is path (e.g. staging/raw)."""
+    return Stage(path, **kwargs)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect and maintain the staging record logs")
+    parser.add_argument("command", choices=("stats", "migrate", "compact"))
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help="raw, parsed and/or sourced (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    for name in args.stages or STAGES:
+        with open_stage(os.path.join(STAGING_DIR, name)) as stage:
+            if args.command == "migrate":
+                print(f"  {name:<8} imported {stage.migrate()} legacy files")
+            elif args.command == "compact":
+                before, after = stage.compact()
+                print(f"  {name:<8} {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+            stats = stage.stats()
+            print(f"  {name:<8} {stats['records']:>7} records  {stats['segments']:>3} segments  "
+                  f"{stats['bytes'] / 1e6:>7.1f} MB  {stats['garbage_bytes'] / 1e6:.1f} MB superseded  "
+                  f"{stats['legacy_files']} legacy files")
+
+
+if __name__ == "__main__":
+    main()
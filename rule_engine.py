@@ -0,0 +1,61 @@
+"""
+Compiled regex rule sets: named patterns compiled once, reporting which rule fired.
+
+A RuleSet takes named rules [(name, pattern)] in priority order and
+compiles each once, at construction. search(text) returns the first rule
+that matches, so for yes/no questions the answer is the same as
+any(re.search(p, text) for p in patterns) and the caller also learns why.
+
+The rules are deliberately not merged into one big alternation: CPython's
+re is a backtracking engine, and an alternation tries every branch at
+every position, losing the literal-prefix scan each pattern gets on its
+own. On 3 KB email bodies the merged form measured 1.2-25x slower than
+separate compiled patterns (scripts/bench_classify.py).
+
+Usage:
+    rules = RuleSet([("filled", r"position\\s+has\\s+been\\s+filled"),
+                     ("regret", r"regret\\s+to\\s+inform")], re.IGNORECASE)
+    rules.first(text)      # "filled", "regret" or None
+"""
+
+import re
+
+
+class RuleSet:
+    """Named patterns compiled once, tried in priority order."""
+
+    def __init__(self, rules, flags=0):
+        self.rules = list(rules)
+        self.names = [name for name, _ in self.rules]
+        self.flags = flags
+        self._compiled = [(name, re.compile(pattern, flags)) for name, pattern in self.rules]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def search(self, text):
+        """(rule name, match) for the first rule that matches text, or None."""
+        for name, regex in self._compiled:
+            match = regex.search(text)
+            if match:
+                return name, match
+        return None
+
+    def first(self, text):
+        """Name of the first rule that matches text, or None."""
+        for name, regex in self._compiled:
+            if regex.search(text):
+                return name
+        return None
+
+
+_compiled = {}
+
+
+def compiled(pattern, flags=0):
+    """pattern compiled once per process (config-supplied patterns)."""
+    key = (pattern, flags)
+    regex = _compiled.get(key)
+    if regex is None:
+        regex = _compiled[key] = re.compile(pattern, flags)
+    return regex
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Benchmark email classification: compiled RuleSets vs one re.search per rule.
+
+Builds a corpus from the .eml fixtures in tests/fixtures/eml/ and the
+email dicts in tests/test_email_parse.py, repeated up to --count emails;
+every other copy has its body padded to a realistic few KB. For each rule
+set in email_parse it scans the field text the classifier uses with the
+RuleSet, with re.search per pattern (the previous approach) and with all
+rules merged into one alternation, and reports the time for each and any
+email where they disagree. Then it times classify_email_rule over the
+corpus and prints how often each rule fired.
+
+Usage:
+    python scripts/bench_classify.py [--count N] [--config pipeline_config.json]
+"""
+
+import argparse
+import ast
+import email
+import glob
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import email_fetch  # noqa: E402
+import email_parse  # noqa: E402
+from email_parse import EmailView  # noqa: E402
+
+# Rule set -> the text classify_email_rule scans it against
+RULE_SETS = {
+    "rejection": (email_parse.REJECTION_RULES,
+                  lambda v: f"{v.lower_subject} {v.lower_text[:3000]}"),
+    "rejection_subject": (email_parse.REJECTION_SUBJECT_RULES, lambda v: v.lower_subject),
+    "negative_body": (email_parse.NEGATIVE_BODY_RULES, lambda v: v.lower_text[:3000]),
+    "non_job": (email_parse.NON_JOB_RULES,
+                lambda v: f"{v.lower_subject} {v.body_text[:1000].lower()}"),
+    "recruiter": (email_parse.RECRUITER_RULES,
+                  lambda v: f"{v.subject} {v.text[:500]}".lower()),
+    "specific_job": (email_parse.SPECIFIC_JOB_RULES, lambda v: f"{v.subject} {v.text[:1000]}"),
+}
+
+
+PADDING = ("Thanks again for your time last week. The team enjoyed meeting you, and our "
+           "coordinator will send calendar invites for Tuesday morning shortly. ") * 20
+
+
+def load_corpus(count):
+    emails = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "fixtures", "eml", "*.eml"))):
+        with open(path, "rb") as f:
+            msg = email.message_from_bytes(f.read())
+        emails.append(email_fetch.parse_email_message(msg, os.path.basename(path)))
+    with open(os.path.join(ROOT, "tests", "test_email_parse.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Dict):
+            continue
+        try:
+            d = ast.literal_eval(node)
+        except ValueError:
+            continue
+        if isinstance(d, dict) and "subject" in d:
+            emails.append({"from": "", "body_text": "", "body_html": "", **d})
+    corpus = []
+    for i in range(count):
+        e = dict(emails[i % len(emails)])
+        if i // len(emails) % 2:
+            e["body_text"] = f"{e['body_text']}\n\n{PADDING}"
+        corpus.append(e)
+    return corpus
+
+
+def scan_each(rules, text):
+    """The previous approach: every pattern searched separately."""
+    for name, pattern in rules.rules:
+        if re.search(pattern, text, rules.flags):
+            return name
+    return None
+
+
+def merged(rules):
+    """All rules as one alternation of named groups, for comparison."""
+    regex = re.compile("|".join(f"(?P<_rule{i}>{pattern})"
+                                for i, (_, pattern) in enumerate(rules.rules)), rules.flags)
+
+    def first(text):
+        match = regex.search(text)
+        return rules.names[int(match.lastgroup[5:])] if match else None
+    return first
+
+
+def _timed(fn, texts):
+    start = time.perf_counter()
+    found = [fn(t) is not None for t in texts]
+    return time.perf_counter() - start, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email classification rules")
+    parser.add_argument("--count", type=int, default=10000, help="Emails in the corpus")
+    parser.add_argument("--config", default=None,
+                        help="pipeline_config.json to take sender_templates from")
+    args = parser.parse_args()
+
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            templates = json.load(f).get("sender_templates", {})
+    else:
+        sys.path.insert(0, os.path.join(ROOT, "tests"))
+        from test_email_parse import SENDER_TEMPLATES as templates
+
+    emails = load_corpus(args.count)
+    views = [EmailView(e) for e in emails]
+    for view in views:
+        email_parse._enrich_forwarded_email(view)
+    print(f"  {len(emails)} emails\n")
+
+    print(f"  {'Rule set':<18} {'Rules':>5} {'re.search':>10} {'RuleSet':>9} {'Merged':>8} {'Diffs':>6}")
+    for label, (rules, field) in RULE_SETS.items():
+        texts = [field(v) for v in views]
+        each_seconds, each = _timed(lambda t: scan_each(rules, t), texts)
+        ruleset_seconds, found = _timed(rules.first, texts)
+        merged_seconds, merged_found = _timed(merged(rules), texts)
+        diffs = sum(a != b or a != c for a, b, c in zip(each, found, merged_found))
+        print(f"  {label:<18} {len(rules):>5} {each_seconds:>10.3f} {ruleset_seconds:>9.3f} "
+              f"{merged_seconds:>8.3f} {diffs:>6}")
+
+    start = time.perf_counter()
+    fired = Counter(email_parse.classify_email_rule(v, templates)[1] for v in views)
+    seconds = time.perf_counter() - start
+    print(f"\n  classify_email_rule: {seconds:.2f}s, "
+          f"{len(views) / seconds:,.0f} emails/s\n")
+    for rule, n in fired.most_common():
+        print(f"    {n:>6}  {rule}")
+
+
+if __name__ == "__main__":
+    main()
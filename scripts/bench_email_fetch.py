@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark the email_fetch IMAP path against the local stand-in server.
+
+Seeds tests/fake_imap_server.FakeImapServer with a mailbox built from the
+.eml fixtures (5,000 messages by default), adds a fixed per-command
+latency to stand in for the WAN round-trip to Gmail, and measures
+round-trips, bytes in each direction and wall time for:
+
+  legacy       SEARCH ALL, one FETCH (RFC822) + parse per message and a
+               create/select/copy per message to label it (the pre-sync
+               fetch path). Run on a sample and scaled to the mailbox.
+  initial      get_unprocessed_emails + LabelBatcher on an empty sync state
+  incremental  the same again after N new messages arrive
+
+Usage:
+    python scripts/bench_email_fetch.py [--messages N] [--latency SECONDS]
+                                        [--new N] [--legacy-sample N] [--plain]
+"""
+
+import argparse
+import email
+import email.policy
+import imaplib
+import math
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import email_fetch  # noqa: E402
+from dedup_store import DedupStore  # noqa: E402
+from fake_imap_server import FakeImapServer  # noqa: E402
+
+EML_DIR = os.path.join(ROOT, "tests", "fixtures", "eml")
+LABEL = "pipeline/processed"
+CONFIG = {"email": {"labels": {"processed": LABEL, "failed": "pipeline/failed"}}}
+
+
+def legacy_fetch(conn, limit):
+    """The pre-sync path: SEARCH ALL, FETCH RFC822 and label one by one."""
+    conn.select("INBOX")
+    _, data = conn.search(None, "ALL")
+    count = 0
+    for num in data[0].split()[:limit]:
+        _, msg_data = conn.fetch(num, "(RFC822)")
+        msg = email.message_from_bytes(msg_data[0][1], policy=email.policy.default)
+        email_fetch.parse_email_message(msg, num.decode())
+        try:
+            conn.create(LABEL)
+        except imaplib.IMAP4.error:
+            pass
+        conn.select("INBOX")
+        conn.copy(num, LABEL)
+        count += 1
+    return count
+
+
+def synced_fetch(conn, store, state):
+    emails = email_fetch.get_unprocessed_emails(conn, CONFIG, limit=0, state=state, store=store)
+    labeler = email_fetch.LabelBatcher(conn, gmail=email_fetch.use_gmail_extensions(conn, CONFIG))
+    for e in emails:
+        store.add(e["message_id"], email_fetch.compute_email_fingerprint(e), e["uid"])
+        labeler.add(e["uid"], LABEL)
+    labeler.flush()
+    return len(emails)
+
+
+def measure(server, fn, *args):
+    server.reset_stats()
+    conn = imaplib.IMAP4("127.0.0.1", server.port)
+    conn.login("bench@example.com", "pw")
+    start = time.perf_counter()
+    count = fn(conn, *args)
+    seconds = time.perf_counter() - start
+    conn.logout()
+    stats = dict(server.stats)
+    # login/logout are not part of the fetch
+    stats["commands"] = stats.get("commands", 0) - 2
+    return count, seconds, stats
+
+
+def row(name, count, seconds, stats, scale=1.0, note=""):
+    print(f"  {name:<12} {count:>7} {int(stats['commands'] * scale):>10} "
+          f"{stats['bytes_in'] * scale / 1e3:>9.1f} {stats['bytes_out'] * scale / 1e6:>9.2f} "
+          f"{seconds * scale:>9.2f}  {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the email_fetch IMAP path")
+    parser.add_argument("--messages", type=int, default=5000, help="Mailbox size")
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="Seconds added to every IMAP command (default: 0.01)")
+    parser.add_argument("--new", type=int, default=20, help="Messages arriving before the incremental run")
+    parser.add_argument("--legacy-sample", type=int, default=300,
+                        help="Messages to run the legacy path on before scaling (0 = all)")
+    parser.add_argument("--plain", action="store_true", help="Server without Gmail extensions")
+    args = parser.parse_args()
+
+    fixtures = len([n for n in os.listdir(EML_DIR) if n.endswith(".eml")])
+    copies = math.ceil(args.messages / fixtures)
+    kind = "plain IMAP" if args.plain else "Gmail"
+
+    def build():
+        server = FakeImapServer.from_eml_dir(EML_DIR, copies=copies, gmail=not args.plain,
+                                             latency=args.latency)
+        server.mailboxes["INBOX"].messages = server.mailboxes["INBOX"].messages[:args.messages]
+        return server.start()
+
+    print(f"  {args.messages} messages, {kind}, {args.latency * 1000:.0f} ms per command\n")
+    print(f"  {'Path':<12} {'Emails':>7} {'Commands':>10} {'KB in':>9} {'MB out':>9} {'Seconds':>9}")
+
+    server = build()
+    try:
+        sample = args.legacy_sample or args.messages
+        count, seconds, stats = measure(server, legacy_fetch, sample)
+        scale = args.messages / count if count else 1.0
+        row("legacy", args.messages, seconds, stats, scale,
+            f"(measured on {count}, scaled)" if scale != 1.0 else "")
+    finally:
+        server.stop()
+
+    server = build()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with DedupStore(os.path.join(tmpdir, "dedup.sqlite3")) as store:
+                state = {"uidvalidity": None, "last_uid": 0}
+                row("initial", *measure(server, synced_fetch, store, state))
+                for n in range(args.new):
+                    server.add_message(b"From: alerts@linkedin.com\r\nSubject: New alert %d\r\n"
+                                       b"Message-ID: <bench-new-%d@x>\r\n\r\nDirector role\r\n" % (n, n))
+                row("incremental", *measure(server, synced_fetch, store, state))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
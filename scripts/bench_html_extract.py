@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Benchmark html_extract backends against the original BeautifulSoup path.
+
+Builds career-page HTML from the saved applications/*/job-description.md
+corpus (each description rendered into Greenhouse-, Lever- and generic-
+style page templates with the usual script/nav/footer noise), adds the
+HTML fixtures in tests/fixtures/html/, and runs every extraction on every
+backend. Reports time per backend and any output that differs from the
+bs4 reference.
+
+Usage:
+    python scripts/bench_html_extract.py [--limit N] [--repeat N]
+"""
+
+import argparse
+import glob
+import html
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import html_extract  # noqa: E402
+
+NOISE_HEAD = """<head>
+<meta charset="utf-8"><meta property="og:title" content="{title}">
+<meta property="og:site_name" content="{company}">
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+<style>body {{ font-family: sans-serif; }} .nav a {{ margin: 0 4px; }}</style>
+</head>"""
+
+NOISE_NAV = """<header class="site-header"><nav class="nav">
+<a href="/">Home</a><a href="/about">About</a><a href="/careers">Careers</a><a href="/blog">Blog</a>
+</nav></header><div class="cookie-banner">We use cookies to improve your experience. <button>OK</button></div>"""
+
+NOISE_FOOTER = """<footer><nav><a href="/privacy">Privacy</a><a href="/terms">Terms</a></nav>
+<p>&copy; 2026 {company}. All rights reserved.</p></footer>
+<script>document.querySelectorAll('a').forEach(a => a.addEventListener('click', track));</script>"""
+
+TEMPLATES = {
+    "greenhouse": """<!DOCTYPE html><html>{head}<body><div id="app_body">
+<div id="header"><h1 class="app-title">{title}</h1><span class="company-name">at {company}</span>
+<div class="location">Remote</div></div>
+<div id="content">{body}</div>
+<div id="application"><form><input name="first_name"><br><button>Submit</button></form></div>
+</div></body></html>""",
+    "lever": """<!DOCTYPE html><html>{head}<body>
+<div class="main-header"><a class="main-header-logo" href="/">{company}</a></div>
+<div class="content-wrapper posting-page"><div class="posting-headline"><h2>{title}</h2>
+<div class="posting-categories"><div class="location">New York, NY</div></div></div>
+<div class="section-wrapper"><div class="section">{body}</div></div>
+<div class="section-wrapper"><a class="postings-btn" href="/apply">Apply for this job</a></div>
+</div></body></html>""",
+    "generic": """<!DOCTYPE html><html>{head}<body>{nav}<main><div class="breadcrumbs">
+<a href="/careers">Careers</a> / Engineering</div><h1>{title}</h1>
+<p class="job-location">Hybrid</p><article class="job-description">{body}</article>
+</main>{footer}</body></html>""",
+}
+
+
+_BULLET_RE = re.compile(r"^[-*•]\s+")
+
+
+def markdown_to_html(text):
+    """Just enough Markdown -> HTML to give the corpus realistic structure."""
+    out = []
+    for block in re.split(r"\n\s*\n", text):
+        lines = [ln.strip() for ln in block.strip().splitlines() if ln.strip()]
+        if not lines:
+            continue
+        if all(_BULLET_RE.match(ln) for ln in lines):
+            items = "".join(f"<li>{html.escape(_BULLET_RE.sub('', ln))}</li>" for ln in lines)
+            out.append(f"<ul>{items}</ul>")
+            continue
+        first = lines[0]
+        heading = re.match(r"^#{1,4}\s+(.*)", first)
+        if heading:
+            out.append(f"<h3>{html.escape(heading.group(1))}</h3>")
+            lines = lines[1:]
+        elif len(lines) == 1 and len(first) < 60 and not first.endswith("."):
+            out.append(f"<p><strong>{html.escape(first)}</strong></p>")
+            continue
+        if lines:
+            out.append("<p>" + "<br>".join(html.escape(ln) for ln in lines) + "</p>")
+    return "\n".join(out)
+
+
+def load_corpus(limit=None):
+    pages = []
+    paths = sorted(glob.glob(os.path.join(ROOT, "applications", "*", "job-description.md")))
+    for path in paths[:limit] if limit else paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        title = (re.match(r"#\s*(.*)", text) or [None, "Job"])[1].strip()
+        company = (re.search(r"\*\*Company:\*\*\s*(.*)", text) or [None, "Company"])[1].strip()
+        body = text.split("---", 1)[1] if "---" in text else text
+        fields = {"title": html.escape(title), "company": html.escape(company)}
+        head = NOISE_HEAD.format(**fields)
+        for kind, template in TEMPLATES.items():
+            pages.append((kind, template.format(
+                head=head, nav=NOISE_NAV, footer=NOISE_FOOTER.format(**fields),
+                body=markdown_to_html(body), **fields)))
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "fixtures", "html", "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            name = os.path.basename(path)
+            kind = "greenhouse" if name.startswith("greenhouse") else \
+                "lever" if name.startswith("lever") else "generic"
+            pages.append((kind, f.read()))
+    return pages
+
+
+EXTRACTORS = {
+    "greenhouse": html_extract.extract_greenhouse,
+    "lever": html_extract.extract_lever,
+    "generic": html_extract.extract_generic,
+}
+
+
+def run(pages, backend, repeat):
+    outputs = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [(EXTRACTORS[kind](page, backend=backend), html_extract.html_to_text(page, backend))
+                   for kind, page in pages]
+    return time.perf_counter() - start, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends")
+    parser.add_argument("--limit", type=int, default=None, help="Max job descriptions to use")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per backend")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.limit)
+    total_bytes = sum(len(p) for _, p in pages)
+    print(f"  {len(pages)} pages, {total_bytes / 1e6:.1f} MB of HTML, {args.repeat} pass(es)\n")
+
+    backends = ["bs4", "html.parser"]
+    if html_extract._lxml_etree is not None:
+        backends.append("lxml")
+
+    reference_seconds, reference = run(pages, "bs4", args.repeat)
+    print(f"  {'Backend':<12} {'Seconds':>8} {'ms/page':>8} {'Speedup':>8} {'Diffs':>6}")
+    for backend in backends:
+        if backend == "bs4":
+            seconds, outputs = reference_seconds, reference
+        else:
+            seconds, outputs = run(pages, backend, args.repeat)
+        diffs = [i for i, (got, ref) in enumerate(zip(outputs, reference)) if got != ref]
+        per_page = 1000 * seconds / (len(pages) * args.repeat)
+        print(f"  {backend:<12} {seconds:>8.2f} {per_page:>8.2f} "
+              f"{reference_seconds / seconds:>7.1f}x {len(diffs):>6}")
+        for i in diffs[:3]:
+            print(f"      differs: page {i} ({pages[i][0]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,645 @@
+"""
+In-process stand-in IMAP4rev1 server for email_fetch tests and benchmarks.
+
+Speaks enough real IMAP over a local socket for imaplib (and therefore
+email_fetch and pipeline_audit, with `"imap_ssl": false`) to run unmodified:
+LOGIN, CAPABILITY, SELECT/EXAMINE, STATUS, LIST, CREATE, SEARCH, FETCH,
+STORE, COPY, MOVE, EXPUNGE (plain and UID forms), IDLE, plus the Gmail
+extensions the pipeline uses — X-GM-RAW search, X-GM-LABELS fetch/store
+and X-GM-MSGID. Mailboxes are seeded from .eml files. Every command can be
+delayed by a fixed latency to mimic a WAN round-trip, and the server
+counts commands and bytes in each direction.
+
+Usage:
+    server = FakeImapServer.from_eml_dir("tests/fixtures/eml", latency=0.01)
+    with server:
+        conn = imaplib.IMAP4("127.0.0.1", server.port)
+        conn.login("user", "pw")
+        ...
+    print(server.stats)
+"""
+
+import bisect
+import collections
+import email.utils
+import os
+import re
+import select
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+CAPABILITIES = "IMAP4rev1 UIDPLUS MOVE ID IDLE"
+GMAIL_CAPABILITIES = CAPABILITIES + " X-GM-EXT-1"
+
+
+class Message:
+    __slots__ = ("uid", "raw", "flags", "labels", "gm_msgid", "date")
+
+    def __init__(self, uid, raw, flags=(), labels=(), gm_msgid=0):
+        self.uid = uid
+        self.raw = raw
+        self.flags = set(flags)
+        self.labels = set(labels)
+        self.gm_msgid = gm_msgid
+        self.date = _message_date(raw)
+
+    @property
+    def header(self):
+        end = self.raw.find(b"\r\n\r\n")
+        return self.raw if end < 0 else self.raw[:end + 4]
+
+
+class Mailbox:
+
+    def __init__(self, name, uidvalidity):
+        self.name = name
+        self.uidvalidity = uidvalidity
+        self.uidnext = 1
+        self.messages = []
+
+    def append(self, message):
+        message.uid = self.uidnext
+        self.uidnext += 1
+        self.messages.append(message)
+        return message
+
+
+def _crlf(raw):
+    return re.sub(rb"\r?\n", b"\r\n", raw)
+
+
+def _message_date(raw):
+    match = re.search(rb"^Date:\s*(.+?)\r?$", raw, re.MULTILINE | re.IGNORECASE)
+    try:
+        return email.utils.parsedate_to_datetime(match.group(1).decode("ascii", "replace"))
+    except (AttributeError, TypeError, ValueError):
+        return datetime.now(timezone.utc)
+
+
+def _quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+# ---------------------------------------------------------------------------
+# Command parsing
+# ---------------------------------------------------------------------------
+
+def parse_args(text):
+    """Tokenize IMAP arguments into strings and nested lists.
+
+    Atoms keep any [...] section intact, so BODY.PEEK[HEADER.FIELDS (A B)]
+    stays one token.
+    """
+    out = []
+    stack = [out]
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c == " ":
+            i += 1
+        elif c == "(":
+            inner = []
+            stack[-1].append(inner)
+            stack.append(inner)
+            i += 1
+        elif c == ")":
+            stack.pop()
+            i += 1
+        elif c == '"':
+            j = i + 1
+            buf = []
+            while j < len(text) and text[j] != '"':
+                if text[j] == "\\":
+                    j += 1
+                buf.append(text[j])
+                j += 1
+            stack[-1].append("".join(buf))
+            i = j + 1
+        else:
+            j = i
+            depth = 0
+            while j < len(text):
+                ch = text[j]
+                if ch == "[":
+                    depth += 1
+                elif ch == "]":
+                    depth -= 1
+                elif depth == 0 and ch in " ()":
+                    break
+                j += 1
+            stack[-1].append(text[i:j])
+            i = j
+    return out
+
+
+def _ranges(spec, top):
+    """Sequence set -> [(lo, hi)] (* = top, so n:* also matches top)."""
+    ranges = []
+    for part in spec.split(","):
+        lo, _, hi = part.partition(":")
+        lo = top if lo == "*" else int(lo)
+        hi = lo if not hi else (top if hi == "*" else int(hi))
+        ranges.append((min(lo, hi), max(lo, hi)))
+    return ranges
+
+
+def _in_set(spec, value, top):
+    """Is value in the sequence set spec?"""
+    return any(lo <= value <= hi for lo, hi in _ranges(spec, top))
+
+
+def _label_key(label):
+    # Gmail search spells "pipeline/processed" as pipeline-processed too
+    return re.sub(r"[/\s]", "-", label.lower())
+
+
+def gmail_raw_matches(query, message):
+    """Evaluate the subset of Gmail search syntax the pipeline uses."""
+    labels = {_label_key(label) for label in message.labels}
+    text = None
+    for term in query.split():
+        negate = term.startswith("-")
+        term = term.lstrip("-")
+        key, _, value = term.partition(":")
+        key = key.lower()
+        if value and key == "label":
+            hit = _label_key(value) in labels
+        elif value and key == "in":
+            hit = _label_key(value) in labels or (value.lower() == "inbox" and "\\inbox" in labels)
+        elif value and key in ("newer_than", "older_than"):
+            unit = {"d": 1, "m": 30, "y": 365}.get(value[-1:], 1)
+            cutoff = datetime.now(timezone.utc) - timedelta(days=int(value[:-1]) * unit)
+            date = message.date if message.date.tzinfo else message.date.replace(tzinfo=timezone.utc)
+            hit = date >= cutoff if key == "newer_than" else date < cutoff
+        else:
+            if text is None:
+                text = message.raw.decode("utf-8", "replace").lower()
+            needle = value if value and key in ("from", "subject", "to") else term
+            hit = needle.lower() in text
+        if hit == negate:
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class FakeImapServer:
+    """Threaded local IMAP server over in-memory mailboxes."""
+
+    def __init__(self, gmail=True, latency=0.0, uidvalidity=1, host="127.0.0.1"):
+        self.gmail = gmail
+        self.latency = latency
+        self.uidvalidity = uidvalidity
+        self.host = host
+        self.port = None
+        self.lock = threading.RLock()
+        self.mailboxes = {}
+        self._next_msgid = 1000
+        self.create_mailbox("INBOX")
+        self.stats = collections.Counter()
+        self.sessions = set()
+        self._server = None
+
+    @classmethod
+    def from_eml_dir(cls, path, copies=1, **kwargs):
+        """Seed INBOX from every .eml under path.
+
+        With copies > 1 the fixtures are cycled to build a larger mailbox,
+        each copy with its own Message-ID and subject (so it is neither a
+        Message-ID nor a fingerprint duplicate).
+        """
+        server = cls(**kwargs)
+        files = sorted(os.path.join(path, n) for n in os.listdir(path) if n.endswith(".eml"))
+        raws = []
+        for filepath in files:
+            with open(filepath, "rb") as f:
+                raws.append(f.read())
+        for i in range(copies):
+            for n, raw in enumerate(raws):
+                if copies > 1:
+                    raw = re.sub(rb"(?im)^Message-ID:\s*<([^>]*)>",
+                                 lambda m: b"Message-ID: <%d.%d.%s>" % (i, n, m.group(1)), raw)
+                    raw = re.sub(rb"(?im)^(Subject:.*?)(\r?)$",
+                                 lambda m: m.group(1) + b" #%d" % i + m.group(2), raw, count=1)
+                server.add_message(raw)
+        return server
+
+    # -- state -------------------------------------------------------------
+
+    def create_mailbox(self, name):
+        with self.lock:
+            if name not in self.mailboxes:
+                self.mailboxes[name] = Mailbox(name, self.uidvalidity)
+            return self.mailboxes[name]
+
+    def add_message(self, raw, mailbox="INBOX", labels=(), flags=()):
+        """Deliver a message; returns its UID."""
+        with self.lock:
+            self._next_msgid += 1
+            box = self.create_mailbox(mailbox)
+            gm_labels = set(labels) | ({"\\Inbox"} if mailbox == "INBOX" else set())
+            message = box.append(Message(0, _crlf(raw), flags, gm_labels, self._next_msgid))
+            return message.uid
+
+    def messages(self, mailbox="INBOX"):
+        return list(self.mailboxes[mailbox].messages)
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def disconnect_all(self):
+        """Drop every open client connection, as a server restart would."""
+        with self.lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            try:
+                session.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        server = self
+
+        class Handler(_Session):
+            imap = server
+
+        self._server = socketserver.ThreadingTCPServer((self.host, 0), Handler)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                         name="fake-imap", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Session(socketserver.StreamRequestHandler):
+    """One client connection."""
+
+    imap = None   # set per server in FakeImapServer.start
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.selected = None
+        self.readonly = False
+        self._out = []
+        self._seqs = None   # id(message) -> sequence number, per command
+        self._reported = 0  # mailbox size last announced with EXISTS
+
+    def _write(self, data):
+        self.imap.stats["bytes_out"] += len(data)
+        self._out.append(data)
+
+    def _flush(self):
+        # One send per response, as a real server would
+        self.wfile.write(b"".join(self._out))
+        self._out.clear()
+
+    def _untagged(self, line):
+        self._write(line.encode("utf-8") + b"\r\n" if isinstance(line, str) else line + b"\r\n")
+
+    def handle(self):
+        self.imap.stats["connections"] += 1
+        with self.imap.lock:
+            self.imap.sessions.add(self)
+        try:
+            self._serve()
+        except OSError:
+            pass   # dropped by disconnect_all
+        finally:
+            with self.imap.lock:
+                self.imap.sessions.discard(self)
+
+    def _serve(self):
+        caps = GMAIL_CAPABILITIES if self.imap.gmail else CAPABILITIES
+        self._untagged(f"* OK [CAPABILITY {caps}] fake IMAP ready")
+        self._flush()
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            self.imap.stats["bytes_in"] += len(line)
+            text = line.decode("utf-8", "replace").rstrip("\r\n")
+            tag, _, rest = text.partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+            uid = command == "UID"
+            if uid:
+                command, _, args = args.partition(" ")
+                command = command.upper()
+            self.imap.stats["commands"] += 1
+            self.imap.stats[("UID " if uid else "") + command] += 1
+            if self.imap.latency:
+                time.sleep(self.imap.latency)
+            if command == "IDLE":
+                # Runs outside the lock so other clients can deliver mail
+                self._untagged(f"{tag} {self._idle()}")
+                self._flush()
+                continue
+            handler = getattr(self, "do_" + command, None)
+            if handler is None:
+                self._untagged(f"{tag} BAD unknown command {command}")
+                self._flush()
+                continue
+            try:
+                with self.imap.lock:
+                    self._seqs = None
+                    status = handler(parse_args(args), uid)
+            except Exception as e:   # malformed arguments
+                status = f"BAD {e}"
+            self._untagged(f"{tag} {status}")
+            self._flush()
+            if command == "LOGOUT":
+                return
+
+    def _idle(self):
+        """RFC 2177 IDLE: push EXISTS as the mailbox grows until DONE.
+
+        Growth since the last EXISTS is announced straight away, in the
+        same send as the "+ idling" continuation.
+        """
+        if self.selected is None:
+            return "BAD no mailbox selected"
+        with self.imap.lock:
+            seen = len(self._mailbox().messages)
+        self._untagged("+ idling")
+        if seen != self._reported:
+            self._untagged(f"* {seen} EXISTS")
+            self._reported = seen
+        self._flush()
+        while True:
+            if select.select([self.connection], [], [], 0.05)[0]:
+                line = self.rfile.readline()
+                if not line:
+                    raise ConnectionResetError("client went away during IDLE")
+                self.imap.stats["bytes_in"] += len(line)
+                if line.strip().upper() == b"DONE":
+                    return "OK IDLE terminated"
+                return "BAD expected DONE"
+            with self.imap.lock:
+                count = len(self._mailbox().messages)
+            if count != seen:
+                seen = self._reported = count
+                self._untagged(f"* {count} EXISTS")
+                self._flush()
+
+    # -- helpers -----------------------------------------------------------
+
+    def _mailbox(self):
+        return self.imap.mailboxes[self.selected]
+
+    def _select_messages(self, spec, uid):
+        """Messages in a UID or sequence-number set, in mailbox order."""
+        messages = self._mailbox().messages
+        if not messages:
+            return []
+        if not uid:
+            picked = set()
+            for lo, hi in _ranges(spec, len(messages)):
+                picked.update(range(max(lo, 1), min(hi, len(messages)) + 1))
+            return [messages[i - 1] for i in sorted(picked)]
+        uids = [m.uid for m in messages]   # ascending
+        picked = set()
+        for lo, hi in _ranges(spec, uids[-1]):
+            picked.update(range(bisect.bisect_left(uids, lo), bisect.bisect_right(uids, hi)))
+        return [messages[i] for i in sorted(picked)]
+
+    def _seq(self, message):
+        if self._seqs is None:
+            self._seqs = {id(m): i for i, m in enumerate(self._mailbox().messages, 1)}
+        return self._seqs[id(message)]
+
+    def _remove(self, messages):
+        """Expunge messages, highest sequence number first."""
+        for seq, message in sorted(((self._seq(m), m) for m in messages), reverse=True,
+                                   key=lambda pair: pair[0]):
+            self._untagged(f"* {seq} EXPUNGE")
+        for message in messages:
+            self._mailbox().messages.remove(message)
+        self._seqs = None
+
+    # -- any state ---------------------------------------------------------
+
+    def do_CAPABILITY(self, args, uid):
+        self._untagged("* CAPABILITY " + (GMAIL_CAPABILITIES if self.imap.gmail else CAPABILITIES))
+        return "OK CAPABILITY completed"
+
+    def do_NOOP(self, args, uid):
+        return "OK NOOP completed"
+
+    def do_LOGIN(self, args, uid):
+        return "OK LOGIN completed"
+
+    def do_LOGOUT(self, args, uid):
+        self._untagged("* BYE logging out")
+        return "OK LOGOUT completed"
+
+    def do_LIST(self, args, uid):
+        for name in sorted(self.imap.mailboxes):
+            self._untagged(f'* LIST (\\HasNoChildren) "/" {_quote(name)}')
+        return "OK LIST completed"
+
+    def do_CREATE(self, args, uid):
+        if args[0] in self.imap.mailboxes:
+            return "NO [ALREADYEXISTS] mailbox exists"
+        self.imap.create_mailbox(args[0])
+        return "OK CREATE completed"
+
+    def do_STATUS(self, args, uid):
+        box = self.imap.mailboxes.get(args[0])
+        if box is None:
+            return "NO no such mailbox"
+        values = {"MESSAGES": len(box.messages), "UIDNEXT": box.uidnext,
+                  "UIDVALIDITY": box.uidvalidity, "RECENT": 0,
+                  "UNSEEN": sum(1 for m in box.messages if "\\Seen" not in m.flags)}
+        items = " ".join(f"{k} {values[k]}" for k in (i.upper() for i in args[1]) if k in values)
+        self._untagged(f"* STATUS {_quote(box.name)} ({items})")
+        return "OK STATUS completed"
+
+    def do_SELECT(self, args, uid, readonly=False):
+        box = self.imap.mailboxes.get(args[0])
+        if box is None:
+            self.selected = None
+            return "NO no such mailbox"
+        self.selected = box.name
+        self.readonly = readonly
+        self._untagged("* FLAGS (\\Answered \\Flagged \\Deleted \\Seen \\Draft)")
+        self._untagged(f"* {len(box.messages)} EXISTS")
+        self._reported = len(box.messages)
+        self._untagged("* 0 RECENT")
+        self._untagged(f"* OK [UIDVALIDITY {box.uidvalidity}] UIDs valid")
+        self._untagged(f"* OK [UIDNEXT {box.uidnext}] next UID")
+        mode = "READ-ONLY" if readonly else "READ-WRITE"
+        return f"OK [{mode}] {'EXAMINE' if readonly else 'SELECT'} completed"
+
+    def do_EXAMINE(self, args, uid):
+        return self.do_SELECT(args, uid, readonly=True)
+
+    # -- selected state ----------------------------------------------------
+
+    def do_CLOSE(self, args, uid):
+        self.selected = None
+        return "OK CLOSE completed"
+
+    def do_SEARCH(self, args, uid):
+        if self.selected is None:
+            return "BAD no mailbox selected"
+        messages = self._mailbox().messages
+        matched = list(messages)
+        i = 0
+        while i < len(args):
+            key = args[i].upper() if isinstance(args[i], str) else args[i]
+            if key == "CHARSET":
+                i += 2
+                continue
+            if key == "ALL":
+                pass
+            elif key == "UID":
+                i += 1
+                top = messages[-1].uid if messages else 0
+                matched = [m for m in matched if _in_set(args[i], m.uid, top)]
+            elif key == "X-GM-RAW" and self.imap.gmail:
+                i += 1
+                matched = [m for m in matched if gmail_raw_matches(args[i], m)]
+            elif key in ("SEEN", "UNSEEN"):
+                matched = [m for m in matched if ("\\Seen" in m.flags) == (key == "SEEN")]
+            elif isinstance(key, str) and re.match(r"^[\d*:,]+$", key):
+                seqs = {self._seq(m) for m in messages if _in_set(key, self._seq(m), len(messages))}
+                matched = [m for m in matched if self._seq(m) in seqs]
+            else:
+                return f"BAD unsupported search key {key}"
+            i += 1
+        ids = [m.uid if uid else self._seq(m) for m in matched]
+        self._untagged("* SEARCH" + "".join(f" {n}" for n in ids))
+        return "OK SEARCH completed"
+
+    def _fetch_item(self, message, item):
+        """(response name, value bytes, is_literal) for one FETCH item."""
+        upper = item.upper()
+        section = ""
+        if "[" in item:
+            section = item[item.index("[") + 1:item.rindex("]")]
+        if upper == "UID":
+            return "UID", str(message.uid).encode(), False
+        if upper == "FLAGS":
+            return "FLAGS", ("(" + " ".join(sorted(message.flags)) + ")").encode(), False
+        if upper == "RFC822.SIZE":
+            return "RFC822.SIZE", str(len(message.raw)).encode(), False
+        if upper == "INTERNALDATE":
+            return "INTERNALDATE", _quote(email.utils.format_datetime(message.date)).encode(), False
+        if upper == "X-GM-LABELS":
+            return "X-GM-LABELS", ("(" + " ".join(_quote(label) for label in sorted(message.labels))
+                                   + ")").encode(), False
+        if upper == "X-GM-MSGID":
+            return "X-GM-MSGID", str(message.gm_msgid).encode(), False
+        if upper in ("RFC822", "BODY[]", "BODY.PEEK[]"):
+            return ("RFC822" if upper == "RFC822" else "BODY[]"), message.raw, True
+        if upper in ("RFC822.HEADER", "BODY[HEADER]", "BODY.PEEK[HEADER]"):
+            return ("RFC822.HEADER" if upper == "RFC822.HEADER" else "BODY[HEADER]"), message.header, True
+        if section.upper().startswith("HEADER.FIELDS"):
+            wanted = {f.upper() for f in parse_args(section[len("HEADER.FIELDS"):])[0]}
+            blocks = re.finditer(rb"(?m)^([!-9;-~]+):.*\r\n(?:[ \t].*\r\n)*", message.header)
+            value = b"".join(b.group(0) for b in blocks
+                             if b.group(1).decode().upper() in wanted) + b"\r\n"
+            return f"BODY[{section}]", value, True
+        raise ValueError(f"unsupported fetch item {item}")
+
+    def do_FETCH(self, args, uid):
+        if self.selected is None:
+            return "BAD no mailbox selected"
+        spec, items = args[0], args[1]
+        if isinstance(items, str):
+            macros = {"ALL": ["FLAGS", "INTERNALDATE", "RFC822.SIZE"],
+                      "FAST": ["FLAGS", "INTERNALDATE", "RFC822.SIZE"]}
+            items = macros.get(items.upper(), [items])
+        items = list(items)
+        if uid and "UID" not in (i.upper() for i in items):
+            items.insert(0, "UID")
+        for message in self._select_messages(spec, uid):
+            parts = []
+            for item in items:
+                name, value, literal = self._fetch_item(message, item)
+                if literal:
+                    parts.append(f"{name} {{{len(value)}}}\r\n".encode() + value)
+                else:
+                    parts.append(name.encode() + b" " + value)
+                if item.upper() in ("RFC822", "BODY[]") and not self.readonly:
+                    message.flags.add("\\Seen")
+            self._write(f"* {self._seq(message)} FETCH (".encode() + b" ".join(parts) + b")\r\n")
+        return "OK FETCH completed"
+
+    def do_STORE(self, args, uid):
+        if self.selected is None or self.readonly:
+            return "NO mailbox not writable"
+        spec, op, values = args[0], args[1].upper(), args[2]
+        values = values if isinstance(values, list) else [values]
+        silent = op.endswith(".SILENT")
+        op = op.replace(".SILENT", "")
+        attr = "labels" if op.lstrip("+-") == "X-GM-LABELS" else "flags"
+        if attr == "labels" and not self.imap.gmail:
+            return "BAD X-GM-LABELS not supported"
+        for message in self._select_messages(spec, uid):
+            current = getattr(message, attr)
+            if op.startswith("+"):
+                current.update(values)
+            elif op.startswith("-"):
+                current.difference_update(values)
+            else:
+                current.clear()
+                current.update(values)
+            if attr == "labels":
+                for label in values:
+                    self.imap.create_mailbox(label)
+            if not silent:
+                name, value, _ = self._fetch_item(message, op.lstrip("+-"))
+                extra = f" UID {message.uid}" if uid else ""
+                self._write(f"* {self._seq(message)} FETCH ({name} ".encode() + value
+                            + extra.encode() + b")\r\n")
+        return "OK STORE completed"
+
+    def do_COPY(self, args, uid, move=False):
+        if self.selected is None:
+            return "BAD no mailbox selected"
+        target = self.imap.mailboxes.get(args[1])
+        if target is None:
+            return "NO [TRYCREATE] no such mailbox"
+        moved = self._select_messages(args[0], uid)
+        src_uids, dst_uids = [], []
+        for message in moved:
+            copy = target.append(Message(0, message.raw, message.flags, message.labels,
+                                         message.gm_msgid))
+            if self.imap.gmail and target.name != "INBOX":
+                message.labels.add(target.name)
+                copy.labels.add(target.name)
+            src_uids.append(str(message.uid))
+            dst_uids.append(str(copy.uid))
+        if move:
+            self._remove(moved)
+        code = f"[COPYUID {target.uidvalidity} {','.join(src_uids)} {','.join(dst_uids)}] " if moved else ""
+        return f"OK {code}{'MOVE' if move else 'COPY'} completed"
+
+    def do_MOVE(self, args, uid):
+        return self.do_COPY(args, uid, move=True)
+
+    def do_EXPUNGE(self, args, uid):
+        self._remove([m for m in self._mailbox().messages if "\\Deleted" in m.flags])
+        return "OK EXPUNGE completed"
@@ -0,0 +1,190 @@
+"""
+Tests for ats_boards.py — board normalization, local matching, snapshot
+storage and diffing.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_boards import (
+    BoardStore, company_slugs, diff_snapshots, fetch_board, match_role, parse_job_url,
+)
+
+
+GREENHOUSE_BOARD = {"jobs": [
+    {"id": 101, "title": "VP of Engineering", "absolute_url": "https://boards.greenhouse.io/acme/jobs/101",
+     "location": {"name": "Remote"}, "company_name": "Acme",
+     "content": "&lt;p&gt;Lead 10+ engineers.&lt;/p&gt;"},
+    {"id": 102, "title": "Senior Software Engineer", "absolute_url": "https://boards.greenhouse.io/acme/jobs/102",
+     "location": {"name": "Boston"}, "company_name": "Acme", "content": "&lt;p&gt;Write code.&lt;/p&gt;"},
+]}
+
+LEVER_BOARD = [
+    {"id": "aaaa1111-2222", "text": "Director, Platform Engineering",
+     "hostedUrl": "https://jobs.lever.co/globex/aaaa1111-2222", "categories": {"location": "NYC"},
+     "description": "<p>Own the platform.</p>",
+     "lists": [{"text": "Requirements", "content": "<li>8+ years</li>"}], "additional": ""},
+]
+
+
+class _FakeHttp:
+    """Serves canned JSON per URL and counts requests."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        resp = requests.Response()
+        resp.url = url
+        if url in self.routes:
+            resp.status_code = 200
+            resp._content = json.dumps(self.routes[url]).encode("utf-8")
+        else:
+            resp.status_code = 404
+            resp._content = b"{}"
+        return resp
+
+
+GH_URL = "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true"
+LEVER_URL = "https://api.lever.co/v0/postings/globex?mode=json"
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_greenhouse(self):
+        snapshot = fetch_board(_FakeHttp({GH_URL: GREENHOUSE_BOARD}), "greenhouse", "acme")
+        job = snapshot["jobs"][0]
+        self.assertEqual(snapshot["company"], "Acme")
+        self.assertEqual(job["id"], "101")
+        self.assertEqual(job["location"], "Remote")
+        self.assertEqual(job["description_html"], "<p>Lead 10+ engineers.</p>")
+        self.assertEqual(len(job["content_hash"]), 16)
+
+    def test_lever_lists_folded_into_description(self):
+        snapshot = fetch_board(_FakeHttp({LEVER_URL: LEVER_BOARD}), "lever", "globex")
+        self.assertIn("<h3>Requirements</h3>", snapshot["jobs"][0]["description_html"])
+        self.assertEqual(snapshot["jobs"][0]["location"], "NYC")
+
+    def test_no_board(self):
+        self.assertIsNone(fetch_board(_FakeHttp({}), "ashby", "nobody"))
+
+
+class TestMatching(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = fetch_board(_FakeHttp({GH_URL: GREENHOUSE_BOARD}), "greenhouse", "acme")
+
+    def test_best_title_wins(self):
+        job, score = match_role(self.snapshot, "VP Engineering")
+        self.assertEqual(job["id"], "101")
+        self.assertEqual(score, 1.0)
+
+    def test_no_match_below_threshold(self):
+        job, _ = match_role(self.snapshot, "Head of Marketing")
+        self.assertIsNone(job)
+
+    def test_company_slugs(self):
+        self.assertEqual(company_slugs("Acme Widgets, Inc."), ["acmewidgets", "acme-widgets"])
+        self.assertEqual(company_slugs("Globex"), ["globex"])
+
+    def test_parse_job_url(self):
+        self.assertEqual(parse_job_url("https://boards.greenhouse.io/acme/jobs/101?gh_src=x"),
+                         ("greenhouse", "acme", "101"))
+        self.assertEqual(parse_job_url("https://jobs.lever.co/globex/aaaa1111-2222/apply"),
+                         ("lever", "globex", "aaaa1111-2222"))
+        self.assertIsNone(parse_job_url("https://acme.com/careers"))
+
+
+class TestBoardStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logs = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _store(self, http, max_age_seconds=3600):
+        return BoardStore(http, boards_dir=self.tmpdir.name, max_age_seconds=max_age_seconds,
+                          log=self.logs.append)
+
+    def test_one_fetch_per_company(self):
+        http = _FakeHttp({GH_URL: GREENHOUSE_BOARD})
+        store = self._store(http)
+        first = store.match("Acme", "VP Engineering")
+        second = store.match("Acme", "Senior Software Engineer")
+        self.assertEqual(first["url"], "https://boards.greenhouse.io/acme/jobs/101")
+        self.assertEqual(first["ats_type"], "greenhouse")
+        self.assertEqual(second["job"]["id"], "102")
+        self.assertEqual(http.calls.count(GH_URL), 1)
+
+    def test_snapshot_reused_from_disk_and_misses_remembered(self):
+        self._store(_FakeHttp({GH_URL: GREENHOUSE_BOARD})).match("Acme", "VP Engineering")
+        http = _FakeHttp({})
+        match = self._store(http).match("Acme", "VP Engineering")
+        self.assertEqual(match["job"]["id"], "101")
+        self.assertEqual(http.calls, [])   # fresh snapshot + remembered 404s
+
+    def test_board_of_another_company_is_skipped(self):
+        other = {"jobs": [dict(job, company_name="Mercury Insurance")
+                          for job in GREENHOUSE_BOARD["jobs"]]}
+        self.assertIsNone(self._store(_FakeHttp({GH_URL: other})).match("Acme", "VP Engineering"))
+        match = self._store(_FakeHttp({GH_URL: GREENHOUSE_BOARD}), max_age_seconds=0).match(
+            "ACME, Inc.", "VP Engineering")
+        self.assertTrue(match["company_verified"])
+        self.assertEqual(match["confidence"], 0.9)
+
+    def test_board_without_company_name_has_lower_confidence(self):
+        match = self._store(_FakeHttp({LEVER_URL: LEVER_BOARD})).match(
+            "Globex", "Director of Platform Engineering")
+        self.assertEqual(match["job"]["id"], "aaaa1111-2222")
+        self.assertFalse(match["company_verified"])
+        self.assertLess(match["confidence"], 0.85)
+
+    def test_lookup_job_by_url(self):
+        store = self._store(_FakeHttp({GH_URL: GREENHOUSE_BOARD}))
+        snapshot, job = store.lookup_job("https://boards.greenhouse.io/acme/jobs/102")
+        self.assertEqual(job["title"], "Senior Software Engineer")
+        self.assertEqual(snapshot["ats"], "greenhouse")
+
+    def test_refresh_records_diff(self):
+        self._store(_FakeHttp({GH_URL: GREENHOUSE_BOARD})).board("greenhouse", "acme")
+        updated = {"jobs": [dict(GREENHOUSE_BOARD["jobs"][0], title="VP, Engineering"),
+                            {"id": 103, "title": "CTO", "location": {"name": "Remote"},
+                             "content": ""}]}
+        snapshot = self._store(_FakeHttp({GH_URL: updated}), max_age_seconds=0).board(
+            "greenhouse", "acme")
+        self.assertEqual(snapshot["changes"], {"added": ["103"], "removed": ["102"],
+                                               "changed": ["101"]})
+        self.assertEqual(len(self.logs), 1)
+        with open(os.path.join(self.tmpdir.name, "greenhouse", "acme.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["changes"]["added"], ["103"])
+
+    def test_stale_snapshot_used_when_refresh_fails(self):
+        self._store(_FakeHttp({GH_URL: GREENHOUSE_BOARD})).board("greenhouse", "acme")
+
+        class _Offline:
+            def get(self, url, **kwargs):
+                raise requests.ConnectionError("offline")
+
+        snapshot = self._store(_Offline(), max_age_seconds=0).board("greenhouse", "acme")
+        self.assertEqual(len(snapshot["jobs"]), 2)
+
+    def test_diff_identical(self):
+        snapshot = fetch_board(_FakeHttp({GH_URL: GREENHOUSE_BOARD}), "greenhouse", "acme")
+        self.assertEqual(diff_snapshots(snapshot, snapshot),
+                         {"added": [], "removed": [], "changed": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
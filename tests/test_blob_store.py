@@ -0,0 +1,74 @@
+"""
+Tests for blob_store.py — content addressing, compression, dedup and the
+staging-record dehydrate/hydrate helpers.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blob_store import BlobStore, dehydrate, hydrate
+
+ALERT_HTML = "<table><tr><td>VP Engineering at Acme</td></tr></table>\n" * 200
+
+
+class TestBlobStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(os.path.join(self.tmpdir.name, "blobs"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_addressed_by_sha256(self):
+        digest = self.store.put(ALERT_HTML)
+        self.assertEqual(digest, hashlib.sha256(ALERT_HTML.encode()).hexdigest())
+        self.assertIn(digest, self.store)
+        self.assertEqual(self.store.get_text(digest), ALERT_HTML)
+        self.assertEqual(self.store.get(self.store.put(b"\x00\x01")), b"\x00\x01")
+
+    def test_identical_content_stored_once_and_compressed(self):
+        first = self.store.put(ALERT_HTML)
+        second = self.store.put(ALERT_HTML.encode("utf-8"))
+        self.assertEqual(first, second)
+        stats = self.store.stats()
+        self.assertEqual(stats["blobs"], 1)
+        self.assertLess(stats["bytes"] * 10, len(ALERT_HTML))
+
+    def test_unknown_digest(self):
+        with self.assertRaises(KeyError):
+            self.store.get("0" * 64)
+
+    def test_dehydrate_and_hydrate(self):
+        record = {"uid": "7", "subject": "Jobs", "body_text": "short", "body_html": ALERT_HTML}
+        stored = dehydrate(record, ("body_text", "body_html"), self.store)
+        self.assertEqual(record["body_html"], ALERT_HTML)   # input untouched
+        self.assertNotIn("body_html", stored)
+        self.assertEqual(stored["body_text"], "short")      # small bodies stay inline
+        self.assertEqual(self.store.get_text(stored["body_html_blob"]), ALERT_HTML)
+        self.assertEqual(hydrate(stored, self.store), record)
+
+    def test_dotted_fields_in_nested_dicts(self):
+        record = {"uid": "8", "body_html": ALERT_HTML,
+                  "forward_info": {"is_forwarded": False, "original_body_html": ALERT_HTML}}
+        stored = dehydrate(record, ("body_html", "forward_info.original_body_html",
+                                    "missing.body"), self.store)
+        self.assertIn("original_body_html", record["forward_info"])   # input untouched
+        self.assertEqual(stored["forward_info"],
+                         {"is_forwarded": False, "original_body_html_blob": stored["body_html_blob"]})
+        self.assertEqual(self.store.stats()["blobs"], 1)
+        self.assertEqual(hydrate(stored, self.store), record)
+
+    def test_hydrate_leaves_inline_records(self):
+        record = {"uid": "1", "body_text": "hello", "body_html": ""}
+        self.assertEqual(hydrate(dict(record), self.store), record)
+
+
+if __name__ == "__main__":
+    unittest.main()
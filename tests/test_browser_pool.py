@@ -0,0 +1,177 @@
+"""
+Tests for browser_pool.py — readiness waits, resource blocking and page
+concurrency, against static HTML fixtures on a local server.
+
+The browser tests need Playwright with Chromium installed and are skipped
+otherwise; the start-failure test uses a stand-in Playwright module.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+import types
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserUnavailable, build_pool
+
+HAS_PLAYWRIGHT = importlib.util.find_spec("playwright") is not None
+
+DESCRIPTION = "Lead a team of 40 engineers across platform and data. " * 10
+
+# Description rendered by script after a short delay, like Workday
+SPA_PAGE = f"""<!doctype html>
+<html><body>
+<h1>VP Engineering</h1>
+<div class="job-location">Remote, US</div>
+<img src="/logo.png">
+<div id="root"></div>
+<script>
+setTimeout(() => {{
+    const el = document.createElement('div');
+    el.setAttribute('data-automation-id', 'jobPostingDescription');
+    el.textContent = {DESCRIPTION!r};
+    document.getElementById('root').appendChild(el);
+}}, 300);
+</script>
+</body></html>
+""".encode()
+
+STATIC_PAGE = f"<html><body><h1>Director</h1><main>{DESCRIPTION}</main></body></html>".encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = {}
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with _Handler.lock:
+            _Handler.hits[self.path] = _Handler.hits.get(self.path, 0) + 1
+            _Handler.in_flight += 1
+            _Handler.max_in_flight = max(_Handler.max_in_flight, _Handler.in_flight)
+        try:
+            if self.path == "/spa":
+                self._send(SPA_PAGE, "text/html")
+            elif self.path.startswith("/slow"):
+                time.sleep(0.3)
+                self._send(STATIC_PAGE, "text/html")
+            elif self.path == "/logo.png":
+                self._send(b"\x89PNG", "image/png")
+            else:
+                self._send(STATIC_PAGE, "text/html")
+        finally:
+            with _Handler.lock:
+                _Handler.in_flight -= 1
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipUnless(HAS_PLAYWRIGHT, "Playwright not installed")
+class TestBrowserPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.pool = build_pool({"browser": {"contexts": 2, "max_pages": 2,
+                                           "ready_timeout_ms": 5000}})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.hits.clear()
+        _Handler.max_in_flight = 0
+
+    def test_waits_for_rendered_description(self):
+        start = time.monotonic()
+        page = self.pool.scrape(self.base + "/spa", "workday")
+        self.assertLess(time.monotonic() - start, 3.0)   # no fixed 3s sleep
+        self.assertEqual(page["title"], "VP Engineering")
+        self.assertEqual(page["location"], "Remote, US")
+        self.assertIn("40 engineers", page["description"])
+
+    def test_blocks_images(self):
+        self.pool.scrape(self.base + "/spa", "workday")
+        self.assertNotIn("/logo.png", _Handler.hits)
+
+    def test_page_concurrency_limit(self):
+        urls = [f"{self.base}/slow{i}" for i in range(6)]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            pages = list(pool.map(self.pool.scrape, urls))
+        self.assertTrue(all("40 engineers" in p["description"] for p in pages))
+        self.assertLessEqual(_Handler.max_in_flight, 2)
+        self.assertEqual(len(self.pool._contexts), 2)
+
+
+class _FakePlaywright:
+    """async_playwright() whose Chromium launch fails, counting driver starts/stops."""
+
+    started = stopped = 0
+
+    def __call__(self):
+        return self
+
+    async def start(self):
+        _FakePlaywright.started += 1
+        return self
+
+    async def stop(self):
+        _FakePlaywright.stopped += 1
+
+    @property
+    def chromium(self):
+        return self
+
+    async def launch(self, **kwargs):
+        raise RuntimeError("Executable doesn't exist; run `playwright install chromium`")
+
+
+class TestStartFailure(unittest.TestCase):
+
+    def test_failed_launch_stops_driver_and_is_not_retried(self):
+        fake = types.ModuleType("playwright.async_api")
+        fake.async_playwright = _FakePlaywright()
+        modules = {"playwright": types.ModuleType("playwright"), "playwright.async_api": fake}
+        with mock.patch.dict(sys.modules, modules):
+            pool = build_pool({})
+            try:
+                for _ in range(3):
+                    with self.assertRaises(BrowserUnavailable):
+                        pool.scrape("http://127.0.0.1/job")
+            finally:
+                pool.close()
+        self.assertEqual((_FakePlaywright.started, _FakePlaywright.stopped), (1, 1))
+
+
+@unittest.skipIf(HAS_PLAYWRIGHT, "Playwright installed")
+class TestWithoutPlaywright(unittest.TestCase):
+
+    def test_build_pool_raises_import_error(self):
+        with self.assertRaises(ImportError):
+            build_pool({})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,341 @@
+"""
+Tests for career_search.py — HTTP configuration and lead sourcing.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import career_search
+from ats_boards import BoardStore
+from career_search import (
+    configure_http, find_career_page, process_parsed_leads, scrape_job_description,
+)
+from pipeline_ledger import PipelineLedger
+from record_log import open_stage
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+
+
+class TestConfigureHttp(unittest.TestCase):
+
+    def test_throttle_from_config(self):
+        client = configure_http({"throttle": {
+            "google_search_seconds": 3.0, "career_page_seconds": 0.5, "per_host_concurrency": 4,
+        }})
+        self.assertEqual(client.throttle.interval_for("html.duckduckgo.com"), 3.0)
+        self.assertEqual(client.throttle.interval_for("jobs.lever.co"), 0.5)
+        self.assertEqual(client.throttle.max_per_host, 4)
+
+
+class _BoardHttp:
+    """Answers only the Greenhouse board API for 'acme'; fails anything else."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        resp = requests.Response()
+        resp.url = url
+        if url.startswith("https://boards-api.greenhouse.io/v1/boards/acme/"):
+            resp.status_code = 200
+            resp._content = json.dumps({"jobs": [{
+                "id": 7, "title": "VP Engineering", "company_name": "Acme",
+                "absolute_url": "https://boards.greenhouse.io/acme/jobs/7",
+                "location": {"name": "Remote"},
+                "content": "&lt;p&gt;Requirements: 10+ years leading teams.&lt;/p&gt;"}]}).encode()
+        else:
+            resp.status_code = 404
+            resp._content = b"{}"
+        return resp
+
+
+class TestBoardSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.http = _BoardHttp()
+        store = BoardStore(self.http, boards_dir=self.tmpdir.name, log=lambda msg: None)
+        self.patch = mock.patch.object(career_search, "_boards", store)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmpdir.cleanup()
+
+    def test_lead_resolved_and_scraped_from_board(self):
+        with mock.patch.object(career_search, "google_search_careers") as search:
+            found = find_career_page("Acme", "VP, Engineering", {})
+            search.assert_not_called()
+        self.assertEqual(found["url"], "https://boards.greenhouse.io/acme/jobs/7")
+        self.assertEqual(found["ats_type"], "greenhouse")
+
+        calls_before = len(self.http.calls)
+        scraped = scrape_job_description(found["url"], "greenhouse", {})
+        self.assertEqual(len(self.http.calls), calls_before)  # no page fetch
+        self.assertEqual(scraped["title"], "VP Engineering")
+        self.assertEqual(scraped["company"], "Acme")
+        self.assertIn("10+ years", scraped["description_text"])
+
+
+    def test_linkedin_job_id_tried_before_board(self):
+        posting = "https://acme.wd1.myworkdayjobs.com/en-US/careers/job/VP-Engineering_R123"
+        with mock.patch.object(career_search, "_search_by_job_id", return_value=[posting]):
+            found = find_career_page("Acme", "VP Engineering", {},
+                                     linkedin_url="https://www.linkedin.com/jobs/view/4343698348/")
+        self.assertEqual(found["url"], posting)
+        self.assertEqual(self.http.calls, [])   # board never fetched
+
+
+class TestScrapeWithPlaywright(unittest.TestCase):
+
+    def test_uses_shared_browser_pool(self):
+        pool = mock.Mock()
+        pool.scrape.return_value = {"title": "VP Engineering", "location": "Remote",
+                                    "description": "Lead teams. " * 30, "html": "<html></html>"}
+        with mock.patch.object(career_search, "_get_browser", return_value=pool):
+            first = career_search._scrape_with_playwright("https://acme.wd1.myworkdayjobs.com/1", "workday")
+            career_search._scrape_with_playwright("https://acme.wd1.myworkdayjobs.com/2", "workday")
+        self.assertEqual(pool.scrape.call_count, 2)
+        self.assertEqual(first["title"], "VP Engineering")
+        self.assertEqual(first["ats_type"], "workday")
+        self.assertFalse(first["description_incomplete"])
+
+    def test_falls_back_when_browser_cannot_start(self):
+        pool = mock.Mock()
+        pool.scrape.side_effect = career_search.BrowserUnavailable("chromium not installed")
+        with mock.patch.object(career_search, "_get_browser", return_value=pool), \
+                mock.patch.object(career_search, "scrape_generic", return_value={"url": "x"}) as generic, \
+                mock.patch("builtins.print"):
+            career_search._scrape_with_playwright("https://acme.icims.com/jobs/1", "icims")
+        generic.assert_called_once_with("https://acme.icims.com/jobs/1")
+
+    def test_falls_back_without_playwright(self):
+        with mock.patch.object(career_search, "_get_browser", side_effect=ImportError), \
+                mock.patch.object(career_search, "scrape_generic", return_value={"url": "x"}) as generic, \
+                mock.patch("builtins.print"):
+            result = career_search._scrape_with_playwright("https://acme.icims.com/jobs/1", "icims")
+        generic.assert_called_once_with("https://acme.icims.com/jobs/1")
+        self.assertEqual(result, {"url": "x"})
+
+
+def _fake_find_career_page(company, role, config, linkedin_url=None):
+    if company == "Nowhere":
+        return None
+    return {"url": f"https://{company.lower()}.example.com/jobs/1", "ats_type": None,
+            "confidence": 0.85}
+
+
+def _fake_scrape(url, ats_type, config, role=None):
+    time.sleep(0.01)
+    return {"url": url, "ats_type": ats_type, "title": role, "company": "",
+            "location": "", "description_text": "Requirements:\n- 10+ years " * 20,
+            "compensation": None, "description_incomplete": False,
+            "scraped_at": "2026-01-01T00:00:00"}
+
+
+class TestProcessParsedLeads(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.parsed_dir = os.path.join(self.tmpdir.name, "parsed")
+        os.makedirs(self.parsed_dir)
+        companies = ["Acme", "Globex", "Nowhere", "Initech", "Umbrella"]
+        for uid, company in enumerate(companies, start=100):
+            leads = [{"type": "job_lead", "company": company, "role": "VP Engineering",
+                      "email_uid": str(uid), "lead_index": 0}]
+            with open(os.path.join(self.parsed_dir, f"{uid}.json"), "w", encoding="utf-8") as f:
+                json.dump(leads, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, sourced_dir, concurrency, retry_unresolved=False, scrape=_fake_scrape,
+             deadline=None):
+        config = {"throttle": {"career_page_seconds": 0, "google_search_seconds": 0},
+                  "search_queue": {"backoff_seconds": 0}}
+        with mock.patch.object(career_search, "STAGING_PARSED", self.parsed_dir), \
+                mock.patch.object(career_search, "STAGING_SOURCED", sourced_dir), \
+                mock.patch.object(career_search, "LEDGER_DB_PATH", sourced_dir + ".sqlite3"), \
+                mock.patch.object(career_search, "SEARCH_QUEUE_PATH", sourced_dir + ".queue.sqlite3"), \
+                mock.patch.object(career_search, "BLOBS_DIR", os.path.join(self.tmpdir.name, "blobs")), \
+                mock.patch.object(career_search, "_blobs", None), \
+                mock.patch.object(career_search, "find_career_page", _fake_find_career_page), \
+                mock.patch.object(career_search, "scrape_job_description", scrape), \
+                mock.patch("builtins.print"):
+            return process_parsed_leads(config, concurrency=concurrency,
+                                        retry_unresolved=retry_unresolved, deadline=deadline)
+
+    def _load_dir(self, path):
+        out = {}
+        with open_stage(path) as stage:
+            for key, data in stage.items():
+                data.pop("sourced_at")
+                if data.get("scraped"):
+                    data["scraped"].pop("scraped_at")
+                out[key] = data
+        return out
+
+    def test_concurrent_matches_serial(self):
+        serial_dir = os.path.join(self.tmpdir.name, "serial")
+        concurrent_dir = os.path.join(self.tmpdir.name, "concurrent")
+        serial_stats = self._run(serial_dir, 1)
+        concurrent_stats = self._run(concurrent_dir, 4)
+
+        self.assertEqual(serial_stats, concurrent_stats)
+        self.assertEqual(serial_stats["sourced"], 4)
+        self.assertEqual(serial_stats["unresolved"], 1)
+        self.assertEqual(self._load_dir(serial_dir), self._load_dir(concurrent_dir))
+
+    def test_ledger_tracks_outcomes_and_drives_retry(self):
+        sourced_dir = os.path.join(self.tmpdir.name, "sourced")
+        self._run(sourced_dir, 1)
+        with PipelineLedger(sourced_dir + ".sqlite3") as ledger:
+            self.assertEqual(ledger.counts()["search"], {"done": 4, "unresolved": 1})
+            self.assertEqual(ledger.retry("search"),
+                             [("102_0", "unresolved", "No career page found for company", 1)])
+
+        stats = self._run(sourced_dir, 1, retry_unresolved=True)
+        self.assertEqual((stats["total"], stats["unresolved"]), (1, 1))
+        with PipelineLedger(sourced_dir + ".sqlite3") as ledger:
+            self.assertEqual(ledger.get("102_0", "search")["attempts"], 2)
+
+    def test_transient_failures_retry_and_permanent_go_dead(self):
+        sourced_dir = os.path.join(self.tmpdir.name, "sourced")
+        failed_once = []
+
+        def flaky_scrape(url, ats_type, config, role=None):
+            if "globex" in url and not failed_once:
+                failed_once.append(url)
+                raise requests.ConnectionError("Connection reset by peer")
+            if "initech" in url:
+                raise ValueError("unexpected page layout")
+            return _fake_scrape(url, ats_type, config, role)
+
+        stats = self._run(sourced_dir, 2, scrape=flaky_scrape)
+        self.assertEqual((stats["sourced"], stats["unresolved"]), (3, 1))
+        self.assertEqual((stats["retrying"], stats["dead"], stats["remaining"]), (1, 1, 0))
+        with career_search.WorkQueue(sourced_dir + ".queue.sqlite3") as work:
+            self.assertEqual(work.dead(), [("103_0", 1, "ValueError: unexpected page layout")])
+        with PipelineLedger(sourced_dir + ".sqlite3") as ledger:
+            self.assertEqual(ledger.get("101_0", "search")["status"], "done")
+            self.assertEqual(ledger.get("103_0", "search")["status"], "failed")
+
+    def test_transient_unresolved_out_of_attempts_counts_as_dead(self):
+        sourced_dir = os.path.join(self.tmpdir.name, "sourced")
+
+        def unavailable_scrape(url, ats_type, config, role=None):
+            if "umbrella" in url:
+                return {"url": url, "error": "503 Server Error: Service Unavailable"}
+            return _fake_scrape(url, ats_type, config, role)
+
+        stats = self._run(sourced_dir, 1, scrape=unavailable_scrape)
+        self.assertEqual((stats["sourced"], stats["unresolved"]), (3, 1))
+        self.assertEqual((stats["dead"], stats["dead_letters"], stats["remaining"]), (1, 1, 0))
+
+    def test_deadline_and_interrupt_resume_without_redoing(self):
+        sourced_dir = os.path.join(self.tmpdir.name, "sourced")
+        stats = self._run(sourced_dir, 1, deadline=0)
+        self.assertEqual((stats["total"], stats["remaining"]), (0, 5))
+
+        scraped = []
+
+        def interrupted_scrape(url, ats_type, config, role=None):
+            if "initech" in url:
+                raise KeyboardInterrupt
+            scraped.append(url)
+            return _fake_scrape(url, ats_type, config, role)
+
+        with self.assertRaises(KeyboardInterrupt):
+            self._run(sourced_dir, 1, scrape=interrupted_scrape)
+        self.assertEqual(len(scraped), 2)
+
+        def counting_scrape(url, ats_type, config, role=None):
+            scraped.append(url)
+            return _fake_scrape(url, ats_type, config, role)
+
+        stats = self._run(sourced_dir, 1, scrape=counting_scrape)
+        self.assertEqual(stats["total"], 2)     # Initech (released) and Umbrella
+        self.assertEqual([u.split("//")[1].split(".")[0] for u in scraped],
+                         ["acme", "globex", "initech", "umbrella"])
+        with open_stage(sourced_dir) as stage:
+            self.assertEqual(len(stage), 5)
+
+
+class TestReExtract(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sourced = os.path.join(self.tmpdir.name, "sourced")
+        os.makedirs(self.sourced)
+        self.patches = [
+            mock.patch.object(career_search, "STAGING_SOURCED", self.sourced),
+            mock.patch.object(career_search, "LEDGER_DB_PATH", os.path.join(self.tmpdir.name, "ledger.sqlite3")),
+            mock.patch.object(career_search, "BLOBS_DIR", os.path.join(self.tmpdir.name, "blobs")),
+            mock.patch.object(career_search, "_blobs", None),
+        ]
+        for p in self.patches:
+            p.start()
+        with open(os.path.join(FIXTURES, "greenhouse.html"), encoding="utf-8") as f:
+            self.html = f.read()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def _write(self, name, data):
+        # Legacy one-file-per-record layout; re_extract_sourced reads it
+        # through the stage and writes the new version to the log.
+        with open(os.path.join(self.sourced, name), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def _read(self, key):
+        with open_stage(self.sourced) as stage:
+            return stage.get(key)
+
+    def test_scrape_keeps_html_and_replays_offline(self):
+        career_search.configure_blobs()
+        lead = {"company": "Acme Health", "role": "Director of Engineering",
+                "email_uid": "1", "lead_index": 0}
+        url = "https://boards.greenhouse.io/acme/jobs/1"
+        scraped = career_search._build_scrape_result(url, "greenhouse", "Old", "", "", "stale",
+                                                     self.html, extractor="greenhouse")
+        self.assertIn(scraped["raw_html_blob"], career_search._blobs)
+        self._write("1_0.json", {"lead": lead, "scraped": scraped, "status": "sourced"})
+        unresolved = dict(scraped, title="", description_text="")
+        self._write("2_0.json", {"lead": dict(lead, email_uid="2"), "scraped": unresolved,
+                                 "status": "unresolved",
+                                 "unresolved_reason": "No description content on page"})
+        self._write("3_0.json", {"lead": lead, "scraped": None, "status": "unresolved"})
+
+        with mock.patch.object(career_search._http, "get", side_effect=AssertionError("network")):
+            stats = career_search.re_extract_sourced()
+
+        self.assertEqual(stats["records"], 3)
+        self.assertEqual(stats["re_extracted"], 2)
+        self.assertEqual(stats["changed"], 2)
+        self.assertEqual(stats["recovered"], 1)
+        self.assertEqual(stats["no_html"], 1)
+        data = self._read("1_0")
+        self.assertEqual(data["scraped"]["title"], "Director of Engineering")
+        self.assertIn("Lead a team of 25+ engineers", data["scraped"]["description_text"])
+        self.assertEqual(data["scraped"]["scraped_at"], scraped["scraped_at"])
+        self.assertTrue(data["match_validation"]["is_match"])
+        recovered = self._read("2_0")
+        self.assertEqual(recovered["status"], "sourced")
+        self.assertNotIn("unresolved_reason", recovered)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for company_resolver.py — alias resolution, normalized keys and
+n-gram fuzzy matching.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from company_resolver import CompanyResolver, company_key
+
+ALIAS_MAP = {
+    "meta": ["facebook", "meta platforms", "meta platforms inc"],
+    "alphabet": ["google", "google llc", "google inc"],
+    "amazon": ["amazon.com", "amazon web services", "aws"],
+}
+
+
+class TestResolve(unittest.TestCase):
+
+    def setUp(self):
+        self.resolver = CompanyResolver(ALIAS_MAP)
+
+    def test_canonical_alias_and_unknown(self):
+        self.assertEqual(self.resolver.resolve("meta"), "meta")
+        self.assertEqual(self.resolver.resolve("Facebook"), "Meta")
+        self.assertEqual(self.resolver.resolve("Google Inc."), "Alphabet")
+        self.assertEqual(self.resolver.resolve("Acme Corp"), "Acme")
+        self.assertIsNone(self.resolver.resolve(None))
+
+    def test_punctuation_variants_of_aliases(self):
+        self.assertEqual(self.resolver.resolve("Meta Platforms, Inc."), "Meta")
+        self.assertEqual(self.resolver.resolve("Amazon Web-Services"), "Amazon")
+
+    def test_first_canonical_wins_a_shared_alias(self):
+        resolver = CompanyResolver({"one": ["shared"], "two": ["shared"]})
+        self.assertEqual(resolver.resolve("Shared"), "One")
+
+    def test_built_once_per_alias_map(self):
+        self.assertIs(CompanyResolver.for_aliases(ALIAS_MAP), CompanyResolver.for_aliases(ALIAS_MAP))
+        self.assertIsNot(CompanyResolver.for_aliases(ALIAS_MAP),
+                         CompanyResolver.for_aliases(dict(ALIAS_MAP)))
+
+
+class TestKnownNames(unittest.TestCase):
+
+    def setUp(self):
+        self.resolver = CompanyResolver(ALIAS_MAP)
+        for name in ("Acme Health", "ACME Health, Inc.", "Meta", "Florida Power & Light",
+                     "Northwind Traders"):
+            self.resolver.add(name, name.upper())
+
+    def test_company_key(self):
+        self.assertEqual(company_key("Florida Power & Light, Inc."), "florida power light")
+        self.assertEqual(company_key("  Acme Corp. "), "acme")
+
+    def test_lookup_by_key_and_alias(self):
+        self.assertEqual(self.resolver.lookup("acme health llc"),
+                         ["ACME HEALTH", "ACME HEALTH, INC."])
+        self.assertEqual(self.resolver.lookup("Facebook"), ["META"])
+        self.assertEqual(self.resolver.lookup("Florida Power and Light"), [])
+
+    def test_fuzzy_match_with_confidence(self):
+        self.assertEqual(self.resolver.match("Facebook"), ("META", 1.0))
+        value, score = self.resolver.match("Northwind Trader")
+        self.assertEqual(value, "NORTHWIND TRADERS")
+        self.assertGreater(score, 0.8)
+        self.assertLess(score, 1.0)
+        self.assertIsNone(self.resolver.match("Contoso"))
+        self.assertIsNone(self.resolver.match(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
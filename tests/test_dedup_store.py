@@ -0,0 +1,75 @@
+"""
+Tests for dedup_store.py — indexed lookups, append-only writes and the
+one-time migration from fingerprints.json.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup_store import DedupStore, open_store
+
+
+class TestDedupStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmpdir.name, "dedup.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lookups(self):
+        with DedupStore(self.db) as store:
+            store.add("<a@x>", "fp-a", "101", uidvalidity=7)
+            self.assertTrue(store.has_message_id("<a@x>"))
+            self.assertTrue(store.has_fingerprint("fp-a"))
+            self.assertFalse(store.has_message_id("<b@x>"))
+            self.assertFalse(store.has_message_id(""))
+            self.assertEqual(store.uids(), {"101"})
+
+    def test_append_only(self):
+        with DedupStore(self.db) as store:
+            store.add("<a@x>", "fp-a", "101")
+            store.add("<a2@x>", "fp-a", "205", source="duplicate")
+            self.assertEqual(store.count(), 2)
+            self.assertEqual(store.count("fingerprint"), 1)
+            self.assertEqual(store.uids(), {"101", "205"})
+
+    def test_persists_across_connections(self):
+        with DedupStore(self.db) as store:
+            store.add("<a@x>", "fp-a", "101")
+        with DedupStore(self.db) as store:
+            self.assertTrue(store.has_fingerprint("fp-a"))
+
+    def test_migration_joins_fingerprints_and_staging(self):
+        fingerprints = os.path.join(self.tmpdir.name, "fingerprints.json")
+        with open(fingerprints, "w", encoding="utf-8") as f:
+            json.dump({"fp-a": "1", "fp-b": "2"}, f)
+        raw = os.path.join(self.tmpdir.name, "raw")
+        os.makedirs(raw)
+        for uid, mid in (("1", "<a@x>"), ("3", "<c@x>")):
+            with open(os.path.join(raw, f"{uid}.json"), "w", encoding="utf-8") as f:
+                json.dump({"uid": uid, "message_id": mid}, f)
+
+        with open_store(self.db, fingerprints, raw) as store:
+            self.assertEqual(store.count(), 3)
+            self.assertTrue(store.has_message_id("<a@x>"))
+            self.assertTrue(store.has_message_id("<c@x>"))
+            self.assertTrue(store.has_fingerprint("fp-b"))
+            # Legacy keys are IMAP sequence numbers, not UIDs
+            self.assertEqual(store.uids(), set())
+
+        # Second open does not import again
+        with open_store(self.db, fingerprints, raw) as store:
+            self.assertEqual(store.count(), 3)
+            self.assertEqual(store.migrate(fingerprints, raw), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
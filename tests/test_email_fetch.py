@@ -0,0 +1,618 @@
+"""
+Tests for email_fetch.py — incremental UID sync, batched fetches and
+header-first skipping, against a small in-memory IMAP connection.
+"""
+
+import imaplib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from email.message import EmailMessage
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import email_fetch
+from blob_store import BlobStore, hydrate
+from dedup_store import DedupStore
+from fake_imap_server import FakeImapServer
+from email_fetch import get_unprocessed_emails, load_sync_state, save_sync_state, uid_set
+from pipeline_ledger import PipelineLedger
+from record_log import open_stage
+
+
+def _message(n, message_id=None):
+    msg = EmailMessage()
+    msg["From"] = "alerts@linkedin.com"
+    msg["To"] = "me@example.com"
+    msg["Subject"] = f"Job alert {n}"
+    msg["Message-ID"] = message_id or f"<alert-{n}@linkedin.com>"
+    msg.set_content(f"VP Engineering role number {n}")
+    return msg.as_bytes()
+
+
+class _FakeImap:
+    """Just enough imaplib.IMAP4 for the fetch path, with a command log."""
+
+    def __init__(self, messages, uidvalidity=1, gmail=False):
+        self.messages = dict(messages)   # uid -> raw bytes
+        self.uidvalidity = uidvalidity
+        self.capabilities = ("IMAP4REV1", "X-GM-EXT-1") if gmail else ("IMAP4REV1",)
+        self.labels = {uid: set() for uid in self.messages}
+        self.commands = []
+        self.copied = []
+
+    def select(self, mailbox):
+        self.commands.append(("SELECT", mailbox))
+        return "OK", [str(len(self.messages)).encode()]
+
+    def response(self, code):
+        return code, [str(self.uidvalidity).encode()]
+
+    def _parse_set(self, spec):
+        top = max(self.messages, default=0)
+        uids = set()
+        for part in spec.split(","):
+            lo, _, hi = part.partition(":")
+            lo = int(lo)
+            hi = top if hi == "*" else int(hi or lo)
+            lo, hi = min(lo, hi), max(lo, hi)   # n:* is n..max or max..n
+            uids.update(u for u in self.messages if lo <= u <= hi)
+        return sorted(uids)
+
+    def uid(self, command, *args):
+        self.commands.append((command,) + args)
+        if command == "SEARCH":
+            uids = self._parse_set(args[1])
+            if "X-GM-RAW" in args:
+                query = args[args.index("X-GM-RAW") + 1].strip('"')
+                excluded = {term[len("-label:"):] for term in query.split()
+                            if term.startswith("-label:")}
+                uids = [u for u in uids if not excluded & self.labels.get(u, set())]
+            return "OK", [" ".join(str(u) for u in uids).encode()]
+        if command == "FETCH":
+            header_only = "HEADER" in args[1]
+            data = []
+            for u in self._parse_set(args[0]):
+                raw = self.messages[u]
+                if header_only:
+                    raw = raw.split(b"\n\n", 1)[0] + b"\n\n"
+                item = "BODY[HEADER]" if header_only else "BODY[]"
+                labels = ""
+                if "X-GM-LABELS" in args[1]:
+                    quoted = " ".join(f'"{label}"' for label in sorted(self.labels.get(u, ())))
+                    labels = f'X-GM-LABELS ("\\\\Inbox" {quoted}) '
+                data.append((f"{u} ({labels}UID {u} {item} {{{len(raw)}}}".encode(), raw))
+                data.append(b")")
+            return "OK", data
+        if command == "STORE":
+            labels = [label.strip('"') for label in args[2].strip("()").split()]
+            for u in self._parse_set(args[0]):
+                self.labels.setdefault(u, set()).update(labels)
+            return "OK", [None]
+        if command in ("COPY", "MOVE"):
+            self.copied.append((command,) + args)
+            return "OK", [None]
+        raise AssertionError(command)
+
+    def create(self, mailbox):
+        self.commands.append(("CREATE", mailbox))
+        return "OK", [None]
+
+    def fetches(self, item):
+        return [c for c in self.commands if c[0] == "FETCH" and item in c[2]]
+
+
+EML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "eml")
+
+CONFIG = {"email": {"labels": {"processed": "pipeline/processed"}}}
+
+
+class TestUidSet(unittest.TestCase):
+
+    def test_ranges(self):
+        self.assertEqual(uid_set([7, 1, 2, 3, 9, 10]), "1:3,7,9:10")
+        self.assertEqual(uid_set([5]), "5")
+
+
+class TestIncrementalSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self._paths = (email_fetch.SYNC_STATE_PATH, email_fetch.STAGING_RAW)
+        email_fetch.SYNC_STATE_PATH = os.path.join(self.tmpdir.name, "sync_state.json")
+        email_fetch.STAGING_RAW = os.path.join(self.tmpdir.name, "raw")
+        self.store = DedupStore(os.path.join(self.tmpdir.name, "dedup.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        email_fetch.SYNC_STATE_PATH, email_fetch.STAGING_RAW = self._paths
+        self.tmpdir.cleanup()
+
+    def _fetch(self, conn, state, limit=0):
+        return get_unprocessed_emails(conn, CONFIG, limit=limit, state=state, store=self.store)
+
+    def test_batched_fetch_by_uid(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 121)})
+        state = load_sync_state()
+        emails = self._fetch(conn, state)
+        self.assertEqual([e["uid"] for e in emails], [str(u) for u in range(1, 121)])
+        self.assertEqual(emails[0]["subject"], "Job alert 1")
+        self.assertEqual(len(conn.fetches("BODY.PEEK[]")), 3)   # 50 + 50 + 20
+        self.assertEqual(conn.fetches("BODY.PEEK[]")[0][1], "1:50")
+        self.assertEqual(state["last_uid"], 120)
+        self.assertEqual(state["uidvalidity"], 1)
+
+    def test_second_run_searches_only_new_uids(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 6)})
+        state = load_sync_state()
+        self._fetch(conn, state)
+        save_sync_state(state)
+
+        conn.messages[6] = _message(6)
+        conn.commands.clear()
+        emails = self._fetch(conn, load_sync_state())
+        self.assertEqual([e["uid"] for e in emails], ["6"])
+        self.assertIn(("SEARCH", "UID", "6:*"), conn.commands)
+
+    def test_nothing_new_despite_star_quirk(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 4)})
+        state = {"uidvalidity": 1, "last_uid": 3}
+        self.assertEqual(self._fetch(conn, state), [])
+        self.assertEqual(conn.fetches("BODY"), [])
+
+    def test_known_message_ids_skipped_after_headers(self):
+        conn = _FakeImap({1: _message(1), 2: _message(2), 3: _message(3)})
+        self.store.add("<alert-2@linkedin.com>", "fp2", "2")
+        state = {"uidvalidity": 1, "last_uid": 0}
+        emails = self._fetch(conn, state)
+        self.assertEqual([e["uid"] for e in emails], ["1", "3"])
+        self.assertEqual(conn.fetches("BODY.PEEK[]")[0][1], "1,3")
+        self.assertEqual(state["last_uid"], 3)
+
+    def test_limit_takes_oldest_and_resumes(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 11)})
+        state = load_sync_state()
+        first = self._fetch(conn, state, limit=4)
+        second = self._fetch(conn, state, limit=4)
+        self.assertEqual([e["uid"] for e in first], ["1", "2", "3", "4"])
+        self.assertEqual([e["uid"] for e in second], ["5", "6", "7", "8"])
+        self.assertEqual(state["last_uid"], 8)
+
+    def test_uidvalidity_change_rescans(self):
+        conn = _FakeImap({1: _message(1), 2: _message(2, "<new@x>")}, uidvalidity=2)
+        self.store.add("<alert-1@linkedin.com>", "fp1", "40", uidvalidity=1)
+        state = {"uidvalidity": 1, "last_uid": 50}
+        emails = self._fetch(conn, state)
+        self.assertEqual([e["message_id"] for e in emails], ["<new@x>"])
+        self.assertEqual(state["uidvalidity"], 2)
+        self.assertEqual(state["last_uid"], 2)
+
+    def test_gmail_search_excludes_labelled_mail(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 5)}, gmail=True)
+        conn.labels[2].add("pipeline/processed")
+        emails = self._fetch(conn, load_sync_state())
+        self.assertEqual([e["uid"] for e in emails], ["1", "3", "4"])
+        search = [c for c in conn.commands if c[0] == "SEARCH"][0]
+        self.assertEqual(search, ("SEARCH", "UID", "1:*", "X-GM-RAW",
+                                  '"-label:pipeline/processed -label:pipeline/failed"'))
+        self.assertEqual(len(conn.fetches("X-GM-LABELS BODY.PEEK[HEADER]")), 1)
+
+    def test_labels_read_with_headers_skip_late_labelled(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 4)}, gmail=True)
+        real_uid = conn.uid
+
+        def uid(command, *args):   # labelled by another run between SEARCH and FETCH
+            if command == "FETCH":
+                conn.labels[3].add("pipeline/failed")
+            return real_uid(command, *args)
+
+        conn.uid = uid
+        emails = self._fetch(conn, load_sync_state())
+        self.assertEqual([e["uid"] for e in emails], ["1", "2"])
+
+    def test_parse_gmail_labels(self):
+        line = b'7 (X-GM-LABELS ("\\\\Inbox" pipeline/processed "Job \\"leads\\"") UID 7'
+        self.assertEqual(email_fetch.parse_gmail_labels(line),
+                         ["\\Inbox", "pipeline/processed", 'Job "leads"'])
+        self.assertIsNone(email_fetch.parse_gmail_labels(b"7 (UID 7 BODY[] {3}"))
+
+    def test_store_gmail_labels_one_command(self):
+        conn = _FakeImap({u: _message(u) for u in range(1, 121)}, gmail=True)
+        result = email_fetch.store_gmail_labels(conn, [str(u) for u in range(1, 121)],
+                                                add=["pipeline/processed"])
+        self.assertEqual(result, (1, 0))
+        stores = [c for c in conn.commands if c[0] == "STORE"]
+        self.assertEqual(stores, [("STORE", "1:120", "+X-GM-LABELS", '("pipeline/processed")')])
+        self.assertIn("pipeline/processed", conn.labels[120])
+
+    def test_gmail_extensions_off_by_config(self):
+        conn = _FakeImap({1: _message(1)}, gmail=True)
+        config = {"email": dict(CONFIG["email"], gmail_extensions=False)}
+        get_unprocessed_emails(conn, config, limit=0, state=load_sync_state(), store=self.store)
+        self.assertNotIn("X-GM-RAW", [c for c in conn.commands if c[0] == "SEARCH"][0])
+
+
+
+class TestLabelBatcher(unittest.TestCase):
+
+    def test_one_copy_per_label_with_compressed_set(self):
+        conn = _FakeImap({})
+        labeler = email_fetch.LabelBatcher(conn)
+        for uid in list(range(101, 141)) + [152] + list(range(160, 171)):
+            labeler.add(str(uid), "pipeline/processed")
+        labeler.add("7", "pipeline/not-job")
+        labeler.add("152", "pipeline/processed")   # duplicates collapse
+        stats = labeler.flush()
+        self.assertEqual(conn.copied, [
+            ("COPY", "7", '"pipeline/not-job"'),
+            ("COPY", "101:140,152,160:170", '"pipeline/processed"'),
+        ])
+        self.assertEqual(stats["pipeline/processed"]["uids"], 52)
+        self.assertEqual(stats["pipeline/processed"]["commands"], 1)
+        self.assertIn("pipeline/processed: 52 emails, 1 command(s)", labeler.format_stats())
+
+    def test_label_created_once_per_session(self):
+        conn = _FakeImap({})
+        labeler = email_fetch.LabelBatcher(conn)
+        labeler.add(1, "pipeline/processed")
+        labeler.flush()
+        labeler.add(2, "pipeline/processed")
+        labeler.flush()
+        self.assertEqual([c for c in conn.commands if c[0] == "CREATE"],
+                         [("CREATE", "pipeline/processed")])
+        self.assertEqual(labeler.stats["pipeline/processed"]["uids"], 2)
+
+    def test_move_when_supported(self):
+        conn = _FakeImap({})
+        conn.capabilities += ("MOVE",)
+        labeler = email_fetch.LabelBatcher(conn, move=True)
+        labeler.add(3, "pipeline/processed")
+        labeler.flush()
+        self.assertEqual(conn.copied[0][0], "MOVE")
+
+    def test_gmail_uses_store(self):
+        conn = _FakeImap({1: _message(1), 2: _message(2)}, gmail=True)
+        labeler = email_fetch.LabelBatcher(conn, gmail=True)
+        labeler.add(1, "pipeline/processed")
+        labeler.add(2, "pipeline/processed")
+        labeler.flush()
+        self.assertEqual(conn.copied, [])
+        self.assertEqual(conn.labels[2], {"pipeline/processed"})
+        self.assertNotIn("CREATE", [c[0] for c in conn.commands])
+
+    def test_long_sets_split(self):
+        uids = range(1, 2000, 2)   # nothing to compress
+        chunks = list(email_fetch.uid_set_chunks(uids, max_chars=100))
+        self.assertTrue(all(len(c) <= 100 for c in chunks))
+        self.assertEqual(",".join(chunks), email_fetch.uid_set(uids))
+
+
+class TestOfflineIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.raw = os.path.join(self.tmpdir.name, "raw")
+        self.blobs = BlobStore(os.path.join(self.tmpdir.name, "blobs"))
+        self.store = DedupStore(os.path.join(self.tmpdir.name, "dedup.sqlite3"))
+        self.ledger_path = os.path.join(self.tmpdir.name, "ledger.sqlite3")
+        self.patch = mock.patch.object(email_fetch, "LEDGER_DB_PATH", self.ledger_path)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def _mbox(self, messages):
+        path = os.path.join(self.tmpdir.name, "takeout.mbox")
+        with open(path, "wb") as f:
+            for raw in messages:
+                body = re.sub(rb"(?m)^(>*From )", rb">\1", raw)
+                f.write(b"From 1234@xxx Mon Jan 01 00:00:00 +0000 2024\n" + body + b"\n")
+        return path
+
+    def _ingest(self, source, path, **kwargs):
+        return email_fetch.ingest_offline(source, path, self.store, staging_dir=self.raw,
+                                          blobs=self.blobs, **kwargs)
+
+    def _saved(self):
+        with open_stage(self.raw) as stage:
+            return [stage.get(key) for key in sorted(stage.keys())]
+
+    def _saved_keys(self):
+        with open_stage(self.raw) as stage:
+            return sorted(stage.keys())
+
+    def test_mbox_streams_and_dedups(self):
+        escaped = _message(2).replace(b"VP Engineering", b"From the team: VP Engineering")
+        same_content = _message(1, "<resent@x>")       # forwarded twice
+        path = self._mbox([_message(1), escaped, _message(1), same_content])
+        stats = self._ingest("mbox", path)
+        self.assertEqual((stats["read"], stats["known"], stats["saved"], stats["duplicates"]),
+                         (4, 1, 2, 1))
+        names = self._saved_keys()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(n.startswith("mbox-") for n in names))
+        bodies = [record["body_text"] for record in self._saved()]
+        self.assertTrue(any(b.startswith("From the team") for b in bodies))
+
+        # Re-running skips everything from headers alone
+        again = self._ingest("mbox", path)
+        self.assertEqual((again["known"], again["saved"]), (4, 0))
+
+        with PipelineLedger(self.ledger_path) as ledger:
+            self.assertEqual(ledger.keys("fetch", "done"), set(names))
+            self.assertEqual(ledger.pending("parse"), set(names))
+
+    def test_maildir_and_eml_dir(self):
+        maildir = os.path.join(self.tmpdir.name, "Maildir")
+        for sub, n in (("cur", 1), ("new", 2)):
+            os.makedirs(os.path.join(maildir, sub))
+            with open(os.path.join(maildir, sub, f"{n}.host:2,S"), "wb") as f:
+                f.write(_message(n))
+        self.assertEqual(self._ingest("maildir", maildir)["saved"], 2)
+
+        eml_dir = os.path.join(self.tmpdir.name, "eml", "2024")
+        os.makedirs(eml_dir)
+        for n in (2, 3):
+            with open(os.path.join(eml_dir, f"{n}.eml"), "wb") as f:
+                f.write(_message(n))
+        stats = self._ingest("eml", os.path.dirname(eml_dir))
+        self.assertEqual((stats["known"], stats["saved"]), (1, 1))
+
+    def test_large_bodies_go_to_blob_store(self):
+        template = "<table><tr><td>VP Engineering at Acme</td></tr></table>\n" * 100
+        messages = []
+        for n in (1, 2):
+            msg = EmailMessage()
+            msg["From"] = "jobalerts-noreply@linkedin.com"
+            msg["Subject"] = f"Jobs for you {n}"
+            msg["Message-ID"] = f"<html-{n}@linkedin.com>"
+            msg.set_content(f"Alert {n}")
+            msg.add_alternative(template, subtype="html")
+            messages.append(msg.as_bytes())
+        path = self._mbox(messages)
+        self.assertEqual(self._ingest("mbox", path)["saved"], 2)
+
+        records = self._saved()
+        self.assertTrue(all("body_html" not in r for r in records))
+        self.assertEqual(len({r["body_html_blob"] for r in records}), 1)   # shared template
+        self.assertEqual(self.blobs.stats()["blobs"], 1)
+        email_dict = hydrate(records[0], self.blobs)
+        self.assertEqual(email_dict["body_html"].strip(), template.strip())
+        self.assertTrue(email_dict["body_text"].startswith("Alert"))
+
+    def test_forwarded_bodies_are_not_staged_inline(self):
+        alert = "VP Engineering at Acme - Remote - Apply now\n" * 200
+        msg = EmailMessage()
+        msg["From"] = "me@example.com"
+        msg["Subject"] = "Fwd: Jobs for you"
+        msg["Message-ID"] = "<fwd-1@example.com>"
+        msg.set_content("---------- Forwarded message ---------\n"
+                        "From: LinkedIn <jobalerts-noreply@linkedin.com>\n"
+                        "Date: Mon, Jan 1, 2024\nSubject: Jobs for you\nTo: me@example.com\n\n"
+                        + alert)
+        msg.add_alternative(f"<pre>{alert}</pre>", subtype="html")
+        self.assertEqual(self._ingest("mbox", self._mbox([msg.as_bytes()]))["saved"], 1)
+
+        record = self._saved()[0]
+        staged = json.dumps(record)
+        self.assertNotIn("VP Engineering", staged)
+        self.assertLess(len(staged), 2000)
+        email_dict = hydrate(record, self.blobs)
+        self.assertTrue(email_dict["forward_info"]["is_forwarded"])
+        self.assertEqual(email_dict["forward_info"]["original_body_text"].strip(), alert.strip())
+        self.assertEqual(email_dict["forward_info"]["original_body_html"], email_dict["body_html"])
+
+    def test_process_pool_matches_serial(self):
+        path = self._mbox([_message(n) for n in range(1, 41)])
+        stats = self._ingest("mbox", path, workers=2, limit=30)
+        self.assertEqual(stats["saved"], 30)
+        with DedupStore(os.path.join(self.tmpdir.name, "serial.sqlite3")) as serial_store:
+            serial = email_fetch.ingest_offline("mbox", path, serial_store, dry_run=True,
+                                                staging_dir=self.raw)
+        self.assertEqual(serial["saved"], 40)
+        self.assertEqual(len(self._saved_keys()), 30)
+
+
+class TestAgainstFakeServer(unittest.TestCase):
+    """The real imaplib client against the local stand-in server."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = DedupStore(os.path.join(self.tmpdir.name, "dedup.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def _run(self, server, config=CONFIG, state=None):
+        conn = imaplib.IMAP4("127.0.0.1", server.port)
+        conn.login("me@example.com", "pw")
+        state = state if state is not None else load_sync_state()
+        emails = get_unprocessed_emails(conn, config, limit=0, state=state, store=self.store)
+        labeler = email_fetch.LabelBatcher(conn, gmail=email_fetch.use_gmail_extensions(conn, config))
+        for e in emails:
+            self.store.add(e["message_id"], email_fetch.compute_email_fingerprint(e), e["uid"])
+            labeler.add(e["uid"], "pipeline/processed")
+        labeler.flush()
+        conn.logout()
+        return emails, state
+
+    def test_gmail_fetch_and_label(self):
+        with FakeImapServer.from_eml_dir(EML_DIR) as server:
+            emails, state = self._run(server)
+            self.assertEqual(len(emails), 6)
+            subjects = {e["subject"] for e in emails}
+            self.assertIn("Fwd: Director of Engineering at Northwind Health", subjects)
+            html = [e for e in emails if e["subject"].startswith("3 new")][0]["body_html"]
+            self.assertIn("Tailspin Toys", html)
+            self.assertTrue(all("pipeline/processed" in m.labels for m in server.messages()))
+            self.assertEqual(server.stats["UID STORE"], 1)
+            self.assertEqual(server.stats["UID FETCH"], 2)   # headers + bodies
+            # Nothing is marked read by the PEEK fetches
+            self.assertFalse(any("\\Seen" in m.flags for m in server.messages()))
+
+            server.add_message(_message(99))
+            server.reset_stats()
+            again, _ = self._run(server, state=state)
+            self.assertEqual([e["subject"] for e in again], ["Job alert 99"])
+            self.assertEqual(server.stats["UID FETCH"], 2)
+
+    def test_gmail_search_skips_labelled(self):
+        with FakeImapServer.from_eml_dir(EML_DIR) as server:
+            server.messages()[0].labels.add("pipeline/processed")
+            emails, _ = self._run(server)
+            self.assertEqual(len(emails), 5)
+
+    def test_plain_imap_copy(self):
+        with FakeImapServer.from_eml_dir(EML_DIR, gmail=False) as server:
+            emails, _ = self._run(server)
+            self.assertEqual(len(emails), 6)
+            self.assertEqual(len(server.messages("pipeline/processed")), 6)
+            self.assertEqual(server.stats["UID COPY"], 1)
+            self.assertEqual(server.stats["CREATE"], 1)
+
+    def test_uidvalidity_change(self):
+        with FakeImapServer.from_eml_dir(EML_DIR) as server:
+            _, state = self._run(server)
+        with FakeImapServer.from_eml_dir(EML_DIR, uidvalidity=2) as server:
+            server.add_message(_message(7))
+            emails, state = self._run(server, state=state)
+            self.assertEqual([e["subject"] for e in emails], ["Job alert 7"])
+            self.assertEqual(state["uidvalidity"], 2)
+
+    def test_connect_imap_plaintext_for_local_server(self):
+        with FakeImapServer() as server:
+            config = {"email": {"address": "me@example.com", "imap_host": "127.0.0.1",
+                                "imap_port": server.port, "imap_ssl": False,
+                                "app_password_env": "FAKE_IMAP_TEST_PASSWORD"}}
+            with mock.patch.dict(os.environ, {"FAKE_IMAP_TEST_PASSWORD": "pw"}):
+                conn = email_fetch.connect_imap(config)
+            self.assertEqual(conn.select("INBOX")[0], "OK")
+            conn.logout()
+
+    def test_latency_and_byte_counters(self):
+        with FakeImapServer.from_eml_dir(EML_DIR, latency=0.02) as server:
+            conn = imaplib.IMAP4("127.0.0.1", server.port)
+            conn.login("me@example.com", "pw")
+            start = time.monotonic()
+            conn.noop()
+            self.assertGreaterEqual(time.monotonic() - start, 0.02)
+            conn.select("INBOX")
+            conn.uid("FETCH", "1:*", "(UID BODY.PEEK[HEADER.FIELDS (SUBJECT MESSAGE-ID)])")
+            conn.logout()
+            self.assertGreater(server.stats["bytes_out"], 0)
+            self.assertGreater(server.stats["bytes_in"], 0)
+
+
+class TestWatch(unittest.TestCase):
+    """IDLE wake-ups and the reconnecting watch loop."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        tmp = self.tmpdir.name
+        self.patches = [
+            mock.patch.object(email_fetch, "SYNC_STATE_PATH", os.path.join(tmp, "sync_state.json")),
+            mock.patch.object(email_fetch, "STAGING_RAW", os.path.join(tmp, "raw")),
+            mock.patch.object(email_fetch, "BLOBS_DIR", os.path.join(tmp, "blobs")),
+            mock.patch.object(email_fetch, "DEDUP_DB_PATH", os.path.join(tmp, "dedup.sqlite3")),
+            mock.patch.object(email_fetch, "FINGERPRINTS_PATH", os.path.join(tmp, "fingerprints.json")),
+            mock.patch.object(email_fetch, "LEDGER_DB_PATH", os.path.join(tmp, "ledger.sqlite3")),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def _connect(self, server):
+        conn = imaplib.IMAP4("127.0.0.1", server.port)
+        conn.login("me@example.com", "pw")
+        return conn
+
+    def test_idle_wakes_on_new_mail(self):
+        with FakeImapServer() as server:
+            conn = self._connect(server)
+            conn.select("INBOX")
+            threading.Timer(0.2, server.add_message, args=(_message(1),)).start()
+            start = time.monotonic()
+            self.assertTrue(email_fetch.imap_idle(conn, 10))
+            self.assertLess(time.monotonic() - start, 5)
+            # The connection is usable again after DONE
+            self.assertEqual(conn.noop()[0], "OK")
+            conn.logout()
+
+    def test_idle_wakes_on_exists_buffered_with_continuation(self):
+        with FakeImapServer() as server:
+            conn = self._connect(server)
+            conn.select("INBOX")
+            server.add_message(_message(1))   # announced with "+ idling"
+            start = time.monotonic()
+            self.assertTrue(email_fetch.imap_idle(conn, 10))
+            self.assertLess(time.monotonic() - start, 2)
+            conn.logout()
+
+    def test_parse_new_emails_parses_only_saved_keys(self):
+        stats = {"parsed": 2, "leads_found": 5, "total": 2}
+        with mock.patch("email_parse.process_raw_emails", return_value=stats) as process, \
+                mock.patch("builtins.print") as printed:
+            email_fetch.parse_new_emails([{"uid": 7}, {"uid": "9"}])
+        process.assert_called_once_with(keys=["7", "9"])
+        printed.assert_called_once_with("  Parsed: 5 leads from 2 emails")
+
+    def test_idle_times_out(self):
+        with FakeImapServer() as server:
+            conn = self._connect(server)
+            conn.select("INBOX")
+            self.assertFalse(email_fetch.imap_idle(conn, 0.3))
+            conn.logout()
+
+    def test_watch_fetches_new_mail_and_reconnects(self):
+        batches = []
+        arrived = threading.Event()
+
+        def on_new(emails):
+            batches.append([e["subject"] for e in emails])
+            arrived.set()
+
+        stop = threading.Event()
+        with FakeImapServer.from_eml_dir(EML_DIR) as server:
+            worker = threading.Thread(target=email_fetch.watch, args=(CONFIG,), kwargs={
+                "on_new": on_new, "idle_seconds": 5, "stop": stop, "max_backoff": 0.1,
+                "connect": lambda config: self._connect(server)})
+            worker.start()
+            try:
+                self.assertTrue(arrived.wait(10))
+                self.assertEqual(len(batches[0]), 6)
+
+                arrived.clear()
+                server.add_message(_message(1))
+                self.assertTrue(arrived.wait(10))
+                self.assertEqual(batches[1], ["Job alert 1"])
+
+                # Server drops the connection; watch reconnects and resumes
+                arrived.clear()
+                server.disconnect_all()
+                server.add_message(_message(2))
+                self.assertTrue(arrived.wait(10))
+                self.assertEqual(batches[2], ["Job alert 2"])
+                self.assertGreaterEqual(server.stats["connections"], 2)
+            finally:
+                stop.set()
+                worker.join(10)
+            self.assertFalse(worker.is_alive())
+            self.assertEqual(load_sync_state()["last_uid"], server.messages()[-1].uid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,12 +5,17 @@ Tests for email_parse.py — email classification, parsing, and normalization.
 import os
 import sys
 import unittest
+from collections import Counter
+from unittest import mock
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import email_parse
 from email_parse import (
+    EmailView,
     classify_email,
+    classify_email_rule,
     detect_non_job_email,
     detect_rejection_email,
     get_sender_domain,
@@ -132,6 +137,35 @@ class TestClassifyEmail(unittest.TestCase):
         result = classify_email(email, SENDER_TEMPLATES)
         self.assertEqual(result, "single_job")
 
+    def test_reports_rule_that_fired(self):
+        cases = [
+            ({"from": "jobs-noreply@linkedin.com", "subject": "Jimmy, 5 new jobs for you"},
+             ("multi_job", "multi_job:linkedin.com:multi_job_indicator")),
+            ({"from": "careers@acme.com", "subject": "Application update",
+              "body_text": "Unfortunately we went another way at this time."},
+             ("rejection", "rejection:application_status+unfortunately")),
+            ({"from": "noreply@linkedin.com", "subject": "Your weekly digest"},
+             ("not_job", "not_job:weekly_digest")),
+            ({"from": "sarah@staffingfirm.com", "subject": "Are you open to new roles?"},
+             ("recruiter_generic", "recruiter_generic:recruiter:sender_template")),
+        ]
+        for email, expected in cases:
+            email = {"body_text": "", "body_html": "", **email}
+            self.assertEqual(classify_email_rule(email, SENDER_TEMPLATES), expected)
+
+        # Without a _default recruiter template the body has to look like outreach
+        email = {"from": "sarah@staffingfirm.com", "subject": "Reaching out",
+                 "body_text": "Are you open to new roles?", "body_html": ""}
+        self.assertEqual(classify_email_rule(email, {}),
+                         ("recruiter_generic", "recruiter_generic:recruiter:reaching_out"))
+        email["subject"] = "Hello"
+        self.assertEqual(classify_email_rule(email, {}), ("unknown", "unknown"))
+
+        email = {"from": "careers@acme.com", "subject": "Update",
+                 "body_text": "The position has been filled.", "body_html": ""}
+        results = email_parse.parse_email(email, "1", SENDER_TEMPLATES, ALIAS_MAP, Counter())
+        self.assertEqual(results[0]["classified_by"], "rejection:position_filled")
+
 
 class TestNonJobDetection(unittest.TestCase):
 
@@ -580,6 +614,16 @@ class TestMatchRejectionToApp(unittest.TestCase):
         matches = _match_rejection_to_app("Totally Different Co", record, index)
         self.assertEqual(len(matches), 0)
 
+    def test_alias_match(self):
+        index = self._make_index([
+            ("Meta", "2026-01-15_meta_director-of-engineering", "applied"),
+        ])
+        record = {"company": "Facebook", "role": None}
+        self.assertEqual(_match_rejection_to_app("Facebook", record, index), [])
+        resolver = email_parse._app_resolver(index, ALIAS_MAP)
+        matches = _match_rejection_to_app("Facebook", record, index, resolver)
+        self.assertEqual([m[0] for m in matches], ["2026-01-15_meta_director-of-engineering"])
+
     def test_role_tiebreaker(self):
         """When multiple apps for same company, prefer role match."""
         index = {}
@@ -732,5 +776,78 @@ class TestClassifyEmailRejection(unittest.TestCase):
         self.assertEqual(classify_email(email, SENDER_TEMPLATES), "rejection")
 
 
+class TestParserFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(email_parse, "_code_fingerprints", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fingerprints(self):
+        email_parse._code_fingerprints.clear()
+        return {(email_type, strategy): email_parse.parser_fingerprint(
+                    email_type, "linkedin.com",
+                    {"linkedin.com": {"body_parse_strategy": strategy}}, ALIAS_MAP)
+                for email_type in email_parse.PARSE_PATHS
+                for strategy in ("linkedin_cards", "indeed_list")}
+
+    def test_only_paths_reaching_changed_code_go_stale(self):
+        before = self._fingerprints()
+
+        def improved(text):
+            return []
+        with mock.patch.object(email_parse, "_parse_linkedin_text_cards", improved):
+            after = self._fingerprints()
+        changed = {key for key in before if before[key] != after[key]}
+        self.assertEqual(changed, {("multi_job", "linkedin_cards")})
+        self.assertEqual(self._fingerprints(), before)
+
+    def test_config_sections_by_type(self):
+        templates = {"_default": {"type": "recruiter"}}
+        base = {t: email_parse.parser_fingerprint(t, "x.com", templates, {})
+                for t in ("not_job", "recruiter_generic")}
+        aliases = {"Acme": ["Acme Corp"]}
+        self.assertEqual(email_parse.parser_fingerprint("not_job", "x.com", templates, aliases),
+                         base["not_job"])
+        self.assertNotEqual(
+            email_parse.parser_fingerprint("recruiter_generic", "x.com", templates, aliases),
+            base["recruiter_generic"])
+        # A template added for the domain replaces _default
+        templates = dict(templates, **{"x.com": {"type": "job_board"}})
+        self.assertNotEqual(email_parse.parser_fingerprint("not_job", "x.com", templates, {}),
+                            base["not_job"])
+
+
+class TestEmailView(unittest.TestCase):
+
+    def test_html_converted_once_per_email(self):
+        cards = "".join(f"<p>VP Engineering {n}</p><p>Company{n} · Remote</p>" for n in range(3))
+        email = {
+            "from": "jobs-noreply@linkedin.com",
+            "subject": "10 new jobs for you",
+            "body_text": "",
+            "body_html": f"<html><body>{cards}<p>View job</p></body></html>",
+        }
+        with mock.patch.object(email_parse, "html_to_text", wraps=email_parse.html_to_text) as convert:
+            results = email_parse.parse_email(email, "1", SENDER_TEMPLATES, ALIAS_MAP, Counter())
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(results[0]["type"], "job_lead")
+
+    def test_forwarded_sender_and_cached_fields(self):
+        view = EmailView({
+            "from": "Me <me@gmail.com>",
+            "subject": "Fwd: VP Engineering",
+            "body_text": "---------- Forwarded message ---------\n"
+                         "From: Jane <jane@recruit.example.com>\nSubject: VP Engineering\n\n"
+                         "Hi\u200b there <https://example.com/x>",
+            "body_html": "",
+        })
+        self.assertEqual(view.sender_domain, "gmail.com")
+        self.assertEqual(view.effective_domain, "example.com")
+        self.assertEqual(view.forward_info["original_subject"], "VP Engineering")
+        self.assertTrue(view.clean_body.endswith("Hi there "))
+        self.assertIs(EmailView.of(view), view)
+
+
 if __name__ == "__main__":
     unittest.main()
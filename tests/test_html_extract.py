@@ -0,0 +1,144 @@
+"""
+Tests for html_extract.py — streaming extraction must match the original
+BeautifulSoup scrapers on every backend.
+"""
+
+import glob
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_extract
+from html_extract import (
+    Selector, extract_generic, extract_greenhouse, extract_lever, html_to_text,
+    set_default_backend,
+)
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         "fixtures", "html", "*.html")))
+
+STREAMING_BACKENDS = ["html.parser"] + (["lxml"] if html_extract._lxml_etree is not None else [])
+
+
+def _load(name):
+    with open(os.path.join(os.path.dirname(FIXTURES[0]), name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestMatchesBeautifulSoup(unittest.TestCase):
+
+    def test_fixtures_all_extractors_all_backends(self):
+        extractors = {
+            "greenhouse": extract_greenhouse,
+            "lever": extract_lever,
+            "generic": extract_generic,
+            "text": lambda html, backend: html_to_text(html, backend),
+        }
+        for path in FIXTURES:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+            for name, fn in extractors.items():
+                expected = fn(html, backend="bs4")
+                for backend in STREAMING_BACKENDS:
+                    with self.subTest(fixture=os.path.basename(path), extractor=name, backend=backend):
+                        self.assertEqual(fn(html, backend=backend), expected)
+
+    def test_tricky_markup(self):
+        samples = [
+            "<div id=content>a<!--c-->b &amp; c<script>x()</script><p> d </p><p></p></div>",
+            "<div class='content'>" + "long text &mdash; with entities &#39;quoted&#39; " * 200 + "</div>",
+            "",
+            "plain text, no tags",
+        ]
+        for html in samples:
+            for backend in STREAMING_BACKENDS:
+                with self.subTest(html=html[:30], backend=backend):
+                    self.assertEqual(extract_greenhouse(html, backend=backend),
+                                     extract_greenhouse(html, backend="bs4"))
+                    self.assertEqual(html_to_text(html, backend=backend),
+                                     html_to_text(html, backend="bs4"))
+
+
+    def test_block_inside_paragraph_default_backend(self):
+        # libxml2 closes the <p> at the <div>, losing description text
+        html = '<p class="content">Intro<div>Lead the team</div>More</p>'
+        self.assertEqual(extract_greenhouse(html)[3], "Intro\nLead the team\nMore")
+        self.assertEqual(extract_greenhouse(html), extract_greenhouse(html, backend="bs4"))
+
+    def test_stray_end_tags_html_parser(self):
+        # libxml2 drops stray end tags without an event, so lxml may join the
+        # text around them; the stdlib tokenizer matches bs4 exactly
+        html = "<p>one<p>two<br>three</div></span>four"
+        self.assertEqual(html_to_text(html, backend="html.parser"), html_to_text(html, backend="bs4"))
+
+
+class TestExtractors(unittest.TestCase):
+
+    def test_greenhouse_fields(self):
+        title, company, location, description = extract_greenhouse(_load("greenhouse.html"))
+        self.assertEqual(title, "Director of Engineering")
+        self.assertEqual(company, "at Acme Health")
+        self.assertEqual(location, "Remote - US")
+        self.assertIn("Lead a team of 25+ engineers", description)
+        self.assertNotIn("trackView", description)
+        self.assertNotIn("recruiter note", description)
+
+    def test_generic_prunes_chrome(self):
+        title, company, location, description = extract_generic(_load("generic_article.html"))
+        self.assertEqual(title, "Head of Engineering")   # site header h1 is pruned
+        self.assertEqual(company, "Initech")
+        self.assertEqual(location, "Austin, TX(on-site 3 days)")
+        self.assertNotIn("cookies", description)
+        self.assertIn("Qualifications", description)
+
+    def test_generic_sections_strategy(self):
+        _, _, _, description = extract_generic(_load("generic_sections.html"))
+        self.assertTrue(description.startswith("Job Description\nLead the data platform team."))
+        self.assertIn("\n\nSkills\nSpark, dbt,\nSnowflake", description)
+        self.assertNotIn("Health, dental", description)
+
+
+class TestSelector(unittest.TestCase):
+
+    def _matches(self, selector, tag, attrs, ancestors=()):
+        anc = [(t, a, (a.get("class") or "").split()) for t, a in ancestors]
+        return Selector(selector).matches(tag, attrs, (attrs.get("class") or "").split(), anc)
+
+    def test_compound_and_descendant(self):
+        self.assertTrue(self._matches("h1.heading", "h1", {"class": "big heading"}))
+        self.assertFalse(self._matches("h1.heading", "h2", {"class": "heading"}))
+        self.assertTrue(self._matches(".posting-page .content", "div", {"class": "content"},
+                                      [("div", {"class": "posting-page x"}), ("div", {})]))
+        self.assertFalse(self._matches(".posting-page .content", "div", {"class": "content"}))
+
+    def test_attribute_operators(self):
+        self.assertTrue(self._matches("[class*='location']", "p", {"class": "job-location"}))
+        self.assertTrue(self._matches("[role='main']", "div", {"role": "main"}))
+        self.assertFalse(self._matches("[role='main']", "div", {"role": "mainly"}))
+        self.assertTrue(self._matches("#content, .content", "div", {"id": "content"}))
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def tearDown(self):
+        set_default_backend("auto")
+
+    def test_unknown_backend_rejected(self):
+        with self.assertRaises(ValueError):
+            set_default_backend("selectolax")
+
+    def test_auto_is_html_parser(self):
+        set_default_backend("auto")
+        self.assertEqual(html_extract.get_default_backend(), "html.parser")
+
+    def test_default_backend_used(self):
+        set_default_backend("html.parser")
+        self.assertEqual(html_extract.get_default_backend(), "html.parser")
+        self.assertEqual(html_to_text("<p>a</p><p>b</p>"), "a\nb")
+
+
+if __name__ == "__main__":
+    unittest.main()
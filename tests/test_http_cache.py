@@ -0,0 +1,195 @@
+"""
+Tests for http_cache.py — TTLs, conditional revalidation, LRU eviction and
+cache-only mode, through HttpClient against a local server.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_cache
+from http_cache import HttpCache, build_cache, classify_url
+from http_client import HttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = {}
+
+    def do_GET(self):
+        _Handler.hits[self.path] = _Handler.hits.get(self.path, 0) + 1
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send(200, b"<html>versioned</html>", etag='"v1"')
+            return
+        if self.path == "/busy":
+            self._send(503, b"busy")
+            return
+        if self.path.startswith("/big"):
+            self._send(200, self.path.encode() + os.urandom(4000))
+            return
+        self._send(200, f"<html>{self.path}</html>".encode())
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _CacheTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        _Handler.hits.clear()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _client(self, **cache_kwargs):
+        cache = HttpCache(self.tmpdir.name, **cache_kwargs)
+        return HttpClient(cache=cache, retries=0)
+
+
+class TestHttpCache(_CacheTestCase):
+
+    def test_fresh_hit_skips_network(self):
+        client = self._client()
+        first = client.get(self.base + "/page")
+        second = client.get(self.base + "/page")
+        self.assertEqual(first.text, second.text)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(_Handler.hits["/page"], 1)
+        (host_stats,) = client.stats().values()
+        self.assertEqual(host_stats["cache_hits"], 1)
+
+    def test_stale_entry_revalidated_with_etag(self):
+        client = self._client(ttl_seconds={"career_page": 0})
+        client.get(self.base + "/etag")
+        resp = client.get(self.base + "/etag")
+        self.assertEqual(_Handler.hits["/etag"], 2)   # conditional request was sent
+        self.assertEqual(resp.status_code, 200)       # ...but served from the cache
+        self.assertEqual(resp.text, "<html>versioned</html>")
+
+    def test_transient_errors_not_cached(self):
+        client = self._client()
+        client.get(self.base + "/busy")
+        client.get(self.base + "/busy")
+        self.assertEqual(_Handler.hits["/busy"], 2)
+
+    def test_identical_bodies_stored_once(self):
+        cache = HttpCache(self.tmpdir.name)
+        client = HttpClient(cache=cache, retries=0)
+        client.get(self.base + "/same?a=1")
+        client.get(self.base + "/same?a=1#x")
+        self.assertEqual(len(os.listdir(cache.meta_dir)), 2)
+        self.assertEqual(len(os.listdir(cache.body_dir)), 1)
+
+    def test_lru_eviction_under_size_cap(self):
+        cache = HttpCache(self.tmpdir.name, max_bytes=12000)
+        client = HttpClient(cache=cache, retries=0)
+        for i in range(3):
+            client.get(f"{self.base}/big{i}")
+            time.sleep(0.02)
+        client.get(f"{self.base}/big0")  # touch: big1 is now least recently used
+        time.sleep(0.02)
+        client.get(f"{self.base}/big3")
+
+        self.assertIsNone(cache.lookup("GET", f"{self.base}/big1"))
+        self.assertIsNotNone(cache.lookup("GET", f"{self.base}/big0"))
+        self.assertIsNotNone(cache.lookup("GET", f"{self.base}/big3"))
+        self.assertLessEqual(cache._current_bytes(), 12000)
+
+    def test_eviction_reads_each_entry_once(self):
+        cache = HttpCache(self.tmpdir.name)
+
+        def store(url, body):
+            resp = requests.Response()
+            resp.status_code, resp._content, resp.url = 200, body, url
+            cache.store("GET", url, resp)
+            time.sleep(0.01)
+
+        shared = os.urandom(4000)
+        store("https://a.example/shared", shared)
+        for i in range(10):
+            store(f"https://a.example/{i}", os.urandom(4000))
+        store("https://b.example/shared", shared)   # keeps the shared body alive
+
+        cache.max_bytes = 30000
+        with mock.patch.object(http_cache.json, "load", wraps=json.load) as load:
+            store("https://a.example/new", os.urandom(4000))
+        self.assertEqual(load.call_count, 13)
+        self.assertLessEqual(cache._current_bytes(), 27000)
+        self.assertIsNone(cache.lookup("GET", "https://a.example/0"))
+        self.assertIsNone(cache.lookup("GET", "https://a.example/shared"))
+        self.assertIsNotNone(cache.lookup("GET", "https://b.example/shared"))
+        self.assertIsNotNone(cache.lookup("GET", "https://a.example/new"))
+
+    def test_cache_only_mode(self):
+        self._client().get(self.base + "/page")
+        offline = self._client(cache_only=True)
+        self.assertEqual(offline.get(self.base + "/page").text, "<html>/page</html>")
+        with self.assertRaises(requests.ConnectionError):
+            offline.get(self.base + "/never-fetched")
+        self.assertEqual(_Handler.hits, {"/page": 1})
+
+
+class TestClassifyUrl(unittest.TestCase):
+
+    def test_url_classes(self):
+        self.assertEqual(classify_url("GET", "https://html.duckduckgo.com/html/?q=x"), "search")
+        self.assertEqual(classify_url("GET", "https://api.ashbyhq.com/posting-api/job-board/acme"),
+                         "ats_api")
+        self.assertEqual(classify_url("GET", "https://boards.greenhouse.io/acme/jobs/12345"),
+                         "job_posting")
+        self.assertEqual(classify_url("GET", "https://acme.com/careers"), "career_page")
+        self.assertEqual(classify_url("HEAD", "https://acme.com/careers"), "probe")
+
+
+class TestBuildCache(unittest.TestCase):
+
+    def test_from_config(self):
+        cache = build_cache({"http_cache": {"max_mb": 5, "ttl_seconds": {"search": 60}}}, "/tmp/x")
+        self.assertEqual(cache.max_bytes, 5 * 1024 * 1024)
+        self.assertEqual(cache.ttls["search"], 60)
+        self.assertIsNone(build_cache({"http_cache": {"enabled": False}}, "/tmp/x"))
+        self.assertTrue(build_cache({"http_cache": {"enabled": False}}, "/tmp/x",
+                                    cache_only=True).cache_only)
+
+
+if __name__ == "__main__":
+    unittest.main()
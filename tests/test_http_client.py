@@ -0,0 +1,166 @@
+"""
+Tests for http_client.py — per-host throttling, retries, pooling and stats.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import HostThrottle, HttpClient, build_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    flaky_remaining = {}
+    connections = set()
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        if self.path.startswith("/flaky"):
+            remaining = _Handler.flaky_remaining.get(self.path, 0)
+            if remaining:
+                _Handler.flaky_remaining[self.path] = remaining - 1
+                self._send(503, b"busy")
+                return
+        if self.path == "/missing":
+            self._send(404, b"nope")
+            return
+        self._send(200, b"<html><body>ok</body></html>")
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ServerTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+
+class TestHostThrottle(unittest.TestCase):
+
+    def test_spaces_requests_to_same_host(self):
+        throttle = HostThrottle(default_interval=0.05)
+        starts = []
+        for _ in range(3):
+            with throttle.slot("https://example.com/a"):
+                starts.append(time.monotonic())
+        self.assertGreaterEqual(starts[2] - starts[0], 0.09)
+
+    def test_different_hosts_do_not_wait(self):
+        throttle = HostThrottle(default_interval=1.0)
+        begin = time.monotonic()
+        with throttle.slot("https://a.example.com/"):
+            pass
+        with throttle.slot("https://b.example.com/"):
+            pass
+        self.assertLess(time.monotonic() - begin, 0.5)
+
+    def test_host_interval_by_suffix(self):
+        throttle = HostThrottle(default_interval=1.0, host_intervals={"duckduckgo.com": 2.5})
+        self.assertEqual(throttle.interval_for("html.duckduckgo.com"), 2.5)
+        self.assertEqual(throttle.interval_for("boards.greenhouse.io"), 1.0)
+
+    def test_caps_concurrent_requests_per_host(self):
+        throttle = HostThrottle(max_per_host=2)
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def hit():
+            with throttle.slot("https://example.com/"):
+                with lock:
+                    in_flight.append(1)
+                    peak.append(len(in_flight))
+                time.sleep(0.02)
+                with lock:
+                    in_flight.pop()
+
+        threads = [threading.Thread(target=hit) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(max(peak), 2)
+
+
+class TestHttpClient(_ServerTestCase):
+
+    def test_retries_transient_5xx(self):
+        _Handler.flaky_remaining["/flaky-a"] = 2
+        client = HttpClient(retries=3, backoff_seconds=0)
+        resp = client.get(f"{self.base}/flaky-a")
+        self.assertEqual(resp.status_code, 200)
+
+    def test_gives_up_after_retries(self):
+        _Handler.flaky_remaining["/flaky-b"] = 10
+        client = HttpClient(retries=1, backoff_seconds=0)
+        resp = client.get(f"{self.base}/flaky-b")
+        self.assertEqual(resp.status_code, 503)
+
+    def test_reuses_connection_per_host(self):
+        _Handler.connections.clear()
+        client = HttpClient()
+        for _ in range(5):
+            client.get(f"{self.base}/page")
+        self.assertEqual(len(_Handler.connections), 1)
+
+    def test_stats_per_host(self):
+        client = HttpClient()
+        client.get(f"{self.base}/page")
+        client.get(f"{self.base}/missing")
+        host = f"127.0.0.1:{self.server.server_address[1]}"
+        stats = client.stats()[host]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["statuses"], {200: 1, 404: 1})
+        self.assertIn(host, client.format_stats())
+
+    def test_negotiates_compression(self):
+        client = HttpClient(headers={"User-Agent": "test"})
+        self.assertIn("gzip", client.headers["Accept-Encoding"])
+
+    def test_timeout_split(self):
+        client = HttpClient(connect_timeout=5, read_timeout=15)
+        self.assertEqual(client._timeout(None), (5, 15))
+        self.assertEqual(client._timeout(8), (5, 8))
+
+
+class TestBuildClient(unittest.TestCase):
+
+    def test_from_config(self):
+        client = build_client(
+            {"throttle": {"google_search_seconds": 3.0, "career_page_seconds": 0.5},
+             "http": {"connect_timeout": 2, "read_timeout": 9, "retries": 5}},
+            search_hosts=("duckduckgo.com",),
+        )
+        self.assertEqual(client.throttle.interval_for("html.duckduckgo.com"), 3.0)
+        self.assertEqual(client.throttle.interval_for("jobs.lever.co"), 0.5)
+        self.assertEqual(client._timeout(None), (2, 9))
+        self.assertEqual(client.retry.total, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the Swooped import scripts' fuzzy application matching, run
+through main() with Supabase calls mocked out.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+
+
+def _load_script(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestImportMissingSwoopedJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.script = _load_script("import_missing_swooped_jobs")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _app(self, app_id, company, role):
+        return {"id": app_id, "company": company, "role": role, "status": "applied",
+                "cover_letter": None, "tailored_resume": None,
+                "applied_date": "2025-01-02", "source": "Swooped"}
+
+    def _run(self, apps, letters):
+        cl_path = os.path.join(self.tmpdir.name, "cover_letters.json")
+        data_path = os.path.join(self.tmpdir.name, "swooped_data.json")
+        with open(cl_path, "w", encoding="utf-8") as f:
+            json.dump({"coverLetters": letters}, f)
+        with open(data_path, "w", encoding="utf-8") as f:
+            json.dump({}, f)
+        with mock.patch.object(self.script, "SUPABASE_KEY", "test-key"), \
+                mock.patch.object(self.script, "load_applications", return_value=apps), \
+                mock.patch.object(self.script, "create_application") as create, \
+                mock.patch.object(self.script, "update_application", return_value=True), \
+                mock.patch.object(sys, "argv", ["import", cl_path, data_path]), \
+                mock.patch("builtins.print"):
+            self.script.main()
+        return create
+
+    def test_close_spelling_is_not_created_again(self):
+        # "HPE" shares an n-gram with "HP"; the existing "H P" job does not
+        apps = [self._app("1", "H P", "Engineer"), self._app("2", "HPE", "Sales")]
+        create = self._run(apps, [{"company": "HP", "role": "Engineer", "content": "x"}])
+        create.assert_not_called()
+
+    def test_unknown_job_is_created(self):
+        apps = [self._app("2", "HPE", "Sales")]
+        create = self._run(apps, [{"company": "Globex", "role": "Director", "content": "x"}])
+        create.assert_called_once()
+        self.assertEqual((create.call_args.kwargs["company"], create.call_args.kwargs["role"]),
+                         ("Globex", "Director"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,7 @@ import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from job_score import (
+    AchievementIndex,
     calculate_overall_score,
     check_auto_skip,
     check_existing_application,
@@ -18,6 +19,7 @@ from job_score import (
     extract_requirements,
     rank_jobs,
     score_requirement,
+    score_sourced_records,
 )
 
 
@@ -85,6 +87,43 @@ class TestScoreRequirement(unittest.TestCase):
         self.assertEqual(result["match_type"], "strong")
 
 
+class TestAchievementIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AchievementIndex(SAMPLE_ACHIEVEMENTS)
+
+    def test_indexes_every_achievement(self):
+        total = sum(len(items) for items in SAMPLE_ACHIEVEMENTS.values())
+        self.assertEqual(len(self.index), total)
+
+    def test_inverted_index_by_stemmed_term(self):
+        ids = self.index.postings.get("microservice", [])
+        items = [self.index.entries[i]["item"] for i in ids]
+        self.assertEqual(len(items), 2)
+        self.assertTrue(all("microservices" in item for item in items))
+
+    def test_candidates_share_a_term(self):
+        ids = self.index.candidates({"hipaa"})
+        self.assertEqual(len(ids), 1)
+        self.assertIn("HIPAA", self.index.entries[ids[0]]["item"])
+
+    def test_no_candidates_for_unrelated_terms(self):
+        self.assertEqual(self.index.candidates({"quantum", "phd"}), [])
+
+    def test_same_result_as_dict(self):
+        requirements = [
+            "Experience building and managing engineering teams from scratch",
+            "Experience with HIPAA compliance in healthcare",
+            "Experience integrating AI and ML into products",
+            "10+ years of engineering leadership",
+            "PhD in quantum computing",
+            "Strong AWS and microservices background",
+        ]
+        for req in requirements:
+            self.assertEqual(score_requirement(req, self.index),
+                             score_requirement(req, SAMPLE_ACHIEVEMENTS))
+
+
 class TestCalculateOverallScore(unittest.TestCase):
 
     def test_strong_score(self):
@@ -259,6 +298,42 @@ class TestCheckExistingApplication(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestScoreSourcedRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.records = []
+        descriptions = [
+            "Requirements:\n- 10+ years of engineering leadership\n- HIPAA compliance\n"
+            "- Experience building teams from scratch\nThis is a fully remote role.",
+            "Requirements:\n- Strong AWS and microservices experience\n- Contract position, 6 months",
+            "",
+            "Qualifications:\n- Experience integrating AI and ML into products\n"
+            "- PhD in quantum computing\nHybrid, on-site two days a week.",
+        ]
+        for i, desc in enumerate(descriptions):
+            sourced = {
+                "lead": {"company": f"Co{i}", "role": "VP Engineering", "email_uid": str(i)},
+                "scraped": {"description_text": desc, "url": f"https://example.com/{i}"},
+                "status": "sourced",
+            }
+            self.records.append(sourced)
+        self.records.append({"lead": {"company": "Gone", "role": "CTO", "email_uid": "9"},
+                             "status": "unresolved", "unresolved_reason": "No career page found"})
+
+    def test_serial_results(self):
+        results = score_sourced_records(self.records, SAMPLE_ACHIEVEMENTS, {"location": "Remote (US)"})
+        self.assertEqual([status for status, _ in results],
+                         ["scored", "scored", "unresolved", "scored", "unresolved"])
+        self.assertEqual(results[1][1]["employment_type"], "contract")
+        self.assertEqual(results[2][1]["reason"], "No description text available")
+
+    def test_workers_match_serial(self):
+        prefs = {"location": "Remote (US)"}
+        serial = score_sourced_records(self.records, SAMPLE_ACHIEVEMENTS, prefs, workers=1)
+        parallel = score_sourced_records(self.records, SAMPLE_ACHIEVEMENTS, prefs, workers=2)
+        self.assertEqual(serial, parallel)
+
+
 class TestExtractRequirements(unittest.TestCase):
 
     def test_extracts_requirements(self):
@@ -0,0 +1,214 @@
+"""
+Tests for pipeline.py — the streaming fetch → parse → search → score run.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from email.message import EmailMessage
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import career_search
+import email_fetch
+import email_parse
+import job_score
+import pipeline
+from pipeline_ledger import PipelineLedger
+from record_log import open_stage
+
+CONFIG = {
+    "sender_templates": {"linkedin.com": {
+        "type": "job_board",
+        "subject_patterns": [r"(?P<role>.+) at (?P<company>.+)"],
+        "body_parse_strategy": "linkedin_cards",
+    }},
+    "company_aliases": {},
+    "throttle": {"career_page_seconds": 0, "google_search_seconds": 0},
+    "user_preferences": {},
+}
+
+
+def _alert(company, n):
+    msg = EmailMessage()
+    msg["From"] = "jobs@linkedin.com"
+    msg["To"] = "me@example.com"
+    msg["Subject"] = f"VP of Engineering at {company}"
+    msg["Message-ID"] = f"<alert-{n}@linkedin.com>"
+    msg.set_content("View this job")
+    return msg.as_bytes()
+
+
+def _fake_find_career_page(company, role, config, linkedin_url=None):
+    if company == "Nowhere":
+        return None
+    if company == "Boom":
+        raise RuntimeError("search backend down")
+    return {"url": f"https://{company.lower()}.example.com/jobs/1", "ats_type": None,
+            "confidence": 0.85}
+
+
+def _fake_scrape(url, ats_type, config, role=None):
+    return {"url": url, "ats_type": ats_type, "title": role, "company": "",
+            "location": "Remote", "description_text": "Requirements:\n- 10+ years " * 20,
+            "compensation": None, "description_incomplete": False,
+            "scraped_at": "2026-01-01T00:00:00"}
+
+
+class TestStreamingRun(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        tmp = self.tmpdir.name
+        staging = os.path.join(tmp, "staging")
+        self.raw = os.path.join(staging, "raw")
+        self.sourced = os.path.join(staging, "sourced")
+        self.ledger_path = os.path.join(tmp, "ledger.sqlite3")
+        blobs = os.path.join(tmp, "blobs")
+        self.published = []
+        self.find = mock.Mock(side_effect=_fake_find_career_page)
+        self.patches = [
+            mock.patch.object(email_fetch, "STAGING_RAW", self.raw),
+            mock.patch.object(email_fetch, "BLOBS_DIR", blobs),
+            mock.patch.object(email_fetch, "LEDGER_DB_PATH", self.ledger_path),
+            mock.patch.object(email_fetch, "DEDUP_DB_PATH", os.path.join(tmp, "dedup.sqlite3")),
+            mock.patch.object(email_fetch, "FINGERPRINTS_PATH", os.path.join(tmp, "fingerprints.json")),
+            mock.patch.object(email_parse, "STAGING_RAW", self.raw),
+            mock.patch.object(email_parse, "STAGING_PARSED", os.path.join(staging, "parsed")),
+            mock.patch.object(email_parse, "BLOBS_DIR", blobs),
+            mock.patch.object(email_parse, "LEDGER_DB_PATH", self.ledger_path),
+            mock.patch.object(email_parse, "load_config", lambda: CONFIG),
+            mock.patch.object(career_search, "STAGING_PARSED", os.path.join(staging, "parsed")),
+            mock.patch.object(career_search, "STAGING_SOURCED", self.sourced),
+            mock.patch.object(career_search, "BLOBS_DIR", blobs),
+            mock.patch.object(career_search, "LEDGER_DB_PATH", self.ledger_path),
+            mock.patch.object(career_search, "HTTP_CACHE_DIR", os.path.join(tmp, "cache")),
+            mock.patch.object(career_search, "BOARDS_DIR", os.path.join(tmp, "boards")),
+            mock.patch.object(career_search, "_blobs", None),
+            mock.patch.object(career_search, "find_career_page", self.find),
+            mock.patch.object(career_search, "scrape_job_description", _fake_scrape),
+            mock.patch.object(job_score, "STAGING_SOURCED", self.sourced),
+            mock.patch.object(job_score, "LEDGER_DB_PATH", self.ledger_path),
+            mock.patch.object(job_score, "publish_scores", self._publish),
+            mock.patch("builtins.print"),
+        ]
+        for p in self.patches:
+            p.start()
+
+        # Fetched by an earlier run that stopped before parsing
+        with open_stage(self.raw) as raw:
+            raw.put("900", {"uid": "900", "from": "jobs@linkedin.com",
+                            "subject": "VP of Engineering at Initech",
+                            "body_text": "View this job", "body_html": ""})
+
+        self.mbox = os.path.join(tmp, "takeout.mbox")
+        with open(self.mbox, "wb") as f:
+            for n, company in enumerate(["Acme", "Globex", "Nowhere", "Boom"]):
+                f.write(b"From 1234@xxx Mon Jan 01 00:00:00 +0000 2024\n"
+                        + _alert(company, n) + b"\n")
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def _publish(self, keys, results, config):
+        self.published.append((keys, results))
+        return {"leads": [data for status, data in results if status == "scored"]}
+
+    def _run(self, **kwargs):
+        run = pipeline.PipelineRun(CONFIG, **kwargs)
+        stats = run.run(pipeline.offline_export("mbox", self.mbox))
+        return run, stats
+
+    def test_streams_every_stage_and_resumes(self):
+        run, stats = self._run(search_workers=3, parse_workers=2, queue_size=2)
+        self.assertEqual(run.errors, [])
+        self.assertEqual((stats["fetched"], stats["backlog_emails"], stats["parsed"]), (4, 1, 5))
+        self.assertEqual(run.parse_stats["leads_found"], 5)
+        self.assertEqual((stats["sourced"], stats["unresolved"], stats["search_failed"]), (3, 1, 1))
+        self.assertEqual(stats["scored_this_run"], 4)
+
+        with PipelineLedger(self.ledger_path) as ledger:
+            counts = ledger.counts()
+            self.assertEqual(counts["parse"], {"done": 5})
+            self.assertEqual(counts["search"], {"done": 3, "unresolved": 1, "failed": 1})
+            self.assertEqual(sorted(r[1:3] for r in ledger.retry("search")),
+                             [("failed", "RuntimeError: search backend down"),
+                              ("unresolved", "No career page found for company")])
+
+        keys, results = self.published[-1]
+        with open_stage(self.sourced) as stage:
+            self.assertEqual(keys, sorted(stage.keys()))
+        self.assertEqual(len(keys), 4)
+        self.assertIn("900_0", keys)
+        self.assertEqual(len(results), 4)
+
+        # A second run finds nothing new and repeats no searches
+        searched = self.find.call_count
+        _, stats = self._run()
+        self.assertEqual((stats["fetched"], stats["backlog_emails"], stats["parsed"]), (0, 0, 0))
+        self.assertEqual(self.find.call_count, searched)
+        self.assertEqual(self.published[-1][0], keys)
+
+    def test_watch_publishes_once_drained_not_per_lead(self):
+        run = pipeline.PipelineRun(CONFIG, watch=True)
+        with mock.patch.object(run, "_publish") as publish:
+            run._enter()                # an email
+            run._enter(3)               # its three leads
+            run._leave()                # email parsed
+            run._leave(scored=True)
+            run._leave(scored=True)
+            publish.assert_not_called()
+            run._leave(scored=True)     # last lead scored: drained
+            self.assertEqual(publish.call_count, 1)
+            run._enter()
+            run._leave()                # an email with no leads: nothing new
+            self.assertEqual(publish.call_count, 1)
+
+    def test_watch_run_publishes_from_session_log(self):
+        with mock.patch.object(pipeline, "open_stage", wraps=pipeline.open_stage) as opened:
+            run, stats = self._run(search_workers=3, watch=True)
+        self.assertEqual(run.errors, [])
+        self.assertEqual(stats["scored_this_run"], 4)
+        # At most once per drained email batch, plus the final publish
+        self.assertLessEqual(len(self.published), stats["fetched"] + stats["backlog_emails"] + 1)
+        self.assertEqual(len(self.published[-1][0]), 4)
+        self.assertNotIn(self.sourced, [c.args[0] for c in opened.call_args_list])
+
+    def test_stop_ends_fetching(self):
+        stop = threading.Event()
+
+        def new_mail():
+            for email_dict in pipeline.offline_export("mbox", self.mbox):
+                stop.set()      # Ctrl-C while the first email is being read
+                yield email_dict
+
+        run = pipeline.PipelineRun(CONFIG)
+        stats = run.run(new_mail(), stop=stop)
+        self.assertEqual((stats["fetched"], stats["backlog_emails"], stats["parsed"]), (1, 1, 2))
+
+    def test_dead_stage_lets_drained_items_leave(self):
+        run = pipeline.PipelineRun(CONFIG, watch=True)
+        with mock.patch.object(job_score, "_init_score_worker",
+                               side_effect=RuntimeError("no achievements")):
+            stats = run.run(pipeline.offline_export("mbox", self.mbox))
+        self.assertEqual(run.errors, ["score: RuntimeError: no achievements"])
+        self.assertEqual(stats["scored_this_run"], 0)
+        self.assertEqual(run._in_flight, 0)
+
+    def test_leads_pending_search_go_first(self):
+        email_parse.process_raw_emails()    # a parse-only run: 900_0 waits for search
+        _, stats = self._run(search_workers=1)
+        self.assertEqual((stats["backlog_emails"], stats["backlog_leads"]), (0, 1))
+        self.assertEqual(self.find.call_args_list[0].args[0], "Initech")
+        with PipelineLedger(self.ledger_path) as ledger:
+            self.assertEqual(ledger.pending("search"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
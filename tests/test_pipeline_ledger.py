@@ -0,0 +1,196 @@
+"""
+Tests for pipeline_ledger.py — per-stage status rows, pending/retry
+queries, backfill from staging, and the parse stage's ledger updates.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import email_parse
+from pipeline_ledger import PipelineLedger, lead_keys, open_ledger, record_hash
+from record_log import open_stage
+
+
+class TestPipelineLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmpdir.name, "ledger.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_mark_upserts_and_counts_attempts(self):
+        with PipelineLedger(self.db) as ledger:
+            ledger.mark("101_0", "search", "unresolved", error="No career page found")
+            ledger.mark("101_0", "search", "done", "abc")
+            row = ledger.get("101_0", "search")
+            self.assertEqual((row["status"], row["content_hash"], row["error"]), ("done", "abc", None))
+            self.assertEqual(row["attempts"], 2)
+            self.assertEqual(row["email_uid"], "101")
+            self.assertIsNone(ledger.get("101_0", "score"))
+
+    def test_pending_and_retry(self):
+        with PipelineLedger(self.db) as ledger:
+            with ledger.batch():
+                for uid in ("1", "2", "3"):
+                    ledger.mark(uid, "fetch", "done")
+                ledger.mark("1", "parse", "done")
+                ledger.mark("2", "parse", "failed", error="ValueError: bad")
+                ledger.add_pending("search", ["1_0", "1_1"])
+            self.assertEqual(ledger.pending("parse"), {"3"})
+            self.assertEqual(ledger.pending("search"), {"1_0", "1_1"})
+
+            ledger.mark("1_0", "search", "done")
+            ledger.mark("1_1", "search", "unresolved", error="Scrape failed: 404")
+            ledger.add_pending("search", ["1_0"])      # a re-parse never resets progress
+            self.assertEqual(ledger.pending("search"), set())
+            self.assertEqual(ledger.pending("score"), {"1_0"})
+            self.assertEqual(ledger.keys("search", ("failed", "unresolved")), {"1_1"})
+            self.assertEqual([r[0] for r in ledger.retry("parse")], ["2"])
+            self.assertEqual(ledger.counts()["search"], {"done": 1, "unresolved": 1})
+            self.assertEqual({r["key"] for r in ledger.for_email("1")}, {"1", "1_0", "1_1"})
+
+    def test_backfill_from_staging_once(self):
+        staging = os.path.join(self.tmpdir.name, "staging")
+        with open_stage(os.path.join(staging, "raw")) as raw:
+            raw.put("7", {"uid": "7", "subject": "Jobs"})
+        with open_stage(os.path.join(staging, "parsed")) as parsed:
+            parsed.put("7", [{"type": "job_lead", "email_uid": "7", "lead_index": 0},
+                             {"type": "job_lead", "email_uid": "7", "lead_index": 1}])
+        with open_stage(os.path.join(staging, "sourced")) as sourced:
+            sourced.put("7_1", {"status": "unresolved", "unresolved_reason": "No career page found"})
+
+        with mock.patch("builtins.print"), open_ledger(self.db, staging) as ledger:
+            self.assertEqual(ledger.get("7", "fetch")["content_hash"],
+                             record_hash({"uid": "7", "subject": "Jobs"}))
+            self.assertEqual(ledger.pending("search"), {"7_0"})
+            self.assertEqual(ledger.get("7_1", "search")["error"], "No career page found")
+            self.assertEqual(ledger.backfill(staging), 0)
+
+    def test_lead_keys(self):
+        results = [{"type": "job_lead", "email_uid": "9", "lead_index": 2},
+                   {"type": "not_job_related", "email_uid": "9"}]
+        self.assertEqual(lead_keys(results), ["9_2"])
+
+
+class TestParseStageLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        tmp = self.tmpdir.name
+        self.ledger_path = os.path.join(tmp, "ledger.sqlite3")
+        self.config = config = {"sender_templates": {"linkedin.com": {
+            "type": "job_board",
+            "subject_patterns": [r"(?P<role>.+) at (?P<company>.+)"],
+            "body_parse_strategy": "linkedin_cards",
+        }}, "company_aliases": {}}
+        self.patches = [
+            mock.patch.object(email_parse, "STAGING_RAW", os.path.join(tmp, "staging", "raw")),
+            mock.patch.object(email_parse, "STAGING_PARSED", os.path.join(tmp, "staging", "parsed")),
+            mock.patch.object(email_parse, "BLOBS_DIR", os.path.join(tmp, "blobs")),
+            mock.patch.object(email_parse, "LEDGER_DB_PATH", self.ledger_path),
+            mock.patch.object(email_parse, "load_config", lambda: config),
+            mock.patch("builtins.print"),
+        ]
+        for p in self.patches:
+            p.start()
+        with open_stage(email_parse.STAGING_RAW) as raw:
+            for uid in ("1", "2"):
+                raw.put(uid, {"uid": uid, "from": "jobs@linkedin.com",
+                              "subject": "VP of Engineering at HealthFirst Technologies",
+                              "body_text": "View this job", "body_html": ""})
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def test_parse_marks_ledger_and_records_failures(self):
+        real_parse = email_parse.parse_email
+
+        def parse_or_fail(email_dict, uid, *args):
+            if uid == "2":
+                raise ValueError("template exploded")
+            return real_parse(email_dict, uid, *args)
+
+        with mock.patch.object(email_parse, "parse_email", parse_or_fail):
+            stats = email_parse.process_raw_emails()
+        self.assertEqual((stats["parsed"], stats["failed"]), (1, 1))
+
+        with PipelineLedger(self.ledger_path) as ledger:
+            self.assertEqual(ledger.get("1", "parse")["status"], "done")
+            self.assertEqual(ledger.pending("search"), {"1_0"})
+            self.assertEqual(ledger.retry("parse"),
+                             [("2", "failed", "ValueError: template exploded", 1)])
+
+        # The failed email is retried on the next run
+        stats = email_parse.process_raw_emails()
+        self.assertEqual((stats["total"], stats["parsed"]), (1, 1))
+        with PipelineLedger(self.ledger_path) as ledger:
+            self.assertEqual(ledger.get("2", "parse")["attempts"], 2)
+            self.assertEqual(ledger.pending("parse"), set())
+
+    def test_only_given_keys(self):
+        stats = email_parse.process_raw_emails(keys=["2", "missing"])
+        self.assertEqual((stats["total"], stats["parsed"]), (1, 1))
+        with open_stage(email_parse.STAGING_PARSED) as parsed:
+            self.assertEqual(parsed.keys(), ["2"])
+
+    def test_workers_match_serial_run(self):
+        subjects = ["VP of Engineering at Acme", "Your weekly digest",
+                    "Your application status", "Hello"]
+        with open_stage(email_parse.STAGING_RAW) as raw:
+            for n in range(3, 40):
+                raw.put(str(n), {"uid": str(n), "from": "jobs@linkedin.com",
+                                 "subject": subjects[n % len(subjects)],
+                                 "body_text": "Unfortunately we will not be moving forward."
+                                 if n % 4 == 2 else "View this job", "body_html": ""})
+
+        serial = email_parse.process_raw_emails()
+        with open_stage(email_parse.STAGING_PARSED) as parsed:
+            serial_records = dict(parsed.items())
+        with PipelineLedger(self.ledger_path) as ledger:
+            serial_counts = ledger.counts()
+
+        pooled = email_parse.process_raw_emails(reparse=True, workers=3)
+        self.assertEqual(pooled, serial)
+        self.assertEqual(serial["rejection"], 9)
+        with open_stage(email_parse.STAGING_PARSED) as parsed:
+            self.assertEqual(dict(parsed.items()), serial_records)
+        with PipelineLedger(self.ledger_path) as ledger:
+            self.assertEqual(ledger.counts(), serial_counts)
+
+    def test_reparse_stale_only_and_reports_invalidated_leads(self):
+        email_parse.process_raw_emails()
+        self.assertEqual(email_parse.process_raw_emails(reparse="stale")["total"], 0)
+        with PipelineLedger(self.ledger_path) as ledger:
+            ledger.mark("1_0", "search", "done")
+            ledger.mark("1_0", "score", "done")
+
+        # New aliases change single-job parsing, so both emails are stale
+        self.config["company_aliases"] = {"HealthFirst": ["HealthFirst Technologies"]}
+        with open_stage(email_parse.STAGING_RAW) as raw:
+            raw.put("3", {"uid": "3", "from": "news@example.com", "subject": "Weekly newsletter",
+                          "body_text": "Unsubscribe", "body_html": ""})
+        stats = email_parse.process_raw_emails(reparse="stale")
+        self.assertEqual((stats["total"], stats["not_job"]), (3, 1))
+        self.assertEqual((stats["invalidated_search"], stats["invalidated_score"]), (1, 1))
+        with open_stage(email_parse.STAGING_PARSED) as parsed:
+            self.assertEqual(parsed.get("1")[0]["company"], email_parse.resolve_company_name(
+                "HealthFirst Technologies", self.config["company_aliases"]))
+
+        # The not-job email does not depend on aliases
+        self.config["company_aliases"] = {}
+        stats = email_parse.process_raw_emails(reparse="stale")
+        self.assertEqual((stats["total"], stats["not_job"]), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests for record_log.py — the append-only segment log and the staging
+Stage compatibility reader.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import record_log
+from record_log import RecordLog, open_stage
+
+
+class TestRecordLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "raw.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _segments(self):
+        return sorted(n for n in os.listdir(self.path) if n.endswith(".jsonl"))
+
+    def test_put_get_overwrite_delete(self):
+        with RecordLog(self.path) as log:
+            log.put("1", {"subject": "VP Engineering"})
+            log.put("2", {"subject": "Director"})
+            log.put("1", {"subject": "VP Engineering (updated)"})
+            log.delete("2")
+            log.delete("missing")
+            self.assertEqual(log.get("1"), {"subject": "VP Engineering (updated)"})
+            self.assertIsNone(log.get("2"))
+            self.assertNotIn("2", log)
+            self.assertEqual(len(log), 1)
+            self.assertGreater(log.stats()["garbage_bytes"], 0)
+
+    def test_items_in_write_order_skip_superseded(self):
+        with RecordLog(self.path) as log:
+            for key in ("3", "1", "2"):
+                log.put(key, {"n": key})
+            log.put("3", {"n": "3b"})
+            self.assertEqual(list(log.items()), [("1", {"n": "1"}), ("2", {"n": "2"}),
+                                                 ("3", {"n": "3b"})])
+
+    def test_segments_rotate(self):
+        with RecordLog(self.path, max_segment_bytes=200) as log:
+            for n in range(20):
+                log.put(str(n), {"body": "x" * 40})
+            self.assertGreater(len(self._segments()), 1)
+            self.assertEqual(log.get("0"), {"body": "x" * 40})
+            self.assertEqual(len(list(log.items())), 20)
+
+    def test_reopen_uses_saved_index(self):
+        with RecordLog(self.path, max_segment_bytes=200) as log:
+            for n in range(10):
+                log.put(str(n), {"n": n})
+        with open(os.path.join(self.path, record_log.INDEX_NAME), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["keys"]), 10)
+        with RecordLog(self.path, max_segment_bytes=200) as log:
+            self.assertEqual(log.get("7"), {"n": 7})
+            log.put("10", {"n": 10})
+            self.assertEqual(sorted(log.keys(), key=int), [str(n) for n in range(11)])
+
+    def test_recovers_unindexed_writes_and_torn_line(self):
+        log = RecordLog(self.path)
+        log.put("1", {"n": 1})
+        log.save_index()
+        log.put("2", {"n": 2})
+        log._close_files()          # crash: index saved before "2" was written
+        segment = os.path.join(self.path, self._segments()[-1])
+        with open(segment, "ab") as f:
+            f.write(b'{"k":"3","v":{"n"')
+
+        with RecordLog(self.path) as reopened:
+            self.assertEqual(reopened.get("2"), {"n": 2})
+            self.assertNotIn("3", reopened)
+            reopened.put("4", {"n": 4})
+        with open(segment, "rb") as f:
+            self.assertNotIn(b'"k":"3"', f.read())   # torn line truncated away
+        with RecordLog(self.path) as log:
+            self.assertEqual(sorted(log.keys()), ["1", "2", "4"])
+
+    def test_reader_leaves_torn_line_for_the_writer(self):
+        writer = RecordLog(self.path)
+        writer.put("1", {"n": 1})
+        segment = os.path.join(self.path, self._segments()[-1])
+        with open(segment, "ab") as f:
+            f.write(b'{"k":"2","v":{"n"')       # a writer mid-append
+        size = os.path.getsize(segment)
+
+        with RecordLog(self.path) as reader:
+            self.assertEqual(reader.keys(), ["1"])
+            self.assertEqual(list(reader.items()), [("1", {"n": 1})])
+        self.assertEqual(os.path.getsize(segment), size)
+        writer.close()
+
+    def test_compact_keeps_live_records(self):
+        with RecordLog(self.path, max_segment_bytes=300) as log:
+            for round_ in range(5):
+                for n in range(10):
+                    log.put(str(n), {"round": round_, "pad": "y" * 20})
+            log.delete("9")
+            before, after = log.compact()
+            self.assertLess(after, before / 4)
+            self.assertEqual(log.stats()["garbage_bytes"], 0)
+            self.assertEqual(len(log), 9)
+            self.assertEqual(log.get("3"), {"round": 4, "pad": "y" * 20})
+        with RecordLog(self.path, max_segment_bytes=300) as log:
+            self.assertEqual(len(list(log.items())), 9)
+            self.assertNotIn("9", log)
+
+
+class TestStage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "parsed")
+        os.makedirs(self.path)
+        for uid in ("1", "2"):
+            with open(os.path.join(self.path, f"{uid}.json"), "w", encoding="utf-8") as f:
+                json.dump({"uid": uid, "legacy": True}, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_log_overlays_legacy_files(self):
+        with open_stage(self.path) as stage:
+            self.assertEqual(stage.get("1"), {"uid": "1", "legacy": True})
+            stage.put("2", {"uid": "2", "legacy": False})
+            stage.put("3", {"uid": "3"})
+            self.assertEqual(len(stage), 3)
+            self.assertEqual(stage.get("2"), {"uid": "2", "legacy": False})
+            self.assertEqual(dict(stage.items())["1"]["legacy"], True)
+            self.assertEqual(sorted(stage.keys()), ["1", "2", "3"])
+        # Writes never touch the legacy directory
+        self.assertEqual(sorted(os.listdir(self.path)), ["1.json", "2.json"])
+
+    def test_migrate(self):
+        with open_stage(self.path) as stage:
+            stage.put("2", {"uid": "2", "legacy": False})
+            self.assertEqual(stage.migrate(), 1)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.isdir(self.path + ".migrated"))
+        with open_stage(self.path) as stage:
+            self.assertEqual(stage.stats()["legacy_files"], 0)
+            self.assertEqual(stage.get("1"), {"uid": "1", "legacy": True})
+            self.assertEqual(stage.get("2"), {"uid": "2", "legacy": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Tests for rule_engine.py — named rule sets and the compiled-pattern cache.
+"""
+
+import os
+import re
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rule_engine import RuleSet, compiled
+
+
+class TestRuleSet(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = RuleSet([
+            ("filled", r"position\s+has\s+been\s+filled"),
+            ("regret", r"regret\s+to\s+inform"),
+            ("repeat", r"(\w+) \1"),
+        ], re.IGNORECASE)
+
+    def test_first_matching_rule_in_priority_order(self):
+        self.assertEqual(len(self.rules), 3)
+        self.assertEqual(self.rules.first("We REGRET to inform you the position has been filled"),
+                         "filled")
+        self.assertEqual(self.rules.first("We regret to inform you"), "regret")
+        self.assertIsNone(self.rules.first("Thanks for applying"))
+
+    def test_search_returns_match(self):
+        name, match = self.rules.search("so so sorry")
+        self.assertEqual((name, match.group(1)), ("repeat", "so"))
+        self.assertIsNone(self.rules.search(""))
+
+    def test_bad_rule_fails_at_construction(self):
+        with self.assertRaises(re.error):
+            RuleSet([("broken", r"(unclosed")])
+
+
+class TestCompiled(unittest.TestCase):
+
+    def test_cached_per_pattern_and_flags(self):
+        self.assertIs(compiled(r"\d+ new jobs"), compiled(r"\d+ new jobs"))
+        self.assertIsNot(compiled(r"\d+ new jobs"), compiled(r"\d+ new jobs", re.IGNORECASE))
+        self.assertTrue(compiled(r"\d+ new jobs", re.IGNORECASE).search("3 NEW JOBS"))
+
+
+if __name__ == "__main__":
+    unittest.main()
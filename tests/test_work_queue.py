@@ -0,0 +1,109 @@
+"""
+Tests for work_queue.py — lease/ack, retry scheduling, dead letters and
+recovery of leases from interrupted runs.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import WorkQueue
+
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "queue.sqlite3")
+        self.clock = _Clock()
+        self.queue = self._open()
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmpdir.cleanup()
+
+    def _open(self):
+        return WorkQueue(self.path, lease_seconds=60, max_attempts=3, backoff_seconds=10,
+                         clock=self.clock)
+
+    def test_lease_ack_in_key_order(self):
+        self.assertEqual(self.queue.enqueue([("2_0", {"n": 2}), ("1_0", {"n": 1})]), 2)
+        self.assertEqual(self.queue.enqueue([("1_0", {"n": "again"})]), 0)
+        self.assertEqual(self.queue.lease(), ("1_0", {"n": 1}, 1))
+        self.assertEqual(self.queue.lease(), ("2_0", {"n": 2}, 1))
+        self.assertIsNone(self.queue.lease())
+        self.queue.ack("1_0")
+        self.assertEqual(self.queue.counts(), {"ready": 0, "leased": 1, "done": 1, "dead": 0})
+
+        # Acked items are never handed out again, even if enqueued again
+        self.queue.enqueue([("1_0", {"n": 1})])
+        self.assertIsNone(self.queue.lease())
+
+    def test_retry_backs_off_then_dead_letters(self):
+        self.queue.enqueue([("1_0", {})])
+        self.queue.lease()
+        self.assertEqual(self.queue.retry("1_0", "Read timed out"), "ready")
+        self.assertIsNone(self.queue.lease())
+        self.assertEqual(self.queue.next_due(), 10)
+
+        self.clock.now += 10
+        self.assertEqual(self.queue.lease()[2], 2)
+        self.assertEqual(self.queue.retry("1_0", "Read timed out"), "ready")
+        self.assertEqual(self.queue.next_due(), 20)     # doubled
+
+        self.clock.now += 20
+        self.queue.lease()
+        self.assertEqual(self.queue.retry("1_0", "503 Server Error"), "dead")
+        self.assertEqual(self.queue.dead(), [("1_0", 3, "503 Server Error")])
+        self.assertIsNone(self.queue.next_due())
+
+        self.assertEqual(self.queue.requeue_dead(), 1)
+        self.assertEqual(self.queue.lease(), ("1_0", {}, 1))
+
+    def test_expired_lease_is_leased_again(self):
+        self.queue.enqueue([("1_0", {})])
+        self.queue.lease()
+        self.clock.now += 59
+        self.assertIsNone(self.queue.lease())
+        self.clock.now += 1
+        self.assertEqual(self.queue.lease(), ("1_0", {}, 2))
+
+    def test_release_and_orphans_survive_reopen(self):
+        self.queue.enqueue([("1_0", {}), ("2_0", {})])
+        self.queue.lease()
+        self.queue.release("1_0")
+        self.assertEqual(self.queue.lease(), ("1_0", {}, 1))   # attempt not counted
+        self.queue.close()
+
+        self.queue = self._open()
+        self.assertEqual(self.queue.reclaim_orphans(), 0)       # this process is alive
+        for owner, reclaimed in (("otherhost:999999999", 0),
+                                 (f"{socket.gethostname()}:999999999", 1)):
+            self.queue._write("UPDATE jobs SET owner = ? WHERE key = '1_0'", (owner,))
+            self.assertEqual(self.queue.reclaim_orphans(), reclaimed)
+        self.assertEqual(self.queue.lease(), ("1_0", {}, 2))
+
+    def test_drop_unstarted_keeps_scheduled_retries(self):
+        self.queue.enqueue([("1_0", {}), ("2_0", {})])
+        self.queue.lease()
+        self.queue.retry("1_0", "Read timed out")
+        self.assertEqual(self.queue.drop_unstarted(["1_0", "2_0"]), 1)
+        self.assertEqual((self.queue.state("1_0"), self.queue.state("2_0")), ("ready", "done"))
+
+
+if __name__ == "__main__":
+    unittest.main()
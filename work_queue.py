@@ -0,0 +1,294 @@
+"""
+Durable work queue in SQLite: lease/ack, scheduled retries, dead letters.
+
+career_search queues every lead that needs sourcing here, then workers
+lease leads one at a time and ack each as soon as its record is written.
+Every state change is committed before the next lead starts, so a run
+that crashes, is interrupted or hits its --deadline resumes exactly where
+it stopped: finished leads are never redone, and the lead that was in
+flight is leased again.
+
+States:
+    ready    waiting for a worker. available_at may be in the future: a
+             retry scheduled after a transient failure (exponential backoff)
+    leased   held by a worker until lease_until. An expired lease, or one
+             whose owning process on this host has exited, is leased again
+    done     acked
+    dead     failed permanently or ran out of attempts. Kept with the last
+             error until requeued
+
+Usage:
+    python work_queue.py [--db PATH]                 # counts per state
+    python work_queue.py dead [--db PATH]            # dead letters with errors
+    python work_queue.py requeue-dead [--db PATH]    # give dead letters another go
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, "pipeline")
+SEARCH_QUEUE_PATH = os.path.join(PIPELINE_DIR, "search_queue.sqlite3")
+
+STATES = ("ready", "leased", "done", "dead")
+LEASE_SECONDS = 600         # longer than any one lead takes to source
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 60        # first retry; doubles per attempt
+MAX_BACKOFF_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key          TEXT PRIMARY KEY,
+    payload      TEXT NOT NULL,
+    state        TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_until  REAL,
+    owner        TEXT,
+    last_error   TEXT,
+    created_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state_available ON jobs (state, available_at);
+"""
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True     # exists, owned by someone else
+    return True
+
+
+class WorkQueue:
+    """Keyed work items with at-least-once delivery to leasing workers."""
+
+    def __init__(self, path=SEARCH_QUEUE_PATH, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, backoff_seconds=BACKOFF_SECONDS,
+                 max_backoff_seconds=MAX_BACKOFF_SECONDS, clock=time.time):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.clock = clock
+        self.owner = _owner()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared by career_search's worker threads; every call takes the lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, sql, params=()):
+        """Run one statement in its own committed transaction; returns rows changed."""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # -- producers ---------------------------------------------------------
+
+    def enqueue(self, items):
+        """Add (key, payload) items. Keys already queued, in any state, are left alone.
+
+        Returns the number added.
+        """
+        now, stamp = self.clock(), datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = 0
+                for key, payload in items:
+                    added += self._conn.execute(
+                        "INSERT OR IGNORE INTO jobs (key, payload, state, available_at,"
+                        " created_at, updated_at) VALUES (?, ?, 'ready', ?, ?, ?)",
+                        (str(key), json.dumps(payload, ensure_ascii=False), now,
+                         stamp, stamp)).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def requeue(self, keys):
+        """Make done or dead items ready again, with a fresh attempt count."""
+        now, stamp = self.clock(), datetime.now().isoformat()
+        return sum(self._write(
+            "UPDATE jobs SET state = 'ready', attempts = 0, available_at = ?, last_error = NULL,"
+            " updated_at = ? WHERE key = ? AND state IN ('done', 'dead')",
+            (now, stamp, str(key))) for key in keys)
+
+    def requeue_dead(self):
+        return self.requeue(key for key, _, _ in self.dead())
+
+    def drop_unstarted(self, keys):
+        """Mark never-attempted ready items done: their work happened elsewhere."""
+        stamp = datetime.now().isoformat()
+        return sum(self._write(
+            "UPDATE jobs SET state = 'done', updated_at = ?"
+            " WHERE key = ? AND state = 'ready' AND attempts = 0", (stamp, str(key)))
+            for key in keys)
+
+    # -- workers -----------------------------------------------------------
+
+    def reclaim_orphans(self):
+        """Make leases held by exited processes on this host ready again.
+
+        Returns the number reclaimed. (Leases from other hosts wait for
+        lease_until.)
+        """
+        host = socket.gethostname()
+        orphans = [key for key, owner in self._query(
+                       "SELECT key, owner FROM jobs WHERE state = 'leased'")
+                   if owner and owner.rsplit(":", 1)[0] == host
+                   and not _pid_alive(int(owner.rsplit(":", 1)[1]))]
+        stamp = datetime.now().isoformat()
+        for key in orphans:
+            self._write("UPDATE jobs SET state = 'ready', lease_until = NULL, owner = NULL,"
+                        " updated_at = ? WHERE key = ? AND state = 'leased'", (stamp, key))
+        return len(orphans)
+
+    def lease(self):
+        """Lease the next due item: (key, payload, attempt number), or None."""
+        now = self.clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT key, payload, attempts FROM jobs"
+                    " WHERE (state = 'ready' AND available_at <= ?)"
+                    " OR (state = 'leased' AND lease_until <= ?)"
+                    " ORDER BY available_at, key LIMIT 1", (now, now)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'leased', attempts = attempts + 1,"
+                        " lease_until = ?, owner = ?, updated_at = ? WHERE key = ?",
+                        (now + self.lease_seconds, self.owner, datetime.now().isoformat(),
+                         row[0]))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        key, payload, attempts = row
+        return key, json.loads(payload), attempts + 1
+
+    def ack(self, key):
+        """The leased item is finished."""
+        self._write("UPDATE jobs SET state = 'done', lease_until = NULL, owner = NULL,"
+                    " updated_at = ? WHERE key = ?", (datetime.now().isoformat(), str(key)))
+
+    def release(self, key):
+        """Hand a leased item back untouched, keeping its place (the attempt is not counted)."""
+        self._write("UPDATE jobs SET state = 'ready', attempts = MAX(attempts - 1, 0),"
+                    " lease_until = NULL, owner = NULL, updated_at = ?"
+                    " WHERE key = ? AND state = 'leased'",
+                    (datetime.now().isoformat(), str(key)))
+
+    def retry(self, key, error):
+        """Schedule a leased item again after a transient failure.
+
+        The delay doubles with each attempt. After max_attempts the item
+        goes to the dead letters instead. Returns the new state.
+        """
+        rows = self._query("SELECT attempts FROM jobs WHERE key = ?", (str(key),))
+        attempts = rows[0][0] if rows else 0
+        if attempts >= self.max_attempts:
+            self.bury(key, error)
+            return "dead"
+        delay = min(self.backoff_seconds * 2 ** max(attempts - 1, 0), self.max_backoff_seconds)
+        self._write("UPDATE jobs SET state = 'ready', available_at = ?, lease_until = NULL,"
+                    " owner = NULL, last_error = ?, updated_at = ? WHERE key = ?",
+                    (self.clock() + delay, error, datetime.now().isoformat(), str(key)))
+        return "ready"
+
+    def bury(self, key, error):
+        """Move an item to the dead letters: it failed in a way retrying will not fix."""
+        self._write("UPDATE jobs SET state = 'dead', lease_until = NULL, owner = NULL,"
+                    " last_error = ?, updated_at = ? WHERE key = ?",
+                    (error, datetime.now().isoformat(), str(key)))
+
+    # -- queries -----------------------------------------------------------
+
+    def next_due(self):
+        """Seconds until the next ready item is due (0 if one is due now), or None."""
+        rows = self._query("SELECT MIN(available_at) FROM jobs WHERE state = 'ready'")
+        if rows[0][0] is None:
+            return None
+        return max(rows[0][0] - self.clock(), 0)
+
+    def state(self, key):
+        rows = self._query("SELECT state FROM jobs WHERE key = ?", (str(key),))
+        return rows[0][0] if rows else None
+
+    def counts(self):
+        """{state: items}, every state present."""
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self._query("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return counts
+
+    def dead(self):
+        """[(key, attempts, last_error)] for the dead letters."""
+        return self._query("SELECT key, attempts, last_error FROM jobs WHERE state = 'dead'"
+                           " ORDER BY updated_at")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect a work queue")
+    parser.add_argument("command", nargs="?", default="counts",
+                        choices=("counts", "dead", "requeue-dead"))
+    parser.add_argument("--db", default=SEARCH_QUEUE_PATH, help="Queue database")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"  No queue at {args.db}")
+        return
+
+    with WorkQueue(args.db) as queue:
+        if args.command == "counts":
+            counts = queue.counts()
+            print(f"  {args.db}")
+            for state in STATES:
+                print(f"    {state:<7} {counts[state]:>6}")
+            due = queue.next_due()
+            if due:
+                print(f"    next retry due in {due:.0f}s")
+        elif args.command == "dead":
+            for key, attempts, error in queue.dead():
+                print(f"  {key:<16} attempts={attempts}  {error or ''}")
+        else:
+            print(f"  Requeued {queue.requeue_dead()} dead letters")
+
+
+if __name__ == "__main__":
+    main()